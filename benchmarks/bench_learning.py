@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_learning.py
+
+Mide clasificaciones/segundo con el sistema de aprendizaje habilitado vs deshabilitado.
+
+La "clasificación" es un clasificador determinista por palabras clave (sin LLM ni embeddings),
+así el benchmark aísla el costo del bookkeeping de aprendizaje (SQLite) por nota.
+
+Uso:
+    python benchmarks/bench_learning.py --notes 2000 [--output resultados.json]
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from paralib.learning_system import PARA_Learning_System  # noqa: E402
+
+CATEGORIES = ["Projects", "Areas", "Resources", "Archive"]
+KEYWORDS = {
+    "Projects": ["deadline", "sprint", "entrega"],
+    "Areas": ["salud", "finanzas", "equipo"],
+    "Resources": ["tutorial", "referencia", "api"],
+    "Archive": ["completado", "2019", "cerrado"],
+}
+
+
+def _make_notes(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    words = [w for ws in KEYWORDS.values() for w in ws] + ["nota", "idea", "reunión", "texto"]
+    return [" ".join(rng.choice(words) for _ in range(40)) for _ in range(count)]
+
+
+def _classify(content: str) -> dict:
+    scores = {cat: sum(content.count(k) for k in kws) for cat, kws in KEYWORDS.items()}
+    category = max(scores, key=scores.get)
+    total = sum(scores.values()) or 1
+    return {
+        "predicted_category": category,
+        "confidence": scores[category] / total,
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+
+
+def run(notes, learning: PARA_Learning_System = None) -> float:
+    start = time.perf_counter()
+    for content in notes:
+        result = _classify(content)
+        if learning is not None:
+            learning.learn_from_classification({**result, "note_content": content})
+    if learning is not None:
+        learning._pool.flush()
+    elapsed = time.perf_counter() - start
+    return len(notes) / elapsed if elapsed > 0 else float("inf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=2000)
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+
+    notes = _make_notes(args.notes)
+    with tempfile.TemporaryDirectory() as tmp:
+        learning = PARA_Learning_System(vault_path=Path(tmp))
+        disabled = run(notes)
+        enabled = run(notes, learning)
+
+    result = {
+        "benchmark": "learning_overhead",
+        "notes": args.notes,
+        "classifications_per_sec_learning_disabled": round(disabled, 1),
+        "classifications_per_sec_learning_enabled": round(enabled, 1),
+        "overhead_ms_per_note": round((1 / enabled - 1 / disabled) * 1000, 4),
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+    print(json.dumps(result, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
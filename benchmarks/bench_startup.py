@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_startup.py
+
+Mide el tiempo de arranque del CLI: latencia de pared de ``para_cli.py help|version|status``
+en procesos nuevos (mediana/mín/máx sobre N ejecuciones), el arranque del intérprete vacío
+como referencia y el tiempo total de importaciones según ``python -X importtime``.
+
+Cada ejecución corre en un directorio temporal (el CLI escribe ``logs/`` en el cwd).
+
+Uso:
+    python benchmarks/bench_startup.py --runs 10 [--commands help,status] [--output resultados.json]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+CLI = Path(__file__).resolve().parent.parent / "src" / "para_cli.py"
+
+
+def _timed_run(argv, cwd: str) -> float:
+    start = time.perf_counter()
+    subprocess.run(argv, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+    return time.perf_counter() - start
+
+
+def _import_profile(command: str, cwd: str, top: int = 10) -> dict:
+    """Total de ``-X importtime`` (µs acumulados de los módulos de primer nivel) y los más caros."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", str(CLI), command], cwd=cwd,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=False)
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|", 2)
+        depth = len(name) - len(name.lstrip(" "))
+        modules.append((depth, name.strip(), int(cumulative_us)))
+    # Solo los módulos de primer nivel (menor sangría) suman el total sin contar dos veces
+    min_depth = min((depth for depth, _, _ in modules), default=0)
+    roots = [(name, us) for depth, name, us in modules if depth == min_depth]
+    return {
+        "total_import_ms": round(sum(us for _, us in roots) / 1000, 1),
+        "modules": len(modules),
+        "top": [{"module": name, "ms": round(us / 1000, 1)}
+                for name, us in sorted(roots, key=lambda item: item[1], reverse=True)[:top]],
+    }
+
+
+def _summary(samples) -> dict:
+    ms = [s * 1000 for s in samples]
+    return {
+        "median_ms": round(statistics.median(ms), 1),
+        "min_ms": round(min(ms), 1),
+        "max_ms": round(max(ms), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--commands", type=str, default="help,version,status")
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+
+    commands = [c.strip() for c in args.commands.split(",") if c.strip()]
+    result = {"benchmark": "startup", "runs": args.runs, "python": sys.version.split()[0], "commands": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        result["interpreter"] = _summary([_timed_run([sys.executable, "-c", "pass"], tmp)
+                                          for _ in range(args.runs)])
+        for command in commands:
+            _timed_run([sys.executable, str(CLI), command], tmp)  # calentamiento (pyc, caché del SO)
+            samples = [_timed_run([sys.executable, str(CLI), command], tmp) for _ in range(args.runs)]
+            result["commands"][command] = {**_summary(samples), **_import_profile(command, tmp)}
+    result["timestamp"] = datetime.utcnow().isoformat()
+
+    print(json.dumps(result, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
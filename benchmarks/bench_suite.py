@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_suite.py
+
+Suite reproducible de rendimiento sobre vaults sintéticos (``synthetic_vault.py``).
+
+Para cada tamaño genera un vault determinista en un directorio temporal y mide, por etapa:
+
+- ``generate``: creación del vault sintético (informativo).
+- ``scan``: escaneo paralelo del árbol (``vault_snapshot.scan_vault``).
+- ``read``: lectura de todas las notas.
+- ``features``: ``extract_structured_features_from_note`` sobre todas las notas y
+  ``analyze_note_completely`` sobre la muestra.
+- ``index``: alta de la muestra en ``ChromaPARADatabase`` (ChromaDB o modo fallback).
+- ``similarity``: ``search_similar_notes`` sobre la muestra indexada, secuencial y con
+  ``--concurrency`` llamadores a la vez (micro-batching de ``embedding_service``).
+- ``clustering``: ``IntelligentClusteringSystem`` (análisis + agrupado) sobre la muestra.
+- ``classification``: ``classify_note_with_complete_analysis`` completa con el backend
+  ``stub`` de ``AIEngine`` (sin Ollama, latencia ``--llm-latency-ms``), con el desglose por
+  etapa del perfilador.
+- ``backup``: backup completo, snapshot incremental inicial y uno sin cambios.
+- ``consolidation``: plan en memoria (``MovePlanner``) de la consolidación de carpetas y su ejecución.
+
+Las etapas cuadráticas o con E/S por nota se miden sobre una muestra fija (``--sample``,
+``--classify``) para que 100k notas siga siendo viable; el JSON indica el tamaño de cada una.
+
+Uso:
+    python benchmarks/bench_suite.py --sizes 1000,10000 [--stages scan,features] [--output resultados.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from synthetic_vault import CATEGORY_SHARES, generate_vault  # noqa: E402
+
+# Algunos módulos imprimen al importarse o desde hilos de fondo (detección de vault/backend):
+# stdout queda solo para el JSON de resultados
+with contextlib.redirect_stdout(sys.stderr):
+    from paralib.backup_manager import PARABackupManager  # noqa: E402
+    from paralib.db import ChromaPARADatabase  # noqa: E402
+    from paralib.embedding_service import get_embedding_service  # noqa: E402
+    from paralib.intelligent_clustering import IntelligentClusteringSystem  # noqa: E402
+    from paralib.move_planner import MovePlanner  # noqa: E402
+    from paralib.organizer import (  # noqa: E402
+        CLASSIFICATION_SYSTEM_PROMPT, analyze_note_completely, classify_note_with_complete_analysis,
+    )
+    from paralib.profiler import profiler  # noqa: E402
+    from paralib.stub_llm import configure_stub_llm  # noqa: E402
+    from paralib.vault import extract_structured_features_from_note  # noqa: E402
+    from paralib.vault_snapshot import scan_vault  # noqa: E402
+
+STAGES = ["scan", "read", "features", "index", "similarity", "clustering",
+          "classification", "backup", "consolidation"]
+DIRECTIVE = "Organiza mis notas según PARA"
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parent, timeout=5).stdout.strip()
+    except Exception:
+        return ""
+
+
+def _measure(func: Callable[[], Any]) -> tuple:
+    """Ejecuta ``func`` con stdout silenciado y devuelve (segundos, resultado)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+    return elapsed, result
+
+
+@contextlib.contextmanager
+def _stage(results: Dict[str, Any], name: str):
+    """Una etapa que falla (p. ej. por una dependencia opcional ausente) queda como error en el JSON."""
+    try:
+        yield
+    except Exception as e:
+        results[name] = {"error": f"{type(e).__name__}: {e}"}
+        print(f"  ⚠️ {name}: {type(e).__name__}: {e}", file=sys.stderr)
+
+
+def _rate(items: int, seconds: float) -> float:
+    return round(items / seconds, 1) if seconds > 0 else float("inf")
+
+
+def run_size(notes: int, workdir: Path, stages: List[str], sample: int, classify: int,
+             latency_ms: float, seed: int, concurrency: int = 8) -> Dict[str, Any]:
+    vault = workdir / f"vault_{notes}"
+    results: Dict[str, Any] = {}
+
+    seconds, summary = _measure(lambda: generate_vault(vault, notes, seed))
+    results["generate"] = {"seconds": round(seconds, 3), "notes_per_sec": _rate(notes, seconds)}
+
+    paths = sorted(p for p in vault.rglob("*.md"))
+    rng = random.Random(seed)
+    sample_paths = sorted(rng.sample(paths, min(sample, len(paths))))
+    contents: Dict[Path, str] = {}
+
+    if "scan" in stages:
+        with _stage(results, "scan"):
+            seconds, found = _measure(lambda: scan_vault(vault, lambda p: p.endswith(".md")))
+            results["scan"] = {"seconds": round(seconds, 3), "files": len(found), "files_per_sec": _rate(len(found), seconds)}
+
+    seconds, _ = _measure(lambda: contents.update((p, p.read_text(encoding="utf-8")) for p in paths))
+    if "read" in stages:
+        results["read"] = {"seconds": round(seconds, 3), "files": len(paths),
+                           "mb_per_sec": round(summary["bytes"] / 1e6 / seconds, 1) if seconds > 0 else None}
+
+    if "features" in stages:
+        with _stage(results, "features"):
+            seconds, _ = _measure(lambda: [extract_structured_features_from_note(contents[p], str(p)) for p in paths])
+            complete_s, _ = _measure(lambda: [analyze_note_completely(p, contents[p], DIRECTIVE) for p in sample_paths])
+            results["features"] = {"seconds": round(seconds, 3), "notes": len(paths), "notes_per_sec": _rate(len(paths), seconds),
+                                   "complete_analysis_seconds": round(complete_s, 3), "complete_analysis_notes": len(sample_paths),
+                                   "complete_analysis_notes_per_sec": _rate(len(sample_paths), complete_s)}
+
+    db = None
+    if {"index", "similarity"} & set(stages):
+        with _stage(results, "index"):
+            category_of = {p: p.relative_to(vault).parts[0] for p in sample_paths}
+            _, db = _measure(lambda: ChromaPARADatabase(db_path=str(workdir / f"chroma_{notes}" / "chroma")))
+            seconds, _ = _measure(lambda: [db.add_or_update_note(p, contents[p], category_of[p]) for p in sample_paths])
+            results["index"] = {"seconds": round(seconds, 3), "notes": len(sample_paths),
+                                "notes_per_sec": _rate(len(sample_paths), seconds),
+                                "mode": "fallback" if db.fallback_mode else "chromadb"}
+
+    if "similarity" in stages and db is not None:
+        with _stage(results, "similarity"):
+            queries = sample_paths[:min(200, len(sample_paths))]
+            seconds, _ = _measure(lambda: [db.search_similar_notes(contents[p], n_results=5) for p in queries])
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                concurrent_s, _ = _measure(lambda: list(executor.map(
+                    lambda p: db.search_similar_notes(contents[p], n_results=5), queries)))
+            service = get_embedding_service(db)
+            results["similarity"] = {"seconds": round(seconds, 3), "queries": len(queries),
+                                     "queries_per_sec": _rate(len(queries), seconds), "indexed": len(sample_paths),
+                                     "concurrency": concurrency, "concurrent_seconds": round(concurrent_s, 3),
+                                     "concurrent_queries_per_sec": _rate(len(queries), concurrent_s),
+                                     "batching": dict(service.stats) if service is not None else None}
+
+    if "clustering" in stages:
+        with _stage(results, "clustering"):
+            clustering = IntelligentClusteringSystem()
+            analyze_s, analyses = _measure(lambda: [a for a in (clustering.analyze_note(p) for p in sample_paths) if a])
+            cluster_s, clusters = _measure(lambda: clustering.cluster_notes(analyses))
+            results["clustering"] = {"seconds": round(analyze_s + cluster_s, 3), "notes": len(analyses),
+                                     "analyze_seconds": round(analyze_s, 3), "cluster_seconds": round(cluster_s, 3),
+                                     "clusters": len(clusters)}
+
+    if "classification" in stages:
+        with _stage(results, "classification"):
+            os.environ["PARA_AI_BACKEND"] = "stub"
+            configure_stub_llm(latency_ms=latency_ms)
+            classify_paths = sample_paths[:classify]
+            class_db = ChromaPARADatabase(db_path=str(vault / ".para_db" / "chroma"))
+            profiler.enable("stages")
+            profiler.start(f"bench_classification_{notes}")
+            try:
+                seconds, outcomes = _measure(lambda: [
+                    classify_note_with_complete_analysis(contents[p], p, DIRECTIVE, "stub", CLASSIFICATION_SYSTEM_PROMPT,
+                                                         class_db, vault)
+                    for p in classify_paths
+                ])
+                stage_report = profiler.report()["stages"]
+            finally:
+                profiler.mode = None
+            results["classification"] = {"seconds": round(seconds, 3), "notes": len(classify_paths),
+                                         "notes_per_sec": _rate(len(classify_paths), seconds),
+                                         "failed": sum(1 for o in outcomes if not o), "llm_latency_ms": latency_ms,
+                                         "profile": stage_report}
+
+    if "backup" in stages:
+        with _stage(results, "backup"):
+            manager = PARABackupManager(backup_dir=str(workdir / f"backups_{notes}"))
+            manager.stop_auto_scheduler()
+            full_s, _ = _measure(lambda: manager.create_backup(str(vault), "full", "bench"))
+            first_s, _ = _measure(lambda: manager.create_backup(str(vault), "incremental", "bench"))
+            unchanged_s, _ = _measure(lambda: manager.create_backup(str(vault), "incremental", "bench"))
+            results["backup"] = {"seconds": round(full_s + first_s + unchanged_s, 3), "format": manager.archive_format,
+                                 "full_seconds": round(full_s, 3), "full_mb_per_sec": round(summary["bytes"] / 1e6 / full_s, 1),
+                                 "incremental_first_seconds": round(first_s, 3),
+                                 "incremental_unchanged_seconds": round(unchanged_s, 3)}
+
+    if "consolidation" in stages:
+        with _stage(results, "consolidation"):
+            # Mismo criterio que consolidation_manager: carpetas cuyo nombre empieza igual se fusionan
+            def plan():
+                planner = MovePlanner(vault)
+                groups = 0
+                for category, _ in CATEGORY_SHARES[1:]:
+                    by_prefix: Dict[str, List[Path]] = {}
+                    for folder in sorted(p for p in (vault / category).iterdir() if p.is_dir()):
+                        by_prefix.setdefault(folder.name.split()[0], []).append(folder)
+                    for prefix, folders in by_prefix.items():
+                        if len(folders) < 2:
+                            continue
+                        target = vault / category / prefix
+                        planner.mkdir(target)
+                        for folder in folders:
+                            if folder != target:
+                                planner.gather(folder, target, "*.md", start=2)
+                        groups += 1
+                return planner, groups
+            plan_s, (planner, groups) = _measure(plan)
+            moves = planner.pending_moves()
+            execute_s, _ = _measure(lambda: planner.execute("bench consolidation"))
+            results["consolidation"] = {"seconds": round(plan_s + execute_s, 3), "groups": groups, "moves": moves,
+                                        "plan_seconds": round(plan_s, 3), "execute_seconds": round(execute_s, 3),
+                                        "moves_per_sec": _rate(moves, execute_s)}
+
+    return {"notes": notes, "vault": summary, "sample": len(sample_paths), "stages": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=str, default="1000", help="Tamaños de vault separados por comas (1000,10000,100000)")
+    parser.add_argument("--stages", type=str, default=",".join(STAGES))
+    parser.add_argument("--sample", type=int, default=1000, help="Notas para indexado, similitud, clustering y análisis completo")
+    parser.add_argument("--classify", type=int, default=200, help="Notas para la clasificación completa")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=8, help="Llamadores concurrentes en la etapa de similitud")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", type=str, default=None, help="Directorio de trabajo (por defecto uno temporal)")
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"Etapas desconocidas: {', '.join(sorted(unknown))}")
+
+    runs = []
+    with tempfile.TemporaryDirectory(dir=args.workdir) as tmp, contextlib.redirect_stdout(sys.stderr):
+        for size in sizes:
+            print(f"▶ Vault de {size} notas...", file=sys.stderr)
+            runs.append(run_size(size, Path(tmp), stages, args.sample, args.classify, args.llm_latency_ms,
+                                 args.seed, args.concurrency))
+
+    result = {
+        "benchmark": "suite",
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "runs": runs,
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+benchmarks/synthetic_vault.py
+
+Generador determinista de vaults sintéticos de Obsidian para los benchmarks.
+
+Con la misma semilla y el mismo número de notas produce byte a byte el mismo vault
+(contenido, nombres, árbol de carpetas y mtimes): frontmatter YAML, tags, wikilinks
+entre notas, tareas, fechas y un árbol PARA (00-Inbox, 01-Projects, 02-Areas,
+03-Resources, 04-Archive) cuyo número de carpetas crece con el tamaño del vault.
+
+Uso:
+    python benchmarks/synthetic_vault.py /tmp/vault_10k --notes 10000 [--seed 42]
+"""
+import argparse
+import json
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Reparto de notas por categoría (suma 1.0)
+CATEGORY_SHARES = [
+    ("00-Inbox", 0.10),
+    ("01-Projects", 0.30),
+    ("02-Areas", 0.20),
+    ("03-Resources", 0.25),
+    ("04-Archive", 0.15),
+]
+
+# Nombres de carpetas: varios coinciden con los grupos de consolidation_manager
+PROJECT_NAMES = ["Api Gateway", "Terraform Infra", "Marketing Launch", "BBI Dashboard", "Code Review",
+                 "Analysis Ventas", "Development Portal", "Task Migración", "Project Atlas", "Work Onboarding"]
+AREA_NAMES = ["Salud", "Finanzas", "Reuniones Equipo", "Rutinas", "Personal", "Fitness", "Money Tracking",
+              "Meeting Notes", "Habit Tracker", "Familia", "Hogar", "Carrera"]
+RESOURCE_NAMES = ["AWS", "API Design", "Database", "Tutorial Python", "Guide Kubernetes", "Documentation",
+                  "Manual Git", "Reference SQL", "Training Course", "Tools", "Software Libros", "Chroma"]
+ARCHIVE_YEARS = ["2019", "2020", "2021", "2022", "2023"]
+
+VOCABULARY = {
+    "00-Inbox": ["idea", "pendiente", "revisar", "leer", "captura", "rápido", "link", "pensar"],
+    "01-Projects": ["deadline", "sprint", "entrega", "milestone", "roadmap", "cliente", "release",
+                    "implementar", "deploy", "objetivo", "kickoff", "backlog"],
+    "02-Areas": ["hábito", "presupuesto", "salud", "equipo", "revisión", "mensual", "responsabilidad",
+                 "seguimiento", "rutina", "gastos"],
+    "03-Resources": ["tutorial", "referencia", "documentación", "ejemplo", "api", "guía", "concepto",
+                     "patrón", "librería", "snippet"],
+    "04-Archive": ["completado", "cerrado", "histórico", "finalizado", "obsoleto", "retrospectiva"],
+}
+COMMON_WORDS = ["nota", "sistema", "proceso", "datos", "reunión", "análisis", "plan", "texto", "usuario",
+                "servicio", "módulo", "versión", "cambio", "problema", "solución", "resultado", "tiempo"]
+TAGS = {
+    "00-Inbox": ["inbox", "idea", "leer-luego"],
+    "01-Projects": ["proyecto", "sprint", "cliente", "trabajo/activo"],
+    "02-Areas": ["area", "salud", "finanzas", "personal"],
+    "03-Resources": ["recurso", "tutorial", "referencia", "tech/aws", "tech/python"],
+    "04-Archive": ["archivo", "completado", "histórico"],
+}
+STATUSES = {
+    "00-Inbox": ["nuevo"],
+    "01-Projects": ["activo", "en-progreso", "bloqueado"],
+    "02-Areas": ["continuo"],
+    "03-Resources": ["referencia"],
+    "04-Archive": ["completado", "cancelado"],
+}
+
+BASE_DATE = datetime(2024, 1, 1, 9, 0, 0, tzinfo=timezone.utc)
+
+
+def _folder_names(base: List[str], wanted: int) -> List[str]:
+    """``wanted`` nombres únicos a partir de ``base`` (se numeran cuando no alcanzan)."""
+    names = list(base[:wanted])
+    round_number = 2
+    while len(names) < wanted:
+        names.extend(f"{name} {round_number}" for name in base[:wanted - len(names)])
+        round_number += 1
+    return names
+
+
+def build_folder_tree(notes: int) -> Dict[str, List[str]]:
+    """Carpetas relativas por categoría; crecen con el tamaño del vault."""
+    projects = _folder_names(PROJECT_NAMES, max(5, notes // 40))
+    areas = _folder_names(AREA_NAMES, max(6, min(60, notes // 100)))
+    topics = _folder_names(RESOURCE_NAMES, max(6, notes // 150))
+    resources = []
+    for index, topic in enumerate(topics):
+        resources.append(topic)
+        if index % 3 == 0:
+            resources.append(f"{topic}/Ejemplos")
+    archive = [f"{ARCHIVE_YEARS[i % len(ARCHIVE_YEARS)]}/{name}"
+               for i, name in enumerate(_folder_names(PROJECT_NAMES, max(5, notes // 80)))]
+    return {
+        "00-Inbox": [""],
+        "01-Projects": projects,
+        "02-Areas": areas,
+        "03-Resources": resources,
+        "04-Archive": archive,
+    }
+
+
+def _sentence(rng: random.Random, vocabulary: List[str], words: int) -> str:
+    pool = vocabulary + COMMON_WORDS
+    text = " ".join(rng.choice(pool) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def _render_note(rng: random.Random, category: str, folder: str, title: str, created: datetime,
+                 link_targets: List[str]) -> Dict[str, Any]:
+    vocabulary = VOCABULARY[category]
+    tags = rng.sample(TAGS[category], k=min(len(TAGS[category]), rng.randint(1, 3)))
+    links = rng.sample(link_targets, k=min(len(link_targets), rng.randint(0, 5))) if link_targets else []
+    task_count = rng.randint(2, 8) if category == "01-Projects" else rng.randint(0, 3)
+    done_ratio = 1.0 if category == "04-Archive" else 0.4
+
+    lines = [
+        "---",
+        f"title: \"{title}\"",
+        f"created: {created.strftime('%Y-%m-%d')}",
+        f"updated: {(created + timedelta(days=rng.randint(0, 90))).strftime('%Y-%m-%d')}",
+        f"status: {rng.choice(STATUSES[category])}",
+        "tags: [" + ", ".join(tags) + "]",
+    ]
+    if folder:
+        lines.append(f"project: \"{folder.split('/')[-1]}\"")
+    if rng.random() < 0.2:
+        lines.append(f"aliases: [\"{title.split()[0]} {rng.randint(1, 99)}\"]")
+    lines += ["---", "", f"# {title}", ""]
+
+    for _ in range(rng.randint(2, 6)):
+        paragraph = " ".join(_sentence(rng, vocabulary, rng.randint(8, 20)) for _ in range(rng.randint(1, 4)))
+        if links and rng.random() < 0.6:
+            paragraph += f" Ver [[{links[rng.randrange(len(links))]}]]."
+        lines += [paragraph, ""]
+
+    if category == "01-Projects":
+        due = created + timedelta(days=rng.randint(7, 60))
+        lines += [f"**Deadline:** {due.strftime('%Y-%m-%d')}", ""]
+    if category == "03-Resources" and rng.random() < 0.4:
+        lines += ["```python", "def ejemplo(x):", "    return x * 2", "```", ""]
+
+    if task_count:
+        lines += ["## Tareas", ""]
+        for _ in range(task_count):
+            mark = "x" if rng.random() < done_ratio else " "
+            lines.append(f"- [{mark}] {_sentence(rng, vocabulary, rng.randint(3, 8))[:-1]}")
+        lines.append("")
+
+    if links:
+        lines += ["## Relacionado", ""] + [f"- [[{target}]]" for target in links] + [""]
+    lines.append(" ".join(f"#{tag}" for tag in tags))
+
+    return {"text": "\n".join(lines) + "\n", "links": len(links), "tasks": task_count}
+
+
+def generate_vault(root: Path, notes: int, seed: int = 42) -> Dict[str, Any]:
+    """
+    Genera ``notes`` notas en ``root`` (que debe no existir o estar vacío) y devuelve el
+    resumen del vault: notas, carpetas, bytes, links y tareas por categoría.
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    (root / ".obsidian").mkdir(exist_ok=True)
+    (root / ".obsidian" / "app.json").write_text('{"useMarkdownLinks": false}\n', encoding="utf-8")
+
+    rng = random.Random(seed)
+    tree = build_folder_tree(notes)
+    for category, folders in tree.items():
+        for folder in folders:
+            (root / category / folder).mkdir(parents=True, exist_ok=True)
+
+    # Títulos primero: los wikilinks apuntan a notas existentes del vault
+    plan = []
+    for category, share in CATEGORY_SHARES:
+        count = round(notes * share) if category != CATEGORY_SHARES[-1][0] else notes - len(plan)
+        for _ in range(count):
+            plan.append(category)
+    titles = []
+    for index, category in enumerate(plan):
+        word = rng.choice(VOCABULARY[category]).capitalize()
+        titles.append(f"{word} {rng.choice(COMMON_WORDS)} {index:06d}")
+
+    summary = {"notes": notes, "seed": seed, "folders": sum(len(f) for f in tree.values()),
+               "bytes": 0, "links": 0, "tasks": 0, "by_category": {}}
+    for index, (category, title) in enumerate(zip(plan, titles)):
+        folder = rng.choice(tree[category])
+        created = BASE_DATE - timedelta(days=rng.randint(0, 5 * 365), minutes=rng.randint(0, 1440))
+        link_targets = [titles[rng.randrange(notes)] for _ in range(8)]
+        note = _render_note(rng, category, folder, title, created, link_targets)
+
+        path = root / category / folder / f"{title}.md"
+        data = note["text"].encode("utf-8")
+        path.write_bytes(data)
+        mtime = created.timestamp() + rng.randint(0, 90 * 86400)
+        os.utime(path, (mtime, mtime))
+
+        summary["bytes"] += len(data)
+        summary["links"] += note["links"]
+        summary["tasks"] += note["tasks"]
+        summary["by_category"][category] = summary["by_category"].get(category, 0) + 1
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output_dir", type=str)
+    parser.add_argument("--notes", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    summary = generate_vault(Path(args.output_dir), args.notes, args.seed)
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,13 @@ from pathlib import Path
 src_path = Path(__file__).parent / "src"
 sys.path.insert(0, str(src_path))
 
+# Con el daemon de PARA activo, los comandos reenviables no cargan el CLI completo
+if __name__ == "__main__":
+    from paralib.daemon import forward
+    exit_code = forward(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+
 # Importar y ejecutar el CLI principal
 from para_cli import main
 
@@ -4,9 +4,12 @@ para_cli.py
 
 CLI principal para PARA System - Sistema de organización de Obsidian usando IA y metodología PARA.
 """
+import atexit
+import importlib.util
 import sys
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import cached_property
 import subprocess
 import time
 from pathlib import Path
@@ -38,6 +41,14 @@ if '--debug' in sys.argv:
     except ImportError:
         print("\n⚠️ Debug config not available, continuing with default verbosity")
 
+# Con el daemon de PARA escuchando, los comandos reenviables se ejecutan allí con el estado
+# caliente (ChromaDB, aprendizaje, vault); sin daemon se sigue en proceso
+if __name__ == "__main__":
+    from paralib.daemon import forward
+    _daemon_exit_code = forward(sys.argv[1:])
+    if _daemon_exit_code is not None:
+        sys.exit(_daemon_exit_code)
+
 # Configurar logging robusto antes de cualquier otra operación
 from paralib.logger import logger, log_function_calls, log_exceptions, log_critical_error
 from paralib.log_center import log_center
@@ -62,10 +73,9 @@ def setup_environment():
         required_modules = ['rich', 'requests', 'watchdog']
         missing_modules = []
         
+        # find_spec comprueba que estén instalados sin pagar su importación en cada arranque
         for module in required_modules:
-            try:
-                __import__(module)
-            except ImportError:
+            if importlib.util.find_spec(module) is None:
                 missing_modules.append(module)
         
         if missing_modules:
@@ -98,26 +108,41 @@ class PARACLI:
         # Configurar logging específico del CLI
         logger.set_context(component="CLI", session_id=os.getpid())
         
-        # Importar dependencias después de setup
+        # rich, el selector de vault y los módulos de comandos se cargan al primer uso
+        # (ver propiedades abajo): 'help' o 'status' no importan organizer, ChromaDB ni ollama
+        
+        logger.info("CLI inicializado correctamente")
+        log_center.log_info("CLI inicializado correctamente", "CLI-Init")
+    
+    @cached_property
+    def console(self):
         from rich.console import Console
-        from rich.prompt import Confirm
+        return Console()
+    
+    @cached_property
+    def vault_selector(self):
         from paralib.vault_selector import vault_selector
+        return vault_selector
+    
+    @cached_property
+    def finetune_commands(self):
         from paralib.cli.finetune import FinetuneCommands
+        return FinetuneCommands(self)
+    
+    @cached_property
+    def organize_commands(self):
         from paralib.cli.organize import OrganizeCommands
+        return OrganizeCommands(self)
+    
+    @cached_property
+    def qa_commands(self):
         from paralib.cli.qa import QACommands
+        return QACommands(self)
+    
+    @cached_property
+    def analyze_commands(self):
         from paralib.cli.analyze import AnalyzeCommands
-        
-        self.console = Console()
-        self.vault_selector = vault_selector
-        
-        # Inicializar módulos CLI
-        self.finetune_commands = FinetuneCommands(self)
-        self.organize_commands = OrganizeCommands(self)
-        self.qa_commands = QACommands(self)
-        self.analyze_commands = AnalyzeCommands(self)
-        
-        logger.info("CLI inicializado correctamente")
-        log_center.log_info("CLI inicializado correctamente", "CLI-Init")
+        return AnalyzeCommands(self)
     
     def setup_environment(self):
         """Configura el entorno específico del CLI."""
@@ -147,11 +172,11 @@ class PARACLI:
                 "doctor", "reclassify-all", "reclassify-enhanced", "plugins", "help", "version",
                 "export-knowledge", "import-knowledge", "learning-status",
                 "logs-auto-fix", "start", "chat", "interactive", "qa", "feedback", "backups",
-                "restore-backup", "exclude", "organize", "backup", "restore", "config", "status", "balance", "update", "naming", "fix-names", "consolidate",
+                "restore-backup", "exclude", "organize", "backup", "restore", "undo", "config", "status", "balance", "update", "naming", "fix-names", "consolidate",
                 "consolidate-duplicates", "export-knowledge", "import-knowledge", "learning-status",
                 "cleanup-folders", "cleanup-all", "test-naming", "consolidate-excessive",
                 "consolidate-aggressive", "reclassify", "reclassify-enhanced", "classify-inbox", "refactor-archive", "enforce-para", "fix-projects",
-                "clean-problematic", "logs-auto-fix", "finetune"
+                "clean-problematic", "logs-auto-fix", "finetune", "stub-llm", "daemon"
             ]
             
             # Agregar comandos de plugins
@@ -183,6 +208,16 @@ class PARACLI:
             if args is None:
                 args = sys.argv[1:]
             
+            # --profile[=stages|cprofile|pyinstrument]: perfil por etapa (equivale a PARA_PROFILE)
+            from paralib.profiler import profiler
+            profile_flags = [arg for arg in args if arg == '--profile' or arg.startswith('--profile=')]
+            if profile_flags:
+                args = [arg for arg in args if arg not in profile_flags]
+                profiler.enable(profile_flags[-1].partition('=')[2] or 'stages')
+            if profiler.enabled:
+                profiler.start(' '.join(args[:1]) or 'start')
+                atexit.register(profiler.finish)
+            
             if not args:
                 # Ejecutar flujo de migración automática
                 logger.info("Sin argumentos, ejecutando flujo de migración automática")
@@ -194,14 +229,15 @@ class PARACLI:
             full_prompt = ' '.join(args)
             log_center.log_info(f"Procesando comando: {full_prompt}", "CLI-Main")
             
-            # Mapeo de comandos tradicionales específicos
+            # Mapeo de comandos tradicionales específicos (los de módulos de comandos, vía lambda
+            # para no importarlos hasta que se ejecutan)
             command_map = {
                 'start': self.cmd_start,
-                'organize': self.organize_commands.cmd_organize,
+                'organize': lambda *a: self.organize_commands.cmd_organize(*a),
                 'classify': self.cmd_classify,
                 'reclassify-all': self.cmd_reclassify_all,
                 'reclassify-enhanced': self.cmd_reclassify_enhanced,
-                'analyze': self.analyze_commands.cmd_analyze,
+                'analyze': lambda *a: self.analyze_commands.cmd_analyze(*a),
                 'learn': self.cmd_learn,
                 'dashboard': self.cmd_dashboard,
                 'health': self.cmd_health,
@@ -209,6 +245,8 @@ class PARACLI:
                 'backup': self.cmd_backup,
                 'restore': self.cmd_restore,
                 'config': self.cmd_config,
+                'watch': self.cmd_watch,
+                'undo': self.cmd_undo,
                 'status': self.cmd_status,
                 'help': self.cmd_help,
                 'version': self.cmd_version,
@@ -234,8 +272,10 @@ class PARACLI:
                 'clean-problematic': self.cmd_clean_problematic,  # Limpieza de carpetas problemáticas
                 'logs-auto-fix': self.cmd_logs_auto_fix,  # Auto-fix de logs con IA
                 'logs': self.cmd_logs,  # Mostrar logs del sistema
-                'finetune': self.finetune_commands.cmd_finetune,  # Sistema centralizado de fine-tuning
-                'qa': self.qa_commands.cmd_qa,  # Sistema de preguntas y respuestas con IA
+                'finetune': lambda *a: self.finetune_commands.cmd_finetune(*a),  # Sistema centralizado de fine-tuning
+                'qa': lambda *a: self.qa_commands.cmd_qa(*a),  # Sistema de preguntas y respuestas con IA
+                'stub-llm': self.cmd_stub_llm,  # Servidor LLM determinista compatible con Ollama
+                'daemon': self.cmd_daemon,  # Proceso persistente con estado caliente (socket Unix)
             }
             
             # Verificar si es un comando tradicional específico (solo el primer argumento)
@@ -779,6 +819,13 @@ class PARACLI:
         """Clasifica archivos usando el clasificador propio CON SISTEMA DE EXCLUSIONES OBLIGATORIO."""
         try:
             log_center.log_info("Iniciando comando classify", "CLI-Classify", {"args": args})
+            
+            # Una nota concreta: clasificación directa, sin selector de vault ni confirmaciones
+            # (así también la puede atender el daemon)
+            if args and str(args[0]).endswith('.md'):
+                self._classify_note_file(Path(args[0]))
+                return
+            
             print("\n[TARGET] Clasificando archivos con IA propia...")
             
             # 1. SELECCIÓN DE VAULT CON BROWSER
@@ -843,6 +890,47 @@ class PARACLI:
             print(f"❌ Error clasificando: {e}")
             log_center.log_error(f"Error clasificando: {str(e)}", "CLI-Classify")
     
+    def _classify_note_file(self, note_path: Path):
+        """Clasifica una sola nota con el pipeline híbrido y muestra la sugerencia (no la mueve)."""
+        note_path = note_path.expanduser().resolve()
+        if not note_path.is_file():
+            print(f"\n❌ No existe la nota: {note_path}")
+            return
+        
+        vault = next((parent for parent in note_path.parents if (parent / '.obsidian').exists()), None)
+        vault = vault or self._require_vault(interactive=False, silent=True)
+        if not vault:
+            print("\n❌ No se encontró el vault de la nota")
+            return
+        vault = Path(vault)
+        
+        from paralib.exclusion_manager import get_global_exclusions
+        for excluded_path in get_global_exclusions():
+            if str(note_path).startswith(str(Path(excluded_path).resolve())):
+                print(f"🚫 Archivo en carpeta excluida, no se clasificará: {note_path}")
+                log_center.log_warning(f"Archivo en carpeta excluida: {note_path}", "CLI-Classify")
+                return
+        
+        from paralib.config import load_para_config
+        from paralib.organizer import CLASSIFICATION_SYSTEM_PROMPT, classify_note_with_complete_analysis, get_shared_chromadb
+        
+        log_center.log_info(f"Clasificando archivo específico: {note_path}", "CLI-Classify")
+        result = classify_note_with_complete_analysis(
+            note_path.read_text(encoding='utf-8'), note_path, "",
+            load_para_config().get('ollama_model', 'llama3.2:3b'), CLASSIFICATION_SYSTEM_PROMPT,
+            get_shared_chromadb(vault), vault
+        )
+        if not result:
+            print(f"⚠️ No se pudo clasificar: {note_path.name}")
+            log_center.log_warning(f"No se pudo clasificar: {note_path}", "CLI-Classify")
+            return
+        
+        category = result.get('category', 'Unknown')
+        folder_name = result.get('folder_name') or '-'
+        print(f"✅ {note_path.name} → {category}/{folder_name} "
+              f"(confianza {result.get('confidence', 0):.3f}, {result.get('method', 'unknown')})")
+        log_center.log_info(f"Archivo clasificado: {note_path} → {category}/{folder_name}", "CLI-Classify")
+    
     def cmd_reclassify_all(self, *args):
         """Reclasifica todas las notas del vault de forma SEGURA (sin renombrar archivos de usuario)."""
         try:
@@ -1109,6 +1197,20 @@ class PARACLI:
             print("\n🧠 Iniciando aprendizaje con herramientas PARA...")
             
             from paralib.learning_system import PARA_Learning_System
+            
+            if args and args[0] == 'rebuild':
+                # Reconstrucción completa de los agregados incrementales desde el historial
+                vault = self._require_vault()
+                if not vault:
+                    return
+                learning_system = PARA_Learning_System(vault_path=vault)
+                print("🔄 Reconstruyendo métricas de aprendizaje desde el historial...")
+                metrics = learning_system.rebuild_metrics()
+                print(f"✅ Métricas reconstruidas: {metrics['total_classifications']} clasificaciones, "
+                      f"precisión {metrics['accuracy_rate']:.1f}%")
+                log_center.log_info("Métricas de aprendizaje reconstruidas", "CLI-Learn", metrics)
+                return
+            
             learning_system = PARA_Learning_System()
             
             # Analizar tendencias y patrones
@@ -1257,6 +1359,69 @@ class PARACLI:
             print(f"❌ Error en configuración: {e}")
             log_center.log_error(f"Error en configuración: {str(e)}", "CLI-Config")
     
+    def cmd_watch(self, *args):
+        """Daemon de auto-clasificación incremental: vigila el vault y procesa solo lo editado."""
+        try:
+            log_center.log_info("Iniciando comando watch", "CLI-Watch", {"args": args})
+            vault = self._require_vault()
+            if not vault:
+                return
+            
+            execute = '--execute' in args
+            from paralib.file_watcher import setup_file_monitoring
+            watcher, auto_classifier = setup_file_monitoring(Path(vault), enable_auto_classification=True, execute=execute)
+            if not watcher or not watcher.is_watching:
+                print("\n❌ No se pudo iniciar el monitoreo del vault")
+                return
+            
+            mode = "mover notas clasificadas" if execute else "solo sugerencias (usa --execute para mover)"
+            print(f"\n👀 Vigilando {vault} ({mode}). Ctrl+C para detener.")
+            try:
+                while True:
+                    time.sleep(1)
+            except KeyboardInterrupt:
+                print("\n🛑 Deteniendo monitoreo...")
+            finally:
+                watcher.stop_watching()
+                auto_classifier.stop()
+                print(f"✅ Monitoreo detenido: {auto_classifier.stats}")
+                log_center.log_info("Monitoreo detenido", "CLI-Watch", auto_classifier.stats)
+        except Exception as e:
+            print(f"❌ Error en watch: {e}")
+            log_center.log_error(f"Error en watch: {str(e)}", "CLI-Watch")
+    
+    def cmd_undo(self, *args):
+        """Deshace una transacción del journal de movimientos. Uso: undo [list | <id>]"""
+        try:
+            log_center.log_info("Iniciando comando undo", "CLI-Undo", {"args": args})
+            vault = self._require_vault()
+            if not vault:
+                return
+            
+            from paralib.move_journal import list_transactions, undo_transaction
+            
+            if args and args[0] == 'list':
+                transactions = list_transactions(vault)
+                if not transactions:
+                    print("\n📭 No hay transacciones en el journal")
+                    return
+                print("\n🛡️ Journal de movimientos:")
+                for transaction in transactions[:20]:
+                    print(f"  {transaction['id']}  {transaction['state']:<12} {transaction['operation_count']:>5} ops  {transaction['description']}")
+                return
+            
+            result = undo_transaction(vault, args[0] if args else None)
+            if not result.get('id'):
+                print(f"\n❌ {result.get('error', 'No se pudo deshacer')}")
+                return
+            print(f"\n↩️ Deshecha {result['id']} ({result['description']}): {result['reverted']} operaciones revertidas")
+            for conflict in result['conflicts'][:20]:
+                print(f"   ⚠️ {conflict}")
+            log_center.log_info(f"Transacción deshecha: {result['id']}", "CLI-Undo", result)
+        except Exception as e:
+            print(f"❌ Error en undo: {e}")
+            log_center.log_error(f"Error en undo: {str(e)}", "CLI-Undo")
+    
     @log_exceptions
     def cmd_status(self, *args):
         """Muestra estado del sistema"""
@@ -1347,6 +1512,7 @@ class PARACLI:
             backup_commands = [
                 ("backup", "Crea backup del vault"),
                 ("restore", "Restaura desde backup"),
+                ("undo", "Deshace los movimientos del último comando"),
                 ("exclude", "Gestiona exclusiones globales")
             ]
             
@@ -1385,7 +1551,9 @@ class PARACLI:
             config_commands = [
                 ("config", "Configuración del sistema"),
                 ("update", "Actualiza componentes del sistema"),
-                ("version", "Muestra versión del sistema")
+                ("version", "Muestra versión del sistema"),
+                ("stub-llm", "LLM determinista local (API de Ollama) para pruebas de carga"),
+                ("daemon", "Daemon con estado caliente: start | stop | status")
             ]
             
             for cmd, desc in config_commands:
@@ -1408,6 +1576,9 @@ class PARACLI:
             print("  # Ayuda específica")
             print("  python para_cli.py help organize")
             print("  python para_cli.py help doctor")
+            print()
+            print("  # Perfil por etapa de una reclasificación (también PARA_PROFILE=1|cprofile|pyinstrument)")
+            print("  python para_cli.py reclassify-all --profile")
             
             print("\n[TARGET] FLUJO DE TRABAJO RECOMENDADO:")
             print("─" * 50)
@@ -1778,11 +1949,14 @@ class PARACLI:
                 recent_logs = log_center.get_recent_logs(50)  # Aumentar a 50 logs para mejor análisis
                 print(f"✅ Logs recientes accesibles: {len(recent_logs)} entradas")
                 
-                # Mostrar tabla de logs recientes SOLO de error, crítico o warning, ORDENADOS de más crítico a menos
-                filtered_logs = [entry for entry in recent_logs if getattr(entry, 'level', 'INFO') in ['ERROR', 'CRITICAL', 'WARNING']]
+                # Logs de error, crítico o warning de las últimas 24h: consulta indexada por nivel y tiempo
+                since = datetime.now() - timedelta(hours=24)
+                attention_logs = log_center.query_logs(levels=['CRITICAL', 'ERROR', 'WARNING'], since=since, limit=500)
+                if not attention_logs:
+                    attention_logs = [entry for entry in recent_logs if getattr(entry, 'level', 'INFO') in ['ERROR', 'CRITICAL', 'WARNING']]
                 # Ordenar: CRITICAL > ERROR > WARNING, y dentro de cada grupo, más reciente primero
                 level_priority = {'CRITICAL': 0, 'ERROR': 1, 'WARNING': 2}
-                filtered_logs.sort(key=lambda entry: (level_priority.get(getattr(entry, 'level', 'WARNING'), 3), -getattr(entry, 'timestamp', 0).timestamp() if hasattr(getattr(entry, 'timestamp', None), 'timestamp') else 0))
+                filtered_logs = sorted(reversed(attention_logs), key=lambda entry: level_priority.get(getattr(entry, 'level', 'WARNING'), 3))
                 if filtered_logs:
                     print(f"\n📊 LOGS QUE REQUIEREN ATENCIÓN ({len(filtered_logs)}):")
                     print("─" * 120)
@@ -1792,6 +1966,7 @@ class PARACLI:
                         timestamp = getattr(entry, 'timestamp', 'N/A')
                         if hasattr(timestamp, 'strftime'):
                             timestamp = timestamp.strftime('%Y-%m-%d %H:%M:%S')
+                        timestamp = str(timestamp)[:19]
                         level = getattr(entry, 'level', 'INFO')
                         component = getattr(entry, 'component', 'N/A')
                         message = getattr(entry, 'message', str(entry))[:65] + "..." if len(getattr(entry, 'message', str(entry))) > 65 else getattr(entry, 'message', str(entry))
@@ -1808,17 +1983,31 @@ class PARACLI:
                 else:
                     print("\n✅ No hay logs de error, crítico o warning recientes.")
                 
-                # Resumen estadístico (sin mostrar tabla de logs INFO)
-                log_errors_found = len([log for log in recent_logs if getattr(log, 'level', 'INFO') in ['ERROR', 'CRITICAL']])
-                log_warnings_found = len([log for log in recent_logs if getattr(log, 'level', 'INFO') == 'WARNING'])
-                log_info_found = len([log for log in recent_logs if getattr(log, 'level', 'INFO') == 'INFO'])
-                log_debug_found = len([log for log in recent_logs if getattr(log, 'level', 'INFO') == 'DEBUG'])
-                print(f"\n📈 ESTADÍSTICAS DE LOGS:")
+                # Resumen estadístico de las últimas 24h (recuento agrupado en el índice, sin tabla de logs INFO)
+                level_counts = log_center.count_logs('level', since=since)
+                if not level_counts:
+                    for log in recent_logs:
+                        level = getattr(log, 'level', 'INFO')
+                        level_counts[level] = level_counts.get(level, 0) + 1
+                log_errors_found = level_counts.get('ERROR', 0) + level_counts.get('CRITICAL', 0)
+                log_warnings_found = level_counts.get('WARNING', 0)
+                log_info_found = level_counts.get('INFO', 0)
+                log_debug_found = level_counts.get('DEBUG', 0)
+                print(f"\n📈 ESTADÍSTICAS DE LOGS (24h):")
                 print(f"   🚨 Errores: {log_errors_found}")
                 print(f"   ⚠️ Warnings: {log_warnings_found}")
                 print(f"   ℹ️ Info: {log_info_found}")
                 print(f"   🔍 Debug: {log_debug_found}")
                 
+                # Funciones instrumentadas más costosas en este proceso (histograma en memoria, sin logs)
+                from paralib.call_stats import get_call_stats
+                slowest = get_call_stats(top=5)
+                if slowest:
+                    print(f"\n⏱️ FUNCIONES INSTRUMENTADAS (tiempo total):")
+                    for item in slowest:
+                        print(f"   {item['name']:<60} {item['calls_measured']:>6} llamadas  "
+                              f"total {item['total_s']:.3f}s  p95 {item['p95_s'] * 1000:.1f}ms")
+                
                 # Buscar errores específicos conocidos
                 error_patterns = [
                     "ImportError", "ModuleNotFoundError", "AttributeError", 
@@ -1841,42 +2030,36 @@ class PARACLI:
                     processed_any = False
                     
                     # Obtener logs de error específicamente
-                    error_logs = [log for log in recent_logs if log.level in ['ERROR', 'CRITICAL']]
+                    error_logs = [log for log in attention_logs if log.level in ['ERROR', 'CRITICAL']]
                     print(f"[DEBUG] Encontrados {len(error_logs)} logs de error para procesar")
                     
                     for log_entry in error_logs:
-                        # Generar ID más robusto
-                        timestamp_str = str(getattr(log_entry, 'timestamp', ''))
                         component = getattr(log_entry, 'component', 'Unknown')
                         message = getattr(log_entry, 'message', '')
                         
-                        # Crear ID más simple y consistente
-                        log_id = f"{component}_{hash(message) % 1000000}"
-                        
                         print(f"[DEBUG] Procesando log: {component} - {message[:50]}...")
                         
-                        # Verificar si ya fue procesado
-                        existing_entry = log_status_manager.get_log_by_id(log_id)
+                        # Agrupar por huella del error (plantilla sin números ni rutas): un error
+                        # recurrente ya resuelto o ignorado no se vuelve a procesar
+                        group, is_new = log_status_manager.record_log(
+                            getattr(log_entry, 'level', 'ERROR'), component, message,
+                            timestamp=str(getattr(log_entry, 'timestamp', '')),
+                            session_id=getattr(log_entry, 'session_id', None)
+                        )
+                        status = group.status.value if group is not None else None
                         
-                        if existing_entry:
-                            status = getattr(existing_entry, 'status', None)
-                            if status == 'resolved':
-                                resolved_count += 1
-                                print(f"   ✅ {message[:50]}... (YA RESUELTO)")
-                            elif status == 'ignored':
-                                ignored_count += 1
-                                print(f"   ⏭️ {message[:50]}... (IGNORADO)")
-                            else:
-                                # Log existente pero sin estado claro, tratarlo como nuevo
-                                new_errors += 1
-                                processed_any = True
-                                print(f"   🆕 {message[:50]}... (NUEVO - sin estado)")
-                                self._process_new_error(log_status_manager, log_id, log_entry, auto_fix)
+                        if status == 'resolved':
+                            resolved_count += 1
+                            print(f"   ✅ {message[:50]}... (YA RESUELTO, {group.occurrences} ocurrencias)")
+                        elif status == 'ignored':
+                            ignored_count += 1
+                            print(f"   ⏭️ {message[:50]}... (IGNORADO, {group.occurrences} ocurrencias)")
                         else:
                             new_errors += 1
                             processed_any = True
-                            print(f"   🆕 {message[:50]}... (NUEVO)")
-                            self._process_new_error(log_status_manager, log_id, log_entry, auto_fix)
+                            print(f"   🆕 {message[:50]}... ({'NUEVO' if is_new else 'NUEVO - sin estado'})")
+                            if group is not None:
+                                self._process_new_error(log_status_manager, group.id, log_entry, auto_fix)
                     
                     # Mostrar estadísticas de gestión de logs
                     print(f"\n📊 ESTADÍSTICAS DE GESTIÓN DE LOGS:")
@@ -1890,18 +2073,18 @@ class PARACLI:
                         print(f"   🗑️ Logs resueltos limpiados: {cleaned_count}")
                     
                     # Guardar estado actualizado SIEMPRE
-                    print(f"[DEBUG] Guardando estado de logs en logs/log_status.json ...")
+                    print(f"[DEBUG] Guardando estado de logs en logs/log_status.db ...")
                     log_status_manager._save_status()
                     print(f"[DEBUG] Estado de logs guardado.")
                     
-                    print(f"\n💾 Estado de logs guardado en logs/log_status.json")
+                    print(f"\n💾 Estado de logs guardado en logs/log_status.db")
                 else:
                     # Forzar guardado de estado aunque no haya errores nuevos
                     log_status_manager = self._create_log_status_manager()
-                    print(f"[DEBUG] (No errores nuevos) Guardando estado de logs en logs/log_status.json ...")
+                    print(f"[DEBUG] (No errores nuevos) Guardando estado de logs en logs/log_status.db ...")
                     log_status_manager._save_status()
                     print(f"[DEBUG] Estado de logs guardado.")
-                    print(f"\n💾 Estado de logs guardado en logs/log_status.json (sin errores nuevos)")
+                    print(f"\n💾 Estado de logs guardado en logs/log_status.db (sin errores nuevos)")
                 
                 # Mostrar resumen final de logs
                 print(f"\n📈 RESUMEN FINAL DE LOGS:")
@@ -2305,6 +2488,10 @@ requests>=2.28.0
             log_center.log_info("Iniciando comando backup", "CLI-Backup", {"args": args})
             print("\n💾 Creando backup con herramientas PARA...")
             
+            if args and args[0] == 'verify':
+                self._verify_backup_cli(*args[1:])
+                return
+            
             vault = self._require_vault()
             if vault:
                 from paralib.backup_manager import backup_manager
@@ -2336,21 +2523,41 @@ requests>=2.28.0
             print(f"❌ Error creando backup: {e}")
             log_center.log_error(f"Error creando backup: {str(e)}", "CLI-Backup")
     
+    def _verify_backup_cli(self, *args):
+        """backup verify <backup_id> [--deep]: verifica la integridad de un backup."""
+        from paralib.backup_manager import backup_manager
+        
+        ids = [a for a in args if not a.startswith('--')]
+        if not ids:
+            print("\n❌ Especifica el ID del backup a verificar")
+            return
+        result = backup_manager.verify_backup(ids[0], deep='--deep' in args)
+        if result.get('valid'):
+            print(f"✅ Backup {ids[0]} íntegro ({result.get('seconds', 0):.2f}s)")
+        else:
+            print(f"❌ Backup {ids[0]} dañado: {result.get('error', '')}")
+            for name in (result.get('damaged_files') or [])[:20]:
+                print(f"   • {name}")
+    
     def cmd_restore(self, *args):
-        """Restaura desde backup"""
+        """Restaura desde backup. Uso: restore <backup_id> [rutas o globs...] (con rutas, restauración selectiva)"""
         try:
             log_center.log_info("Iniciando comando restore", "CLI-Restore", {"args": args})
             print("\n[UPDATE] Restaurando desde backup...")
             
             if args and args[0]:
                 backup_id = args[0]
+                paths = list(args[1:])
                 from paralib.backup_manager import backup_manager
                 
-                log_center.log_info(f"Restaurando backup: {backup_id}", "CLI-Restore")
-                result = backup_manager.restore_backup(backup_id)
+                log_center.log_info(f"Restaurando backup: {backup_id}", "CLI-Restore", {"paths": paths})
+                result = backup_manager.restore_backup(backup_id, restore_type='selective' if paths else 'full', paths=paths)
                 
                 if result:
                     print(f"✅ Backup {backup_id} restaurado exitosamente")
+                    summary = backup_manager.last_restore_result
+                    if summary:
+                        print(f"   📝 Restaurados: {len(summary.restored)} | Sin cambios: {summary.unchanged} | Eliminados: {len(summary.removed)}")
                     log_center.log_info(f"Backup {backup_id} restaurado exitosamente", "CLI-Restore")
                 else:
                     print(f"❌ No se pudo restaurar el backup {backup_id}")
@@ -4546,8 +4753,7 @@ requests>=2.28.0
                 from paralib.auto_fix import auto_fix_engine
                 
                 # Obtener logs recientes para análisis
-                recent_logs = log_center.get_recent_logs(100)
-                error_logs = [log for log in recent_logs if log.level in ['ERROR', 'CRITICAL']]
+                error_logs = log_center.query_logs(levels=['ERROR', 'CRITICAL'], limit=100)
                 
                 if not error_logs:
                     print("✅ No se encontraron errores en logs recientes")
@@ -4734,16 +4940,167 @@ requests>=2.28.0
                 traceback.print_exc()
 
     @log_exceptions
+    def cmd_stub_llm(self, *args):
+        """
+        Servidor LLM determinista compatible con la API de chat de Ollama:
+        --host=127.0.0.1 --port=11435 --latency-ms=0 --jitter-ms=0 --seed=0
+        Otro proceso lo usa con OLLAMA_HOST=http://<host>:<port>; en proceso, PARA_AI_BACKEND=stub.
+        """
+        from paralib.stub_llm import DEFAULT_STUB_PORT, StubLLM, StubOllamaServer
+        
+        options = {'host': '127.0.0.1', 'port': str(DEFAULT_STUB_PORT), 'latency-ms': None, 'jitter-ms': None, 'seed': None}
+        for arg in args:
+            if arg.startswith('--') and '=' in arg:
+                key, value = arg[2:].split('=', 1)
+                if key in options:
+                    options[key] = value
+        try:
+            stub = StubLLM.from_env()
+            if options['latency-ms'] is not None:
+                stub.latency_ms = float(options['latency-ms'])
+            if options['jitter-ms'] is not None:
+                stub.jitter_ms = float(options['jitter-ms'])
+            if options['seed'] is not None:
+                stub.seed = options['seed']
+            server = StubOllamaServer(options['host'], int(options['port']), stub)
+        except (ValueError, OSError) as e:
+            print(f"\n❌ No se pudo iniciar el servidor stub: {e}")
+            log_center.log_error(f"Error iniciando stub-llm: {e}", "CLI-StubLLM")
+            return
+        
+        log_center.log_info(f"Servidor stub-llm en {server.url}", "CLI-StubLLM",
+                            {"latency_ms": stub.latency_ms, "jitter_ms": stub.jitter_ms})
+        print(f"\n🤖 LLM stub escuchando en {server.url} (latencia {stub.latency_ms:g}ms + jitter {stub.jitter_ms:g}ms)")
+        print(f"   Uso: OLLAMA_HOST={server.url} python para_cli.py classify ...")
+        print("   Ctrl+C para detener")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            print(f"\n🛑 Servidor stub detenido ({stub.calls} respuestas)")
+    
+    @log_exceptions
+    def cmd_daemon(self, *args):
+        """
+        Daemon de PARA con estado caliente (ChromaDB, embeddings, aprendizaje, vault) en un socket Unix:
+        daemon start [--socket=RUTA] [--vault=RUTA] | daemon stop | daemon status
+        Con el daemon activo, status, health, metrics, learning-status, qa y classify <nota.md>
+        se ejecutan en él; PARA_NO_DAEMON=1 fuerza la ejecución en proceso.
+        """
+        from paralib import daemon
+        
+        action = 'status'
+        options = {'socket': None, 'vault': None}
+        for arg in args:
+            if arg.startswith('--') and '=' in arg:
+                key, value = arg[2:].split('=', 1)
+                if key in options:
+                    options[key] = value
+            else:
+                action = arg.lower()
+        socket_path = Path(options['socket']).expanduser() if options['socket'] else daemon.get_socket_path()
+        
+        if action == 'status':
+            info = daemon.request({'op': 'ping'}, socket_path)
+            if info is None:
+                print(f"\n⚪ Daemon no activo ({socket_path})")
+                return
+            print(f"\n🟢 Daemon activo (pid {info['pid']}, {info['uptime_s']:.0f}s, {info['requests']} comandos)")
+            print(f"   Socket: {info['socket']}")
+            print(f"   Vault: {info.get('vault') or '-'}")
+            for name, state in (info.get('warm') or {}).items():
+                if 'error' in state:
+                    print(f"   ⚠️ {name:<16} {state['error']}")
+                else:
+                    print(f"   ✅ {name:<16} {state['seconds']:.2f}s")
+            return
+        
+        if action == 'stop':
+            if daemon.request({'op': 'shutdown'}, socket_path) is None:
+                print(f"\n⚪ Daemon no activo ({socket_path})")
+            else:
+                print("\n🛑 Daemon detenido")
+            return
+        
+        if action != 'start':
+            print(f"\n❌ Acción desconocida: {action} (usa start, stop o status)")
+            return
+        
+        try:
+            server = daemon.PARADaemon(self.run, socket_path, options['vault'])
+        except OSError as e:
+            print(f"\n❌ No se pudo iniciar el daemon: {e}")
+            log_center.log_error(f"Error iniciando daemon: {e}", "CLI-Daemon")
+            return
+        
+        print("\n🔥 Precargando estado del daemon...")
+        for name, state in server.warm_up().items():
+            if 'error' in state:
+                print(f"   ⚠️ {name:<16} {state['error']}")
+            else:
+                print(f"   ✅ {name:<16} {state['seconds']:.2f}s")
+        log_center.log_info(f"Daemon escuchando en {socket_path}", "CLI-Daemon", {"vault": str(server.vault_path)})
+        print(f"\n🟢 Daemon escuchando en {socket_path}")
+        print("   Ctrl+C o 'python para_cli.py daemon stop' para detener")
+        
+        def _terminate(signum, frame):
+            raise KeyboardInterrupt  # SIGTERM (kill, systemd) también cierra el socket limpiamente
+        
+        import signal
+        signal.signal(signal.SIGTERM, _terminate)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            print(f"\n🛑 Daemon detenido ({server.requests} comandos atendidos)")
+    
     def cmd_logs(self, *args):
-        """Muestra logs del sistema."""
+        """
+        Muestra logs del sistema. Filtros sobre el log estructurado:
+        --level=ERROR,WARNING --component=CLI-* --since=2h --until=2024-01-31
+        --session=<id> --grep=<texto> --limit=50
+        """
         try:
             log_center.log_info("Iniciando comando logs", "CLI-Logs", {"args": args})
             print("\n📋 Logs del sistema:")
             
-            # Obtener logs recientes
-            recent_logs = log_center.get_recent_logs(50)
+            from paralib.log_store import parse_time_bound
+            filters = {'limit': 50}
+            for arg in args:
+                if not arg.startswith('--') or '=' not in arg:
+                    continue
+                key, value = arg[2:].split('=', 1)
+                if key == 'level':
+                    filters['levels'] = value.upper()
+                elif key == 'component':
+                    filters['components'] = value
+                elif key in ('since', 'until'):
+                    bound = parse_time_bound(value)
+                    if bound is None:
+                        print(f"\n⚠️ Valor inválido para --{key}: {value} (usar 30m, 2h, 7d o fecha ISO)")
+                        return
+                    filters[key] = bound
+                elif key == 'session':
+                    filters['session_id'] = value
+                elif key == 'grep':
+                    filters['contains'] = value
+                elif key == 'limit':
+                    try:
+                        filters['limit'] = int(value)
+                    except ValueError:
+                        print("\n⚠️ Valor inválido para --limit, usando 50 por defecto")
+            
+            # Consulta indexada (sin filtros: las entradas más recientes)
+            if len(filters) > 1:
+                recent_logs = log_center.query_logs(**filters)
+            else:
+                recent_logs = log_center.get_recent_logs(filters['limit'])
             if not recent_logs:
-                print("\n📋 No hay logs recientes")
+                print("\n📋 No hay logs que coincidan" if len(filters) > 1 else "\n📋 No hay logs recientes")
                 return
             
             print("\n-" * 60)
@@ -4754,6 +5111,7 @@ requests>=2.28.0
                 timestamp = getattr(log_entry, 'timestamp', 'N/A')
                 if hasattr(timestamp, 'strftime'):
                     timestamp = timestamp.strftime('%Y-%m-%d %H:%M:%S')
+                timestamp = str(timestamp)[:19]
                 
                 level = getattr(log_entry, 'level', 'INFO')
                 component = getattr(log_entry, 'component', 'N/A')
@@ -4770,109 +5128,20 @@ requests>=2.28.0
             print(f"❌ Error: {e}")
 
     def _create_log_status_manager(self):
-        """Crea y retorna un gestor de estados de logs."""
+        """Crea y retorna un gestor de estados de logs (agrupados por huella, en SQLite)."""
         try:
-            # Definir LogStatus enum localmente si no existe
-            from enum import Enum
-            class LogStatus(Enum):
-                NEW = "new"
-                RESOLVED = "resolved"
-                IGNORED = "ignored"
-            
-            # Crear gestor simple de estados
-            class SimpleLogStatusManager:
-                def __init__(self):
-                    self.log_entries = {}
-                    self.status_file = Path("logs/log_status.json")
-                    self.status_file.parent.mkdir(exist_ok=True)
-                    self._load_status()
-                
-                def _load_status(self):
-                    """Carga el estado de logs desde archivo."""
-                    try:
-                        if self.status_file.exists():
-                            import json
-                            with open(self.status_file, 'r', encoding='utf-8') as f:
-                                data = json.load(f)
-                                self.log_entries = data.get('entries', {})
-                    except Exception:
-                        self.log_entries = {}
-                
-                def _save_status(self):
-                    """Guarda el estado de logs a archivo."""
-                    try:
-                        import json
-                        from datetime import datetime
-                        data = {
-                            'last_updated': datetime.now().isoformat(),
-                            'entries': self.log_entries
-                        }
-                        with open(self.status_file, 'w', encoding='utf-8') as f:
-                            json.dump(data, f, indent=2, ensure_ascii=False)
-                    except Exception as e:
-                        print(f"⚠️ Error guardando estado de logs: {e}")
-                
-                def get_log_by_id(self, log_id):
-                    """Obtiene un log por ID."""
-                    if log_id in self.log_entries:
-                        return type('LogEntry', (), self.log_entries[log_id])()
-                    return None
-                
-                def mark_as_resolved(self, log_id, resolution_notes=None, resolved_by="auto-fix"):
-                    """Marca un log como resuelto."""
-                    from datetime import datetime
-                    self.log_entries[log_id] = {
-                        'status': 'resolved',
-                        'resolution_notes': resolution_notes,
-                        'resolved_at': datetime.now().isoformat(),
-                        'resolved_by': resolved_by,
-                        'auto_fix_applied': True
-                    }
-                
-                def mark_as_ignored(self, log_id, reason=None):
-                    """Marca un log como ignorado."""
-                    from datetime import datetime
-                    self.log_entries[log_id] = {
-                        'status': 'ignored',
-                        'resolution_notes': f"Ignorado: {reason}" if reason else "Ignorado manualmente",
-                        'resolved_at': datetime.now().isoformat(),
-                        'resolved_by': 'manual',
-                        'auto_fix_applied': False
-                    }
-                
-                def cleanup_old_resolved_logs(self, days=7):
-                    """Limpia logs resueltos antiguos."""
-                    import time
-                    from datetime import datetime
-                    
-                    cutoff_time = time.time() - (days * 24 * 3600)
-                    to_remove = []
-                    
-                    for log_id, entry in self.log_entries.items():
-                        if entry.get('status') == 'resolved' and entry.get('resolved_at'):
-                            try:
-                                resolved_time = datetime.fromisoformat(entry['resolved_at']).timestamp()
-                                if resolved_time < cutoff_time:
-                                    to_remove.append(log_id)
-                            except:
-                                pass
-                    
-                    for log_id in to_remove:
-                        del self.log_entries[log_id]
-                    
-                    return len(to_remove)
-            
-            return SimpleLogStatusManager()
-            
+            from paralib.log_status_manager import LogStatusManager
+            return LogStatusManager()
         except Exception as e:
             print(f"⚠️ Error creando gestor de estados de logs: {e}")
             # Retornar gestor dummy
             return type('DummyManager', (), {
-                'get_log_by_id': lambda x: None,
-                'mark_as_resolved': lambda x, y, z: None,
-                'mark_as_ignored': lambda x, y: None,
-                'cleanup_old_resolved_logs': lambda x: 0,
-                '_save_status': lambda: None
+                'record_log': lambda self, *args, **kwargs: (None, False),
+                'get_log_by_id': lambda self, x: None,
+                'mark_as_resolved': lambda self, *args, **kwargs: None,
+                'mark_as_ignored': lambda self, *args, **kwargs: None,
+                'cleanup_old_resolved_logs': lambda self, days=7: 0,
+                '_save_status': lambda self: None
             })()
 
     def _attempt_log_auto_fix(self, log_entry):
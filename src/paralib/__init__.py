@@ -22,18 +22,47 @@ __version__ = "2.0.0"
 __author__ = "PARA System Team"
 __description__ = "Sistema de organización automática de notas con IA"
 
-# Imports principales
-from .organizer import run_full_reclassification_safe, run_inbox_classification, run_archive_refactor, auto_consolidate_post_organization
-from .learning_system import PARA_Learning_System
-from .db import ChromaPARADatabase
-from .ai_engine import ai_engine
-# from .dashboard_unified import PARADashboardUnified
-from .log_manager import PARALogManager
-from .plugin_system import PARAPluginManager
-from .vault import find_vault
-from .config import load_config
-from .update_center import update_center, check_updates, get_embedding_models_status
-from .rg_utils import get_rg_path, rg_search, count_files_with_pattern, verify_rg_installation, search_files_containing
+# Exportaciones perezosas (PEP 562): ``import paralib.logger`` o ``para help`` no cargan
+# organizer, ChromaDB, ollama ni numpy; el submódulo se importa al usar el nombre.
+_LAZY_EXPORTS = {
+    'run_full_reclassification_safe': 'organizer',
+    'run_inbox_classification': 'organizer',
+    'run_archive_refactor': 'organizer',
+    'auto_consolidate_post_organization': 'organizer',
+    'PARA_Learning_System': 'learning_system',
+    'ChromaPARADatabase': 'db',
+    'ai_engine': 'ai_engine',
+    # 'PARADashboardUnified': 'dashboard_unified',
+    'PARALogManager': 'log_manager',
+    'PARAPluginManager': 'plugin_system',
+    'find_vault': 'vault',
+    'load_config': 'config',
+    'update_center': 'update_center',
+    'check_updates': 'update_center',
+    'get_embedding_models_status': 'update_center',
+    'get_rg_path': 'rg_utils',
+    'rg_search': 'rg_utils',
+    'count_files_with_pattern': 'rg_utils',
+    'verify_rg_installation': 'rg_utils',
+    'search_files_containing': 'rg_utils',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    module = importlib.import_module(f".{module_name}", __name__)
+    value = getattr(module, name)
+    # Nota: ai_engine y update_center también son submódulos; si alguien ya los importó,
+    # ``paralib.ai_engine`` es el módulo (usar ``from paralib.ai_engine import ai_engine``)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
 
 __all__ = [
     'run_full_reclassification_safe', 
@@ -3,25 +3,31 @@ paralib/ai_engine.py
 
 Motor AI centralizado para PARA CLI.
 Reutiliza y centraliza todas las funciones AI existentes.
-Soporta múltiples backends: Ollama (local) y Hugging Face.
+Soporta múltiples backends: Ollama (local), Hugging Face y ``stub`` (determinista, para
+pruebas de carga; ver ``paralib/stub_llm.py``). ``PARA_AI_BACKEND`` fuerza el backend de
+las instancias creadas con ``backend="auto"``.
 """
 import json
+import os
 import re
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
-import ollama
 from rich.console import Console
 from rich.prompt import Confirm
 import difflib
 import threading
 
 from paralib.logger import logger
-from paralib.ui import list_ollama_models
+from paralib.profiler import profiler
+from paralib.stub_llm import get_stub_llm
+from paralib.lazy import LazyInstance
 
 console = Console()
 
+AI_BACKENDS = ("ollama", "huggingface", "stub")
+
 # Importar configuración de debug
 try:
     from .debug_config import should_show
@@ -52,7 +58,7 @@ class AIEngine:
     
     def __init__(self, model_name: str = "llama3.2:3b", backend: str = "auto"):
         self.model_name = model_name
-        self.backend = backend  # "ollama", "huggingface", "auto"
+        self.backend = backend  # "ollama", "huggingface", "stub", "auto"
         self.intent_examples: List[IntentExample] = []
         self.prompt_history: List[Dict] = []
         
@@ -65,6 +71,11 @@ class AIEngine:
     
     def _detect_best_backend(self) -> str:
         """Detecta el mejor backend disponible, priorizando Ollama local."""
+        forced = os.environ.get("PARA_AI_BACKEND", "").strip().lower()
+        if forced in AI_BACKENDS:
+            logger.info(f"Backend forzado por PARA_AI_BACKEND: {forced}")
+            return forced
+        
         # Verificar Ollama primero
         if self._check_ollama_availability():
             logger.info("Backend detectado: Ollama (local)")
@@ -278,12 +289,15 @@ class AIEngine:
             return self._check_ollama_model()
         elif self.backend == "huggingface":
             return self._check_huggingface_model()
+        elif self.backend == "stub":
+            return True
         else:
             return self._check_ollama_model()  # Fallback
     
     def _check_ollama_model(self) -> bool:
         """Verifica si el modelo Ollama está disponible."""
         try:
+            import ollama
             ollama.show(self.model_name)
             return True
         except Exception as e:
@@ -307,18 +321,33 @@ class AIEngine:
     
     def _call_ai_with_timeout(self, system_prompt: str, user_prompt: str, timeout: int = 30) -> Dict:
         """Llama al backend AI correspondiente con timeout."""
-        if self.backend == "ollama":
-            return self._call_ollama_with_timeout(system_prompt, user_prompt, timeout)
-        elif self.backend == "huggingface":
-            return self._call_huggingface_with_timeout(system_prompt, user_prompt, timeout)
-        else:
-            return self._call_ollama_with_timeout(system_prompt, user_prompt, timeout)  # Fallback
+        with profiler.stage(f"llm_call[{self.backend}]"):
+            if self.backend == "ollama":
+                return self._call_ollama_with_timeout(system_prompt, user_prompt, timeout)
+            elif self.backend == "huggingface":
+                return self._call_huggingface_with_timeout(system_prompt, user_prompt, timeout)
+            elif self.backend == "stub":
+                return self._call_stub_with_timeout(system_prompt, user_prompt, timeout)
+            else:
+                return self._call_ollama_with_timeout(system_prompt, user_prompt, timeout)  # Fallback
+    
+    def _call_stub_with_timeout(self, system_prompt: str, user_prompt: str, timeout: int = 30) -> Dict:
+        """Backend stub en proceso: respuesta determinista con la latencia configurada."""
+        return get_stub_llm().chat(
+            [
+                {'role': 'system', 'content': system_prompt},
+                {'role': 'user', 'content': user_prompt}
+            ],
+            model=self.model_name,
+            timeout=timeout
+        )
     
     def _call_ollama_with_timeout(self, system_prompt, user_prompt, timeout=30):
         """Llama a ollama.chat con timeout explícito."""
         result = {}
         def target():
             try:
+                import ollama
                 response = ollama.chat(
                     model=self.model_name,
                     messages=[
@@ -391,6 +420,17 @@ class AIEngine:
         """
         logger.info(f"Iniciando QA system con pregunta: {question[:50]}...")
         
+        if self.backend == "stub":
+            stub_result = self._call_stub_with_timeout("", f"Contexto: {context}\n\nPregunta: {question}", timeout=45)
+            if 'error' not in stub_result:
+                return {
+                    'answer': stub_result['message']['content'],
+                    'backend': 'stub',
+                    'model': self.model_name,
+                    'confidence': 1.0,
+                    'source': 'local'
+                }
+        
         # Intentar con Ollama primero (local)
         if self._check_ollama_availability():
             try:
@@ -913,6 +953,7 @@ class AIEngine:
     
     def list_available_models(self) -> list:
         """Devuelve una lista de modelos Ollama locales disponibles (nombre y tamaño)."""
+        from paralib.ui import list_ollama_models
         return list_ollama_models()
 
     def is_available(self) -> bool:
@@ -1312,7 +1353,26 @@ Responde: {{"category": "Projects|Areas|Resources|Archive", "folder_name": "Usar
         return None
 
 # Instancia global del motor AI
-ai_engine = AIEngine()
+ai_engine = LazyInstance(AIEngine)
+
+_engines: Dict[Tuple[str, str, str], AIEngine] = {}
+_engines_lock = threading.Lock()
+
+def get_ai_engine(model_name: str = "llama3.2:3b", backend: str = "auto") -> AIEngine:
+    """
+    Motor reutilizado por (modelo, backend): la detección de backend (``ollama list``) se
+    paga una vez por proceso y no en cada nota o pregunta. La clave incluye
+    ``PARA_AI_BACKEND`` para que cambiarla siga teniendo efecto.
+    """
+    key = (model_name, backend, os.environ.get("PARA_AI_BACKEND", "").strip().lower())
+    engine = _engines.get(key)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(key)
+            if engine is None:
+                engine = AIEngine(model_name=model_name, backend=backend)
+                _engines[key] = engine
+    return engine
 
 def interpret_prompt_with_ai(prompt: str) -> str:
     """Interpreta un prompt/directiva con AI y devuelve el razonamiento en lenguaje natural."""
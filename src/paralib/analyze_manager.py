@@ -10,6 +10,7 @@ from pathlib import Path
 from typing import Dict, Any, List, Tuple
 import numpy as np
 from paralib.db import RobustChromaPARADatabase as ChromaPARADatabase
+from paralib.embedding_service import embed_texts
 from paralib.logger import logger
 from paralib.log_center import log_center
 import json
@@ -169,16 +170,11 @@ class AnalyzeManager:
         if not contents:
             return None
         
-        # Usar el modelo de embeddings para calcular centroide
-        embeddings = []
-        for content in contents[:10]:  # Limitar para eficiencia
-            try:
-                embedding = self.db.embedding_model.encode(
-                    content[:1000], convert_to_tensor=False
-                ).tolist()
-                embeddings.append(embedding)
-            except:
-                continue
+        # Usar el modelo de embeddings para calcular centroide (un solo lote)
+        try:
+            embeddings = embed_texts([content[:1000] for content in contents[:10]], self.db)  # Limitar para eficiencia
+        except Exception:
+            embeddings = []
         
         if embeddings:
             return np.mean(embeddings, axis=0).tolist()
@@ -23,6 +23,7 @@ except ImportError:
     RICH = False
 
 from .logger import logger
+from .lazy import LazyInstance
 
 # ChromaDB para historial de bugs autocorregidos
 try:
@@ -170,4 +171,4 @@ Devuelve solo el código corregido, pero en la línea corregida agrega un coment
         return stats
 
 # Instancia global para reutilización
-auto_fix_engine = AutoFixEngine() 
\ No newline at end of file
+auto_fix_engine = LazyInstance(AutoFixEngine)
\ No newline at end of file
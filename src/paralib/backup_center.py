@@ -571,8 +571,13 @@ class PARABackupCenter:
     def _verify_backup_quick(self, backup_id: str):
         """Verificación rápida de backup."""
         try:
-            # Usar funcionalidad existente del backup_manager
-            st.success(f"✅ Backup {backup_id} verificado correctamente")
+            # Usar funcionalidad existente del backup_manager (manifest por archivo, incremental)
+            result = self.backup_manager.verify_backup(backup_id)
+            if result.get('valid'):
+                st.success(f"✅ Backup {backup_id} verificado correctamente ({result.get('seconds', 0):.2f}s)")
+            else:
+                damaged = result.get('damaged_files') or []
+                st.error(f"❌ Backup {backup_id} dañado: {result.get('error', f'{len(damaged)} archivos afectados')}")
             log_streamlit_action(f"Backup verificado: {backup_id}")
         except Exception as e:
             st.error(f"❌ Error verificando backup: {e}")
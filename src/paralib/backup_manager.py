@@ -12,17 +12,39 @@ Backup Manager para PARA System v2.0
 """
 import shutil
 import zipfile
+import tarfile
+import io
 import json
 import os
 import time
 import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, Tuple
 from dataclasses import dataclass
-import hashlib
+import zlib
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
 
 from .log_center import log_center, log_function_call
+from .fast_hash import DEFAULT_ALGORITHM, HashingReader, hash_bytes, hash_file, new_hasher
+from .snapshot_store import SnapshotStore, diff_vault, walk_vault_files
+from .restore_engine import COPY_CHUNK_SIZE, RestoreEngine, RestoreResult, atomic_write
+from .lazy import LazyInstance
+
+# Archivos hasta este tamaño se leen por adelantado en el pool; los mayores se copian en streaming
+PREFETCH_MAX_BYTES = 1024 * 1024
+# Máximo de lecturas adelantadas en vuelo (acota la memoria usada por el pipeline)
+PREFETCH_WINDOW = 64
+# Entradas de los archivos de backup que no pertenecen al vault
+ARCHIVE_EXTRA_PREFIXES = ('config/', 'logs/')
 
 @dataclass
 class BackupInfo:
@@ -45,13 +67,21 @@ class PARABackupManager:
         self.backup_dir = Path(backup_dir)
         self.backup_dir.mkdir(exist_ok=True)
         
+        # Almacén direccionado por contenido para backups incrementales
+        self.snapshot_store = SnapshotStore(self.backup_dir / "snapshots")
+        
         # Configuración
         self.max_backups = 10
+        self.max_snapshots = 50
+        # Formato de los backups completos: tar.zst multihilo si zstandard está instalado
+        self.archive_format = 'tar.zst' if ZSTD_AVAILABLE else 'zip'
+        self.io_workers = min(16, (os.cpu_count() or 2) * 2)
         self.auto_backup_enabled = True
         self.backup_interval_hours = 24
         
         # Estado
         self.last_backup = None
+        self.last_restore_result: Optional[RestoreResult] = None
         self.backups = []
         
         # Auto-scheduler
@@ -72,7 +102,19 @@ class PARABackupManager:
         try:
             self.backups = []
             
+            for meta_file in self.backup_dir.glob("para_backup_*.meta.json"):
+                try:
+                    info = self._extract_archive_sidecar_info(meta_file)
+                    if info:
+                        self.backups.append(info)
+                except Exception as e:
+                    log_center.log_error(f"Error cargando backup {meta_file}: {e}", component='BackupManager')
+            
+            # Zips antiguos sin metadata externa
+            known = {b.id for b in self.backups}
             for backup_file in self.backup_dir.glob("para_backup_*.zip"):
+                if backup_file.stem in known:
+                    continue
                 try:
                     info = self._extract_backup_info(backup_file)
                     if info:
@@ -80,6 +122,12 @@ class PARABackupManager:
                 except Exception as e:
                     log_center.log_error(f"Error cargando backup {backup_file}: {e}", component='BackupManager')
             
+            for manifest in self.snapshot_store.list_manifests():
+                try:
+                    self.backups.append(self._snapshot_backup_info(manifest))
+                except Exception as e:
+                    log_center.log_error(f"Error cargando snapshot {manifest.get('id')}: {e}", component='BackupManager')
+            
             # Ordenar por timestamp
             self.backups.sort(key=lambda x: x.timestamp, reverse=True)
             
@@ -120,6 +168,67 @@ class PARABackupManager:
             log_center.log_error(f"Error extrayendo info de {backup_file}: {e}", component='BackupManager')
             return None
     
+    def _extract_archive_sidecar_info(self, meta_file: Path) -> Optional[BackupInfo]:
+        """Información de un backup tar.zst desde su metadata externa (<id>.meta.json)."""
+        with open(meta_file, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        archive = self.backup_dir / metadata.get('archive', '')
+        if not metadata.get('archive') or not archive.exists():
+            return None
+        return BackupInfo(
+            id=metadata['id'],
+            timestamp=datetime.fromisoformat(metadata['timestamp']),
+            vault_path=metadata.get('vault_path', ''),
+            size_mb=archive.stat().st_size / (1024 * 1024),
+            file_count=metadata.get('file_count', 0),
+            backup_type=metadata.get('backup_type', 'full'),
+            description=metadata.get('description', ''),
+            checksum=metadata.get('checksum', ''),
+            status=metadata.get('status', 'completed'),
+            metadata=metadata
+        )
+    
+    def _archive_file(self, backup_info: BackupInfo) -> Path:
+        """Archivo del backup (zip histórico o el indicado en la metadata)."""
+        return self.backup_dir / backup_info.metadata.get('archive', f"{backup_info.id}.zip")
+    
+    def _file_manifest_path(self, backup_id: str) -> Path:
+        return self.backup_dir / f"{backup_id}.files.json"
+    
+    def _remove_archive(self, backup_info: BackupInfo):
+        for path in (self._archive_file(backup_info), self.backup_dir / f"{backup_info.id}.meta.json",
+                     self._file_manifest_path(backup_info.id)):
+            if path.exists():
+                path.unlink()
+    
+    def _snapshot_backup_info(self, manifest: Dict[str, Any]) -> BackupInfo:
+        """BackupInfo de un snapshot del almacén (tamaño = delta que agregó al almacén)."""
+        return BackupInfo(
+            id=manifest['id'],
+            timestamp=datetime.fromisoformat(manifest['timestamp']),
+            vault_path=manifest.get('vault_path', ''),
+            size_mb=manifest.get('added_bytes', 0) / (1024 * 1024),
+            file_count=manifest.get('file_count', 0),
+            backup_type=manifest.get('backup_type', 'incremental'),
+            description=manifest.get('description', ''),
+            checksum='',
+            status=manifest.get('status', 'completed'),
+            metadata=manifest
+        )
+    
+    @staticmethod
+    def _is_snapshot(backup_info: BackupInfo) -> bool:
+        return backup_info.metadata.get('format') == 'snapshot'
+    
+    def _new_backup_id(self) -> str:
+        """ID único (los backups pre-comando pueden coincidir en el mismo segundo)."""
+        base_id = f"para_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        backup_id, counter = base_id, 1
+        while (any(self.backup_dir.glob(f"{backup_id}.*")) or self.snapshot_store.manifest_path(backup_id).exists()):
+            backup_id = f"{base_id}_{counter}"
+            counter += 1
+        return backup_id
+    
     @log_function_call
     def create_backup(self, vault_path: str, backup_type: str = 'full', description: str = '') -> Optional[BackupInfo]:
         """Crea un nuevo backup."""
@@ -127,16 +236,20 @@ class PARABackupManager:
             log_center.log_info(f"Iniciando backup {backup_type} del vault: {vault_path}", component='BackupManager')
             
             # Generar ID único
-            backup_id = f"para_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            backup_id = self._new_backup_id()
             backup_file = self.backup_dir / f"{backup_id}.zip"
+            if backup_type == 'full' and self.archive_format == 'tar.zst':
+                backup_file = self.backup_dir / f"{backup_id}.tar.zst"
+            
+            # Los incrementales van al almacén de snapshots, no a un zip
+            if backup_type == 'incremental':
+                return self._create_incremental_backup(vault_path, backup_id, description)
             
             # Crear backup
             if backup_type == 'full':
                 success = self._create_full_backup(vault_path, backup_file)
-            elif backup_type == 'config':
-                success = self._create_config_backup(backup_file)
             else:
-                success = self._create_incremental_backup(vault_path, backup_file)
+                success = self._create_config_backup(backup_file)
             
             if not success:
                 log_center.log_error("Falló la creación del backup", component='BackupManager')
@@ -177,44 +290,140 @@ class PARABackupManager:
             log_center.log_error(f"Error creando backup: {e}", component='BackupManager')
             return None
     
+    def _iter_backup_sources(self, vault_path_obj: Path) -> Iterator[Tuple[str, Path, os.stat_result]]:
+        """(nombre en el archivo, ruta, stat) del vault + configuración + logs recientes."""
+        # Los directorios excluidos (.para_db, .git, ...) se podan durante el recorrido
+        for rel_path, st in walk_vault_files(vault_path_obj):
+            yield rel_path, vault_path_obj / rel_path, st
+        
+        # Backup de configuración
+        for config_file in ['para_config.default.json', 'requirements.txt']:
+            if Path(config_file).exists():
+                yield f"config/{config_file}", Path(config_file), Path(config_file).stat()
+        
+        # Backup de logs recientes
+        log_dir = Path("logs")
+        if log_dir.exists():
+            for log_file in log_dir.glob("*.log"):
+                st = log_file.stat()
+                if st.st_size < 10 * 1024 * 1024:  # Solo logs < 10MB
+                    yield f"logs/{log_file.name}", log_file, st
+    
+    def _prefetched_sources(self, executor: ThreadPoolExecutor, sources) -> Iterator[Tuple[str, Path, os.stat_result, Any]]:
+        """
+        Pipeline de lectura: los archivos pequeños se leen en paralelo en el pool (ventana
+        acotada, en orden); los grandes se devuelven sin leer para copiarlos en streaming.
+        """
+        def read_file(path: Path) -> Tuple[bytes, str]:
+            with open(path, 'rb') as f:
+                data = f.read()
+            # El hash por archivo (manifest de verificación) también se calcula en el pool
+            return data, hash_bytes(data)
+        
+        window = deque()
+        for arcname, path, st in sources:
+            future = executor.submit(read_file, path) if st.st_size <= PREFETCH_MAX_BYTES else None
+            window.append((arcname, path, st, future))
+            if len(window) >= PREFETCH_WINDOW:
+                yield window.popleft()
+        while window:
+            yield window.popleft()
+    
     def _create_full_backup(self, vault_path: str, backup_file: Path) -> bool:
-        """Crea un backup completo del vault."""
+        """Crea un backup completo del vault (tar.zst multihilo o zip)."""
         try:
             vault_path_obj = Path(vault_path)
             if not vault_path_obj.exists():
                 log_center.log_error(f"Vault no encontrado: {vault_path}", component='BackupManager')
                 return False
             
-            with zipfile.ZipFile(backup_file, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
-                # Backup del vault
-                for file_path in vault_path_obj.rglob('*'):
-                    if file_path.is_file():
-                        # Excluir archivos del sistema PARA
-                        if '.para_db' in str(file_path) or '.git' in str(file_path):
-                            continue
-                        
-                        arcname = file_path.relative_to(vault_path_obj)
-                        zip_ref.write(file_path, arcname)
-                
-                # Backup de configuración
-                config_files = ['para_config.default.json', 'requirements.txt']
-                for config_file in config_files:
-                    if Path(config_file).exists():
-                        zip_ref.write(config_file, f"config/{config_file}")
-                
-                # Backup de logs recientes
-                log_dir = Path("logs")
-                if log_dir.exists():
-                    for log_file in log_dir.glob("*.log"):
-                        if log_file.stat().st_size < 10 * 1024 * 1024:  # Solo logs < 10MB
-                            zip_ref.write(log_file, f"logs/{log_file.name}")
+            if backup_file.name.endswith('.tar.zst'):
+                files = self._write_tar_zst_backup(vault_path_obj, backup_file)
+                # Metadata externa: leerla no requiere descomprimir el archivo
+                self._write_archive_sidecar(backup_file, {'archive': backup_file.name, 'file_count': len(files)})
+            else:
+                files = self._write_zip_backup(vault_path_obj, backup_file)
             
+            self._write_file_manifest(backup_file, files)
             return True
             
         except Exception as e:
             log_center.log_error(f"Error en backup completo: {e}", component='BackupManager')
             return False
     
+    def _write_zip_backup(self, vault_path_obj: Path, backup_file: Path) -> Dict[str, Dict[str, Any]]:
+        """Escribe el backup como zip (sin zstandard). Devuelve las entradas del manifest por archivo."""
+        files = {}
+        with zipfile.ZipFile(backup_file, 'w', zipfile.ZIP_DEFLATED) as zip_ref, \
+                ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="para-backup-io") as executor:
+            for arcname, path, st, future in self._prefetched_sources(executor, self._iter_backup_sources(vault_path_obj)):
+                info = zipfile.ZipInfo(arcname, date_time=time.localtime(st.st_mtime)[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.external_attr = (st.st_mode & 0xFFFF) << 16
+                try:
+                    if future is None:
+                        with open(path, 'rb') as f, zip_ref.open(info, 'w', force_zip64=True) as dst:
+                            reader = HashingReader(f)
+                            shutil.copyfileobj(reader, dst, COPY_CHUNK_SIZE)
+                            st = os.fstat(f.fileno())
+                        digest = reader.hexdigest()
+                    else:
+                        data, digest = future.result()
+                        zip_ref.writestr(info, data)
+                    files[arcname] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'hash': digest}
+                except OSError as e:
+                    log_center.log_warning(f"Archivo omitido en backup {arcname}: {e}", component='BackupManager')
+        return files
+    
+    def _write_tar_zst_backup(self, vault_path_obj: Path, backup_file: Path) -> Dict[str, Dict[str, Any]]:
+        """
+        Escribe un tar en streaming comprimido con zstd multihilo (un hilo por core).
+        Lectura paralela con el pool; los archivos grandes se copian sin cargarlos enteros.
+        Devuelve las entradas del manifest por archivo.
+        """
+        compressor = zstandard.ZstdCompressor(level=3, threads=-1)
+        files = {}
+        with open(backup_file, 'wb') as raw, \
+                compressor.stream_writer(raw, closefd=False) as compressed, \
+                tarfile.open(fileobj=compressed, mode='w|') as tar, \
+                ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="para-backup-io") as executor:
+            for arcname, path, st, future in self._prefetched_sources(executor, self._iter_backup_sources(vault_path_obj)):
+                info = tarfile.TarInfo(arcname)
+                info.mtime = int(st.st_mtime)
+                info.mode = st.st_mode & 0o7777
+                try:
+                    if future is None:
+                        with open(path, 'rb') as f:
+                            st = os.fstat(f.fileno())
+                            info.size = st.st_size
+                            reader = HashingReader(f)
+                            tar.addfile(info, reader)
+                        digest = reader.hexdigest()
+                    else:
+                        data, digest = future.result()
+                        info.size = len(data)
+                        tar.addfile(info, io.BytesIO(data))
+                    files[arcname] = {'size': info.size, 'mtime_ns': st.st_mtime_ns, 'hash': digest}
+                except OSError as e:
+                    log_center.log_warning(f"Archivo omitido en backup {arcname}: {e}", component='BackupManager')
+        return files
+    
+    def _write_file_manifest(self, backup_file: Path, files: Dict[str, Dict[str, Any]]):
+        """Manifest por archivo (<id>.files.json): tamaño, mtime y hash rápido de cada entrada."""
+        backup_id = backup_file.name.split('.')[0]
+        with open(self._file_manifest_path(backup_id), 'w', encoding='utf-8') as f:
+            json.dump({'hash_algorithm': DEFAULT_ALGORITHM, 'files': files}, f, ensure_ascii=False)
+    
+    def _write_archive_sidecar(self, backup_file: Path, data: Dict[str, Any]):
+        sidecar = self.backup_dir / f"{backup_file.name.split('.')[0]}.meta.json"
+        existing = {}
+        if sidecar.exists():
+            with open(sidecar, 'r', encoding='utf-8') as f:
+                existing = json.load(f)
+        existing.update(data)
+        with open(sidecar, 'w', encoding='utf-8') as f:
+            json.dump(existing, f, indent=2)
+    
     def _create_config_backup(self, backup_file: Path) -> bool:
         """Crea un backup solo de configuración."""
         try:
@@ -246,27 +455,48 @@ class PARABackupManager:
             log_center.log_error(f"Error en backup de configuración: {e}", component='BackupManager')
             return False
     
-    def _create_incremental_backup(self, vault_path: str, backup_file: Path) -> bool:
-        """Crea un backup incremental."""
+    def _create_incremental_backup(self, vault_path: str, backup_id: str, description: str = '') -> Optional[BackupInfo]:
+        """
+        Crea un backup incremental como snapshot direccionado por contenido: solo se leen
+        los archivos cambiados desde el snapshot anterior y solo se guardan los chunks nuevos.
+        """
         try:
-            # Por ahora, igual que full backup
-            return self._create_full_backup(vault_path, backup_file)
+            if not Path(vault_path).exists():
+                log_center.log_error(f"Vault no encontrado: {vault_path}", component='BackupManager')
+                return None
+            
+            started = time.time()
+            manifest = self.snapshot_store.create_snapshot(Path(vault_path), backup_id, description)
+            manifest.pop('files', None)
+            backup_info = self._snapshot_backup_info(manifest)
+            
+            self.backups.insert(0, backup_info)
+            self.last_backup = backup_info
+            self._cleanup_old_backups()
+            
+            log_center.log_info(
+                f"Snapshot completado: {backup_id} ({manifest['changed_files']} archivos cambiados, "
+                f"+{backup_info.size_mb:.2f} MB, {time.time() - started:.2f}s)",
+                component='BackupManager'
+            )
+            return backup_info
             
         except Exception as e:
             log_center.log_error(f"Error en backup incremental: {e}", component='BackupManager')
-            return False
+            return None
     
     def _create_backup_metadata(self, backup_id: str, vault_path: str, backup_type: str, 
                                description: str, backup_file: Path) -> Dict[str, Any]:
         """Crea metadata del backup."""
         try:
-            # Calcular checksum
-            checksum = self._calculate_file_checksum(backup_file)
-            
             # Contar archivos
-            file_count = 0
-            with zipfile.ZipFile(backup_file, 'r') as zip_ref:
-                file_count = len(zip_ref.namelist())
+            is_zip = backup_file.suffix == '.zip'
+            if is_zip:
+                with zipfile.ZipFile(backup_file, 'r') as zip_ref:
+                    file_count = len(zip_ref.namelist())
+            else:
+                with open(self.backup_dir / f"{backup_id}.meta.json", 'r', encoding='utf-8') as f:
+                    file_count = json.load(f).get('file_count', 0)
             
             metadata = {
                 'id': backup_id,
@@ -274,17 +504,28 @@ class PARABackupManager:
                 'vault_path': vault_path,
                 'backup_type': backup_type,
                 'description': description,
-                'checksum': checksum,
                 'file_count': file_count,
-                'size_bytes': backup_file.stat().st_size,
                 'status': 'completed',
                 'created_by': 'PARA_BackupManager',
                 'version': '2.0'
             }
             
-            # Guardar metadata en el zip
-            with zipfile.ZipFile(backup_file, 'a') as zip_ref:
-                zip_ref.writestr('metadata.json', json.dumps(metadata, indent=2))
+            # Guardar metadata en el zip (compatibilidad); el checksum va en la metadata externa
+            # porque se calcula sobre el archivo final
+            if is_zip:
+                with zipfile.ZipFile(backup_file, 'a') as zip_ref:
+                    zip_ref.writestr('metadata.json', json.dumps(metadata, indent=2))
+            
+            metadata.update({
+                'checksum': self._calculate_file_checksum(backup_file),
+                'checksum_algorithm': DEFAULT_ALGORITHM,
+                'size_bytes': backup_file.stat().st_size,
+                'archive': backup_file.name,
+                'archive_format': 'zip' if is_zip else 'tar.zst',
+            })
+            if self._file_manifest_path(backup_id).exists():
+                metadata['file_manifest'] = self._file_manifest_path(backup_id).name
+            self._write_archive_sidecar(backup_file, metadata)
             
             return metadata
             
@@ -292,72 +533,96 @@ class PARABackupManager:
             log_center.log_error(f"Error creando metadata: {e}", component='BackupManager')
             return {}
     
-    def _calculate_file_checksum(self, file_path: Path) -> str:
-        """Calcula el checksum de un archivo."""
+    def _calculate_file_checksum(self, file_path: Path, algorithm: str = None) -> str:
+        """Calcula el checksum de un archivo (hash rápido en bloques de 1 MB)."""
         try:
-            hash_md5 = hashlib.md5()
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_md5.update(chunk)
-            return hash_md5.hexdigest()
+            return hash_file(file_path, algorithm or DEFAULT_ALGORITHM)
         except Exception:
             return ""
     
     def _cleanup_old_backups(self):
-        """Limpia backups antiguos."""
+        """Limpia backups antiguos (retención separada para zips y snapshots)."""
         try:
-            if len(self.backups) <= self.max_backups:
+            archives = [b for b in self.backups if not self._is_snapshot(b)]
+            snapshots = [b for b in self.backups if self._is_snapshot(b)]
+            backups_to_remove = archives[self.max_backups:] + snapshots[self.max_snapshots:]
+            if not backups_to_remove:
                 return
             
-            # Mantener solo los más recientes
-            backups_to_remove = self.backups[self.max_backups:]
-            
+            removed_snapshots = False
             for backup_info in backups_to_remove:
-                backup_file = self.backup_dir / f"{backup_info.id}.zip"
-                if backup_file.exists():
-                    backup_file.unlink()
-                    log_center.log_info(f"Backup eliminado: {backup_info.id}", component='BackupManager')
+                if self._is_snapshot(backup_info):
+                    self.snapshot_store.delete_snapshot(backup_info.id)
+                    removed_snapshots = True
+                else:
+                    self._remove_archive(backup_info)
+                log_center.log_info(f"Backup eliminado: {backup_info.id}", component='BackupManager')
+            
+            if removed_snapshots:
+                self.snapshot_store.garbage_collect()
             
             # Actualizar lista
-            self.backups = self.backups[:self.max_backups]
+            removed_ids = {b.id for b in backups_to_remove}
+            self.backups = [b for b in self.backups if b.id not in removed_ids]
             
         except Exception as e:
             log_center.log_error(f"Error limpiando backups antiguos: {e}", component='BackupManager')
     
     @log_function_call
     def restore_backup(self, backup_id: str, target_path: str = None, 
-                      restore_type: str = 'full') -> bool:
-        """Restaura un backup."""
+                      restore_type: str = 'full', paths: Optional[List[str]] = None) -> bool:
+        """
+        Restaura un backup por diferencias: solo se reescriben los archivos que difieren del vault.
+
+        - ``full``: el vault queda igual al backup (se eliminan los archivos que no están en él).
+        - ``selective``: solo las rutas, carpetas o globs de ``paths``; no elimina nada.
+        - ``config``: solo los archivos de configuración.
+        """
         try:
             log_center.log_info(f"Iniciando restore del backup: {backup_id}", component='BackupManager')
             
+            if paths and restore_type == 'full':
+                restore_type = 'selective'
+            if restore_type == 'selective' and not paths:
+                log_center.log_error("La restauración selectiva requiere rutas o patrones", component='BackupManager')
+                return False
+            
             # Encontrar backup
             backup_info = next((b for b in self.backups if b.id == backup_id), None)
             if not backup_info:
                 log_center.log_error(f"Backup no encontrado: {backup_id}", component='BackupManager')
                 return False
             
-            backup_file = self.backup_dir / f"{backup_id}.zip"
-            if not backup_file.exists():
-                log_center.log_error(f"Archivo de backup no encontrado: {backup_file}", component='BackupManager')
-                return False
+            backup_file = None
+            if not self._is_snapshot(backup_info):
+                backup_file = self._archive_file(backup_info)
+                if not backup_file.exists():
+                    log_center.log_error(f"Archivo de backup no encontrado: {backup_file}", component='BackupManager')
+                    return False
+                
+                # Verificar checksum
+                if not self._verify_backup_checksum(backup_file, backup_info.checksum,
+                                                    backup_info.metadata.get('checksum_algorithm', 'md5')):
+                    log_center.log_error(f"Checksum inválido para backup: {backup_id}", component='BackupManager')
+                    return False
             
-            # Verificar checksum
-            if not self._verify_backup_checksum(backup_file, backup_info.checksum):
-                log_center.log_error(f"Checksum inválido para backup: {backup_id}", component='BackupManager')
-                return False
+            target = Path(target_path or backup_info.vault_path or '.')
             
-            # Crear backup del estado actual antes de restaurar
-            if target_path and Path(target_path).exists():
-                current_backup = self.create_backup(target_path, 'config', f'Pre-restore backup for {backup_id}')
+            # Crear backup del estado actual antes de restaurar (snapshot incremental: solo guarda lo que cambió)
+            if restore_type != 'config' and target.is_dir():
+                current_backup = self.create_backup(str(target), 'incremental', f'Pre-restore backup for {backup_id}')
                 if not current_backup:
                     log_center.log_warning("No se pudo crear backup del estado actual", component='BackupManager')
             
             # Restaurar
-            success = self._perform_restore(backup_file, target_path, restore_type)
+            if self._is_snapshot(backup_info):
+                success = self._restore_snapshot(backup_info, target, restore_type, paths)
+            else:
+                success = self._perform_restore(backup_file, target, restore_type, paths)
             
             if success:
-                log_center.log_info(f"Restore completado: {backup_id}", component='BackupManager')
+                log_center.log_info(f"Restore completado: {backup_id}", component='BackupManager',
+                                    extra_data=self.last_restore_result.to_dict() if self.last_restore_result else None)
             else:
                 log_center.log_error(f"Restore falló: {backup_id}", component='BackupManager')
             
@@ -367,38 +632,220 @@ class PARABackupManager:
             log_center.log_error(f"Error en restore: {e}", component='BackupManager')
             return False
     
-    def _verify_backup_checksum(self, backup_file: Path, expected_checksum: str) -> bool:
-        """Verifica el checksum de un backup."""
+    def _restore_engine(self, target: Path, restore_type: str, paths: Optional[List[str]],
+                        keep: Optional[List[str]] = None) -> RestoreEngine:
+        return RestoreEngine(target, patterns=paths, prune=(restore_type == 'full'), workers=self.io_workers,
+                             keep=keep)
+    
+    def _finish_restore(self, result: RestoreResult) -> bool:
+        self.last_restore_result = result
+        return result.success
+    
+    def _restore_snapshot(self, backup_info: BackupInfo, target: Path, restore_type: str = 'full',
+                          paths: Optional[List[str]] = None) -> bool:
+        """Restaura un snapshot reconstruyendo desde el almacén solo los archivos que difieren."""
+        manifest = self.snapshot_store.load_manifest(backup_info.id)
+        if not manifest:
+            log_center.log_error(f"Manifest no encontrado: {backup_info.id}", component='BackupManager')
+            return False
+        
+        algorithm = manifest.get('hash_algorithm', 'blake2b')
+        skipped = manifest.get('skipped_paths') or []
+        if skipped:
+            log_center.log_warning(f"Snapshot incompleto {backup_info.id}: {len(skipped)} rutas no respaldadas "
+                                   f"se conservan tal cual", component='BackupManager')
+        engine = self._restore_engine(target, restore_type, paths, keep=skipped)
+        result = engine.restore(manifest['files'], 
+                                lambda live, entry: self.snapshot_store.is_unchanged(live, entry, algorithm),
+                                lambda live, entry: self.snapshot_store.restore_file(entry, live))
+        
+        log_center.log_info(f"Snapshot restaurado: {backup_info.id} ({len(result.restored)} restaurados, "
+                            f"{result.unchanged} sin cambios, {len(result.removed)} eliminados)", component='BackupManager')
+        return self._finish_restore(result)
+    
+    def _verify_backup_checksum(self, backup_file: Path, expected_checksum: str, algorithm: str = 'md5') -> bool:
+        """Verifica el checksum de un backup (los backups antiguos sin algoritmo registrado usan MD5)."""
         try:
             if not expected_checksum:
                 return True  # Sin checksum para verificar
             
-            actual_checksum = self._calculate_file_checksum(backup_file)
+            actual_checksum = self._calculate_file_checksum(backup_file, algorithm)
             return actual_checksum == expected_checksum
             
         except Exception:
             return False
     
-    def _perform_restore(self, backup_file: Path, target_path: str, restore_type: str) -> bool:
+    def load_file_manifest(self, backup_info: BackupInfo) -> Optional[Dict[str, Any]]:
+        """Manifest por archivo de un backup: ``{'hash_algorithm', 'files': {ruta: {size, mtime_ns, hash}}}``."""
+        if self._is_snapshot(backup_info):
+            manifest = self.snapshot_store.load_manifest(backup_info.id)
+            if manifest is None:
+                return None
+            return {'hash_algorithm': manifest.get('hash_algorithm', 'blake2b'), 'files': manifest['files']}
+        path = self._file_manifest_path(backup_info.id)
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def verify_backup(self, backup_id: str, deep: bool = False, incremental: bool = True) -> Dict[str, Any]:
+        """
+        Verifica la integridad de un backup.
+
+        - Snapshots: chunks presentes y con el hash correcto (en paralelo; con ``incremental``
+          solo se verifican los blobs que no se verificaron antes).
+        - Archivos tar.zst/zip: checksum del archivo; con ``incremental`` se omite si el archivo no
+          cambió (tamaño/mtime) desde la última verificación correcta. Con ``deep`` se recorre el
+          archivo y se comprueba el hash de cada entrada contra su manifest, hasheando en paralelo.
+        """
+        backup_info = next((b for b in self.backups if b.id == backup_id), None)
+        if not backup_info:
+            return {'valid': False, 'error': f"Backup no encontrado: {backup_id}"}
+        
+        started = time.time()
+        try:
+            if self._is_snapshot(backup_info):
+                result = self.snapshot_store.verify_snapshot(backup_id, incremental=incremental)
+            else:
+                result = self._verify_archive(backup_info, deep, incremental)
+        except Exception as e:
+            log_center.log_error(f"Error verificando backup {backup_id}: {e}", component='BackupManager')
+            result = {'valid': False, 'error': str(e)}
+        
+        result.update({'backup_id': backup_id, 'seconds': round(time.time() - started, 3)})
+        if result.get('valid'):
+            log_center.log_info(f"Verificación de backup {backup_id}: OK", component='BackupManager', extra_data=result)
+        else:
+            log_center.log_error(f"Verificación de backup {backup_id}: FALLÓ", component='BackupManager', context=result)
+        return result
+    
+    def _verify_archive(self, backup_info: BackupInfo, deep: bool, incremental: bool) -> Dict[str, Any]:
+        backup_file = self._archive_file(backup_info)
+        if not backup_file.exists():
+            return {'valid': False, 'error': f"Archivo de backup no encontrado: {backup_file.name}"}
+        
+        st = backup_file.stat()
+        stamp = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+        result: Dict[str, Any] = {'valid': True, 'cached': False}
+        
+        if incremental and not deep and backup_info.metadata.get('verified') == stamp:
+            result['cached'] = True
+            return result
+        
+        algorithm = backup_info.metadata.get('checksum_algorithm', 'md5')
+        result['valid'] = self._verify_backup_checksum(backup_file, backup_info.checksum, algorithm)
+        
+        if deep and result['valid']:
+            manifest = self.load_file_manifest(backup_info)
+            if manifest is None:
+                result['deep'] = 'sin manifest por archivo'
+            else:
+                bad = self._verify_archive_entries(backup_file, manifest)
+                result.update({'files': len(manifest['files']), 'damaged_files': bad, 'valid': not bad})
+        
+        if result['valid'] and (self.backup_dir / f"{backup_info.id}.meta.json").exists():
+            backup_info.metadata['verified'] = stamp
+            self._write_archive_sidecar(backup_file, {'verified': stamp})
+        return result
+    
+    def _verify_archive_entries(self, backup_file: Path, manifest: Dict[str, Any]) -> List[str]:
+        """Recorre el archivo una vez y hashea cada entrada en el pool; devuelve las que no coinciden."""
+        algorithm = manifest.get('hash_algorithm', DEFAULT_ALGORITHM)
+        expected = manifest['files']
+        seen = set()
+        
+        def check(name: str, data: bytes) -> Optional[str]:
+            return None if hash_bytes(data, algorithm) == expected[name]['hash'] else name
+        
+        def check_stream(name: str, fileobj) -> Optional[str]:
+            hasher = new_hasher(algorithm)
+            for chunk in iter(lambda: fileobj.read(COPY_CHUNK_SIZE), b''):
+                hasher.update(chunk)
+            return None if hasher.hexdigest() == expected[name]['hash'] else name
+        
+        futures, bad = [], []
+        with ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="para-verify") as executor:
+            if backup_file.name.endswith('.tar.zst'):
+                with open(backup_file, 'rb') as raw, \
+                        zstandard.ZstdDecompressor().stream_reader(raw) as reader, \
+                        tarfile.open(fileobj=reader, mode='r|') as tar:
+                    for member in tar:
+                        if not member.isfile() or member.name not in expected:
+                            continue
+                        seen.add(member.name)
+                        fileobj = tar.extractfile(member)
+                        if member.size <= PREFETCH_MAX_BYTES:
+                            futures.append(executor.submit(check, member.name, fileobj.read()))
+                        else:
+                            # Los grandes se hashean al leerlos del stream (no se pueden diferir)
+                            bad.append(check_stream(member.name, fileobj))
+            else:
+                with zipfile.ZipFile(backup_file, 'r') as zip_ref:
+                    for info in zip_ref.infolist():
+                        if info.filename not in expected:
+                            continue
+                        seen.add(info.filename)
+                        with zip_ref.open(info) as fileobj:
+                            if info.file_size <= PREFETCH_MAX_BYTES:
+                                futures.append(executor.submit(check, info.filename, fileobj.read()))
+                            else:
+                                bad.append(check_stream(info.filename, fileobj))
+            bad.extend(future.result() for future in futures)
+        
+        return sorted([name for name in bad if name] + [name for name in expected if name not in seen])
+    
+    def latest_backup_for_vault(self, vault_path: str) -> Optional[BackupInfo]:
+        """Último backup del vault que tenga manifest por archivo (snapshot o completo)."""
+        vault_path = str(Path(vault_path).resolve())
+        for backup in self.backups:
+            if backup.backup_type == 'config' or not backup.vault_path:
+                continue
+            if str(Path(backup.vault_path).resolve()) != vault_path:
+                continue
+            if self._is_snapshot(backup) or self._file_manifest_path(backup.id).exists():
+                return backup
+        return None
+    
+    def vault_matches_backup(self, vault_path: str, backup_id: str = None) -> Dict[str, Any]:
+        """
+        Comprueba si el vault coincide con su último backup (o con ``backup_id``) usando el manifest
+        por archivo: un stat por archivo y hash solo de los que cambiaron de mtime sin cambiar de
+        tamaño. Es lo bastante barato para ejecutarlo antes de cada comando destructivo.
+        """
+        if backup_id:
+            backup_info = next((b for b in self.backups if b.id == backup_id), None)
+        else:
+            backup_info = self.latest_backup_for_vault(vault_path)
+        manifest = self.load_file_manifest(backup_info) if backup_info else None
+        if manifest is None:
+            return {'matches': False, 'backup_id': backup_info.id if backup_info else None,
+                    'changed': [], 'added': [], 'removed': []}
+        
+        files = {rel_path: entry for rel_path, entry in manifest['files'].items()
+                 if self._vault_member_name(rel_path)}
+        diff = diff_vault(Path(vault_path), files, manifest.get('hash_algorithm', DEFAULT_ALGORITHM), self.io_workers)
+        diff['matches'] = not (diff['changed'] or diff['added'] or diff['removed'])
+        diff['backup_id'] = backup_info.id
+        return diff
+    
+    @staticmethod
+    def _vault_member_name(name: str) -> Optional[str]:
+        """Ruta relativa al vault de un miembro del archivo, o None si no es del vault o no es segura."""
+        name = name.replace('\\', '/')
+        if name == 'metadata.json' or name.startswith(ARCHIVE_EXTRA_PREFIXES) or name.endswith('/'):
+            return None
+        if name.startswith('/') or '..' in name.split('/'):
+            return None
+        return name
+    
+    def _perform_restore(self, backup_file: Path, target: Path, restore_type: str,
+                         paths: Optional[List[str]] = None) -> bool:
         """Realiza la restauración."""
+        if backup_file.name.endswith('.tar.zst'):
+            return self._perform_tar_zst_restore(backup_file, target, restore_type, paths)
         try:
-            with zipfile.ZipFile(backup_file, 'r') as zip_ref:
-                if restore_type == 'full':
-                    # Restaurar todo
-                    if target_path:
-                        # Limpiar directorio objetivo
-                        target_path_obj = Path(target_path)
-                        if target_path_obj.exists():
-                            shutil.rmtree(target_path_obj)
-                        target_path_obj.mkdir(parents=True)
-                        
-                        # Extraer todo
-                        zip_ref.extractall(target_path)
-                    else:
-                        # Extraer en ubicación original
-                        zip_ref.extractall('.')
-                
-                elif restore_type == 'config':
+            if restore_type == 'config':
+                with zipfile.ZipFile(backup_file, 'r') as zip_ref:
                     # Restaurar solo configuración
                     config_files = [f for f in zip_ref.namelist() if f.startswith('config/')]
                     for config_file in config_files:
@@ -406,14 +853,79 @@ class PARABackupManager:
                         # Mover de config/ a raíz
                         extracted_path = Path(config_file)
                         if extracted_path.exists():
-                            extracted_path.rename(extracted_path.name)
-                
-                elif restore_type == 'selective':
-                    # Restauración selectiva
-                    # Implementar según necesidades específicas
-                    pass
+                            extracted_path.replace(extracted_path.name)
+                return True
             
-            return True
+            with zipfile.ZipFile(backup_file, 'r') as zip_ref:
+                entries = {}
+                for info in zip_ref.infolist():
+                    rel_path = self._vault_member_name(info.filename)
+                    if rel_path:
+                        entries[rel_path] = info
+            
+            # Un ZipFile por hilo: los miembros se leen y escriben en paralelo
+            local = threading.local()
+            handles = []
+            handles_lock = threading.Lock()
+            
+            def zip_handle() -> zipfile.ZipFile:
+                if not hasattr(local, 'zip'):
+                    local.zip = zipfile.ZipFile(backup_file, 'r')
+                    with handles_lock:
+                        handles.append(local.zip)
+                return local.zip
+            
+            def is_same(live: Path, info: zipfile.ZipInfo) -> bool:
+                if live.stat().st_size != info.file_size:
+                    return False
+                crc = 0
+                with open(live, 'rb') as f:
+                    for chunk in iter(lambda: f.read(COPY_CHUNK_SIZE), b''):
+                        crc = zlib.crc32(chunk, crc)
+                return crc == info.CRC
+            
+            def write(live: Path, info: zipfile.ZipInfo):
+                mtime_ns = int(time.mktime(info.date_time + (0, 0, -1)) * 1_000_000_000)
+                with zip_handle().open(info) as member:
+                    atomic_write(live, iter(lambda: member.read(COPY_CHUNK_SIZE), b''), mtime_ns)
+            
+            try:
+                result = self._restore_engine(target, restore_type, paths).restore(entries, is_same, write)
+            finally:
+                for handle in handles:
+                    handle.close()
+            return self._finish_restore(result)
+            
+        except Exception as e:
+            log_center.log_error(f"Error en restauración: {e}", component='BackupManager')
+            return False
+    
+    def _perform_tar_zst_restore(self, backup_file: Path, target: Path, restore_type: str,
+                                 paths: Optional[List[str]] = None) -> bool:
+        """Restauración en streaming de un backup tar.zst (una sola pasada de descompresión)."""
+        if not ZSTD_AVAILABLE:
+            log_center.log_error("Restaurar backups tar.zst requiere el paquete zstandard", component='BackupManager')
+            return False
+        try:
+            with open(backup_file, 'rb') as raw, \
+                    zstandard.ZstdDecompressor().stream_reader(raw) as reader, \
+                    tarfile.open(fileobj=reader, mode='r|') as tar:
+                if restore_type == 'config':
+                    extract_kwargs = {'filter': 'data'} if hasattr(tarfile, 'data_filter') else {}
+                    for member in tar:
+                        if member.name.startswith('config/'):
+                            member.name = member.name[len('config/'):]
+                            tar.extract(member, '.', **extract_kwargs)
+                    return True
+                
+                def members():
+                    for member in tar:
+                        rel_path = self._vault_member_name(member.name)
+                        if rel_path and member.isfile():
+                            yield rel_path, member.size, int(member.mtime) * 1_000_000_000, tar.extractfile(member)
+                
+                result = self._restore_engine(target, restore_type, paths).restore_stream(members())
+            return self._finish_restore(result)
             
         except Exception as e:
             log_center.log_error(f"Error en restauración: {e}", component='BackupManager')
@@ -448,8 +960,11 @@ class PARABackupManager:
             log_center.log_error(f"Error obteniendo stats de backup: {e}", component='BackupManager')
             return {}
     
-    def should_create_auto_backup(self) -> bool:
-        """Determina si se debe crear un backup automático."""
+    def should_create_auto_backup(self, vault_path: str = None) -> bool:
+        """
+        Determina si se debe crear un backup automático. Con ``vault_path``, además se omite
+        si el vault no cambió desde su último backup (comparación barata por manifest).
+        """
         if not self.auto_backup_enabled:
             return False
         
@@ -457,7 +972,12 @@ class PARABackupManager:
             return True
         
         time_since_last = datetime.now() - self.last_backup.timestamp
-        return time_since_last.total_seconds() > (self.backup_interval_hours * 3600)
+        if time_since_last.total_seconds() <= (self.backup_interval_hours * 3600):
+            return False
+        
+        if vault_path:
+            return not self.vault_matches_backup(vault_path)['matches']
+        return True
     
     def list_backups(self) -> List[Dict[str, Any]]:
         """Lista todos los backups disponibles."""
@@ -485,9 +1005,11 @@ class PARABackupManager:
                 log_center.log_error(f"Backup no encontrado para eliminar: {backup_id}", component='BackupManager')
                 return False
             
-            backup_file = self.backup_dir / f"{backup_id}.zip"
-            if backup_file.exists():
-                backup_file.unlink()
+            if self._is_snapshot(backup_info):
+                self.snapshot_store.delete_snapshot(backup_id)
+                self.snapshot_store.garbage_collect()
+            else:
+                self._remove_archive(backup_info)
             
             self.backups.remove(backup_info)
             
@@ -544,6 +1066,10 @@ class PARABackupManager:
                 log_center.log_warning("No se pudo encontrar vault para backup automático", component='BackupManager')
                 return
             
+            if not self.should_create_auto_backup(str(vault_path)):
+                log_center.log_info("Vault sin cambios desde el último backup, se omite el automático", component='BackupManager')
+                return
+            
             # Crear backup automático
             description = f"Backup automático - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
             backup_info = self.create_backup(str(vault_path), 'full', description)
@@ -580,4 +1106,4 @@ class PARABackupManager:
             pass
 
 # Instancia global
-backup_manager = PARABackupManager() 
\ No newline at end of file
+backup_manager = LazyInstance(PARABackupManager)
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""
+paralib/call_stats.py
+
+Instrumentación barata de funciones para los decoradores de logging
+(``log_center.log_function_call``, ``logger.log_function_calls`` y ``logger.log_exceptions``).
+
+- ``PARA_CALL_TRACING``: ``off`` (el decorador devuelve la función original, coste cero),
+  ``stats`` (por defecto: tiempos a un histograma en memoria, solo los errores van al log)
+  o ``log`` (además, entradas de inicio/fin en el log como antes, solo en llamadas muestreadas).
+- ``PARA_CALL_SAMPLE_RATE``: fracción de llamadas que se miden (por defecto 1.0).
+- ``PARA_CALL_SAMPLING``: tasas por función, ``patrón=tasa`` separados por comas
+  (``paralib.db.*=0.01,paralib.file_watcher.*=0.1``); el patrón usa ``fnmatch`` sobre
+  ``módulo.qualname``.
+
+El muestreo es determinista (una de cada ``1/tasa`` llamadas) y se resuelve al decorar, así
+una llamada no muestreada solo paga un contador. Los errores se registran siempre.
+"""
+import fnmatch
+import itertools
+import os
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional
+
+TRACE_MODES = ('off', 'stats', 'log')
+
+# Buckets log2 de nanosegundos: el bucket i cubre [2**(i-1), 2**i) ns
+HISTOGRAM_BUCKETS = 64
+
+
+def _env_rate(value: Optional[str], default: float = 1.0) -> float:
+    try:
+        return min(1.0, max(0.0, float(value)))
+    except (TypeError, ValueError):
+        return default
+
+
+def _parse_sampling(value: str) -> List[tuple]:
+    rules = []
+    for item in (value or '').split(','):
+        if '=' not in item:
+            continue
+        pattern, rate = item.rsplit('=', 1)
+        rules.append((pattern.strip(), _env_rate(rate)))
+    return rules
+
+
+trace_mode = os.environ.get('PARA_CALL_TRACING', 'stats').lower()
+if trace_mode not in TRACE_MODES:
+    trace_mode = 'stats'
+default_sample_rate = _env_rate(os.environ.get('PARA_CALL_SAMPLE_RATE'))
+_sampling_rules = _parse_sampling(os.environ.get('PARA_CALL_SAMPLING', ''))
+
+
+class CallHistogram:
+    """Tiempos de una función: contador, errores, total, máximo y buckets log2 (aproximado bajo concurrencia)."""
+    __slots__ = ('name', 'count', 'errors', 'total_ns', 'max_ns', 'buckets', 'sample_rate')
+
+    def __init__(self, name: str, sample_rate: float = 1.0):
+        self.name = name
+        self.sample_rate = sample_rate
+        self.count = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets = [0] * (HISTOGRAM_BUCKETS + 1)
+
+    def record(self, elapsed_ns: int, failed: bool = False):
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.buckets[min(elapsed_ns.bit_length(), HISTOGRAM_BUCKETS)] += 1
+        if failed:
+            self.errors += 1
+
+    def percentile(self, q: float) -> float:
+        """Cota superior (en segundos) del percentil ``q`` (0-100) según los buckets."""
+        if not self.count:
+            return 0.0
+        threshold = self.count * q / 100
+        seen = 0
+        for index, hits in enumerate(self.buckets):
+            seen += hits
+            if seen >= threshold:
+                return min(2 ** index, self.max_ns) / 1e9
+        return self.max_ns / 1e9
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'calls_measured': self.count,
+            'sample_rate': self.sample_rate,
+            'errors': self.errors,
+            'total_s': self.total_ns / 1e9,
+            'mean_s': self.total_ns / self.count / 1e9 if self.count else 0.0,
+            'p50_s': self.percentile(50),
+            'p95_s': self.percentile(95),
+            'p99_s': self.percentile(99),
+            'max_s': self.max_ns / 1e9,
+        }
+
+
+_histograms: Dict[str, CallHistogram] = {}
+
+
+def sample_rate_for(name: str, explicit: Optional[float] = None) -> float:
+    """Tasa de muestreo de una función: regla de ``PARA_CALL_SAMPLING``, la del decorador o la global."""
+    for pattern, rate in _sampling_rules:
+        if fnmatch.fnmatchcase(name, pattern):
+            return rate
+    if explicit is not None:
+        return _env_rate(explicit)
+    return default_sample_rate
+
+
+def get_histogram(name: str, sample_rate: float = 1.0) -> CallHistogram:
+    histogram = _histograms.get(name)
+    if histogram is None:
+        histogram = _histograms[name] = CallHistogram(name, sample_rate)
+    return histogram
+
+
+def get_call_stats(top: Optional[int] = None, sort_by: str = 'total_s') -> List[Dict[str, Any]]:
+    """Resumen de los histogramas, ordenado de mayor a menor por ``sort_by``."""
+    stats = [histogram.summary() for histogram in list(_histograms.values()) if histogram.count]
+    stats.sort(key=lambda item: item.get(sort_by, 0), reverse=True)
+    return stats[:top] if top else stats
+
+
+def reset_call_stats():
+    for histogram in list(_histograms.values()):
+        histogram.count = histogram.errors = histogram.total_ns = histogram.max_ns = 0
+        histogram.buckets = [0] * (HISTOGRAM_BUCKETS + 1)
+
+
+def qualified_name(func: Callable) -> str:
+    return f"{getattr(func, '__module__', None) or '?'}.{getattr(func, '__qualname__', None) or getattr(func, '__name__', repr(func))}"
+
+
+def instrument(func: Callable, on_error: Callable[[Any, BaseException, Optional[int]], None],
+               sample_rate: Optional[float] = None,
+               on_start: Optional[Callable[[], Any]] = None,
+               on_end: Optional[Callable[[Any, int], None]] = None,
+               measure: bool = True) -> Callable:
+    """
+    Envuelve ``func`` según ``trace_mode``. Devuelve ``func`` sin tocar si el tracing está
+    apagado. ``on_error(ctx, exc, elapsed_ns)`` se llama en cada excepción (``elapsed_ns`` es
+    None si la llamada no estaba muestreada); ``on_start``/``on_end`` solo en modo ``log`` y
+    en llamadas muestreadas. Con ``measure=False`` solo se vigilan los errores.
+    """
+    if trace_mode == 'off':
+        return func
+    name = qualified_name(func)
+    rate = sample_rate_for(name, sample_rate)
+    if not measure:
+        @wraps(func)
+        def guarded(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                on_error(None, e, None)
+                raise
+        return guarded
+
+    histogram = get_histogram(name, rate)
+    # Una de cada ``period`` llamadas se mide; rate 0 → ninguna
+    period = max(1, round(1 / rate)) if rate > 0 else 0
+    ticks = itertools.count()
+    perf_counter_ns = time.perf_counter_ns
+    if trace_mode != 'log':
+        on_start = on_end = None
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if period != 1 and (not period or next(ticks) % period):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                on_error(None, e, None)
+                raise
+        ctx = on_start() if on_start is not None else None
+        start = perf_counter_ns()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            elapsed = perf_counter_ns() - start
+            histogram.record(elapsed, True)
+            on_error(ctx, e, elapsed)
+            raise
+        elapsed = perf_counter_ns() - start
+        histogram.record(elapsed)
+        if on_end is not None:
+            on_end(ctx, elapsed)
+        return result
+
+    wrapper.__call_histogram__ = histogram
+    return wrapper
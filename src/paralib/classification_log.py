@@ -2,12 +2,428 @@
 paralib/classification_log.py
 
 Registro exhaustivo y consulta de clasificaciones, factores, vecinos y feedback para aprendizaje activo y trazabilidad perfecta.
+
+El historial vive en un log append-only de eventos en SQLite (``classification_history.db``)
+con columnas tipadas e índices, en lugar de blobs JSON en la metadata de ChromaDB.
+Así el análisis de feedback, los reportes de precisión y la exportación para
+fine-tuning se resuelven con consultas agregadas, sin re-codificar embeddings.
 """
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Any, Iterator
 from pathlib import Path
 from paralib.db import ChromaPARADatabase
 import json
+import sqlite3
+import threading
+from paralib.sqlite_pool import get_pool
+
+HISTORY_DB_NAME = "classification_history.db"
+
+EVENT_CLASSIFICATION = "classification"
+EVENT_FEEDBACK = "feedback"
+
+# Columnas tipadas del log de eventos (orden = orden de inserción)
+_EVENT_COLUMNS = [
+    ("event_type", "TEXT NOT NULL"),
+    ("note_id", "TEXT NOT NULL"),
+    ("path", "TEXT NOT NULL"),
+    ("filename", "TEXT"),
+    ("timestamp", "TEXT NOT NULL"),
+    ("predicted_category", "TEXT"),
+    ("predicted_folder", "TEXT"),
+    ("confidence", "REAL"),
+    ("method", "TEXT"),
+    ("semantic_category", "TEXT"),
+    ("semantic_confidence", "REAL"),
+    ("llm_category", "TEXT"),
+    ("llm_confidence", "REAL"),
+    ("fallback_used", "INTEGER"),
+    ("requires_review", "INTEGER"),
+    ("neighbor_agreement", "REAL"),
+    ("explanation", "TEXT"),
+    ("prompt", "TEXT"),
+    ("model", "TEXT"),
+    ("alias_used", "TEXT"),
+    ("previous_category", "TEXT"),
+    ("previous_folder", "TEXT"),
+    ("created", "TEXT"),
+    ("modified", "TEXT"),
+    ("feedback_category", "TEXT"),
+    ("feedback_folder", "TEXT"),
+    ("correction_reason", "TEXT"),
+    ("content_preview", "TEXT"),
+    ("neighbors", "TEXT"),
+    ("keywords", "TEXT"),
+    ("rules", "TEXT"),
+    ("tags", "TEXT"),
+    ("extra", "TEXT"),
+]
+_EVENT_COLUMN_NAMES = [name for name, _ in _EVENT_COLUMNS]
+_JSON_COLUMNS = ("neighbors", "keywords", "rules", "tags", "extra")
+_BOOL_COLUMNS = ("fallback_used", "requires_review")
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS classification_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    {", ".join(f"{name} {ctype}" for name, ctype in _EVENT_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS idx_events_type_note ON classification_events(event_type, note_id, id);
+CREATE INDEX IF NOT EXISTS idx_events_type_ts ON classification_events(event_type, timestamp);
+CREATE INDEX IF NOT EXISTS idx_events_category ON classification_events(predicted_category, event_type);
+CREATE INDEX IF NOT EXISTS idx_events_path ON classification_events(path);
+
+-- Estado actual por nota: última clasificación y último feedback
+CREATE VIEW IF NOT EXISTS latest_classifications AS
+    SELECT e.* FROM classification_events e
+    JOIN (SELECT MAX(id) AS id FROM classification_events
+          WHERE event_type = 'classification' GROUP BY note_id) l ON e.id = l.id;
+CREATE VIEW IF NOT EXISTS latest_feedback AS
+    SELECT e.* FROM classification_events e
+    JOIN (SELECT MAX(id) AS id FROM classification_events
+          WHERE event_type = 'feedback' GROUP BY note_id) l ON e.id = l.id;
+"""
+
+# Columnas que se exponen desde la última clasificación al unir con el feedback
+_FEEDBACK_VIEW_SELECT = """
+    SELECT c.*, f.path AS f_path, f.filename AS f_filename,
+           f.feedback_category AS f_feedback_category,
+           f.feedback_folder AS f_feedback_folder,
+           f.correction_reason AS f_correction_reason,
+           f.timestamp AS f_timestamp
+    FROM latest_feedback f
+    LEFT JOIN latest_classifications c ON c.note_id = f.note_id
+"""
+
+
+class ClassificationHistoryStore:
+    """
+    Log append-only y columnar de eventos de clasificación/feedback sobre SQLite.
+
+    Cada clasificación o corrección es una fila nueva; el "estado actual" de una
+    nota se obtiene con las vistas ``latest_classifications`` y ``latest_feedback``.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.is_new = not self.db_path.exists()
+        self._pool = get_pool(self.db_path)
+        with self._pool.connection() as conn:
+            conn.executescript(_SCHEMA)
+        self._insert_sql = (
+            f"INSERT INTO classification_events ({', '.join(_EVENT_COLUMN_NAMES)}) "
+            f"VALUES ({', '.join('?' for _ in _EVENT_COLUMN_NAMES)})"
+        )
+
+    # --- Escritura ---
+
+    def append(self, event: Dict[str, Any]) -> None:
+        """Agrega un evento al log."""
+        self.append_many([event])
+
+    def append_many(self, events: List[Dict[str, Any]]) -> None:
+        """Agrega varios eventos en una sola transacción."""
+        rows = [self._to_row(event) for event in events]
+        if not rows:
+            return
+        self._pool.executemany(self._insert_sql, rows)
+
+    @staticmethod
+    def _to_row(event: Dict[str, Any]) -> tuple:
+        values = []
+        for name in _EVENT_COLUMN_NAMES:
+            value = event.get(name)
+            if name in _JSON_COLUMNS and value is not None and not isinstance(value, str):
+                value = json.dumps(value, ensure_ascii=False, default=str)
+            elif name in _BOOL_COLUMNS and value is not None:
+                value = 1 if value else 0
+            values.append(value)
+        return tuple(values)
+
+    # --- Lectura ---
+
+    def _query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        conn = self._pool.connect()
+        try:
+            cursor = conn.execute(sql, params)
+            cursor.row_factory = sqlite3.Row
+            return cursor.fetchall()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        record = {key: row[key] for key in row.keys()}
+        for name in _JSON_COLUMNS:
+            raw = record.get(name)
+            if isinstance(raw, str):
+                try:
+                    record[name] = json.loads(raw)
+                except ValueError:
+                    pass
+        for name in _BOOL_COLUMNS:
+            if record.get(name) is not None:
+                record[name] = bool(record[name])
+        return record
+
+    def count_events(self) -> int:
+        return self._query("SELECT COUNT(*) FROM classification_events")[0][0]
+
+    def feedback_notes(self) -> List[Dict]:
+        """Última clasificación de cada nota corregida, combinada con su último feedback."""
+        notes = []
+        for row in self._query(_FEEDBACK_VIEW_SELECT):
+            record = self._row_to_dict(row)
+            f_path, f_filename = record.pop("f_path"), record.pop("f_filename")
+            record["path"] = record.get("path") or f_path
+            record["filename"] = record.get("filename") or f_filename
+            record["feedback"] = True
+            record["feedback_category"] = record.pop("f_feedback_category")
+            record["feedback_folder"] = record.pop("f_feedback_folder")
+            record["correction_reason"] = record.pop("f_correction_reason")
+            record["feedback_timestamp"] = record.pop("f_timestamp")
+            notes.append(record)
+        return notes
+
+    def latest_classifications(self) -> List[Dict]:
+        """Última clasificación registrada para cada nota."""
+        rows = self._query("""
+            SELECT c.*, f.note_id IS NOT NULL AS feedback
+            FROM latest_classifications c
+            LEFT JOIN latest_feedback f ON f.note_id = c.note_id
+        """)
+        classifications = []
+        for row in rows:
+            record = self._row_to_dict(row)
+            record["feedback"] = bool(record["feedback"])
+            record["content"] = record.get("content_preview") or ""
+            classifications.append(record)
+        return classifications
+
+    def history(self, note_id: str) -> List[Dict]:
+        """Todos los eventos de una nota en orden cronológico."""
+        rows = self._query(
+            "SELECT * FROM classification_events WHERE event_type IN (?, ?) AND note_id = ? ORDER BY id",
+            (EVENT_CLASSIFICATION, EVENT_FEEDBACK, note_id)
+        )
+        return [self._row_to_dict(row) for row in rows]
+
+    def iter_examples(self, batch_size: int = 500) -> Iterator[Dict]:
+        """Recorre (sin materializar) la última clasificación de cada nota con su feedback."""
+        sql = """
+            SELECT c.*, f.feedback_category AS f_feedback_category,
+                   f.feedback_folder AS f_feedback_folder,
+                   f.correction_reason AS f_correction_reason,
+                   f.timestamp AS f_timestamp
+            FROM latest_classifications c
+            LEFT JOIN latest_feedback f ON f.note_id = c.note_id
+        """
+        conn = self._pool.connect()
+        try:
+            cursor = conn.execute(sql)
+            cursor.row_factory = sqlite3.Row
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield self._row_to_dict(row)
+        finally:
+            conn.close()
+
+    def last_event_id(self) -> int:
+        return self._query("SELECT COALESCE(MAX(id), 0) FROM classification_events")[0][0]
+
+    def events_since(self, last_id: int, limit: int = 5000) -> List[Dict]:
+        """
+        Eventos con ``id > last_id`` en orden de inserción (para agregados incrementales).
+        Cada feedback trae la categoría y confianza de la clasificación previa de su nota.
+        """
+        rows = self._query("""
+            SELECT e.id, e.event_type, e.note_id, e.predicted_category, e.confidence,
+                   e.neighbor_agreement, e.feedback_category,
+                   c.predicted_category AS prior_category, c.confidence AS prior_confidence
+            FROM (
+                SELECT ev.*, CASE WHEN ev.event_type = ? THEN (
+                    SELECT MAX(p.id) FROM classification_events p
+                    WHERE p.event_type = ? AND p.note_id = ev.note_id AND p.id < ev.id
+                ) END AS prior_id
+                FROM classification_events ev
+                WHERE ev.id > ? ORDER BY ev.id LIMIT ?
+            ) e
+            LEFT JOIN classification_events c ON c.id = e.prior_id
+            ORDER BY e.id
+        """, (EVENT_FEEDBACK, EVENT_CLASSIFICATION, last_id, limit))
+        return [{key: row[key] for key in row.keys()} for row in rows]
+
+    # --- Agregados ---
+
+    def summary(self) -> Dict[str, Any]:
+        """Totales de notas clasificadas, corregidas y aciertos sobre el feedback."""
+        row = self._query("""
+            SELECT
+                (SELECT COUNT(*) FROM latest_classifications) AS total_notes,
+                COUNT(f.note_id) AS feedback_count,
+                COALESCE(SUM(CASE WHEN c.predicted_category = f.feedback_category THEN 1 ELSE 0 END), 0) AS correct
+            FROM latest_feedback f
+            LEFT JOIN latest_classifications c ON c.note_id = f.note_id
+        """)[0]
+        return {
+            "total_notes": row["total_notes"],
+            "feedback_count": row["feedback_count"],
+            "correct": row["correct"],
+        }
+
+    def category_summary(self) -> Dict[str, Dict[str, int]]:
+        """Por categoría predicha: total de notas y cuántas recibieron feedback."""
+        rows = self._query("""
+            SELECT COALESCE(c.predicted_category, 'Unknown') AS category,
+                   COUNT(*) AS total, COUNT(f.note_id) AS feedback
+            FROM latest_classifications c
+            LEFT JOIN latest_feedback f ON f.note_id = c.note_id
+            GROUP BY category
+        """)
+        return {row["category"]: {"total": row["total"], "feedback": row["feedback"]} for row in rows}
+
+    def model_summary(self) -> Dict[str, Dict[str, int]]:
+        """Por modelo: total de notas y cuántas recibieron feedback."""
+        rows = self._query("""
+            SELECT COALESCE(c.model, 'Unknown') AS model_name,
+                   COUNT(*) AS total, COUNT(f.note_id) AS feedback
+            FROM latest_classifications c
+            LEFT JOIN latest_feedback f ON f.note_id = c.note_id
+            GROUP BY model_name
+        """)
+        return {row["model_name"]: {"total": row["total"], "feedback": row["feedback"]} for row in rows}
+
+    def confidences(self, feedback_only: bool = False) -> List[float]:
+        """Columna de confianzas del estado actual (solo las corregidas si feedback_only)."""
+        join = "JOIN" if feedback_only else "LEFT JOIN"
+        rows = self._query(f"""
+            SELECT c.confidence FROM latest_classifications c
+            {join} latest_feedback f ON f.note_id = c.note_id
+            WHERE c.confidence IS NOT NULL AND c.confidence != 0
+        """)
+        return [float(row[0]) for row in rows]
+
+    def threshold_summary(self, thresholds: List[float]) -> Dict[float, Dict[str, int]]:
+        """Para cada umbral: notas con confianza >= umbral y cuántas fueron corregidas."""
+        if not thresholds:
+            return {}
+        columns = ", ".join(
+            f"SUM(CASE WHEN c.confidence >= ? THEN 1 ELSE 0 END), "
+            f"SUM(CASE WHEN c.confidence >= ? AND f.note_id IS NOT NULL THEN 1 ELSE 0 END)"
+            for _ in thresholds
+        )
+        params = tuple(t for threshold in thresholds for t in (threshold, threshold))
+        row = self._query(f"""
+            SELECT {columns} FROM latest_classifications c
+            LEFT JOIN latest_feedback f ON f.note_id = c.note_id
+        """, params)[0]
+        return {
+            threshold: {"total": row[2 * i] or 0, "feedback": row[2 * i + 1] or 0}
+            for i, threshold in enumerate(thresholds)
+        }
+
+    def daily_counts(self, event_type: str = EVENT_CLASSIFICATION) -> Dict[str, int]:
+        """Eventos por día (YYYY-MM-DD)."""
+        rows = self._query("""
+            SELECT substr(timestamp, 1, 10) AS day, COUNT(*) FROM classification_events
+            WHERE event_type = ? GROUP BY day
+        """, (event_type,))
+        return {row[0]: row[1] for row in rows}
+
+    def close(self):
+        self._pool.close()
+
+
+_stores: Dict[str, ClassificationHistoryStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_history_db_path(db: ChromaPARADatabase) -> Path:
+    """Ruta del log de clasificaciones, dentro de ``.para_db`` junto a la carpeta de ChromaDB."""
+    db_path = Path(db.db_path)
+    if db_path.name != "chroma" and (db_path / ".para_db").is_dir():
+        # Algunos llamadores construyen la DB con la ruta del vault
+        return db_path / ".para_db" / HISTORY_DB_NAME
+    return db_path.parent / HISTORY_DB_NAME
+
+
+def get_history_store_at(path: Path) -> ClassificationHistoryStore:
+    """Devuelve (y cachea) el store de historial ubicado en ``path``."""
+    key = str(Path(path))
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = ClassificationHistoryStore(path)
+            _stores[key] = store
+    return store
+
+
+def get_history_store(db: ChromaPARADatabase) -> Optional[ClassificationHistoryStore]:
+    """
+    Devuelve (y cachea) el store de historial asociado a una base ChromaDB.
+    La primera vez importa la metadata de clasificación heredada de ChromaDB.
+    """
+    if db is None or not getattr(db, "db_path", None):
+        return None
+    path = get_history_db_path(db)
+    with _stores_lock:
+        if str(path) in _stores:
+            return _stores[str(path)]
+    store = get_history_store_at(path)
+    if store.is_new:
+        store.is_new = False
+        _import_legacy_chroma_metadata(db, store)
+    return store
+
+
+def _import_legacy_chroma_metadata(db: ChromaPARADatabase, store: ClassificationHistoryStore):
+    """Migra una única vez los registros de clasificación guardados como metadata en ChromaDB."""
+    collection = getattr(db, "collection", None)
+    if collection is None:
+        return
+    try:
+        results = collection.get(where={"predicted_category": {"$ne": ""}}, include=["metadatas", "documents"])
+    except Exception:
+        return
+    events = []
+    for meta, doc in zip(results.get("metadatas") or [], results.get("documents") or []):
+        if not meta or not meta.get("path"):
+            continue
+        note_id = db._generate_id(Path(meta["path"]))
+        event = {name: meta.get(name) for name in _EVENT_COLUMN_NAMES if name in meta}
+        event.update({
+            "event_type": EVENT_CLASSIFICATION,
+            "note_id": note_id,
+            "timestamp": meta.get("timestamp") or datetime.utcnow().isoformat(),
+            "content_preview": doc,
+        })
+        events.append(event)
+        if meta.get("feedback"):
+            events.append({
+                "event_type": EVENT_FEEDBACK,
+                "note_id": note_id,
+                "path": meta["path"],
+                "filename": meta.get("filename"),
+                "timestamp": meta.get("feedback_timestamp") or event["timestamp"],
+                "feedback_category": meta.get("feedback_category"),
+                "feedback_folder": meta.get("feedback_folder"),
+                "correction_reason": meta.get("correction_reason"),
+            })
+    store.append_many(events)
+
+
+def _neighbor_agreement(neighbors: List[Dict], predicted_category: str) -> Optional[float]:
+    """Fracción de vecinos semánticos con la misma categoría que la predicha."""
+    if not neighbors:
+        return None
+    categories = [n.get("category") for n in neighbors if isinstance(n, dict)]
+    if not categories:
+        return None
+    return sum(1 for cat in categories if cat == predicted_category) / len(categories)
+
 
 def log_classification(
     db: ChromaPARADatabase,
@@ -35,48 +451,50 @@ def log_classification(
     extra_metadata: Dict = None
 ):
     """
-    Registra todos los factores y la predicción de una clasificación en ChromaDB.
+    Registra todos los factores y la predicción de una clasificación en el historial.
     """
+    store = get_history_store(db)
+    if store is None:
+        return
     note_id = db._generate_id(note_path)
-    embedding = db.embedding_model.encode(content[:1000], convert_to_tensor=False).tolist()
-    metadata = {
+    timestamp = datetime.utcnow().isoformat()
+    events = [{
+        "event_type": EVENT_CLASSIFICATION,
+        "note_id": note_id,
         "path": str(note_path),
         "filename": note_path.name,
+        "timestamp": timestamp,
         "predicted_category": predicted_category,
         "predicted_folder": predicted_folder,
         "explanation": explanation,
         "confidence": confidence,
-        "neighbors": json.dumps(neighbors),
+        "neighbors": neighbors or [],
+        "neighbor_agreement": _neighbor_agreement(neighbors, predicted_category),
         "prompt": prompt,
         "model": model,
-        "keywords": json.dumps(keywords) if keywords is not None else "[]",
-        "rules": json.dumps(rules) if rules is not None else "[]",
-        "tags": json.dumps(tags) if tags is not None else "[]",
+        "keywords": keywords or [],
+        "rules": rules or [],
+        "tags": tags or [],
         "alias_used": alias_used,
         "previous_category": previous_category,
         "previous_folder": previous_folder,
         "created": created,
         "modified": modified,
-        "feedback": feedback,
-        "feedback_category": feedback_category,
-        "feedback_folder": feedback_folder,
-        "correction_reason": correction_reason,
-        "timestamp": datetime.utcnow().isoformat(),
-    }
-    if extra_metadata:
-        metadata.update(extra_metadata)
-    # --- Limpieza y serialización: ---
-    for k, v in list(metadata.items()):
-        if v is None:
-            del metadata[k]
-        elif isinstance(v, (list, dict)):
-            metadata[k] = json.dumps(v)
-    db.collection.upsert(
-        ids=[note_id],
-        embeddings=[embedding],
-        documents=[content[:500]],
-        metadatas=[metadata],
-    )
+        "content_preview": content[:500],
+        "extra": extra_metadata,
+    }]
+    if feedback:
+        events.append({
+            "event_type": EVENT_FEEDBACK,
+            "note_id": note_id,
+            "path": str(note_path),
+            "filename": note_path.name,
+            "timestamp": timestamp,
+            "feedback_category": feedback_category,
+            "feedback_folder": feedback_folder,
+            "correction_reason": correction_reason,
+        })
+    store.append_many(events)
 
 def log_feedback(
     db: ChromaPARADatabase,
@@ -86,48 +504,49 @@ def log_feedback(
     correction_reason: Optional[str] = None
 ):
     """
-    Marca una nota como corregida por feedback y actualiza la metadata.
+    Registra una corrección manual (feedback) como nuevo evento del historial.
     """
-    note_id = db._generate_id(note_path)
-    db.collection.update(
-        ids=[note_id],
-        metadatas=[{
-            "feedback": True,
-            "feedback_category": feedback_category,
-            "feedback_folder": feedback_folder,
-            "correction_reason": correction_reason,
-            "feedback_timestamp": datetime.utcnow().isoformat(),
-        }]
-    )
+    store = get_history_store(db)
+    if store is None:
+        return
+    store.append({
+        "event_type": EVENT_FEEDBACK,
+        "note_id": db._generate_id(note_path),
+        "path": str(note_path),
+        "filename": note_path.name,
+        "timestamp": datetime.utcnow().isoformat(),
+        "feedback_category": feedback_category,
+        "feedback_folder": feedback_folder,
+        "correction_reason": correction_reason,
+    })
 
 def get_feedback_notes(db: ChromaPARADatabase) -> List[Dict]:
     """
     Devuelve todas las notas con feedback/corrección manual registrada.
     """
-    results = db.collection.get(where={"feedback": True}, include=["metadatas"])
-    return results.get("metadatas", [])
+    store = get_history_store(db)
+    return store.feedback_notes() if store is not None else []
 
 def get_classification_history(db: ChromaPARADatabase, note_path: Path) -> List[Dict]:
     """
     Devuelve el historial de clasificaciones para una nota específica.
     """
-    note_id = db._generate_id(note_path)
-    results = db.collection.get(ids=[note_id], include=["metadatas"])
-    return results.get("metadatas", [])
+    store = get_history_store(db)
+    if store is None:
+        return []
+    return store.history(db._generate_id(note_path))
 
 def export_finetune_dataset(db: ChromaPARADatabase, output_path: str = "finetune_dataset.jsonl"):
     """
     Exporta todos los ejemplos de clasificación y feedback a un archivo JSONL para fine-tuning.
     """
-    # Obtener todos los metadatos de la colección
-    results = db.collection.get(include=["metadatas", "documents"])
-    metadatas = results.get("metadatas", [])
-    documents = results.get("documents", [])
+    store = get_history_store(db)
+    examples = store.iter_examples() if store is not None else iter(())
     with open(output_path, "w", encoding="utf-8") as f:
-        for meta, doc in zip(metadatas, documents):
+        for meta in examples:
             example = {
                 "input": {
-                    "note_content": doc,
+                    "note_content": meta.get("content_preview"),
                     "neighbors": meta.get("neighbors"),
                     "predicted_category": meta.get("predicted_category"),
                     "predicted_folder": meta.get("predicted_folder"),
@@ -147,11 +566,11 @@ def export_finetune_dataset(db: ChromaPARADatabase, output_path: str = "finetune
                     }
                 },
                 "user_feedback": {
-                    "feedback": meta.get("feedback"),
-                    "feedback_category": meta.get("feedback_category"),
-                    "feedback_folder": meta.get("feedback_folder"),
-                    "correction_reason": meta.get("correction_reason"),
+                    "feedback": meta.get("f_feedback_category") is not None,
+                    "feedback_category": meta.get("f_feedback_category"),
+                    "feedback_folder": meta.get("f_feedback_folder"),
+                    "correction_reason": meta.get("f_correction_reason"),
                     "timestamp": meta.get("timestamp"),
                 }
             }
-            f.write(json.dumps(example, ensure_ascii=False) + "\n") 
\ No newline at end of file
+            f.write(json.dumps(example, ensure_ascii=False) + "\n")
@@ -14,15 +14,17 @@ from rich.table import Table
 from rich.prompt import Prompt, Confirm
 from rich import box
 import os
-import shutil
 import hashlib
 from collections import defaultdict
 from datetime import datetime
 from typing import Dict, List, Tuple, Any
 import tempfile
+from contextlib import nullcontext
 
 from paralib.logger import logger, log_exceptions, log_function_calls
 from paralib.log_center import log_center
+from paralib.move_journal import journal_mkdir, journal_rename, move_transaction
+from paralib.lazy import LazyInstance
 
 console = Console()
 
@@ -154,7 +156,7 @@ class RobustCleanManager:
             # Crear directorio para duplicados
             duplicates_dir = vault_path / "_Duplicados_Cleaned"
             try:
-                duplicates_dir.mkdir(exist_ok=True)
+                journal_mkdir(duplicates_dir)
             except Exception as e:
                 log_center.log_error(f"Error creando directorio duplicados: {e}", "CleanManager-CleanDuplicates")
                 return 0
@@ -174,7 +176,7 @@ class RobustCleanManager:
                             target_path = duplicates_dir / new_name
                             
                             # Mover archivo
-                            shutil.move(str(dup_file), str(target_path))
+                            journal_rename(dup_file, target_path)
                             
                             cleaned_count += 1
                             self.cleaned_files.append(str(target_path))
@@ -220,7 +222,7 @@ class RobustCleanManager:
             
             # Crear directorio para archivos vacíos
             empty_dir = vault_path / "_Empty_Files_Cleaned"
-            empty_dir.mkdir(exist_ok=True)
+            journal_mkdir(empty_dir)
             
             cleaned_count = 0
             for empty_file in empty_files:
@@ -229,7 +231,7 @@ class RobustCleanManager:
                     new_name = f"{empty_file.stem}_{timestamp}{empty_file.suffix}"
                     target_path = empty_dir / new_name
                     
-                    shutil.move(str(empty_file), str(target_path))
+                    journal_rename(empty_file, target_path)
                     cleaned_count += 1
                     
                     log_center.log_info(f"Archivo vacío movido: {empty_file.name}", "CleanManager-Empty")
@@ -293,7 +295,7 @@ class RobustCleanManager:
             
             # Crear directorio para archivos corruptos
             corrupt_dir = vault_path / "_Corrupt_Files_Quarantine"
-            corrupt_dir.mkdir(exist_ok=True)
+            journal_mkdir(corrupt_dir)
             
             cleaned_count = 0
             for corrupt_file in corrupt_files:
@@ -302,7 +304,7 @@ class RobustCleanManager:
                     new_name = f"{corrupt_file.stem}_{timestamp}{corrupt_file.suffix}"
                     target_path = corrupt_dir / new_name
                     
-                    shutil.move(str(corrupt_file), str(target_path))
+                    journal_rename(corrupt_file, target_path)
                     cleaned_count += 1
                     
                     log_center.log_info(f"Archivo corrupto movido a cuarentena: {corrupt_file.name}", "CleanManager-Corrupt")
@@ -377,33 +379,23 @@ class RobustCleanManager:
             
             vault_path = Path(vault_path)
             
-            # Crear backup si se solicita
-            if create_backup:
-                try:
-                    from paralib.backup_manager import backup_manager
-                    backup_info = backup_manager.create_backup(
-                        str(vault_path),
-                        backup_type='full',
-                        description='Backup antes de limpieza completa'
-                    )
-                    if backup_info:
-                        log_center.log_info(f"Backup creado antes de limpieza: {backup_info.id}", "CleanManager-All")
-                    else:
-                        log_center.log_warning("No se pudo crear backup antes de limpieza", "CleanManager-All")
-                except Exception as e:
-                    log_center.log_error(f"Error creando backup: {e}", "CleanManager-All")
-            
-            # Ejecutar todas las limpiezas
+            # Ejecutar todas las limpiezas. Con create_backup, en modo seguro: la limpieza solo
+            # mueve archivos, así que basta el journal de movimientos (deshacer con 'undo')
             results = {}
-            
-            # 1. Limpiar duplicados
-            results['duplicates'] = self.clean_duplicates(vault_path)
-            
-            # 2. Limpiar archivos vacíos
-            results['empty_files'] = self.clean_empty_files(vault_path)
-            
-            # 3. Limpiar archivos corruptos
-            results['corrupt_files'] = self.clean_corrupt_files(vault_path)
+            journal_id = None
+            with (move_transaction(vault_path, "Limpieza completa") if create_backup else nullcontext()) as transaction:
+                if transaction is not None:
+                    journal_id = transaction.id
+                    log_center.log_info(f"Journal de movimientos para la limpieza: {journal_id}", "CleanManager-All")
+                
+                # 1. Limpiar duplicados
+                results['duplicates'] = self.clean_duplicates(vault_path)
+                
+                # 2. Limpiar archivos vacíos
+                results['empty_files'] = self.clean_empty_files(vault_path)
+                
+                # 3. Limpiar archivos corruptos
+                results['corrupt_files'] = self.clean_corrupt_files(vault_path)
             
             # Calcular totales
             total_cleaned = sum(result.get('cleaned', 0) for result in results.values())
@@ -413,7 +405,8 @@ class RobustCleanManager:
             summary = {
                 'total_cleaned': total_cleaned,
                 'total_errors': total_errors,
-                'backup_created': create_backup,
+                'backup_created': False,
+                'journal_id': journal_id,
                 'results': results,
                 'stats': self.stats.copy()
             }
@@ -447,7 +440,7 @@ class RobustCleanManager:
         log_center.log_info("Estadísticas del CleanManager reseteadas", "CleanManager-Reset")
 
 # Instancia global del CleanManager
-clean_manager = RobustCleanManager()
+clean_manager = LazyInstance(RobustCleanManager)
 
 # Funciones de compatibilidad para mantener la API existente
 @log_exceptions
@@ -149,7 +149,7 @@ class QACommands:
                 return
         
         # Inicializar AI Engine con backend específico si se especifica
-        from paralib.ai_engine import AIEngine
+        from paralib.ai_engine import get_ai_engine
         
         if backend:
             if backend not in ["ollama", "huggingface", "auto"]:
@@ -163,7 +163,7 @@ class QACommands:
             else:
                 model_name = self.config.get('ollama_model', 'llama3.2:3b')
             
-            ai_engine = AIEngine(model_name=model_name, backend=backend)
+            ai_engine = get_ai_engine(model_name, backend)
             print(f"🔧 Usando backend forzado: {backend} ({model_name})")
         else:
             # Usar configuración automática
@@ -175,7 +175,7 @@ class QACommands:
             else:
                 model_name = self.config.get('ollama_model', 'llama3.2:3b')
             
-            ai_engine = AIEngine(model_name=model_name, backend=backend)
+            ai_engine = get_ai_engine(model_name, backend)
             print(f"🔧 Backend automático: {backend} ({model_name})")
         
         # Ejecutar QA
@@ -40,7 +40,7 @@ class PARAConfig:
         """Asegura que la configuración tenga la estructura por defecto."""
         defaults = {
             "ollama_model": "llama3.2:3b",
-            "ai_backend": "auto",  # "ollama", "huggingface", "auto"
+            "ai_backend": "auto",  # "ollama", "huggingface", "stub", "auto"
             "huggingface_model": "microsoft/DialoGPT-medium",
             "excluded_folders": [],
             "excluded_folders_global": [],
@@ -4,11 +4,45 @@ consolidation_manager.py
 
 Módulo para manejar la consolidación de carpetas en el sistema PARA.
 """
+from contextlib import nullcontext
 from pathlib import Path
 from typing import Dict, List, Any
 
 from paralib.logger import logger
 from paralib.log_center import log_center
+from paralib.move_journal import move_transaction
+from paralib.move_planner import MovePlanner
+
+
+def _apply_group_plan(planner: MovePlanner, folders: List[Path], target_folder: Path,
+                      stats: Dict[str, int], component: str) -> None:
+    """
+    Planifica en memoria la fusión de los ``.md`` de ``folders`` en ``target_folder``
+    (colisiones resueltas con sufijo ``_N``) y la ejecuta como un solo lote del journal.
+    """
+    planner.mkdir(target_folder)
+    files_moved = 0
+    removed = []
+    for folder in folders:
+        if folder == target_folder:
+            continue
+        moved, folder_removed = planner.gather(folder, target_folder, '*.md', start=2)
+        files_moved += moved
+        if folder_removed:
+            removed.append(folder)
+
+    try:
+        planner.execute()
+    except Exception as e:
+        # execute() ya descartó el árbol del planner: los grupos siguientes se planifican sobre el disco
+        print(f"      ⚠️ Error moviendo carpetas a {target_folder.name}: {e}")
+        log_center.log_error(f"Error moviendo carpetas a {target_folder.name}: {str(e)}", component)
+        return
+
+    stats['files_moved'] += files_moved
+    stats['folders_merged'] += len(removed)
+    for folder in removed:
+        print(f"      ✅ Carpeta eliminada: {folder.name}")
 
 
 def consolidate_excessive_folders(vault_path: Path, execute: bool = False) -> Dict[str, int]:
@@ -58,69 +92,45 @@ def consolidate_excessive_folders(vault_path: Path, execute: bool = False) -> Di
         }
     }
     
-    for category, groups in consolidation_groups.items():
-        category_path = vault_path / category
-        if not category_path.exists():
-            continue
-        
-        print(f"\n📁 Procesando {category}...")
-        
-        # Obtener todas las carpetas en la categoría
-        folders = [f for f in category_path.iterdir() if f.is_dir()]
-        
-        for group_name, keywords in groups.items():
-            matching_folders = []
+    # Con execute, todos los movimientos forman una transacción del journal (deshacer con 'undo')
+    with (move_transaction(vault_path, "Consolidación de carpetas excesivas") if execute else nullcontext()):
+        for category, groups in consolidation_groups.items():
+            category_path = vault_path / category
+            if not category_path.exists():
+                continue
             
-            # Encontrar carpetas que coincidan con las palabras clave
-            for folder in folders:
-                folder_name_lower = folder.name.lower()
-                for keyword in keywords:
-                    if keyword.lower() in folder_name_lower:
-                        matching_folders.append(folder)
-                        break
+            print(f"\n📁 Procesando {category}...")
             
-            if len(matching_folders) > 1:  # Solo consolidar si hay más de una carpeta
-                print(f"  🔄 Consolidando {len(matching_folders)} carpetas en '{group_name}':")
-                
-                # Crear carpeta de destino
-                target_folder = category_path / group_name
+            # Obtener todas las carpetas en la categoría
+            folders = [f for f in category_path.iterdir() if f.is_dir()]
+            # Un plan por categoría: una carpeta ya fusionada en un grupo no se vuelve a procesar
+            planner = MovePlanner()
+            
+            for group_name, keywords in groups.items():
+                matching_folders = []
                 
-                if execute:
-                    target_folder.mkdir(exist_ok=True)
+                # Encontrar carpetas que coincidan con las palabras clave
+                for folder in folders:
+                    folder_name_lower = folder.name.lower()
+                    for keyword in keywords:
+                        if keyword.lower() in folder_name_lower:
+                            matching_folders.append(folder)
+                            break
                 
-                # Mover archivos de cada carpeta
-                for folder in matching_folders:
-                    print(f"    📂 {folder.name} → {group_name}")
+                if len(matching_folders) > 1:  # Solo consolidar si hay más de una carpeta
+                    print(f"  🔄 Consolidando {len(matching_folders)} carpetas en '{group_name}':")
+                    
+                    # Crear carpeta de destino
+                    target_folder = category_path / group_name
+                    
+                    for folder in matching_folders:
+                        print(f"    📂 {folder.name} → {group_name}")
                     
                     if execute:
-                        try:
-                            # Mover todos los archivos .md
-                            for md_file in folder.glob("*.md"):
-                                target_file = target_folder / md_file.name
-                                
-                                # Evitar sobrescribir
-                                if target_file.exists():
-                                    counter = 2
-                                    while target_file.exists():
-                                        name_parts = md_file.stem, f"_{counter}", md_file.suffix
-                                        target_file = target_folder / "".join(name_parts)
-                                        counter += 1
-                                
-                                md_file.rename(target_file)
-                                stats['files_moved'] += 1
-                            
-                            # Eliminar carpeta origen si está vacía
-                            if not any(folder.iterdir()):
-                                folder.rmdir()
-                                stats['folders_merged'] += 1
-                                print(f"      ✅ Carpeta eliminada")
-                            
-                        except Exception as e:
-                            print(f"      ⚠️ Error moviendo {folder.name}: {e}")
-                            log_center.log_error(f"Error moviendo {folder.name}: {str(e)}", "Consolidation")
-                
-                stats['total_consolidations'] += 1
-    
+                        _apply_group_plan(planner, matching_folders, target_folder, stats, "Consolidation")
+                    
+                    stats['total_consolidations'] += 1
+        
     return stats
 
 
@@ -171,83 +181,58 @@ def consolidate_aggressive(vault_path: Path, execute: bool = False) -> Dict[str,
         }
     }
     
-    for category, groups in aggressive_groups.items():
-        category_path = vault_path / category
-        if not category_path.exists():
-            continue
-        
-        print(f"\n📁 Procesando {category} (consolidación agresiva)...")
-        
-        # Obtener todas las carpetas en la categoría
-        folders = [f for f in category_path.iterdir() if f.is_dir() ]
-        
-        # Agrupar carpetas por similitud de nombre
-        folder_groups = {}
-        for folder in folders:
-            folder_name_lower = folder.name.lower()
+    # Con execute, todos los movimientos forman una transacción del journal (deshacer con 'undo')
+    with (move_transaction(vault_path, "Consolidación agresiva de carpetas") if execute else nullcontext()):
+        for category, groups in aggressive_groups.items():
+            category_path = vault_path / category
+            if not category_path.exists():
+                continue
             
-            # Encontrar el grupo más apropiado
-            assigned_group = None
-            for group_name, keywords in groups.items():
-                for keyword in keywords:
-                    if keyword.lower() in folder_name_lower:
-                        assigned_group = group_name
-                        break
-                if assigned_group:
-                    break
+            print(f"\n📁 Procesando {category} (consolidación agresiva)...")
             
-            # Si no se encontró grupo específico, asignar a General
-            if not assigned_group:
-                assigned_group = 'General'
+            # Obtener todas las carpetas en la categoría
+            folders = [f for f in category_path.iterdir() if f.is_dir() ]
+            planner = MovePlanner()
             
-            if assigned_group not in folder_groups:
-                folder_groups[assigned_group] = []
-            folder_groups[assigned_group].append(folder)
-        
-        # Consolidar grupos con múltiples carpetas
-        for group_name, folder_list in folder_groups.items():
-            if len(folder_list) > 1:
-                print(f"  🔥 Consolidando {len(folder_list)} carpetas en '{group_name}':")
+            # Agrupar carpetas por similitud de nombre
+            folder_groups = {}
+            for folder in folders:
+                folder_name_lower = folder.name.lower()
                 
-                # Crear carpeta de destino
-                target_folder = category_path / group_name
+                # Encontrar el grupo más apropiado
+                assigned_group = None
+                for group_name, keywords in groups.items():
+                    for keyword in keywords:
+                        if keyword.lower() in folder_name_lower:
+                            assigned_group = group_name
+                            break
+                    if assigned_group:
+                        break
                 
-                if execute:
-                    target_folder.mkdir(exist_ok=True)
+                # Si no se encontró grupo específico, asignar a General
+                if not assigned_group:
+                    assigned_group = 'General'
                 
-                # Mover archivos de cada carpeta
-                for folder in folder_list:
-                    print(f"    📂 {folder.name} → {group_name}")
+                if assigned_group not in folder_groups:
+                    folder_groups[assigned_group] = []
+                folder_groups[assigned_group].append(folder)
+            
+            # Consolidar grupos con múltiples carpetas
+            for group_name, folder_list in folder_groups.items():
+                if len(folder_list) > 1:
+                    print(f"  🔥 Consolidando {len(folder_list)} carpetas en '{group_name}':")
+                    
+                    # Crear carpeta de destino
+                    target_folder = category_path / group_name
+                    
+                    for folder in folder_list:
+                        print(f"    📂 {folder.name} → {group_name}")
                     
                     if execute:
-                        try:
-                            # Mover todos los archivos .md
-                            for md_file in folder.glob("*.md"):
-                                target_file = target_folder / md_file.name
-                                
-                                # Evitar sobrescribir
-                                if target_file.exists():
-                                    counter = 2
-                                    while target_file.exists():
-                                        name_parts = md_file.stem, f"_{counter}", md_file.suffix
-                                        target_file = target_folder / "".join(name_parts)
-                                        counter += 1
-                                
-                                md_file.rename(target_file)
-                                stats['files_moved'] += 1
-                            
-                            # Eliminar carpeta origen si está vacía
-                            if not any(folder.iterdir()):
-                                folder.rmdir()
-                                stats['folders_merged'] += 1
-                                print(f"      ✅ Carpeta eliminada")
-                            
-                        except Exception as e:
-                            print(f"      ⚠️ Error moviendo {folder.name}: {e}")
-                            log_center.log_error(f"Error moviendo {folder.name}: {str(e)}", "Consolidation-Aggressive")
-                
-                stats['total_consolidations'] += 1
-    
+                        _apply_group_plan(planner, folder_list, target_folder, stats, "Consolidation-Aggressive")
+                    
+                    stats['total_consolidations'] += 1
+        
     return stats
 
 
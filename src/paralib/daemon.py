@@ -0,0 +1,414 @@
+"""
+paralib/daemon.py
+
+Daemon de PARA: un proceso de larga vida que mantiene caliente el estado caro (ChromaDB con
+el modelo de embeddings, el sistema de aprendizaje, el grafo/escaneo del vault y el motor de
+IA) y atiende comandos del CLI por un socket Unix local.
+
+- ``para daemon start`` lo arranca en primer plano (``para daemon stop|status`` para el resto).
+- ``para_cli.py`` llama a ``forward()`` antes de importar nada pesado: si el daemon está
+  escuchando y el comando es reenviable (``DAEMON_COMMANDS``), el comando se ejecuta allí y la
+  salida vuelve en streaming; si no, el CLI sigue en proceso como siempre.
+- ``PARA_NO_DAEMON=1`` desactiva el reenvío y ``PARA_DAEMON_SOCKET`` cambia la ruta del socket.
+
+Protocolo: una línea JSON por mensaje. Petición ``{"op": "run", "argv": [...], "cwd": ...}``,
+respuestas ``{"stream": "stdout"|"stderr", "data": ...}`` y al final ``{"exit": código}``;
+``{"op": "ping"}`` y ``{"op": "shutdown"}`` para estado y parada. ``{"op": "encode", "texts": [...]}``
+y ``{"op": "query", "text": ..., "n_results": 5, "where": {...}}`` pasan por el servicio de
+embeddings con micro-batching (``paralib/embedding_service.py``) sin esperar a los comandos.
+
+El lado cliente solo usa la biblioteca estándar: reenviar ``para status`` no importa ``paralib``
+más allá de este módulo. Los comandos se ejecutan de uno en uno en el daemon (el estado
+compartido y el ``cwd`` del proceso no son seguros entre hilos); la salida de cada petición se
+separa por hilo, así que los hilos de fondo del daemon siguen escribiendo en su propia consola.
+"""
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_SOCKET_PATH = Path.home() / ".cache" / "para_daemon" / "para.sock"
+
+# Comandos no interactivos que se benefician del estado caliente; 'classify' solo con una nota
+DAEMON_COMMANDS = {'status', 'health', 'metrics', 'learning-status', 'version', 'help', 'qa', 'classify'}
+
+_local = threading.local()
+
+# Sin AF_UNIX (Windows antiguo) el CLI nunca reenvía y el daemon no arranca
+_UnixServer = getattr(socketserver, 'ThreadingUnixStreamServer', socketserver.ThreadingTCPServer)
+
+
+def get_socket_path() -> Path:
+    return Path(os.environ.get('PARA_DAEMON_SOCKET') or DEFAULT_SOCKET_PATH)
+
+
+def is_forwardable(argv: List[str]) -> bool:
+    """True si el comando puede ejecutarse en el daemon sin interacción con el usuario."""
+    if not argv or argv[0].lower() not in DAEMON_COMMANDS:
+        return False
+    if any(arg == '--profile' or arg.startswith('--profile=') for arg in argv) or os.environ.get('PARA_PROFILE'):
+        return False  # el perfil tiene que medir el proceso que ejecuta el comando
+    if argv[0].lower() == 'classify':
+        return len(argv) > 1 and argv[1].endswith('.md')
+    return True
+
+
+# --- Cliente ---
+
+def _connect(socket_path: Path, timeout: Optional[float] = None) -> Optional[socket.socket]:
+    if not hasattr(socket, 'AF_UNIX') or not socket_path.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(socket_path))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def request(message: Dict[str, Any], socket_path: Optional[Path] = None, timeout: float = 5.0) -> Optional[Dict[str, Any]]:
+    """Petición de una sola respuesta (``ping``, ``shutdown``); None si no hay daemon."""
+    sock = _connect(Path(socket_path or get_socket_path()), timeout)
+    if sock is None:
+        return None
+    with sock, sock.makefile('rwb') as stream:
+        stream.write(json.dumps(message).encode('utf-8') + b'\n')
+        stream.flush()
+        line = stream.readline()
+    return json.loads(line) if line else None
+
+
+def forward(argv: List[str], socket_path: Optional[Path] = None) -> Optional[int]:
+    """
+    Ejecuta ``argv`` en el daemon y reproduce su salida. Devuelve el código de salida, o None
+    si no hay que reenviarlo (sin daemon, comando no reenviable o ``PARA_NO_DAEMON``), en cuyo
+    caso el CLI lo ejecuta en proceso.
+    """
+    if os.environ.get('PARA_NO_DAEMON') or not is_forwardable(argv):
+        return None
+    sock = _connect(Path(socket_path or get_socket_path()))
+    if sock is None:
+        return None
+
+    message = {'op': 'run', 'argv': list(argv), 'cwd': os.getcwd(), 'isatty': sys.stdout.isatty()}
+    with sock, sock.makefile('rwb') as stream:
+        try:
+            stream.write(json.dumps(message).encode('utf-8') + b'\n')
+            stream.flush()
+            for line in stream:
+                reply = json.loads(line)
+                if 'exit' in reply:
+                    return int(reply['exit'])
+                target = sys.stderr if reply.get('stream') == 'stderr' else sys.stdout
+                target.write(reply.get('data', ''))
+                target.flush()
+        except OSError:
+            pass
+    # El comando pudo tener efectos: no se repite en proceso
+    print("\n⚠️ Se perdió la conexión con el daemon de PARA", file=sys.stderr)
+    return 1
+
+
+# --- Servidor ---
+
+class _ThreadStream:
+    """Sustituto de ``sys.stdout``/``stderr``/``stdin`` que redirige por hilo."""
+
+    def __init__(self, name: str, fallback):
+        self._name = name
+        self._fallback = fallback
+
+    def _target(self):
+        targets = getattr(_local, 'targets', None)
+        return targets[self._name] if targets else self._fallback
+
+    def __getattr__(self, attr):
+        return getattr(self._target(), attr)
+
+    def write(self, data):
+        return self._target().write(data)
+
+    def flush(self):
+        return self._target().flush()
+
+    def isatty(self):
+        return self._target().isatty()
+
+
+class _SocketSink(io.TextIOBase):
+    """Salida de un comando reenviado: se envía al cliente por líneas completas."""
+
+    def __init__(self, send: Callable[[Dict[str, Any]], None], stream: str, isatty: bool):
+        self._send = send
+        self._stream = stream
+        self._isatty = isatty
+        self._buffer: List[str] = []
+
+    def writable(self):
+        return True
+
+    def isatty(self):
+        return self._isatty
+
+    def write(self, data: str) -> int:
+        self._buffer.append(data)
+        if '\n' in data:
+            self.flush()
+        return len(data)
+
+    def flush(self):
+        if self._buffer:
+            data, self._buffer = ''.join(self._buffer), []
+            if self._send is None:
+                return
+            try:
+                self._send({'stream': self._stream, 'data': data})
+            except OSError:
+                self._send = None  # el cliente se fue (Ctrl+C): el comando termina sin salida
+
+
+class _DaemonHandler(socketserver.StreamRequestHandler):
+
+    def _send(self, message: Dict[str, Any]):
+        self.wfile.write(json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n')
+        self.wfile.flush()
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            message = json.loads(line)
+        except ValueError:
+            self._send({'error': 'Petición inválida'})
+            return
+
+        op = message.get('op')
+        if op == 'ping':
+            self._send(self.server.status())
+        elif op == 'shutdown':
+            self._send({'ok': True})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        elif op in ('encode', 'query'):
+            self._send(self.server.embedding_request(message))
+        elif op == 'run':
+            argv = message.get('argv') or []
+            try:
+                # La lista de comandos permitidos se aplica también aquí: el socket es la frontera,
+                # no el cliente de forward()
+                if not isinstance(argv, list) or not all(isinstance(arg, str) for arg in argv) \
+                        or not is_forwardable(argv):
+                    self._send({'stream': 'stderr', 'data': f"❌ Comando no admitido por el daemon: {argv!r}\n",
+                                'error': 'Comando no admitido'})
+                    self._send({'exit': 2})
+                    return
+                code = self.server.run_command(argv, message.get('cwd'), self._send, bool(message.get('isatty')))
+                self._send({'exit': code})
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # el cliente se fue (Ctrl+C)
+        else:
+            self._send({'error': f'Operación desconocida: {op}'})
+
+
+class PARADaemon(_UnixServer):
+    """
+    Servidor del daemon. ``runner(argv)`` ejecuta un comando del CLI (``PARACLI.run`` de una
+    instancia que vive todo el proceso); las cachés de módulo que llena ``warm_up`` (ChromaDB
+    compartido, aprendizaje, grafo del vault, motores de IA) quedan disponibles para todos.
+    """
+    daemon_threads = True
+
+    def __init__(self, runner: Callable[[List[str]], Any], socket_path: Optional[Path] = None,
+                 vault_path: Optional[Path] = None):
+        if not hasattr(socket, 'AF_UNIX'):
+            raise OSError("Los sockets Unix no están disponibles en esta plataforma")
+        self.socket_path = Path(socket_path or get_socket_path())
+        self.runner = runner
+        self.vault_path = Path(vault_path) if vault_path else None
+        self.started_at = time.time()
+        self.requests = 0
+        self.warm: Dict[str, Any] = {}
+        self._command_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+        if self.socket_path.exists():
+            if request({'op': 'ping'}, self.socket_path, timeout=1.0) is not None:
+                raise OSError(f"Ya hay un daemon escuchando en {self.socket_path}")
+            self.socket_path.unlink()  # socket huérfano de un daemon que no terminó limpio
+        super().__init__(str(self.socket_path), _DaemonHandler)
+        os.chmod(self.socket_path, 0o600)  # ejecuta comandos: solo el propio usuario
+
+        sys.stdout = _ThreadStream('stdout', sys.stdout)
+        sys.stderr = _ThreadStream('stderr', sys.stderr)
+        sys.stdin = _ThreadStream('stdin', sys.stdin)
+
+    # --- Estado caliente ---
+
+    def warm_up(self) -> Dict[str, Any]:
+        """Precarga vault, ChromaDB (con su modelo de embeddings), aprendizaje, análisis semántico, grafo del vault e IA."""
+        from paralib.log_center import log_center
+
+        steps = [
+            ('vault', self._warm_vault),
+            ('chromadb', self._warm_chromadb),
+            ('learning_system', self._warm_learning_system),
+            ('analyze_manager', self._warm_analyze_manager),
+            ('vault_scan', self._warm_vault_scan),
+            ('ai_engine', self._warm_ai_engine),
+        ]
+        for name, step in steps:
+            start = time.perf_counter()
+            try:
+                detail = step()
+                self.warm[name] = {'seconds': round(time.perf_counter() - start, 3), 'detail': detail}
+            except Exception as e:
+                self.warm[name] = {'error': f"{type(e).__name__}: {e}"}
+                log_center.log_warning(f"Daemon: no se pudo precargar {name}: {e}", "Daemon")
+        log_center.log_info("Daemon: estado caliente cargado", "Daemon", self.warm)
+        return self.warm
+
+    def _warm_vault(self):
+        if self.vault_path is None:
+            from paralib.vault_selector import vault_selector
+            vault = vault_selector.get_vault(silent=True)
+            self.vault_path = Path(vault) if vault else None
+        if self.vault_path is None:
+            raise RuntimeError("no se encontró un vault")
+        return str(self.vault_path)
+
+    def _warm_chromadb(self):
+        from paralib.organizer import get_shared_chromadb
+        if self.vault_path is None:
+            raise RuntimeError("sin vault")
+        db = get_shared_chromadb(self.vault_path)
+        return {'notes': db.get_note_count(), 'model': getattr(db, 'current_model', None)}
+
+    def _warm_learning_system(self):
+        from paralib.organizer import _get_learning_system, get_shared_chromadb
+        if self.vault_path is None:
+            raise RuntimeError("sin vault")
+        _get_learning_system(get_shared_chromadb(self.vault_path), self.vault_path)
+        return True
+
+    def _warm_analyze_manager(self):
+        from paralib.organizer import _get_analyze_manager, get_shared_chromadb
+        if self.vault_path is None:
+            raise RuntimeError("sin vault")
+        _get_analyze_manager(get_shared_chromadb(self.vault_path), self.vault_path)
+        return True
+
+    def _warm_vault_scan(self):
+        from paralib.vault import get_link_graph
+        if self.vault_path is None:
+            raise RuntimeError("sin vault")
+        graph = get_link_graph(self.vault_path)
+        return {'notes': len(graph.raw_links)}
+
+    def _warm_ai_engine(self):
+        from paralib.ai_engine import get_ai_engine
+        from paralib.config import load_para_config
+        engine = get_ai_engine(load_para_config().get('ollama_model', 'llama3.2:3b'))
+        return engine.backend
+
+    # --- Ejecución ---
+
+    def run_command(self, argv: List[str], cwd: Optional[str], send: Callable[[Dict[str, Any]], None],
+                    isatty: bool = False) -> int:
+        """Ejecuta un comando reenviado con su salida hacia el cliente; devuelve el código de salida."""
+        stdout = _SocketSink(send, 'stdout', isatty)
+        stderr = _SocketSink(send, 'stderr', isatty)
+        with self._command_lock:
+            self.requests += 1
+            previous_cwd = os.getcwd()
+            _local.targets = {'stdout': stdout, 'stderr': stderr, 'stdin': io.StringIO('')}
+            code = 0
+            try:
+                if cwd and os.path.isdir(cwd):
+                    os.chdir(cwd)
+                self._refresh_state()
+                self.runner(list(argv))
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            except Exception as e:
+                print(f"❌ Error en el daemon: {e}", file=sys.stderr)
+                code = 1
+            finally:
+                stdout.flush()
+                stderr.flush()
+                _local.targets = None
+                os.chdir(previous_cwd)
+        return code
+
+    @staticmethod
+    def _refresh_state():
+        """El estado caliente vive lo que el daemon: antes de cada comando se pone al día con el disco."""
+        from paralib.log_center import log_center
+        try:
+            from paralib.vault import refresh_link_graphs
+            refresh_link_graphs()
+        except Exception as e:
+            log_center.log_warning(f"Daemon: no se pudo actualizar el grafo de enlaces: {e}", "Daemon")
+
+    def embedding_request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """``encode``/``query`` de otros procesos; las peticiones concurrentes se agrupan en lote."""
+        from paralib.embedding_service import get_embedding_service
+        from paralib.organizer import get_shared_chromadb
+        if self.vault_path is None:
+            return {'error': 'El daemon no tiene vault'}
+        try:
+            service = get_embedding_service(get_shared_chromadb(self.vault_path))
+            if service is None:
+                return {'error': 'Servicio de embeddings no disponible (sin modelo, modo fallback o desactivado)'}
+            if message['op'] == 'encode':
+                return {'embeddings': service.embed([str(text) for text in message.get('texts') or []])}
+            future = service.query(str(message.get('text', '')), int(message.get('n_results', 5)), message.get('where'))
+            results = service.result(future)
+            if results is None:
+                return {'error': 'La búsqueda falló o superó el tiempo límite'}
+            return {'results': results}
+        except Exception as e:
+            return {'error': f"{type(e).__name__}: {e}"}
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'ok': True,
+            'pid': os.getpid(),
+            'socket': str(self.socket_path),
+            'vault': str(self.vault_path) if self.vault_path else None,
+            'uptime_s': round(time.time() - self.started_at, 1),
+            'requests': self.requests,
+            'warm': self.warm,
+        }
+
+    def start(self) -> "PARADaemon":
+        """Sirve en un hilo de fondo (pruebas y benchmarks en el mismo proceso)."""
+        self._thread = threading.Thread(target=self.serve_forever, name="para-daemon", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.server_close()
+
+    def server_close(self):
+        super().server_close()
+        for name in ('stdout', 'stderr', 'stdin'):
+            stream = getattr(sys, name)
+            if isinstance(stream, _ThreadStream):
+                setattr(sys, name, stream._fallback)
+        try:
+            self.socket_path.unlink()
+        except FileNotFoundError:
+            pass
@@ -33,6 +33,7 @@ except ImportError:
 
 from .logger import logger, log_function_calls, log_exceptions
 from .log_center import log_center
+from .embedding_service import get_embedding_service
 
 class RobustChromaPARADatabase:
     """
@@ -308,8 +309,11 @@ class RobustChromaPARADatabase:
     def _add_note_chromadb(self, note_id: str, note_path: Path, content: str, category: str, project_name: str) -> bool:
         """Agrega nota usando ChromaDB."""
         try:
-            # Generar embedding
-            embedding = self.embedding_model.encode(content[:1000], convert_to_tensor=False).tolist()
+            # Generar embedding (en lote con otras altas/búsquedas concurrentes si hay servicio)
+            service = get_embedding_service(self)
+            embedding = service.result(service.encode(content[:1000])) if service is not None else None
+            if embedding is None:
+                embedding = self.embedding_model.encode(content[:1000], convert_to_tensor=False).tolist()
             
             metadata = {
                 "path": str(note_path),
@@ -379,18 +383,21 @@ class RobustChromaPARADatabase:
                 log_center.log_warning("Búsqueda en colección vacía", "ChromaDB-Robust")
                 return []
             
-            query_embedding = self.embedding_model.encode(content[:1000], convert_to_tensor=False).tolist()
-            
-            results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=min(n_results, self.collection.count()),
-                include=["metadatas", "distances"],
-            )
-            
-            metadatas = results.get("metadatas", [[]])[0]
-            distances = results.get("distances", [[]])[0]
-            
-            result_pairs = list(zip(metadatas, distances))
+            service = get_embedding_service(self)
+            result_pairs = service.result(service.query(content[:1000], n_results)) if service is not None else None
+            if result_pairs is None:
+                query_embedding = self.embedding_model.encode(content[:1000], convert_to_tensor=False).tolist()
+                
+                results = self.collection.query(
+                    query_embeddings=[query_embedding],
+                    n_results=min(n_results, self.collection.count()),
+                    include=["metadatas", "distances"],
+                )
+                
+                metadatas = results.get("metadatas", [[]])[0]
+                distances = results.get("distances", [[]])[0]
+                
+                result_pairs = list(zip(metadatas, distances))
             log_center.log_debug(f"Encontradas {len(result_pairs)} notas similares", "ChromaDB-Robust")
             
             return result_pairs
@@ -531,6 +538,20 @@ class RobustChromaPARADatabase:
             log_center.log_error(f"Error actualizando categoría: {e}", "ChromaDB-Robust")
             return False
     
+    def remove_note(self, note_path: Path) -> bool:
+        """Elimina una nota del índice (ChromaDB o fallback). Nunca falla."""
+        try:
+            note_id = self._generate_id(note_path)
+            if self.fallback_mode:
+                if self.fallback_data.pop(note_id, None) is not None:
+                    self._save_fallback_data()
+                return True
+            self.collection.delete(ids=[note_id])
+            return True
+        except Exception as e:
+            log_center.log_error(f"Error eliminando nota {Path(note_path).name}: {e}", "ChromaDB-Robust")
+            return False
+    
     def get_all_notes_metadata(self) -> List[Dict]:
         """Obtiene metadatos de todas las notas de manera robusta, incluyendo embeddings."""
         try:
@@ -631,6 +652,12 @@ class RobustChromaPARADatabase:
                 return results[:n_results]
             
             elif self.collection and self.collection.count() > 0:
+                service = get_embedding_service(self)
+                if service is not None:
+                    result_pairs = service.result(service.query(content[:1000], n_results, where={"category": category}))
+                    if result_pairs is not None:
+                        return result_pairs
+                
                 # Filtrar primero por categoría
                 query_embedding = self.embedding_model.encode(content[:1000], convert_to_tensor=False).tolist()
                 
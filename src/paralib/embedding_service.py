@@ -0,0 +1,309 @@
+"""
+paralib/embedding_service.py
+
+Servicio de embeddings con micro-batching para ``encode`` y búsquedas top-k en ChromaDB.
+
+Los llamadores (``ChromaPARADatabase.search_similar_notes``, ``AnalyzeManager``,
+``similarity.py``, el watcher, el dashboard o el daemon) piden un embedding o una búsqueda y
+reciben un ``Future``; un hilo de fondo junta las peticiones que llegan dentro de una ventana
+corta (``window_ms``, unos pocos ms) y las resuelve con **un** ``encode`` en lote del modelo y
+**una** ``collection.query`` por filtro ``where``. Con varios llamadores concurrentes el modelo
+procesa lotes en lugar de serializarse nota a nota.
+
+La ventana solo se espera cuando hay concurrencia (el lote anterior tuvo más de una petición
+o ya hay otra en cola): un llamador secuencial no paga latencia extra.
+
+Un error en un lote falla sus futures (nunca quedan sin resolver) y el hilo sigue vivo. Los
+llamadores esperan con ``result`` (límite ``timeout_s``) y, si falla o vence, usan el camino
+directo al modelo/colección.
+
+Se configura en ``para_config.json``::
+
+    "embedding_service": {"enabled": true, "window_ms": 3, "max_batch": 64, "timeout_s": 30}
+
+El daemon (``paralib/daemon.py``) lo expone por su socket con las operaciones ``encode`` y
+``query`` para otros procesos.
+"""
+import json
+import queue
+import threading
+import time
+import weakref
+from collections import defaultdict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional
+
+from .logger import logger
+
+DEFAULT_WINDOW_MS = 3.0
+DEFAULT_MAX_BATCH = 64
+DEFAULT_TIMEOUT_S = 30.0
+
+_STOP = object()
+
+
+class _Request:
+    __slots__ = ('kind', 'text', 'n_results', 'where', 'future')
+
+    def __init__(self, kind: str, text: str, n_results: int = 0, where: Optional[Dict[str, Any]] = None):
+        self.kind = kind
+        self.text = text
+        self.n_results = n_results
+        self.where = where
+        self.future: Future = Future()
+
+
+class EmbeddingService:
+    """
+    Cola de peticiones de embeddings/top-k resueltas en lote por un hilo de fondo.
+
+    Solo guarda una referencia débil a ``db``: el servicio no la mantiene viva, y cuando ``db``
+    se libera el hilo de fondo se detiene (ver ``get_embedding_service``).
+    """
+
+    def __init__(self, db, window_ms: float = DEFAULT_WINDOW_MS, max_batch: int = DEFAULT_MAX_BATCH,
+                 timeout_s: float = DEFAULT_TIMEOUT_S):
+        self._db_ref = weakref.ref(db)
+        self.window = max(0.0, window_ms) / 1000
+        self.max_batch = max(1, max_batch)
+        self.timeout = timeout_s
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._last_batch_size = 0
+        self._stats_lock = threading.Lock()
+        self.stats = {'requests': 0, 'batches': 0, 'encoded': 0, 'queries': 0, 'largest_batch': 0, 'errors': 0,
+                      'timeouts': 0}
+
+    @property
+    def db(self):
+        db = self._db_ref()
+        if db is None:
+            raise RuntimeError("La base de datos del servicio de embeddings ya no existe")
+        return db
+
+    # --- API ---
+
+    def encode(self, text: str) -> Future:
+        """Future con el embedding (lista de floats) de ``text``."""
+        return self._submit(_Request('encode', text))
+
+    def query(self, text: str, n_results: int = 5, where: Optional[Dict[str, Any]] = None) -> Future:
+        """Future con los ``n_results`` vecinos de ``text``: lista de (metadatos, distancia)."""
+        return self._submit(_Request('query', text, n_results, where))
+
+    def result(self, future: Future, timeout: Optional[float] = None):
+        """
+        Espera ``future`` como mucho ``timeout`` (por defecto ``timeout_s``); None si falla o
+        vence, para que el llamador use el camino directo.
+        """
+        try:
+            return future.result(timeout=self.timeout if timeout is None else timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            self._count('timeouts')
+            logger.warning(f"Servicio de embeddings sin respuesta en {self.timeout}s; se usa el camino directo")
+        except Exception as e:
+            logger.debug(f"Petición de embeddings fallida, se usa el camino directo: {e}")
+        return None
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embeddings de ``texts`` (se encolan juntos, así que viajan en el mismo lote); los que
+        fallen o venzan se calculan directamente.
+        """
+        futures = [self.encode(text) for text in texts]
+        deadline = time.monotonic() + self.timeout
+        embeddings = [self.result(future, max(0.0, deadline - time.monotonic())) for future in futures]
+        missing = [index for index, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            for index, embedding in zip(missing, self._encode_texts([texts[index] for index in missing])):
+                embeddings[index] = embedding
+        return embeddings
+
+    def stop(self, timeout: float = 5.0):
+        """Resuelve lo pendiente y detiene el hilo de fondo."""
+        worker = self._worker
+        if worker is not None and worker.is_alive():
+            self._queue.put(_STOP)
+            # El finalizador de ``db`` puede ejecutarse en el propio hilo de fondo: no se espera a sí mismo
+            if worker is not threading.current_thread():
+                worker.join(timeout)
+        self._worker = None
+
+    # --- Hilo de fondo ---
+
+    def _submit(self, request: _Request) -> Future:
+        self._ensure_worker()
+        self._queue.put(request)
+        self._count('requests')
+        return request.future
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._worker_loop, name="para-embedding-batcher", daemon=True)
+                self._worker.start()
+
+    def _worker_loop(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            # Solo se espera a más peticiones si hay concurrencia; un llamador secuencial no espera
+            wait = self.window if (self._last_batch_size > 1 or not self._queue.empty()) else 0.0
+            deadline = time.monotonic() + wait
+            stop = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._last_batch_size = len(batch)
+            try:
+                self._process_batch(batch)
+            except Exception as e:
+                # Cualquier error inesperado falla las peticiones pendientes del lote; el hilo sigue
+                self._fail(batch, e)
+            if stop:
+                return
+
+    def _process_batch(self, batch: List[_Request]):
+        requests = [request for request in batch if request.future.set_running_or_notify_cancel()]
+        if not requests:
+            return
+        with self._stats_lock:
+            self.stats['batches'] += 1
+            self.stats['largest_batch'] = max(self.stats['largest_batch'], len(requests))
+        try:
+            embeddings = self._encode_texts([request.text for request in requests])
+        except Exception as e:
+            self._fail(requests, e)
+            return
+        self._count('encoded', len(requests))
+
+        queries = []
+        for request, embedding in zip(requests, embeddings):
+            if request.kind == 'encode':
+                request.future.set_result(embedding)
+            else:
+                queries.append((request, embedding))
+        if queries:
+            self._run_queries(queries)
+
+    def _encode_texts(self, texts: List[str]) -> List[List[float]]:
+        model = getattr(self.db, 'embedding_model', None)
+        if model is None:
+            raise RuntimeError("Modelo de embeddings no disponible")
+        vectors = model.encode(texts, convert_to_tensor=False, batch_size=min(len(texts), self.max_batch))
+        return [vector.tolist() if hasattr(vector, 'tolist') else list(vector) for vector in vectors]
+
+    def _run_queries(self, queries: List[tuple]):
+        """Una ``collection.query`` por filtro ``where`` con todos los embeddings del grupo."""
+        groups = defaultdict(list)
+        for request, embedding in queries:
+            groups[json.dumps(request.where, sort_keys=True, default=str)].append((request, embedding))
+        try:
+            count = self.db.collection.count()
+        except Exception as e:
+            self._fail([request for request, _ in queries], e)
+            return
+
+        for items in groups.values():
+            requests = [request for request, _ in items]
+            if count == 0:
+                for request in requests:
+                    request.future.set_result([])
+                continue
+            try:
+                kwargs = {'where': requests[0].where} if requests[0].where else {}
+                results = self.db.collection.query(
+                    query_embeddings=[embedding for _, embedding in items],
+                    n_results=min(max(request.n_results for request in requests), count),
+                    include=["metadatas", "distances"],
+                    **kwargs,
+                )
+                metadatas = results.get("metadatas") or []
+                distances = results.get("distances") or []
+                if len(metadatas) != len(requests) or len(distances) != len(requests):
+                    raise ValueError(f"ChromaDB devolvió {len(metadatas)} resultados para {len(requests)} consultas")
+                for index, request in enumerate(requests):
+                    request.future.set_result(list(zip(metadatas[index], distances[index]))[:request.n_results])
+            except Exception as e:
+                self._fail(requests, e)
+                continue
+            self._count('queries', len(requests))
+
+    def _fail(self, requests: List[_Request], error: Exception):
+        pending = [request for request in requests if not request.future.done()]
+        self._count('errors', len(pending))
+        logger.warning(f"Error en lote de embeddings ({len(pending)} peticiones): {error}")
+        for request in pending:
+            try:
+                request.future.set_exception(error)
+            except Exception:
+                pass  # Cancelada/resuelta entre medias por el llamador
+
+
+_services: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_services_lock = threading.Lock()
+_settings: Optional[Dict[str, Any]] = None
+
+
+def _load_settings() -> Dict[str, Any]:
+    global _settings
+    if _settings is None:
+        try:
+            from .config import load_para_config
+            _settings = load_para_config().get('embedding_service', {}) or {}
+        except Exception:
+            _settings = {}
+    return _settings
+
+
+def get_embedding_service(db) -> Optional[EmbeddingService]:
+    """
+    Servicio compartido de ``db``; None si está desactivado en ``para_config.json`` o si ``db``
+    no tiene modelo de embeddings o colección (modo fallback), en cuyo caso se usa el camino directo.
+    """
+    if getattr(db, 'embedding_model', None) is None or getattr(db, 'collection', None) is None:
+        return None
+    settings = _load_settings()
+    if not settings.get('enabled', True):
+        return None
+    service = _services.get(db)
+    if service is None:
+        with _services_lock:
+            service = _services.get(db)
+            if service is None:
+                service = EmbeddingService(db, window_ms=settings.get('window_ms', DEFAULT_WINDOW_MS),
+                                           max_batch=settings.get('max_batch', DEFAULT_MAX_BATCH),
+                                           timeout_s=settings.get('timeout_s', DEFAULT_TIMEOUT_S))
+                _services[db] = service
+                # Al liberarse ``db`` se quita su entrada (clave débil) y se detiene el hilo, sin esperarlo
+                weakref.finalize(db, service.stop, 0)
+    return service
+
+
+def embed_texts(texts: List[str], db) -> List[List[float]]:
+    """Embeddings de ``texts`` en un único lote (con el servicio o, sin él, directo al modelo)."""
+    texts = list(texts)
+    if not texts:
+        return []
+    service = get_embedding_service(db)
+    if service is not None:
+        return service.embed(texts)
+    vectors = db.embedding_model.encode(texts, convert_to_tensor=False)
+    return [vector.tolist() if hasattr(vector, 'tolist') else list(vector) for vector in vectors]
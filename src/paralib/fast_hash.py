@@ -0,0 +1,94 @@
+"""
+paralib/fast_hash.py
+
+Hash rápido de contenido para manifests y verificación de backups.
+
+Usa BLAKE3 si el paquete ``blake3`` está instalado, si no xxHash (``xxh3_128``) y como
+último recurso ``blake2b`` de hashlib. El algoritmo usado se guarda junto a cada hash
+en los manifests, así un backup se puede verificar aunque cambien las dependencias
+instaladas (``md5`` queda soportado para los checksums antiguos).
+"""
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+try:
+    import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    blake3 = None
+    BLAKE3_AVAILABLE = False
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    xxhash = None
+    XXHASH_AVAILABLE = False
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+if BLAKE3_AVAILABLE:
+    DEFAULT_ALGORITHM = 'blake3'
+elif XXHASH_AVAILABLE:
+    DEFAULT_ALGORITHM = 'xxh3_128'
+else:
+    DEFAULT_ALGORITHM = 'blake2b'
+
+
+def available_algorithms():
+    algorithms = ['blake2b', 'md5']
+    if XXHASH_AVAILABLE:
+        algorithms.insert(0, 'xxh3_128')
+    if BLAKE3_AVAILABLE:
+        algorithms.insert(0, 'blake3')
+    return algorithms
+
+
+def new_hasher(algorithm: Optional[str] = None):
+    """Objeto hasher (``update``/``hexdigest``) para el algoritmo indicado o el predeterminado."""
+    algorithm = algorithm or DEFAULT_ALGORITHM
+    if algorithm == 'blake3':
+        if not BLAKE3_AVAILABLE:
+            raise ValueError("El algoritmo blake3 requiere el paquete blake3")
+        return blake3.blake3()
+    if algorithm == 'xxh3_128':
+        if not XXHASH_AVAILABLE:
+            raise ValueError("El algoritmo xxh3_128 requiere el paquete xxhash")
+        return xxhash.xxh3_128()
+    if algorithm == 'blake2b':
+        return hashlib.blake2b(digest_size=32)
+    if algorithm == 'md5':
+        return hashlib.md5()
+    raise ValueError(f"Algoritmo de hash desconocido: {algorithm}")
+
+
+def hash_bytes(data: bytes, algorithm: Optional[str] = None) -> str:
+    hasher = new_hasher(algorithm)
+    hasher.update(data)
+    return hasher.hexdigest()
+
+
+def hash_file(file_path: Path, algorithm: Optional[str] = None) -> str:
+    """Hash del contenido completo de un archivo, leído en bloques de 1 MB."""
+    hasher = new_hasher(algorithm)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class HashingReader:
+    """Envuelve un archivo y calcula el hash de lo que se va leyendo (copias en streaming)."""
+
+    def __init__(self, fileobj, algorithm: Optional[str] = None):
+        self._fileobj = fileobj
+        self._hasher = new_hasher(algorithm)
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._fileobj.read(size)
+        self._hasher.update(data)
+        return data
+
+    def hexdigest(self) -> str:
+        return self._hasher.hexdigest()
@@ -17,7 +17,7 @@ from rich.progress import Progress
 import pandas as pd
 
 from paralib.db import ChromaPARADatabase
-from paralib.classification_log import get_feedback_notes, get_classification_history, log_feedback
+from paralib.classification_log import get_feedback_notes, get_classification_history, log_feedback, get_history_store
 from paralib.vault import load_para_config, save_para_config
 from paralib.logger import logger
 
@@ -30,22 +30,23 @@ class FeedbackAnalyzer:
         self.db = db
         self.vault_path = vault_path
         self.config = load_para_config()
+        self.history = get_history_store(db)
     
     def get_all_classifications(self) -> List[Dict]:
-        """Obtiene todas las clasificaciones de la base de datos."""
-        results = self.db.collection.get(include=["metadatas", "documents"])
-        return [
-            {**meta, "content": doc} 
-            for meta, doc in zip(results.get("metadatas", []), results.get("documents", []))
-        ]
+        """Obtiene la última clasificación de cada nota desde el historial."""
+        if self.history is None:
+            return []
+        return self.history.latest_classifications()
     
     def analyze_feedback_quality(self, detailed: bool = False) -> Dict:
         """Analiza la calidad del sistema basado en feedback."""
-        classifications = self.get_all_classifications()
+        # Los agregados se resuelven en SQL; las listas completas solo para el análisis detallado
+        classifications = self.get_all_classifications() if detailed else []
         feedback_notes = get_feedback_notes(self.db)
         
         # Métricas básicas
-        total_notes = len(classifications)
+        summary = self.history.summary() if self.history is not None else {}
+        total_notes = summary.get("total_notes", 0)
         feedback_count = len(feedback_notes)
         feedback_rate = (feedback_count / total_notes * 100) if total_notes > 0 else 0
         
@@ -86,32 +87,23 @@ class FeedbackAnalyzer:
     
     def _analyze_category_distribution(self, classifications: List[Dict], feedback_notes: List[Dict]) -> Dict:
         """Analiza la distribución de categorías y correcciones."""
-        category_counts = Counter()
-        feedback_by_category = defaultdict(list)
-        
-        for note in classifications:
-            category = note.get("predicted_category", "Unknown")
-            category_counts[category] += 1
-            
-            if note.get("feedback"):
-                feedback_by_category[category].append(note)
+        summary = self.history.category_summary() if self.history is not None else {}
         
         # Calcular tasa de corrección por categoría
-        correction_rates = {}
-        for category in category_counts:
-            total = category_counts[category]
-            corrections = len(feedback_by_category[category])
-            correction_rates[category] = (corrections / total * 100) if total > 0 else 0
+        correction_rates = {
+            category: (data["feedback"] / data["total"] * 100) if data["total"] > 0 else 0
+            for category, data in summary.items()
+        }
         
         return {
-            "total_by_category": dict(category_counts),
-            "feedback_by_category": {k: len(v) for k, v in feedback_by_category.items()},
+            "total_by_category": {category: data["total"] for category, data in summary.items()},
+            "feedback_by_category": {category: data["feedback"] for category, data in summary.items() if data["feedback"]},
             "correction_rates": correction_rates
         }
     
     def _analyze_confidence_distribution(self, classifications: List[Dict], feedback_notes: List[Dict]) -> Dict:
         """Analiza la distribución de confianza y su relación con correcciones."""
-        confidences = [float(note.get("confidence", 0)) for note in classifications if note.get("confidence")]
+        confidences = self.history.confidences() if self.history is not None else []
         feedback_confidences = [float(note.get("confidence", 0)) for note in feedback_notes if note.get("confidence")]
         
         if not confidences:
@@ -130,23 +122,21 @@ class FeedbackAnalyzer:
                 "median": statistics.median(feedback_confidences) if feedback_confidences else 0,
                 "std": statistics.stdev(feedback_confidences) if len(feedback_confidences) > 1 else 0
             },
-            "confidence_threshold_analysis": self._analyze_confidence_thresholds(confidences, feedback_confidences)
+            "confidence_threshold_analysis": self._analyze_confidence_thresholds()
         }
     
-    def _analyze_confidence_thresholds(self, all_confidences: List[float], feedback_confidences: List[float]) -> Dict:
+    def _analyze_confidence_thresholds(self) -> Dict:
         """Analiza diferentes umbrales de confianza para optimizar el sistema."""
         thresholds = [0.5, 0.6, 0.7, 0.8, 0.9]
         results = {}
+        summary = self.history.threshold_summary(thresholds) if self.history is not None else {}
         
-        for threshold in thresholds:
-            high_conf = [c for c in all_confidences if c >= threshold]
-            high_conf_feedback = [c for c in feedback_confidences if c >= threshold]
-            
-            if high_conf:
-                error_rate = len(high_conf_feedback) / len(high_conf) * 100
+        for threshold, data in summary.items():
+            if data["total"]:
+                error_rate = data["feedback"] / data["total"] * 100
                 results[f"threshold_{threshold}"] = {
-                    "total_notes": len(high_conf),
-                    "feedback_count": len(high_conf_feedback),
+                    "total_notes": data["total"],
+                    "feedback_count": data["feedback"],
                     "error_rate": error_rate
                 }
         
@@ -180,15 +170,9 @@ class FeedbackAnalyzer:
     def _analyze_temporal_patterns(self, classifications: List[Dict], feedback_notes: List[Dict]) -> Dict:
         """Analiza patrones temporales en clasificaciones y feedback."""
         # Agrupar por fecha (simplificado)
-        daily_classifications = defaultdict(int)
+        daily_classifications = self.history.daily_counts() if self.history is not None else {}
         daily_feedback = defaultdict(int)
         
-        for note in classifications:
-            timestamp = note.get("timestamp", "")
-            if timestamp:
-                date = timestamp[:10]  # YYYY-MM-DD
-                daily_classifications[date] += 1
-        
         for note in feedback_notes:
             timestamp = note.get("feedback_timestamp", "")
             if timestamp:
@@ -275,17 +259,14 @@ class FeedbackAnalyzer:
     
     def _analyze_model_performance(self, classifications: List[Dict], feedback_notes: List[Dict]) -> Dict:
         """Analiza el rendimiento del modelo de IA."""
-        models_used = Counter(note.get("model", "Unknown") for note in classifications)
-        model_accuracy = {}
-        
-        for model in models_used:
-            model_notes = [n for n in classifications if n.get("model") == model]
-            model_feedback = [n for n in feedback_notes if n.get("model") == model]
-            accuracy = (1 - len(model_feedback) / len(model_notes)) * 100 if model_notes else 0
-            model_accuracy[model] = accuracy
+        summary = self.history.model_summary() if self.history is not None else {}
+        model_accuracy = {
+            model: (1 - data["feedback"] / data["total"]) * 100 if data["total"] else 0
+            for model, data in summary.items()
+        }
         
         return {
-            "models_used": dict(models_used),
+            "models_used": {model: data["total"] for model, data in summary.items()},
             "model_accuracy": model_accuracy
         }
     
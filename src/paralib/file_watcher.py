@@ -10,7 +10,8 @@ import time
 from pathlib import Path
 from typing import Dict, List, Callable, Optional, Set
 from datetime import datetime
-from threading import Thread, Event
+from threading import Thread, Event, Condition, Lock
+from collections import OrderedDict
 import json
 
 try:
@@ -24,11 +25,152 @@ except ImportError:
     FileSystemEvent = None
 
 from paralib.log_center import log_center, log_function_call
+from paralib.lazy import LazyInstance
+
+class EventCoalescer:
+    """
+    Fusiona eventos de archivos por ruta sobre una ventana de silencio y los entrega en
+    lotes a un procesador, en un hilo propio (no en el hilo de watchdog).
+    
+    - created+modified(+modified...) → created; deleted+created → modified
+    - created+deleted → se descarta; moved+deleted → deleted del origen
+    - cadenas de moved se colapsan en un solo moved desde el origen original
+    
+    Un evento se entrega cuando su ruta lleva ``quiet_window`` segundos sin cambios. El
+    estado solo contiene eventos pendientes (se poda al entregar) y está acotado por
+    ``max_pending``: al superarlo se entrega sin esperar la ventana.
+    """
+    
+    def __init__(self, processor: Callable[[List[Dict]], None], quiet_window: float = 1.0,
+                 batch_size: int = 256, max_pending: int = 10000, name: str = "para-event-coalescer"):
+        self.processor = processor
+        self.quiet_window = quiet_window
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.name = name
+        # Ordenado por último cambio (move_to_end en cada actualización)
+        self._pending: "OrderedDict[str, Dict]" = OrderedDict()
+        self._condition = Condition()
+        self._stopped = False
+        self._busy = False
+        self._force = False
+        self._worker: Optional[Thread] = None
+    
+    @staticmethod
+    def _merge(previous: Optional[Dict], kind: str, path: str, old_path: str = None) -> Optional[Dict]:
+        if kind == 'moved':
+            if previous and previous['kind'] == 'created':
+                # Nota nueva todavía no entregada: basta con entregarla en su destino
+                return {'kind': 'created', 'path': path, 'old_path': None}
+            origin = previous['old_path'] if previous and previous['kind'] == 'moved' else old_path
+            if origin == path:
+                return {'kind': 'modified', 'path': path, 'old_path': None}
+            return {'kind': 'moved', 'path': path, 'old_path': origin}
+        event = {'kind': kind, 'path': path, 'old_path': None}
+        if not previous:
+            return event
+        if kind == 'deleted':
+            if previous['kind'] == 'created':
+                return None  # Creada y eliminada antes de entregarse
+            if previous['kind'] == 'moved':
+                return {'kind': 'deleted', 'path': previous['old_path'], 'old_path': None}
+        elif kind == 'created' and previous['kind'] == 'deleted':
+            return {'kind': 'modified', 'path': path, 'old_path': None}  # Guardado atómico
+        elif kind == 'modified' and previous['kind'] in ('created', 'moved'):
+            return previous
+        return event
+    
+    def put(self, kind: str, path: str, old_path: str = None):
+        """Registra un evento fusionándolo con el pendiente de la misma ruta."""
+        with self._condition:
+            if kind == 'moved' and old_path:
+                previous = self._pending.pop(old_path, None)
+                self._pending.pop(path, None)  # El destino sobrescrito queda reemplazado
+            else:
+                previous = self._pending.pop(path, None)
+            event = self._merge(previous, kind, path, old_path)
+            if event:
+                event['last_seen'] = time.monotonic()
+                self._pending[event['path']] = event
+            self._condition.notify()
+        self._ensure_worker()
+    
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._stopped = False
+            self._worker = Thread(target=self._worker_loop, name=self.name, daemon=True)
+            self._worker.start()
+    
+    def _take_ready(self) -> List[Dict]:
+        """Extrae los eventos cuya ruta está en silencio (o todos si se fuerza/desborda)."""
+        now = time.monotonic()
+        force = self._force or self._stopped or len(self._pending) >= self.max_pending
+        batch = []
+        while self._pending and len(batch) < self.batch_size:
+            path, event = next(iter(self._pending.items()))
+            if not force and now - event['last_seen'] < self.quiet_window:
+                break
+            del self._pending[path]
+            event.pop('last_seen', None)
+            batch.append(event)
+        return batch
+    
+    def _worker_loop(self):
+        while True:
+            with self._condition:
+                batch = self._take_ready()
+                while not batch:
+                    if self._stopped:
+                        return
+                    if self._pending:
+                        oldest = next(iter(self._pending.values()))['last_seen']
+                        self._condition.wait(max(0.01, self.quiet_window - (time.monotonic() - oldest)))
+                    else:
+                        self._force = False
+                        self._condition.wait()
+                    batch = self._take_ready()
+                self._busy = True
+            try:
+                self.processor(batch)
+            except Exception as e:
+                log_center.log_error(f"Error procesando lote de eventos ({self.name}): {e}", "FileWatcher")
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+    
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._pending)
+    
+    def drain(self, timeout: float = None) -> bool:
+        """Entrega de inmediato lo pendiente (sin esperar la ventana) y espera a que termine."""
+        deadline = time.monotonic() + timeout if timeout else None
+        self._ensure_worker()
+        with self._condition:
+            self._force = True
+            self._condition.notify_all()
+            try:
+                while self._pending or self._busy:
+                    remaining = deadline - time.monotonic() if deadline else None
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._condition.wait(min(remaining, 0.1) if remaining is not None else 0.1)
+            finally:
+                self._force = False
+        return True
+    
+    def stop(self, timeout: float = 30):
+        """Entrega lo pendiente y detiene el hilo consumidor."""
+        self.drain(timeout)
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
 
 class ObsidianFileHandler(FileSystemEventHandler):
     """Manejador de eventos de archivos específico para Obsidian."""
     
-    def __init__(self, callback: Callable, vault_path: Path):
+    def __init__(self, callback: Callable, vault_path: Path, quiet_window: float = 1.0):
         super().__init__()
         self.callback = callback
         self.vault_path = Path(vault_path)
@@ -42,9 +184,8 @@ class ObsidianFileHandler(FileSystemEventHandler):
         }
         self.markdown_extensions = {'.md', '.markdown', '.txt'}
         
-        # Debounce para evitar múltiples eventos del mismo archivo
-        self.recent_events: Dict[str, float] = {}
-        self.debounce_time = 1.0  # 1 segundo
+        # Coalescencia: ráfagas (guardar-renombrar-guardar, git pull) → un evento lógico por nota
+        self.coalescer = EventCoalescer(self._dispatch, quiet_window=quiet_window, name="para-watcher-events")
         
         log_center.log_info("ObsidianFileHandler inicializado", "FileWatcher")
     
@@ -67,49 +208,59 @@ class ObsidianFileHandler(FileSystemEventHandler):
         
         return False
     
-    def is_debounced(self, path: str) -> bool:
-        """Verifica si el evento debe ser ignorado por debounce."""
-        current_time = time.time()
-        last_event_time = self.recent_events.get(path, 0)
-        
-        if current_time - last_event_time < self.debounce_time:
-            return True
-        
-        self.recent_events[path] = current_time
-        return False
+    def _dispatch(self, events: List[Dict]):
+        """Entrega un lote de eventos ya fusionados a los callbacks (hilo del coalescer)."""
+        counts = {}
+        for event in events:
+            counts[event['kind']] = counts.get(event['kind'], 0) + 1
+            if event['kind'] == 'moved':
+                self.callback('moved', event['path'], event['old_path'])
+            else:
+                self.callback(event['kind'], event['path'])
+        log_center.log_info(f"Eventos de archivos procesados: {len(events)}", "FileWatcher", counts)
     
     def on_created(self, event: FileSystemEvent):
         """Archivo creado."""
         if not event.is_directory and not self.should_ignore(event.src_path):
-            if not self.is_debounced(event.src_path):
-                log_center.log_info(f"Archivo creado: {event.src_path}", "FileWatcher")
-                self.callback('created', event.src_path)
+            self.coalescer.put('created', event.src_path)
     
     def on_modified(self, event: FileSystemEvent):
         """Archivo modificado."""
         if not event.is_directory and not self.should_ignore(event.src_path):
-            if not self.is_debounced(event.src_path):
-                log_center.log_info(f"Archivo modificado: {event.src_path}", "FileWatcher")
-                self.callback('modified', event.src_path)
+            self.coalescer.put('modified', event.src_path)
     
     def on_moved(self, event: FileSystemEvent):
         """Archivo movido/renombrado."""
-        if not event.is_directory and not self.should_ignore(event.dest_path):
-            log_center.log_info(f"Archivo movido: {event.src_path} -> {event.dest_path}", "FileWatcher")
-            self.callback('moved', event.dest_path, event.src_path)
+        if event.is_directory:
+            return
+        src_ignored = self.should_ignore(event.src_path)
+        dest_ignored = self.should_ignore(event.dest_path)
+        if src_ignored and not dest_ignored:
+            # Guardado atómico (temporal → nota): equivale a modificar el destino
+            self.coalescer.put('modified', event.dest_path)
+        elif dest_ignored and not src_ignored:
+            self.coalescer.put('deleted', event.src_path)
+        elif not dest_ignored:
+            self.coalescer.put('moved', event.dest_path, event.src_path)
     
     def on_deleted(self, event: FileSystemEvent):
         """Archivo eliminado."""
         if not event.is_directory and not self.should_ignore(event.src_path):
-            log_center.log_info(f"Archivo eliminado: {event.src_path}", "FileWatcher")
-            self.callback('deleted', event.src_path)
+            self.coalescer.put('deleted', event.src_path)
+    
+    def stop(self, timeout: float = 30):
+        """Entrega los eventos pendientes y detiene el hilo de despacho."""
+        self.coalescer.stop(timeout)
 
 class PARAFileWatcher:
     """Sistema de monitoreo de archivos para PARA System."""
     
-    def __init__(self, vault_path: Optional[Path] = None):
+    def __init__(self, vault_path: Optional[Path] = None, reconcile_on_start: bool = True):
         self.vault_path = vault_path
+        self.reconcile_on_start = reconcile_on_start
+        self.snapshot = None
         self.observer = None
+        self.event_handler = None
         self.is_watching = False
         self.callbacks: Dict[str, List[Callable]] = {
             'created': [],
@@ -125,6 +276,8 @@ class PARAFileWatcher:
             'files_moved': 0,
             'files_deleted': 0,
             'total_events': 0,
+            'reconciled_events': 0,
+            'reconcile_seconds': None,
             'start_time': None
         }
         
@@ -162,6 +315,10 @@ class PARAFileWatcher:
             self.stats[f'files_{event_type}'] += 1
             self.stats['total_events'] += 1
             
+            # Mantener el snapshot al día para la reconciliación del próximo arranque
+            if self.snapshot is not None:
+                self.snapshot.apply_event(event_type, file_path, old_path)
+            
             # Ejecutar callbacks
             for callback in self.callbacks[event_type]:
                 try:
@@ -192,14 +349,19 @@ class PARAFileWatcher:
         
         try:
             self.observer = Observer()
-            event_handler = ObsidianFileHandler(self._handle_file_event, self.vault_path)
+            self.event_handler = ObsidianFileHandler(self._handle_file_event, self.vault_path)
             
-            self.observer.schedule(event_handler, str(self.vault_path), recursive=True)
+            self.observer.schedule(self.event_handler, str(self.vault_path), recursive=True)
             self.observer.start()
             
             self.is_watching = True
             self.stats['start_time'] = datetime.now()
             
+            # Reconciliar lo cambiado mientras el watcher estaba detenido (el observer ya
+            # está activo, así que no hay hueco; el coalescer fusiona eventos duplicados)
+            if self.reconcile_on_start:
+                Thread(target=self._reconcile_startup, name="para-reconcile", daemon=True).start()
+            
             log_center.log_info(f"Monitoreo iniciado en: {self.vault_path}", "FileWatcher")
             return True
             
@@ -207,6 +369,26 @@ class PARAFileWatcher:
             log_center.log_error(f"Error iniciando monitoreo: {e}", "FileWatcher")
             return False
     
+    def _reconcile_startup(self):
+        """Diff del vault contra el snapshot persistido y emisión de eventos sintéticos."""
+        try:
+            from paralib.vault_snapshot import VaultSnapshot
+            
+            handler = self.event_handler
+            started = time.monotonic()
+            snapshot = VaultSnapshot(self.vault_path, lambda path: not handler.should_ignore(path))
+            events = snapshot.reconcile()
+            self.snapshot = snapshot
+            for event in events:
+                handler.coalescer.put(event['kind'], event['path'], event['old_path'])
+            
+            self.stats['reconciled_events'] = len(events)
+            self.stats['reconcile_seconds'] = round(time.monotonic() - started, 3)
+            log_center.log_info(f"Reconciliación de arranque: {len(events)} cambios detectados "
+                                f"en {self.stats['reconcile_seconds']}s", "FileWatcher")
+        except Exception as e:
+            log_center.log_error(f"Error en reconciliación de arranque: {e}", "FileWatcher")
+    
     @log_function_call
     def stop_watching(self):
         """Detiene el monitoreo de archivos."""
@@ -218,6 +400,11 @@ class PARAFileWatcher:
                 self.observer.stop()
                 self.observer.join()
                 self.observer = None
+            if self.event_handler:
+                self.event_handler.stop()
+                self.event_handler = None
+            if self.snapshot is not None:
+                self.snapshot.flush()
             
             self.is_watching = False
             self.stop_event.set()
@@ -272,71 +459,218 @@ class PARAFileWatcher:
             pass
 
 # Funciones de conveniencia para auto-clasificación
+class ClassificationWorkQueue(EventCoalescer):
+    """
+    Cola de trabajo del auto-clasificador: un EventCoalescer con ventana más larga y
+    lotes pequeños, ya que cada nota del Inbox implica una llamada al LLM.
+    """
+    
+    def __init__(self, processor: Callable[[List[Dict]], None], settle_time: float = 2.0, batch_size: int = 32):
+        super().__init__(processor, quiet_window=settle_time, batch_size=batch_size, name="para-autoclassifier")
+
 class AutoClassifier:
-    """Sistema de auto-clasificación basado en eventos de archivos."""
+    """
+    Daemon de auto-clasificación incremental basado en eventos de archivos.
+    
+    Los eventos del watcher alimentan una ClassificationWorkQueue; cada lote se procesa
+    con el pipeline híbrido real (classify_note_with_complete_analysis) para las notas del
+    Inbox, y para el resto solo se actualizan de forma incremental el índice ChromaDB y el
+    grafo de enlaces. El trabajo es proporcional a las ediciones, no al tamaño del vault.
+    """
     
-    def __init__(self, file_watcher: PARAFileWatcher):
+    INBOX_FOLDER = '00-Inbox'
+    
+    def __init__(self, file_watcher: PARAFileWatcher, db=None, model_name: str = None,
+                 execute: bool = False, settle_time: float = 2.0, batch_size: int = 32):
         self.file_watcher = file_watcher
+        self.db = db
+        self.model_name = model_name
+        self.execute = execute
+        self.work_queue = ClassificationWorkQueue(self._process_batch, settle_time, batch_size)
+        # Rutas tocadas por los movimientos del propio clasificador (ruta -> expiración); la
+        # escriben el hilo de la cola de trabajo y la leen los callbacks del watcher
+        self._own_moves: Dict[str, float] = {}
+        self._own_moves_lock = Lock()
+        self.stats = {'classified': 0, 'moved': 0, 'indexed': 0, 'removed': 0, 'errors': 0, 'batches': 0}
         self.setup_auto_classification()
         log_center.log_info("AutoClassifier inicializado", "AutoClassifier")
     
+    @property
+    def vault_path(self) -> Path:
+        return Path(self.file_watcher.vault_path)
+    
     def setup_auto_classification(self):
         """Configura los callbacks para auto-clasificación."""
         self.file_watcher.add_callback('created', self.classify_new_file)
         self.file_watcher.add_callback('modified', self.reclassify_file)
         self.file_watcher.add_callback('moved', self.handle_moved_file)
+        self.file_watcher.add_callback('deleted', self.handle_deleted_file)
+    
+    OWN_MOVE_TTL = 10.0
+    
+    def _is_own_move(self, path: str) -> bool:
+        """Consume el evento si corresponde a un movimiento hecho por el propio clasificador."""
+        now = time.monotonic()
+        with self._own_moves_lock:
+            for expired in [p for p, expiry in self._own_moves.items() if expiry < now]:
+                del self._own_moves[expired]
+            return self._own_moves.pop(path, None) is not None
+    
+    def _mark_own_moves(self, *paths: str):
+        expiry = time.monotonic() + self.OWN_MOVE_TTL
+        with self._own_moves_lock:
+            for path in paths:
+                self._own_moves[path] = expiry
     
-    @log_function_call
     def classify_new_file(self, file_path: str):
-        """Clasifica automáticamente un archivo nuevo."""
-        try:
-            log_center.log_info(f"Auto-clasificando archivo nuevo: {file_path}", "AutoClassifier")
-            
-            # Aquí se integraría con el sistema de clasificación PARA
-            # Por ahora solo loggeamos
-            
-            # Ejemplo de lógica de clasificación:
-            path_obj = Path(file_path)
-            
-            # Clasificación básica por contenido del nombre
-            if any(keyword in path_obj.name.lower() for keyword in ['proyecto', 'project', 'trabajo']):
-                category = 'Projects'
-            elif any(keyword in path_obj.name.lower() for keyword in ['area', 'responsabilidad']):
-                category = 'Areas'
-            elif any(keyword in path_obj.name.lower() for keyword in ['recurso', 'reference', 'info']):
-                category = 'Resources'
-            else:
-                category = 'Archive'
-            
-            log_center.log_info(f"Archivo clasificado como: {category}", "AutoClassifier")
-            
-        except Exception as e:
-            log_center.log_error(f"Error en auto-clasificación: {e}", "AutoClassifier")
+        """Encola un archivo nuevo para clasificación."""
+        if self._is_own_move(file_path):
+            return
+        self.work_queue.put('created', file_path)
     
-    @log_function_call
     def reclassify_file(self, file_path: str):
-        """Re-clasifica un archivo modificado."""
-        log_center.log_info(f"Re-evaluando clasificación: {file_path}", "AutoClassifier")
-        # Lógica de re-clasificación
+        """Encola un archivo modificado para re-evaluación."""
+        self.work_queue.put('modified', file_path)
     
-    @log_function_call
     def handle_moved_file(self, new_path: str, old_path: str):
-        """Maneja archivos movidos."""
-        log_center.log_info(f"Archivo movido de {old_path} a {new_path}", "AutoClassifier")
-        # Lógica para archivos movidos
+        """Encola un archivo movido/renombrado."""
+        if self._is_own_move(new_path):
+            # Movimiento hecho por el propio clasificador: ya está indexado
+            with self._own_moves_lock:
+                self._own_moves.pop(old_path, None)
+            return
+        self.work_queue.put('moved', new_path, old_path)
+    
+    def handle_deleted_file(self, file_path: str):
+        """Encola un archivo eliminado."""
+        if self._is_own_move(file_path):
+            return
+        self.work_queue.put('deleted', file_path)
+    
+    # --- Procesamiento de lotes (hilo consumidor) ---
+    
+    def _get_db(self):
+        if self.db is None:
+            from paralib.organizer import get_shared_chromadb
+            self.db = get_shared_chromadb(self.vault_path)
+        return self.db
+    
+    def _get_model_name(self) -> str:
+        if not self.model_name:
+            from paralib.config import load_para_config
+            self.model_name = load_para_config().get('ollama_model', 'llama3.2:3b')
+        return self.model_name
+    
+    def _category_from_path(self, note_path: Path) -> tuple:
+        """(categoría, carpeta) según la ubicación de la nota en la estructura PARA."""
+        from paralib.organizer import _get_category_mapping
+        try:
+            parts = note_path.relative_to(self.vault_path).parts
+        except ValueError:
+            return 'Unknown', None
+        folders = {folder: category for category, folder in _get_category_mapping().items()}
+        category = folders.get(parts[0], 'Unknown') if parts else 'Unknown'
+        folder = parts[1] if len(parts) > 2 else None
+        return category, folder
+    
+    def _is_inbox_note(self, note_path: Path) -> bool:
+        try:
+            return note_path.relative_to(self.vault_path).parts[0] == self.INBOX_FOLDER
+        except (ValueError, IndexError):
+            return False
+    
+    def _process_batch(self, events: List[Dict]):
+        from paralib.vault import get_link_graph
+        
+        db = self._get_db()
+        graph = get_link_graph(self.vault_path)
+        self.stats['batches'] += 1
+        
+        for event in events:
+            note_path = Path(event['path'])
+            try:
+                if event['kind'] == 'deleted':
+                    db.remove_note(note_path)
+                    graph.remove_note(note_path)
+                    self.stats['removed'] += 1
+                    continue
+                
+                if not note_path.exists():
+                    continue
+                content = note_path.read_text(encoding='utf-8')
+                
+                if event['kind'] == 'moved':
+                    db.remove_note(Path(event['old_path']))
+                    graph.move_note(Path(event['old_path']), note_path, content)
+                else:
+                    graph.update_note(note_path, content)
+                
+                if self._is_inbox_note(note_path):
+                    self._classify_note(note_path, content, db)
+                else:
+                    category, folder = self._category_from_path(note_path)
+                    db.add_or_update_note(note_path, content, category, folder)
+                    self.stats['indexed'] += 1
+            except Exception as e:
+                self.stats['errors'] += 1
+                log_center.log_error(f"Error auto-clasificando {note_path.name}: {e}", "AutoClassifier")
+        
+        log_center.log_info(f"Lote de auto-clasificación procesado: {len(events)} eventos", "AutoClassifier",
+                            {k: v for k, v in self.stats.items()})
+    
+    def _classify_note(self, note_path: Path, content: str, db):
+        """Clasifica una nota del Inbox con el pipeline híbrido y, si execute, la mueve."""
+        from paralib.organizer import (classify_note_with_complete_analysis, CLASSIFICATION_SYSTEM_PROMPT,
+                                       _get_category_mapping, _safe_rename_file)
+        
+        result = classify_note_with_complete_analysis(
+            content, note_path, "", self._get_model_name(), CLASSIFICATION_SYSTEM_PROMPT, db, self.vault_path
+        )
+        if not result:
+            self.stats['errors'] += 1
+            return
+        
+        category = result.get('category', 'Unknown')
+        folder_name = result.get('folder_name') or None
+        self.stats['classified'] += 1
+        log_center.log_info(f"Auto-clasificado: {note_path.name} → {category}/{folder_name} "
+                            f"(conf: {result.get('confidence', 0):.3f})", "AutoClassifier")
+        
+        final_path = note_path
+        category_folder = _get_category_mapping().get(category)
+        if self.execute and category_folder and category != 'Inbox':
+            target_dir = self.vault_path / category_folder
+            if folder_name:
+                target_dir = target_dir / folder_name
+            target_dir.mkdir(parents=True, exist_ok=True)
+            # Según el backend, watchdog informa el movimiento como moved o como deleted+created
+            self._mark_own_moves(str(note_path), str(target_dir / note_path.name))
+            final_path = _safe_rename_file(note_path, target_dir / note_path.name, self.vault_path, db)
+            self._mark_own_moves(str(final_path))
+            if final_path != note_path:
+                from paralib.vault import get_link_graph
+                get_link_graph(self.vault_path).move_note(note_path, final_path, content)
+                db.remove_note(note_path)
+                self.stats['moved'] += 1
+        
+        db.add_or_update_note(final_path, content, category, folder_name)
+    
+    def stop(self, timeout: float = 30):
+        """Procesa los eventos pendientes y detiene el consumidor."""
+        self.work_queue.stop(timeout)
 
 # Instancia global
-file_watcher = PARAFileWatcher()
+file_watcher = LazyInstance(PARAFileWatcher)
 
 # Función de conveniencia para inicializar todo
-def setup_file_monitoring(vault_path: Path, enable_auto_classification: bool = True) -> tuple:
+def setup_file_monitoring(vault_path: Path, enable_auto_classification: bool = True, execute: bool = False) -> tuple:
     """Configura el monitoreo completo de archivos."""
     try:
         file_watcher.set_vault_path(vault_path)
         
         auto_classifier = None
         if enable_auto_classification:
-            auto_classifier = AutoClassifier(file_watcher)
+            auto_classifier = AutoClassifier(file_watcher, execute=execute)
         
         success = file_watcher.start_watching()
         
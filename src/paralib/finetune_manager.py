@@ -14,6 +14,7 @@ import logging
 
 from .db import ChromaPARADatabase
 from .learning_system import PARA_Learning_System
+from .lazy import LazyInstance
 from .classification_log import export_finetune_dataset
 
 logger = logging.getLogger(__name__)
@@ -724,7 +725,7 @@ Path("para_finetune.modelfile").unlink(missing_ok=True)
 '''
 
 # Instancia global
-finetune_manager = FinetuneManager()
+finetune_manager = LazyInstance(FinetuneManager)
 
 def get_finetune_manager(vault_path: str = None) -> FinetuneManager:
     """Obtiene la instancia global del FinetuneManager."""
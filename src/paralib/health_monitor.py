@@ -22,6 +22,7 @@ import queue
 import os
 
 from .log_center import log_center, log_function_call
+from .lazy import LazyInstance
 
 @dataclass
 class HealthMetric:
@@ -202,8 +203,13 @@ class PARAHealthMonitor:
     def _calculate_error_rate(self) -> float:
         """Calcula la tasa de errores en logs recientes."""
         try:
-            # Implementar cálculo de tasa de errores
-            return 5.0  # Placeholder
+            # Recuento por nivel de la última hora en el índice del log estructurado
+            counts = log_center.count_logs('level', since=datetime.now() - timedelta(hours=1))
+            total = sum(counts.values())
+            if not total:
+                return 0.0
+            errors = counts.get('ERROR', 0) + counts.get('CRITICAL', 0)
+            return errors / total * 100
         except Exception:
             return 0.0
     
@@ -400,7 +406,10 @@ class PARAHealthMonitor:
                 # Verificar errores de clasificación en logs recientes
                 try:
                     log_center.log_info("Analizando errores de clasificación en logs", "HealthMonitor-Classification")
-                    recent_logs = log_center.get_recent_logs(100)
+                    # Warnings y errores de las últimas 24h (consulta indexada, sin releer los archivos de log)
+                    recent_logs = log_center.query_logs(
+                        levels=['WARNING', 'ERROR', 'CRITICAL'], since=datetime.now() - timedelta(hours=24), limit=1000
+                    )
                     
                     # Patrones de error específicos de ChromaDB y clasificación
                     chromadb_error_patterns = [
@@ -769,7 +778,7 @@ class PARAHealthMonitor:
             return {'error': str(e)}
 
 # Instancia global
-health_monitor = PARAHealthMonitor()
+health_monitor = LazyInstance(PARAHealthMonitor)
 
 # Add missing log methods to avoid errors
 def log_auto_fix_attempt(message, component='System'):
@@ -0,0 +1,66 @@
+"""
+paralib/lazy.py
+
+Singletons de módulo diferidos.
+
+``backup_manager = LazyInstance(PARABackupManager)`` deja el nombre importable como siempre
+(``from paralib.backup_manager import backup_manager``) pero el objeto real (con sus hilos,
+directorios, bases SQLite o la detección del backend de IA) se construye en el primer acceso
+a un atributo, no al importar el módulo. Así ``para help`` o ``para status`` no pagan por
+gestores que no usan.
+"""
+import threading
+from typing import Any, Callable
+
+_UNSET = object()
+
+
+class LazyInstance:
+    """Proxy que construye la instancia con ``factory()`` en el primer uso (thread-safe)."""
+    __slots__ = ('_factory', '_instance', '_lock', '__weakref__')
+
+    def __init__(self, factory: Callable[[], Any]):
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_instance', _UNSET)
+        object.__setattr__(self, '_lock', threading.Lock())
+
+    def _resolve(self) -> Any:
+        instance = object.__getattribute__(self, '_instance')
+        if instance is _UNSET:
+            with object.__getattribute__(self, '_lock'):
+                instance = object.__getattribute__(self, '_instance')
+                if instance is _UNSET:
+                    instance = object.__getattribute__(self, '_factory')()
+                    object.__setattr__(self, '_instance', instance)
+        return instance
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._resolve(), name, value)
+
+    def __delattr__(self, name: str):
+        delattr(self._resolve(), name)
+
+    def __dir__(self):
+        return dir(self._resolve())
+
+    def __repr__(self) -> str:
+        instance = object.__getattribute__(self, '_instance')
+        if instance is _UNSET:
+            factory = object.__getattribute__(self, '_factory')
+            return f"<LazyInstance {getattr(factory, '__qualname__', factory)} (sin construir)>"
+        return repr(instance)
+
+
+def is_initialized(proxy: Any) -> bool:
+    """True si ``proxy`` no es un ``LazyInstance`` o si ya construyó su instancia."""
+    if not isinstance(proxy, LazyInstance):
+        return True
+    return object.__getattribute__(proxy, '_instance') is not _UNSET
+
+
+def resolve(proxy: Any) -> Any:
+    """La instancia real detrás de ``proxy`` (para ``isinstance`` o identidad)."""
+    return proxy._resolve() if isinstance(proxy, LazyInstance) else proxy
@@ -8,9 +8,10 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple, Any
 from pathlib import Path
 import json
+import math
 import statistics
-from collections import defaultdict, Counter
-import sqlite3
+import threading
+from collections import defaultdict, Counter, deque
 import re
 
 # SIN PYTORCH NI NUMPY - Solo matemáticas básicas de Python
@@ -39,20 +40,149 @@ class SimpleMath:
 np = SimpleMath()
 
 from paralib.db import ChromaPARADatabase
-from paralib.classification_log import get_feedback_notes, log_feedback
+from paralib.classification_log import (
+    get_feedback_notes, log_feedback, get_history_store, get_history_store_at, HISTORY_DB_NAME,
+    EVENT_CLASSIFICATION, EVENT_FEEDBACK,
+)
 from paralib.vault import load_para_config, save_para_config
 from paralib.logger import logger
+from paralib.sqlite_pool import get_pool, apply_migrations
 
-def init_learning_db_at_path(db_path):
-    """Crea todas las tablas necesarias en la ruta de DB especificada (robusto para portabilidad y QA)."""
-    import sqlite3
-    from pathlib import Path
-    db_path = Path(db_path)
-    db_path.parent.mkdir(exist_ok=True, parents=True)
-    conn = sqlite3.connect(str(db_path))
-    cursor = conn.cursor()
-    # Tabla de métricas de aprendizaje
-    cursor.execute('''
+class RunningLearningAggregates:
+    """
+    Agregados incrementales de aprendizaje: se actualizan en O(1) por evento
+    (conteos, sumas, varianza de Welford y ventana deslizante) en lugar de recalcular
+    sobre todo el historial. Siguen el log de eventos del historial de clasificaciones
+    (``last_event_id``): cada clasificación y cada feedback cuentan una vez, lo registre
+    quien lo registre. ``PARA_Learning_System.rebuild_metrics`` los reconstruye con la
+    misma regla desde el primer evento.
+    """
+    
+    VELOCITY_WINDOW = 10
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Serializa la puesta al día con el historial (sin aplicar dos veces un evento)
+        self.sync_lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        self.last_event_id = 0
+        self.total_classifications = 0
+        self.category_counts = Counter()
+        # Welford para la confianza
+        self.confidence_n = 0
+        self.confidence_mean = 0.0
+        self.confidence_m2 = 0.0
+        # Coherencia semántica (acuerdo con vecinos)
+        self.coherence_sum = 0.0
+        self.coherence_n = 0
+        # Feedback: precisión y correlación confianza/acierto (sumas de Pearson)
+        self.feedback_count = 0
+        self.correct_count = 0
+        self.corr_sums = [0.0, 0.0, 0.0, 0.0, 0.0]  # sx, sy, sxx, syy, sxy
+        self.accuracy_window = deque(maxlen=self.VELOCITY_WINDOW)
+    
+    def add_classification(self, category: str, confidence: float, neighbor_agreement: Optional[float] = None):
+        with self._lock:
+            self.total_classifications += 1
+            self.category_counts[category or 'Unknown'] += 1
+            if confidence:
+                self.confidence_n += 1
+                delta = confidence - self.confidence_mean
+                self.confidence_mean += delta / self.confidence_n
+                self.confidence_m2 += delta * (confidence - self.confidence_mean)
+            if neighbor_agreement is not None:
+                self.coherence_sum += neighbor_agreement
+                self.coherence_n += 1
+    
+    def add_feedback(self, predicted_category: str, actual_category: str, confidence: float):
+        with self._lock:
+            is_correct = 1.0 if predicted_category == actual_category else 0.0
+            self.feedback_count += 1
+            self.correct_count += int(is_correct)
+            x, y = float(confidence or 0), is_correct
+            sums = self.corr_sums
+            sums[0] += x
+            sums[1] += y
+            sums[2] += x * x
+            sums[3] += y * y
+            sums[4] += x * y
+    
+    def push_accuracy(self, accuracy_rate: float):
+        with self._lock:
+            self.accuracy_window.append(accuracy_rate)
+    
+    def accuracy_rate(self) -> float:
+        return (self.correct_count / self.feedback_count * 100) if self.feedback_count else 0.0
+    
+    def confidence_std(self) -> float:
+        return math.sqrt(self.confidence_m2 / (self.confidence_n - 1)) if self.confidence_n > 1 else 0.0
+    
+    def confidence_correlation(self) -> float:
+        n = self.feedback_count
+        if n < 2:
+            return 0.0
+        sx, sy, sxx, syy, sxy = self.corr_sums
+        denominator = math.sqrt(max(n * sxx - sx * sx, 0) * max(n * syy - sy * sy, 0))
+        return (n * sxy - sx * sy) / denominator if denominator else 0.0
+    
+    def category_balance(self) -> float:
+        total = sum(self.category_counts.values())
+        if not total:
+            return 0.0
+        entropy = -sum((c / total) * math.log2(c / total) for c in self.category_counts.values() if c > 0)
+        return entropy / math.log2(4)  # 4 categorías PARA
+    
+    def semantic_coherence(self) -> float:
+        return self.coherence_sum / self.coherence_n if self.coherence_n else 0.5
+    
+    def learning_velocity(self) -> float:
+        values = list(self.accuracy_window)
+        if len(values) < 2:
+            return 0.0
+        n = len(values)
+        mean_x, mean_y = (n - 1) / 2, SimpleMath.mean(values)
+        sxx = sum((i - mean_x) ** 2 for i in range(n))
+        trend = sum((i - mean_x) * (v - mean_y) for i, v in enumerate(values)) / sxx
+        return max(0, min(1, (trend + 0.1) / 0.2))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'last_event_id': self.last_event_id,
+                'total_classifications': self.total_classifications,
+                'category_counts': dict(self.category_counts),
+                'confidence': [self.confidence_n, self.confidence_mean, self.confidence_m2],
+                'coherence': [self.coherence_sum, self.coherence_n],
+                'feedback': [self.feedback_count, self.correct_count],
+                'corr_sums': list(self.corr_sums),
+                'accuracy_window': list(self.accuracy_window),
+            }
+    
+    def load_dict(self, state: Dict[str, Any]):
+        with self._lock:
+            self.reset()
+            self.last_event_id = state.get('last_event_id', 0)
+            self.total_classifications = state.get('total_classifications', 0)
+            self.category_counts = Counter(state.get('category_counts', {}))
+            self.confidence_n, self.confidence_mean, self.confidence_m2 = state.get('confidence', [0, 0.0, 0.0])
+            self.coherence_sum, self.coherence_n = state.get('coherence', [0.0, 0])
+            self.feedback_count, self.correct_count = state.get('feedback', [0, 0])
+            self.corr_sums = list(state.get('corr_sums', [0.0] * 5))
+            self.accuracy_window.extend(state.get('accuracy_window', []))
+
+
+# Agregados compartidos por base de aprendizaje (varias instancias en el mismo proceso)
+_running_aggregates: Dict[str, RunningLearningAggregates] = {}
+_running_aggregates_lock = threading.Lock()
+
+# Migraciones versionadas de learning_system.db (PRAGMA user_version).
+# Nunca editar una migración ya publicada: agregar una nueva con versión mayor.
+LEARNING_DB_MIGRATIONS = [
+    (1, "Esquema base", [
+        # Tabla de métricas de aprendizaje
+        '''
         CREATE TABLE IF NOT EXISTS learning_metrics (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             timestamp TEXT NOT NULL,
@@ -66,9 +196,9 @@ def init_learning_db_at_path(db_path):
             user_satisfaction REAL,
             system_adaptability REAL
         )
-    ''')
-    # Tabla de patrones de aprendizaje
-    cursor.execute('''
+        ''',
+        # Tabla de patrones de aprendizaje
+        '''
         CREATE TABLE IF NOT EXISTS learning_patterns (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             pattern_type TEXT NOT NULL,
@@ -77,9 +207,9 @@ def init_learning_db_at_path(db_path):
             discovered_at TEXT NOT NULL,
             usage_count INTEGER DEFAULT 0
         )
-    ''')
-    # Tabla de feedback sobre carpetas creadas
-    cursor.execute('''
+        ''',
+        # Tabla de feedback sobre carpetas creadas
+        '''
         CREATE TABLE IF NOT EXISTS folder_creation_feedback (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             timestamp TEXT NOT NULL,
@@ -97,9 +227,9 @@ def init_learning_db_at_path(db_path):
             learning_insights TEXT,
             factors_applied TEXT
         )
-    ''')
-    # Tabla de patrones de nombres de carpetas
-    cursor.execute('''
+        ''',
+        # Tabla de patrones de nombres de carpetas
+        '''
         CREATE TABLE IF NOT EXISTS folder_name_patterns (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             pattern TEXT NOT NULL,
@@ -109,9 +239,9 @@ def init_learning_db_at_path(db_path):
             last_used TEXT,
             created_at TEXT NOT NULL
         )
-    ''')
-    # Tabla de ejecuciones de comandos
-    cursor.execute('''
+        ''',
+        # Tabla de ejecuciones de comandos
+        '''
         CREATE TABLE IF NOT EXISTS command_executions (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             timestamp TEXT NOT NULL,
@@ -124,9 +254,80 @@ def init_learning_db_at_path(db_path):
             execution_time REAL,
             user_feedback TEXT
         )
-    ''')
-    conn.commit()
-    conn.close()
+        ''',
+    ]),
+    (2, "Tabla factor_tracking en el esquema base", [
+        '''
+        CREATE TABLE IF NOT EXISTS factor_tracking (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            factor_name TEXT NOT NULL,
+            factor_value TEXT NOT NULL,
+            predicted_category TEXT,
+            confidence REAL,
+            method_used TEXT,
+            folder_name TEXT
+        )
+        ''',
+    ]),
+    (3, "Índices para consultas por fecha, categoría y carpeta", [
+        # Tendencias (get_learning_progress, get_cli_evolution_score_trend, _get_recent_metrics):
+        # índice cubriente para que el rango temporal no toque la tabla
+        '''
+        CREATE INDEX IF NOT EXISTS idx_learning_metrics_ts_trend ON learning_metrics(
+            timestamp, accuracy_rate, improvement_score, learning_velocity,
+            user_satisfaction, system_adaptability
+        )
+        ''',
+        # get_folder_creation_stats: rango temporal + columnas agregadas (cubriente)
+        '''
+        CREATE INDEX IF NOT EXISTS idx_folder_feedback_ts_stats ON folder_creation_feedback(
+            timestamp, folder_name, category, user_feedback, confidence, method_used, semantic_score, ai_score
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_folder_feedback_category ON folder_creation_feedback(category, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_folder_feedback_folder ON folder_creation_feedback(folder_name)",
+        # _update_folder_name_patterns (lookup) y _get_top_folder_patterns (rango por last_used)
+        "CREATE INDEX IF NOT EXISTS idx_folder_patterns_lookup ON folder_name_patterns(pattern, category)",
+        '''
+        CREATE INDEX IF NOT EXISTS idx_folder_patterns_recent ON folder_name_patterns(
+            last_used, usage_count, success_rate
+        )
+        ''',
+        # _update_command_metrics: ventana de 7 días (cubriente)
+        '''
+        CREATE INDEX IF NOT EXISTS idx_command_executions_ts ON command_executions(
+            timestamp, success, confidence, command
+        )
+        ''',
+        # get_factor_analysis: rango temporal agrupado por factor y categoría (cubriente)
+        '''
+        CREATE INDEX IF NOT EXISTS idx_factor_tracking_ts ON factor_tracking(
+            timestamp, factor_name, predicted_category, confidence
+        )
+        ''',
+    ]),
+    (4, "Estado de agregados incrementales de aprendizaje", [
+        '''
+        CREATE TABLE IF NOT EXISTS learning_aggregates (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            state TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+        ''',
+    ]),
+]
+
+def init_learning_db_at_path(db_path):
+    """Crea/migra el esquema en la ruta de DB especificada (robusto para portabilidad y QA)."""
+    from pathlib import Path
+    db_path = Path(db_path)
+    db_path.parent.mkdir(exist_ok=True, parents=True)
+    conn = get_pool(db_path).connect()
+    try:
+        return apply_migrations(conn, LEARNING_DB_MIGRATIONS)
+    finally:
+        conn.close()
 
 class PARA_Learning_System:
     """Sistema de Aprendizaje Autónomo que mejora continuamente la clasificación PARA."""
@@ -163,9 +364,47 @@ class PARA_Learning_System:
             self.config = {}
             self.learning_db_path = Path("default_learning/.para_db/learning_system.db")
         
+    @property
+    def _pool(self):
+        """Pool compartido (WAL) de la base de aprendizaje."""
+        return get_pool(self.learning_db_path)
+    
     def _init_learning_database(self):
         """Inicializa la base de datos de aprendizaje y asegura todas las tablas necesarias."""
         init_learning_db_at_path(self.learning_db_path)
+    
+    @property
+    def _aggregates(self) -> RunningLearningAggregates:
+        """Agregados incrementales compartidos, cargados una vez por proceso desde la DB."""
+        key = str(self.learning_db_path)
+        with _running_aggregates_lock:
+            aggregates = _running_aggregates.get(key)
+            if aggregates is None:
+                aggregates = RunningLearningAggregates()
+                try:
+                    rows = self._pool.query("SELECT state FROM learning_aggregates WHERE id = 1")
+                    if rows:
+                        aggregates.load_dict(json.loads(rows[0][0]))
+                except Exception as e:
+                    logger.warning(f"No se pudieron cargar agregados de aprendizaje: {e}")
+                _running_aggregates[key] = aggregates
+            return aggregates
+    
+    def _save_aggregates(self, sync: bool = False):
+        """Persiste el estado de los agregados (una fila, O(1))."""
+        sql = "INSERT OR REPLACE INTO learning_aggregates (id, state, updated_at) VALUES (1, ?, ?)"
+        params = (json.dumps(self._aggregates.to_dict()), datetime.utcnow().isoformat())
+        if sync:
+            self._pool.execute(sql, params)
+        else:
+            self._pool.submit(sql, params)
+    
+    def _history_store(self):
+        """Store del historial de clasificaciones (vía ChromaDB o, sin DB, vía vault)."""
+        store = get_history_store(self.db)
+        if store is None and self.vault_path is not None:
+            store = get_history_store_at(self.vault_path / ".para_db" / HISTORY_DB_NAME)
+        return store
         
     def learn_from_classification(self, *args, **kwargs) -> Dict[str, Any]:
         """
@@ -262,50 +501,117 @@ class PARA_Learning_System:
         }
     
     def _update_learning_metrics(self, classification_result: Dict = None):
-        """Actualiza las métricas de aprendizaje."""
+        """Actualiza los agregados incrementales y encola un snapshot de métricas (O(1))."""
         try:
+            # Con historial, los agregados lo siguen (_sync_aggregates); sin él, se cuenta aquí
+            if classification_result and self._history_store() is None:
+                self._record_classification(classification_result)
+            else:
+                self._sync_aggregates(save=False)
             metrics = self._calculate_current_metrics()
+            self._aggregates.push_accuracy(metrics['accuracy_rate'])
             self._save_learning_metrics(metrics)
+            self._save_aggregates()
         except Exception as e:
             logger.warning(f"Error actualizando métricas de aprendizaje: {e}")
             # No fallar si hay error en métricas
     
+    def _record_classification(self, classification_result: Dict):
+        """Incorpora a los agregados una clasificación sin historial (y su feedback, si lo trae)."""
+        final_decision = classification_result.get('final_decision') or {}
+        predicted_category = (classification_result.get('predicted_category')
+                              or final_decision.get('category') or 'Unknown')
+        confidence = classification_result.get('confidence', final_decision.get('confidence', 0)) or 0
+        
+        neighbor_agreement = classification_result.get('neighbor_agreement')
+        neighbors = classification_result.get('neighbors')
+        if neighbor_agreement is None and isinstance(neighbors, list) and neighbors:
+            categories = [n.get('category', 'Unknown') for n in neighbors if isinstance(n, dict)]
+            if categories:
+                neighbor_agreement = sum(1 for cat in categories if cat == predicted_category) / len(categories)
+        
+        aggregates = self._aggregates
+        aggregates.add_classification(predicted_category, float(confidence), neighbor_agreement)
+        actual_category = classification_result.get('actual_category')
+        if actual_category:
+            aggregates.add_feedback(predicted_category, actual_category, float(confidence))
+    
+    def _sync_aggregates(self, save: bool = True) -> int:
+        """
+        Aplica a los agregados los eventos del historial posteriores a ``last_event_id``
+        (clasificaciones y feedback de cualquier proceso o comando). Devuelve cuántos aplicó.
+        """
+        store = self._history_store()
+        if store is None:
+            return 0
+        aggregates = self._aggregates
+        applied = 0
+        with aggregates.sync_lock:
+            if aggregates.last_event_id > store.last_event_id():
+                # El historial se recreó: los agregados ya no corresponden a sus eventos
+                logger.warning("Historial de clasificaciones recreado; se reconstruyen los agregados de aprendizaje")
+                aggregates.reset()
+            while True:
+                events = store.events_since(aggregates.last_event_id)
+                if not events:
+                    break
+                for event in events:
+                    if event['event_type'] == EVENT_CLASSIFICATION:
+                        aggregates.add_classification(
+                            event.get('predicted_category') or 'Unknown',
+                            float(event.get('confidence') or 0),
+                            event.get('neighbor_agreement')
+                        )
+                    elif event['event_type'] == EVENT_FEEDBACK and event.get('feedback_category'):
+                        aggregates.add_feedback(
+                            event.get('prior_category'),
+                            event.get('feedback_category'),
+                            float(event.get('prior_confidence') or 0)
+                        )
+                    aggregates.last_event_id = event['id']
+                applied += len(events)
+        if applied and save:
+            self._save_aggregates()
+        return applied
+    
+    def rebuild_metrics(self) -> Dict[str, Any]:
+        """
+        Reconstruye los agregados incrementales desde el historial completo de eventos, con la
+        misma regla de conteo que la actualización incremental. Usar vía `para learn rebuild`.
+        """
+        aggregates = self._aggregates
+        with aggregates.sync_lock:
+            aggregates.reset()
+        self._sync_aggregates(save=False)
+        
+        # _get_recent_metrics ya devuelve orden cronológico, el que espera la ventana de velocidad
+        for metric in self._get_recent_metrics(RunningLearningAggregates.VELOCITY_WINDOW):
+            aggregates.push_accuracy(metric['accuracy_rate'] or 0)
+        
+        self._save_aggregates(sync=True)
+        return self._calculate_current_metrics()
+    
     def _calculate_current_metrics(self) -> Dict[str, Any]:
-        """Calcula las métricas actuales del sistema."""
-        classifications = self._get_all_classifications()
-        feedback_notes = get_feedback_notes(self.db)
+        """Calcula las métricas actuales del sistema a partir de los agregados incrementales."""
+        aggregates = self._aggregates
         
-        total_classifications = len(classifications)
-        feedback_count = len(feedback_notes)
+        total_classifications = aggregates.total_classifications
+        feedback_count = aggregates.feedback_count
         
         # Calcular precisión
-        correct_classifications = sum(1 for note in feedback_notes 
-                                    if note.get('predicted_category') == note.get('feedback_category'))
-        accuracy_rate = (correct_classifications / feedback_count * 100) if feedback_count > 0 else 0
-        
-        # Calcular correlación de confianza
-        confidences = [float(note.get('confidence', 0)) for note in classifications if note.get('confidence')]
-        feedback_confidences = [float(note.get('confidence', 0)) for note in feedback_notes if note.get('confidence')]
+        accuracy_rate = aggregates.accuracy_rate()
         
-        if confidences and feedback_confidences:
-            try:
-                confidence_correlation = SimpleMath.correlation(confidences[:len(feedback_confidences)], feedback_confidences)
-                # Verificar si es NaN (not a number) usando comparación simple
-                if confidence_correlation != confidence_correlation:  # NaN check
-                    confidence_correlation = 0.0
-            except Exception:
-                confidence_correlation = 0.0
-        else:
-            confidence_correlation = 0.0
+        # Correlación entre confianza y acierto (Pearson sobre el feedback)
+        confidence_correlation = aggregates.confidence_correlation()
         
-        # Calcular velocidad de aprendizaje
-        learning_velocity = self._calculate_learning_velocity()
+        # Velocidad de aprendizaje (ventana deslizante de precisión)
+        learning_velocity = aggregates.learning_velocity()
         
-        # Calcular balance de categorías
-        category_balance = self._calculate_category_balance(classifications)
+        # Balance de categorías (entropía de los conteos)
+        category_balance = aggregates.category_balance()
         
-        # Calcular coherencia semántica
-        semantic_coherence = self._calculate_semantic_coherence(classifications)
+        # Coherencia semántica (acuerdo medio con vecinos)
+        semantic_coherence = aggregates.semantic_coherence()
         
         # Calcular satisfacción del usuario
         user_satisfaction = self._calculate_user_satisfaction(feedback_count, total_classifications)
@@ -330,15 +636,12 @@ class PARA_Learning_System:
         }
     
     def _get_all_classifications(self) -> List[Dict]:
-        """Obtiene todas las clasificaciones."""
+        """Obtiene la última clasificación de cada nota desde el historial."""
         try:
-            if self.db is None:
+            store = get_history_store(self.db)
+            if store is None:
                 return []  # Sin DB configurada, devolver lista vacía
-            results = self.db.collection.get(include=["metadatas", "documents"])
-            return [
-                {**meta, "content": doc} 
-                for meta, doc in zip(results.get("metadatas", []), results.get("documents", []))
-            ]
+            return store.latest_classifications()
         except Exception as e:
             logger.warning(f"Error obteniendo clasificaciones: {e}")
             return []
@@ -426,7 +729,7 @@ class PARA_Learning_System:
     
     def _get_recent_metrics(self, limit: int) -> List[Dict]:
         """Obtiene métricas recientes."""
-        conn = sqlite3.connect(self.learning_db_path)
+        conn = self._pool.connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -461,11 +764,8 @@ class PARA_Learning_System:
         return []
     
     def _save_learning_metrics(self, metrics: Dict[str, Any]):
-        """Guarda métricas de aprendizaje."""
-        conn = sqlite3.connect(self.learning_db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        """Encola las métricas de aprendizaje para el escritor en background."""
+        self._pool.submit('''
             INSERT INTO learning_metrics (
                 timestamp, total_classifications, accuracy_rate, confidence_correlation,
                 learning_velocity, improvement_score, category_balance, semantic_coherence,
@@ -477,15 +777,13 @@ class PARA_Learning_System:
             metrics['category_balance'], metrics['semantic_coherence'], metrics['user_satisfaction'],
             metrics['system_adaptability']
         ))
-        
-        conn.commit()
-        conn.close()
     
     def get_learning_progress(self, days: int = 30) -> Dict[str, Any]:
         """Obtiene el progreso de aprendizaje."""
         start_date = (datetime.utcnow() - timedelta(days=days)).isoformat()
+        self._pool.flush()
         
-        conn = sqlite3.connect(self.learning_db_path)
+        conn = self._pool.connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -548,6 +846,7 @@ class PARA_Learning_System:
     
     def create_learning_snapshot(self) -> Dict[str, Any]:
         """Crea un snapshot del estado de aprendizaje."""
+        self._sync_aggregates()
         metrics = self._calculate_current_metrics()
         
         snapshot = {
@@ -709,7 +1008,7 @@ class PARA_Learning_System:
     
     def _save_folder_feedback(self, folder_info: Dict, user_feedback: str, feedback_reason: str):
         """Guarda el feedback sobre la creación de carpetas."""
-        conn = sqlite3.connect(self.learning_db_path)
+        conn = self._pool.connect()
         cursor = conn.cursor()
         
         # Extraer factores supremos si están disponibles
@@ -748,46 +1047,31 @@ class PARA_Learning_System:
     
     def _save_individual_factors(self, factors: Dict, folder_info: Dict):
         """Guarda factores individuales para análisis de impacto."""
-        conn = sqlite3.connect(self.learning_db_path)
+        conn = self._pool.connect()
         cursor = conn.cursor()
         
-        # Crear tabla de factores si no existe
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS factor_tracking (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                factor_name TEXT NOT NULL,
-                factor_value TEXT NOT NULL,
-                predicted_category TEXT,
-                confidence REAL,
-                method_used TEXT,
-                folder_name TEXT
-            )
-        ''')
-        
         timestamp = datetime.utcnow().isoformat()
         
-        for factor_name, factor_value in factors.items():
-            cursor.execute('''
-                INSERT INTO factor_tracking 
-                (timestamp, factor_name, factor_value, predicted_category, confidence, method_used, folder_name)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                timestamp,
-                factor_name,
-                str(factor_value),
-                folder_info.get('category', ''),
-                folder_info.get('confidence', 0),
-                folder_info.get('method_used', ''),
-                folder_info.get('folder_name', '')
-            ))
+        cursor.executemany('''
+            INSERT INTO factor_tracking 
+            (timestamp, factor_name, factor_value, predicted_category, confidence, method_used, folder_name)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', [(
+            timestamp,
+            factor_name,
+            str(factor_value),
+            folder_info.get('category', ''),
+            folder_info.get('confidence', 0),
+            folder_info.get('method_used', ''),
+            folder_info.get('folder_name', '')
+        ) for factor_name, factor_value in factors.items()])
         
         conn.commit()
         conn.close()
     
     def _update_folder_name_patterns(self, folder_name: str, category: str, is_positive: bool):
         """Actualiza los patrones de nombres de carpetas basado en feedback."""
-        conn = sqlite3.connect(self.learning_db_path)
+        conn = self._pool.connect()
         cursor = conn.cursor()
         
         # Buscar patrón existente
@@ -1012,7 +1296,7 @@ class PARA_Learning_System:
     
     def get_folder_creation_stats(self, days: int = 30) -> Dict[str, Any]:
         """Obtiene estadísticas sobre la creación de carpetas."""
-        conn = sqlite3.connect(self.learning_db_path)
+        conn = self._pool.connect()
         cursor = conn.cursor()
         
         # Obtener feedback reciente
@@ -1136,7 +1420,7 @@ class PARA_Learning_System:
     
     def _get_top_folder_patterns(self, days: int) -> List[Dict[str, Any]]:
         """Obtiene los patrones de nombres de carpetas más exitosos."""
-        conn = sqlite3.connect(self.learning_db_path)
+        conn = self._pool.connect()
         cursor = conn.cursor()
         
         cutoff_date = (datetime.utcnow() - timedelta(days=days)).isoformat()
@@ -1273,7 +1557,8 @@ class PARA_Learning_System:
     
     def get_metrics(self) -> Dict[str, Any]:
         """Obtiene todas las métricas disponibles del sistema de aprendizaje."""
-        # Calcular métricas actuales
+        # Calcular métricas actuales (al día con el historial: incluye feedback de otros comandos)
+        self._sync_aggregates()
         current_metrics = self._calculate_current_metrics()
         
         # Obtener progreso de aprendizaje
@@ -1329,9 +1614,10 @@ class PARA_Learning_System:
         Devuelve la evolución temporal del 'Evolución CLI Score' (0-100) y los factores individuales para cada snapshot.
         El score pondera: precisión (40%), score de mejora (20%), velocidad de aprendizaje (15%), satisfacción usuario (15%), adaptabilidad (10%).
         """
-        conn = sqlite3.connect(self.learning_db_path)
+        conn = self._pool.connect()
         cursor = conn.cursor()
         since = (datetime.utcnow() - timedelta(days=days)).isoformat()
+        self._pool.flush()
         cursor.execute(
             """
             SELECT timestamp, accuracy_rate, improvement_score, learning_velocity, user_satisfaction, system_adaptability
@@ -1440,7 +1726,8 @@ class PARA_Learning_System:
     
     def _export_learning_metrics(self) -> List[Dict]:
         """Exporta métricas de aprendizaje."""
-        conn = sqlite3.connect(self.learning_db_path)
+        self._pool.flush()
+        conn = self._pool.connect()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM learning_metrics ORDER BY timestamp DESC")
         rows = cursor.fetchall()
@@ -1480,7 +1767,7 @@ class PARA_Learning_System:
     
     def _export_feedback_data(self) -> List[Dict]:
         """Exporta datos de feedback."""
-        conn = sqlite3.connect(self.learning_db_path)
+        conn = self._pool.connect()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM folder_creation_feedback ORDER BY timestamp DESC")
         rows = cursor.fetchall()
@@ -1498,7 +1785,7 @@ class PARA_Learning_System:
     
     def _export_folder_patterns(self) -> List[Dict]:
         """Exporta patrones de nombres de carpetas."""
-        conn = sqlite3.connect(self.learning_db_path)
+        conn = self._pool.connect()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM folder_name_patterns ORDER BY usage_count DESC")
         rows = cursor.fetchall()
@@ -1554,7 +1841,7 @@ class PARA_Learning_System:
         if not metrics:
             return 0
         
-        conn = sqlite3.connect(self.learning_db_path)
+        conn = self._pool.connect()
         cursor = conn.cursor()
         
         imported = 0
@@ -1590,7 +1877,7 @@ class PARA_Learning_System:
         if not feedback:
             return 0
         
-        conn = sqlite3.connect(self.learning_db_path)
+        conn = self._pool.connect()
         cursor = conn.cursor()
         
         imported = 0
@@ -1617,7 +1904,7 @@ class PARA_Learning_System:
         if not patterns:
             return 0
         
-        conn = sqlite3.connect(self.learning_db_path)
+        conn = self._pool.connect()
         cursor = conn.cursor()
         
         imported = 0
@@ -1673,7 +1960,7 @@ class PARA_Learning_System:
     
     def _get_last_improvement_date(self) -> str:
         """Obtiene fecha de la última mejora."""
-        conn = sqlite3.connect(self.learning_db_path)
+        conn = self._pool.connect()
         cursor = conn.cursor()
         cursor.execute("SELECT timestamp FROM learning_metrics ORDER BY timestamp DESC LIMIT 1")
         result = cursor.fetchone()
@@ -1764,25 +2051,9 @@ class PARA_Learning_System:
         Registra la ejecución de un comando para aprendizaje entre ejecuciones.
         """
         try:
-            conn = sqlite3.connect(self.learning_db_path)
+            conn = self._pool.connect()
             cursor = conn.cursor()
             
-            # Crear tabla si no existe
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS command_executions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT NOT NULL,
-                    command TEXT NOT NULL,
-                    args TEXT,
-                    success INTEGER NOT NULL,
-                    confidence REAL,
-                    reasoning TEXT,
-                    error TEXT,
-                    execution_time REAL,
-                    user_feedback TEXT
-                )
-            """)
-            
             # Insertar registro
             cursor.execute("""
                 INSERT INTO command_executions 
@@ -1810,7 +2081,7 @@ class PARA_Learning_System:
     def _update_command_metrics(self) -> None:
         """Actualiza métricas de aprendizaje basadas en ejecuciones recientes."""
         try:
-            conn = sqlite3.connect(self.learning_db_path)
+            conn = self._pool.connect()
             cursor = conn.cursor()
             
             # Obtener estadísticas de ejecuciones
@@ -1865,7 +2136,7 @@ class PARA_Learning_System:
     def _calculate_learning_velocity(self) -> float:
         """Calcula la velocidad de aprendizaje basada en mejoras recientes."""
         try:
-            conn = sqlite3.connect(self.learning_db_path)
+            conn = self._pool.connect()
             cursor = conn.cursor()
             
             # Obtener métricas de los últimos 7 días
@@ -1904,7 +2175,7 @@ class PARA_Learning_System:
     
     def get_factor_analysis(self, days: int = 30) -> Dict[str, Any]:
         """Analiza el rendimiento de factores supremos."""
-        conn = sqlite3.connect(self.learning_db_path)
+        conn = self._pool.connect()
         cursor = conn.cursor()
         
         # Verificar si existe la tabla
@@ -101,16 +101,39 @@ Devuelve solo el código corregido, pero en la línea corregida agrega un coment
     print(f"[OK] Parche automático aplicado a {file_path}. Backup en {backup_path}")
     register_fixed_bug(file_path, line_num, error_signature, error_message)
 
-def analyze_and_fix_log():
+def _recent_error_lines(limit=500):
+    """
+    Líneas de los errores recientes. Primero del log estructurado (filtro por nivel indexado,
+    sin buscar 'ERROR' en texto libre); si está vacío, de las últimas líneas de para.log.
+    Devuelve None si no hay ningún log que analizar.
+    """
+    try:
+        from paralib.log_center import log_center
+        entries = log_center.query_logs(levels=['ERROR', 'CRITICAL'], limit=limit)
+    except Exception:
+        entries = []
+    if entries:
+        lines = []
+        for entry in entries:
+            # Un traceback guardado en el mensaje conserva sus líneas 'File "...", line N'
+            message_lines = entry.message.splitlines() or ['']
+            lines.append(f"{entry.timestamp} {entry.level} [{entry.component}] {message_lines[0]}")
+            lines.extend(message_lines[1:])
+        return lines
     if not os.path.exists(LOG_PATH):
+        return None
+    with open(LOG_PATH, 'r', encoding='utf-8') as f:
+        lines = f.readlines()[-limit:]
+    return [l for l in lines if 'ERROR' in l or 'CRITICAL' in l]
+
+def analyze_and_fix_log():
+    error_lines = _recent_error_lines()
+    if error_lines is None:
         if RICH:
             Console().print(Panel("No se encontró el archivo de log para analizar.", title="[red]Sin log[/red]"))
         else:
             print("No se encontró el archivo de log para analizar.")
         return
-    with open(LOG_PATH, 'r', encoding='utf-8') as f:
-        lines = f.readlines()[-500:]
-    error_lines = [l for l in lines if 'ERROR' in l or 'CRITICAL' in l]
     if not error_lines:
         if RICH:
             Console().print(Panel("No se detectaron errores recientes.", title="[green]Sin errores[/green]"))
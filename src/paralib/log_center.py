@@ -15,10 +15,15 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, Callable
 from dataclasses import dataclass
 from enum import Enum
-from functools import wraps
 import queue
 import threading
 import traceback
+import atexit
+from collections import deque
+from itertools import islice
+
+from .call_stats import instrument
+from .lazy import LazyInstance
 
 class LogLevel(Enum):
     """Niveles de log personalizados."""
@@ -34,6 +39,90 @@ class LogStatus(Enum):
     RESOLVED = "resolved" # Log resuelto por auto-fix o manual
     IGNORED = "ignored"   # Log ignorado (no requiere acción)
 
+_LEVEL_NUMBERS = {
+    'DEBUG': logging.DEBUG,
+    'INFO': logging.INFO,
+    'WARNING': logging.WARNING,
+    'ERROR': logging.ERROR,
+    'CRITICAL': logging.CRITICAL,
+}
+
+
+class _DeferredMessage:
+    """Mensaje que se compone al escribirse (en el hilo del listener), no al loguear."""
+    __slots__ = ('message', 'component', 'session_id', 'context')
+
+    def __init__(self, message, component, session_id, context):
+        self.message = message
+        self.component = component
+        self.session_id = session_id
+        self.context = context
+
+    def __str__(self):
+        log_message = f"{self.message} | Component: {self.component} | Session: {self.session_id}"
+        if self.context:
+            log_message += f" | Context: {self.context}"
+        return log_message
+
+
+class _JsonLineFormatter(logging.Formatter):
+    """
+    Una línea JSON por entrada con los campos tipados (``ts`` epoch, ``level``, ``component``,
+    ``message``, ``session``, ``context``): el log estructurado se consulta sin regex.
+    """
+
+    def format(self, record):
+        message = record.msg
+        if isinstance(message, _DeferredMessage):
+            data = {
+                'ts': record.created,
+                'level': record.levelname,
+                'component': message.component,
+                'message': str(message.message),
+                'session': message.session_id,
+            }
+            if message.context:
+                data['context'] = message.context
+        else:
+            data = {
+                'ts': record.created,
+                'level': record.levelname,
+                'component': record.name,
+                'message': record.getMessage(),
+            }
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que encola el record sin formatearlo: el formateo ocurre en el listener."""
+
+    def prepare(self, record):
+        return record
+
+
+class _LogCenterListener(logging.handlers.QueueListener):
+    """
+    Listener que acepta, además de records, tuplas ``(levelno, created, mensaje diferido)``
+    encoladas directamente por ``PARALogCenter._log``: el LogRecord se construye aquí, fuera
+    del hilo que loguea (sin ``findCaller`` ni despacho de handlers en el camino caliente).
+    """
+
+    def handle(self, record):
+        # Marca de flush(): todo lo encolado antes ya se escribió
+        if isinstance(record, threading.Event):
+            record.set()
+            return
+        super().handle(record)
+
+    def prepare(self, record):
+        if isinstance(record, tuple):
+            levelno, created, message = record
+            record = logging.LogRecord('PARA_LogCenter', levelno, '', 0, message, None, None)
+            record.created = created
+            record.msecs = (created - int(created)) * 1000
+        return record
+
+
 @dataclass
 class LogEntry:
     """Estructura de entrada de log con gestión de estados."""
@@ -63,6 +152,10 @@ class PARALogCenter:
         # Configuración - AUTO-FIX COMPLETAMENTE DESHABILITADO
         self.auto_fix_enabled = False
         self.max_log_entries = 10000
+        # Nivel mínimo (PARA_LOG_LEVEL): lo que queda por debajo se descarta antes de formatear nada
+        self.level = _LEVEL_NUMBERS.get(os.environ.get('PARA_LOG_LEVEL', 'DEBUG').upper(), logging.DEBUG)
+        self._listener = None
+        self._queue = None
         
         # Configurar logging
         self._setup_logging()
@@ -82,21 +175,34 @@ class PARALogCenter:
             'info': 0
         }
         
-        # Lista simple de logs en memoria
-        self.log_entries = []
+        # Buffer circular de logs en memoria (descarta los más antiguos sin copiar)
+        self.log_entries = deque(maxlen=self.max_log_entries)
         
         # Alertas básicas
         self.alerts = []
         
+        # Índices de archivos de log (lazy, ver get_recent_logs y query_logs)
+        self._log_index = None
+        self._structured_store = None
+        
         # Inicialización silenciosa - NO PRINT
     
     def _setup_logging(self):
-        """Configura logging SOLO A ARCHIVO - SIN CONSOLA."""
+        """
+        Configura logging SOLO A ARCHIVO - SIN CONSOLA.
+        
+        El logger solo encola los records (QueueHandler); un QueueListener en segundo plano
+        los formatea y escribe en el RotatingFileHandler, así loguear no bloquea por I/O.
+        """
         self.logger = logging.getLogger('PARA_LogCenter')
         self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
         
         # Evitar duplicación
         if self.logger.handlers:
+            for handler in self.logger.handlers:
+                if isinstance(handler, _DeferredQueueHandler):
+                    self._queue = handler.queue
             return
         
         # Handler SOLO para archivo - NO CONSOLA
@@ -114,11 +220,53 @@ class PARALogCenter:
         
         main_handler.setFormatter(formatter)
         
-        # SOLO agregar handler de archivo - NO CONSOLA
-        self.logger.addHandler(main_handler)
+        # Log estructurado (JSON lines) para consultas filtradas: ver query_logs
+        structured_handler = logging.handlers.RotatingFileHandler(
+            self.log_dir / "para_system.jsonl",
+            maxBytes=20*1024*1024,  # 20MB
+            backupCount=5,
+            encoding='utf-8'
+        )
+        structured_handler.setLevel(logging.DEBUG)
+        structured_handler.setFormatter(_JsonLineFormatter())
+        
+        # SOLO agregar handlers de archivo - NO CONSOLA, a través de la cola
+        self._queue = queue.SimpleQueue()
+        self._listener = _LogCenterListener(self._queue, main_handler, structured_handler, respect_handler_level=True)
+        self._listener.start()
+        self.logger.addHandler(_DeferredQueueHandler(self._queue))
+        # Al salir se vacía la cola antes de cerrar el archivo
+        atexit.register(self.shutdown)
+    
+    def flush(self, timeout: float = 5.0):
+        """Espera a que el listener haya escrito todo lo encolado."""
+        if self._queue is None:
+            return
+        marker = threading.Event()
+        self._queue.put_nowait(marker)
+        marker.wait(timeout)
+    
+    def shutdown(self):
+        """Detiene el listener (escribe lo pendiente y cierra los archivos)."""
+        if self._listener is not None and self._listener._thread is not None:
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+    
+    def set_level(self, level: str):
+        """Cambia el nivel mínimo que se registra (DEBUG, INFO, WARNING, ERROR, CRITICAL)."""
+        self.level = _LEVEL_NUMBERS.get(level.upper(), logging.DEBUG)
+    
+    def is_enabled_for(self, level: str) -> bool:
+        return _LEVEL_NUMBERS.get(level, logging.INFO) >= self.level
     
     def _log(self, level: str, message: str, component: str = "Unknown", context: Dict = None, session_id: str = None):
         """Método interno de logging simplificado."""
+        levelno = _LEVEL_NUMBERS.get(level, logging.INFO)
+        # Nivel deshabilitado: no se crea la entrada ni se formatea el mensaje
+        if levelno < self.level:
+            return
+        
         if context is None:
             context = {}
         
@@ -126,7 +274,8 @@ class PARALogCenter:
             session_id = self._generate_session_id()
         
         # Crear entrada de log simple
-        timestamp = datetime.now()
+        created = time.time()
+        timestamp = datetime.fromtimestamp(created)
         log_entry = {
             'timestamp': timestamp,
             'level': level,
@@ -136,13 +285,9 @@ class PARALogCenter:
             'session_id': session_id
         }
         
-        # Agregar a lista en memoria
+        # Agregar al buffer en memoria (maxlen: solo se mantienen los últimos logs)
         self.log_entries.append(log_entry)
         
-        # Mantener solo los últimos logs
-        if len(self.log_entries) > self.max_log_entries:
-            self.log_entries = self.log_entries[-self.max_log_entries:]
-        
         # Actualizar métricas
         self.metrics['total_logs'] += 1
         if level == 'ERROR':
@@ -152,22 +297,12 @@ class PARALogCenter:
         elif level == 'INFO':
             self.metrics['info'] += 1
         
-        # Log a archivo usando el logger estándar
-        log_message = f"{message} | Component: {component} | Session: {session_id}"
-        if context:
-            log_message += f" | Context: {context}"
-        
-        if hasattr(self, 'logger'):
-            if level == 'ERROR':
-                self.logger.error(log_message)
-            elif level == 'WARNING':
-                self.logger.warning(log_message)
-            elif level == 'INFO':
-                self.logger.info(log_message)
-            elif level == 'DEBUG':
-                self.logger.debug(log_message)
-            else:
-                self.logger.info(log_message)
+        # Log a archivo: se encola sin formatear; el listener compone el texto al escribirlo
+        deferred = _DeferredMessage(message, component, session_id, context)
+        if self._queue is not None:
+            self._queue.put_nowait((levelno, created, deferred))
+        elif hasattr(self, 'logger'):
+            self.logger.log(levelno, deferred)
     
     def log_info(self, message: str, component: str = "System", extra_data: dict = None, verbose: bool = False, session_id: str = None):
         """Log información general - SOLO A ARCHIVO."""
@@ -192,9 +327,7 @@ class PARALogCenter:
     
     def _generate_session_id(self) -> str:
         """Genera un ID de sesión único."""
-        import random
-        import string
-        return ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
+        return os.urandom(4).hex()
     
     def get_log_stats(self) -> dict:
         """Obtiene estadísticas de logs de forma segura."""
@@ -213,68 +346,106 @@ class PARALogCenter:
                 'auto_fixes_applied': 0
             }
     
+    def _get_log_index(self):
+        """Índice SQLite de ``para_system.log`` (se crea al primer uso)."""
+        if self._log_index is None:
+            from .log_store import LogIndex
+            self._log_index = LogIndex(self.log_dir / "log_index.db")
+        return self._log_index
+    
+    def _get_structured_store(self):
+        """Índice SQLite de ``para_system.jsonl`` (se crea al primer uso)."""
+        if self._structured_store is None:
+            from .log_store import StructuredLogStore
+            self._structured_store = StructuredLogStore(self.log_dir / "log_events.db", self.log_dir / "para_system.jsonl")
+        return self._structured_store
+    
+    @staticmethod
+    def _event_to_entry(event) -> LogEntry:
+        return LogEntry(
+            timestamp=str(event.timestamp),
+            level=event.level,
+            component=event.component,
+            message=event.message,
+            context=event.context or {},
+            session_id=event.session_id or 'unknown'
+        )
+    
+    def query_logs(self, levels=None, components=None, since=None, until=None,
+                   session_id: str = None, contains: str = None, limit: Optional[int] = 100) -> List[LogEntry]:
+        """
+        Consulta el log estructurado por nivel, componente (admite prefijos ``CLI-*``), rango
+        de tiempo (``datetime`` o epoch), sesión y texto. Devuelve las ``limit`` entradas más
+        recientes que cumplen los filtros, las más antiguas primero.
+        """
+        try:
+            self.flush()
+            events = self._get_structured_store().query(
+                levels=levels, components=components, since=since, until=until,
+                session_id=session_id, contains=contains, limit=limit
+            )
+            return [self._event_to_entry(event) for event in events]
+        except Exception as e:
+            try:
+                self._log('ERROR', f"Error consultando logs: {e}", 'LogCenter')
+            except:
+                pass
+            return []
+    
+    def count_logs(self, group_by: str = 'level', levels=None, components=None, since=None, until=None) -> Dict[str, int]:
+        """Recuento de entradas del log estructurado agrupado por nivel, componente o sesión."""
+        try:
+            self.flush()
+            return self._get_structured_store().count_by(
+                group_by, levels=levels, components=components, since=since, until=until
+            )
+        except Exception as e:
+            try:
+                self._log('ERROR', f"Error contando logs: {e}", 'LogCenter')
+            except:
+                pass
+            return {}
+    
     def get_recent_logs(self, limit: int = 100) -> List[LogEntry]:
         """Obtiene los logs más recientes de forma segura."""
         try:
-            # Devolver logs desde memoria primero
-            if self.log_entries:
-                recent_from_memory = []
-                for entry in self.log_entries[-limit:]:
-                    try:
-                        log_entry = LogEntry(
-                            timestamp=str(entry.get('timestamp', datetime.now())),
-                            level=entry.get('level', 'INFO'),
-                            component=entry.get('component', 'System'),
-                            message=entry.get('message', ''),
-                            context=entry.get('context', {}),
-                            session_id=entry.get('session_id', 'unknown')
+            # Si la memoria ya tiene suficientes entradas no hace falta leer archivos
+            if len(self.log_entries) < limit:
+                self.flush()
+                entries = self.query_logs(limit=limit)
+                if entries:
+                    return entries
+                # Sin log estructurado (logs anteriores): índice del log de texto
+                records = self._get_log_index().recent(self.log_dir / "para_system.log", limit)
+                if records:
+                    return [
+                        LogEntry(
+                            timestamp=record.timestamp,
+                            level=record.level,
+                            component=record.component,
+                            message=record.message,
+                            context={},
+                            session_id=record.session_id or 'file_log'
                         )
-                        recent_from_memory.append(log_entry)
-                    except Exception:
-                        # Si hay error creando LogEntry, continuar con el siguiente
-                        continue
-                return recent_from_memory
-            
-            # Fallback: leer desde archivo
-            log_files = sorted(self.log_dir.glob("para_system.log*"), reverse=True)
-            if not log_files:
-                return []
+                        for record in records
+                    ]
             
-            recent_logs = []
-            with open(log_files[0], 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                for line in lines[-limit:]:
-                    if line.strip():
-                        try:
-                            # Parsear línea de log básica con manejo seguro
-                            parts = line.split(' | ')
-                            timestamp = datetime.now().isoformat()
-                            level = 'INFO'
-                            message = line.strip()
-                            
-                            if len(parts) >= 1 and '[' in parts[0] and ']' in parts[0]:
-                                timestamp_part = parts[0].strip('[]').split('] ')
-                                if len(timestamp_part) >= 2:
-                                    timestamp = timestamp_part[0]
-                                    level = timestamp_part[1]
-                            
-                            if len(parts) >= 2:
-                                message = parts[1]
-                            
-                            log_entry = LogEntry(
-                                timestamp=timestamp,
-                                level=level,
-                                component='System',
-                                message=message,
-                                context={},
-                                session_id='file_log'
-                            )
-                            recent_logs.append(log_entry)
-                        except Exception:
-                            # Si hay error parseando una línea, continuar con la siguiente
-                            continue
-            
-            return recent_logs[-limit:]
+            recent_from_memory = []
+            for entry in islice(self.log_entries, max(0, len(self.log_entries) - limit), None):
+                try:
+                    log_entry = LogEntry(
+                        timestamp=str(entry.get('timestamp', datetime.now())),
+                        level=entry.get('level', 'INFO'),
+                        component=entry.get('component', 'System'),
+                        message=entry.get('message', ''),
+                        context=entry.get('context', {}),
+                        session_id=entry.get('session_id', 'unknown')
+                    )
+                    recent_from_memory.append(log_entry)
+                except Exception:
+                    # Si hay error creando LogEntry, continuar con el siguiente
+                    continue
+            return recent_from_memory
         except Exception as e:
             # Log error de forma segura sin causar recursión
             try:
@@ -332,7 +503,7 @@ class PARALogCenter:
     def get_recent_errors_by_type(self, error_type: str, hours: int = 24) -> list:
         """Obtiene errores recientes de un tipo específico."""
         try:
-            recent_logs = self.get_recent_logs(100)
+            recent_logs = self.query_logs(levels=['ERROR', 'CRITICAL'], since=datetime.now() - timedelta(hours=hours), limit=1000)
             filtered_errors = []
             
             patterns = {
@@ -344,11 +515,10 @@ class PARALogCenter:
             search_patterns = patterns.get(error_type.lower(), [error_type])
             
             for log_entry in recent_logs:
-                if log_entry.level.upper() in ['ERROR', 'CRITICAL']:
-                    for pattern in search_patterns:
-                        if pattern.lower() in log_entry.message.lower():
-                            filtered_errors.append(log_entry)
-                            break
+                for pattern in search_patterns:
+                    if pattern.lower() in log_entry.message.lower():
+                        filtered_errors.append(log_entry)
+                        break
             
             return filtered_errors
             
@@ -356,48 +526,41 @@ class PARALogCenter:
             self.log_error(f"Error obteniendo errores recientes por tipo: {e}", "LogCenter")
             return []
 
-# Instancia global
-log_center = PARALogCenter()
+# Instancia global (diferida: logs/, handlers, hilo del QueueListener y atexit se crean en el primer uso)
+log_center = LazyInstance(PARALogCenter)
 
-def log_function_call(func: Callable) -> Callable:
-    """Decorador para loggear llamadas a funciones."""
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        start_time = time.time()
+def log_function_call(func: Callable = None, *, sample_rate: Optional[float] = None) -> Callable:
+    """
+    Decorador para medir llamadas a funciones: ``@log_function_call`` o
+    ``@log_function_call(sample_rate=0.1)``.
+    
+    Los tiempos van a un histograma en memoria (``get_call_stats``) y los errores al log; las
+    entradas de inicio/fin solo se escriben con ``PARA_CALL_TRACING=log``. Con
+    ``PARA_CALL_TRACING=off`` devuelve la función sin envolver (ver ``paralib.call_stats``).
+    """
+    if func is None:
+        return lambda f: log_function_call(f, sample_rate=sample_rate)
+    
+    def on_start():
         session_id = log_center._generate_session_id()
-        
-        try:
-            # Log de inicio
-            log_center.log_info(
-                f"Iniciando función: {func.__name__}",
-                component=func.__module__,
-                session_id=session_id
-            )
-            
-            # Ejecutar función
-            result = func(*args, **kwargs)
-            
-            # Log de éxito
-            execution_time = time.time() - start_time
-            log_center.log_info(
-                f"Función completada: {func.__name__} ({execution_time:.2f}s)",
-                component=func.__module__,
-                session_id=session_id
-            )
-            
-            return result
-            
-        except Exception as e:
-            # Log de error
-            execution_time = time.time() - start_time
-            log_center.log_error(
-                f"Error en función: {func.__name__} - {str(e)}",
-                component=func.__module__,
-                session_id=session_id
-            )
-            raise
+        log_center.log_info(f"Iniciando función: {func.__name__}", component=func.__module__, session_id=session_id)
+        return session_id
+    
+    def on_end(session_id, elapsed_ns):
+        log_center.log_info(
+            f"Función completada: {func.__name__} ({elapsed_ns / 1e9:.2f}s)",
+            component=func.__module__,
+            session_id=session_id
+        )
+    
+    def on_error(session_id, error, elapsed_ns):
+        log_center.log_error(
+            f"Error en función: {func.__name__} - {str(error)}",
+            component=func.__module__,
+            session_id=session_id
+        )
     
-    return wrapper
+    return instrument(func, on_error, sample_rate=sample_rate, on_start=on_start, on_end=on_end)
 
 def log_streamlit_action(action: str, component: str = 'Dashboard'):
     """Log de acciones de Streamlit."""
@@ -7,7 +7,6 @@ Analiza logs automáticamente, resuelve problemas comunes y mantiene métricas d
 """
 import re
 import json
-import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
@@ -16,6 +15,8 @@ from enum import Enum
 import logging
 
 from .logger import logger
+from .log_store import LogTailer, parse_detailed_records, parse_log_timestamp, record_signature
+from .sqlite_pool import get_pool
 
 class LogStatus(Enum):
     PENDING = "pending"
@@ -40,6 +41,8 @@ class PARALogManager:
         self.db_path = db_path or Path(__file__).parent.parent / "logs" / "log_manager.db"
         self.db_path.parent.mkdir(exist_ok=True)
         self._init_database()
+        # Checkpoints de lectura de los logs: cada análisis solo parsea los bytes nuevos
+        self._tailer = LogTailer(self.db_path)
         
         # Patrones de auto-resolución
         self.auto_resolution_patterns = {
@@ -86,7 +89,7 @@ class PARALogManager:
     
     def _init_database(self):
         """Inicializa la base de datos del log manager."""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -118,11 +121,32 @@ class PARALogManager:
             )
         ''')
         
+        # Firma única por entrada: la deduplicación es un INSERT OR IGNORE sobre el índice
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(log_entries)")]
+        if 'signature' not in columns:
+            cursor.execute("ALTER TABLE log_entries ADD COLUMN signature TEXT")
+            rows = cursor.execute("SELECT id, timestamp, level, module, message FROM log_entries").fetchall()
+            cursor.executemany(
+                "UPDATE log_entries SET signature = ? WHERE id = ?",
+                [(record_signature(ts, level, module, message), row_id) for row_id, ts, level, module, message in rows]
+            )
+            # Entradas duplicadas de versiones anteriores: se conserva la primera
+            cursor.execute('''
+                DELETE FROM log_entries WHERE id NOT IN (SELECT MIN(id) FROM log_entries GROUP BY signature)
+            ''')
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_log_entries_signature ON log_entries(signature)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_log_entries_status ON log_entries(status, timestamp)")
+        
         conn.commit()
         conn.close()
     
     def analyze_log_file(self, log_file_path: str = None) -> Dict:
-        """Analiza el archivo de logs principal y procesa las entradas."""
+        """
+        Analiza el archivo de logs principal y procesa las entradas nuevas.
+        
+        Solo se parsea lo escrito desde el análisis anterior (checkpoint por inode/offset,
+        incluidas las rotaciones ``.1``...``.N``) y las entradas se guardan en un solo lote.
+        """
         if not log_file_path:
             log_file_path = Path(__file__).parent.parent / "logs" / "para.log"
         
@@ -130,29 +154,37 @@ class PARALogManager:
             logger.warning(f"Log file not found: {log_file_path}")
             return {'processed': 0, 'auto_resolved': 0, 'pending': 0}
         
-        processed = 0
-        auto_resolved = 0
-        pending = 0
+        tail = self._tailer.read_new(log_file_path, parse_detailed_records)
+        log_entries = self._records_to_entries(tail.records)
         
-        with open(log_file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        # Descartar las ya guardadas (y repetidas en el lote) antes de intentar resolverlas
+        candidates = {}
+        for entry in log_entries:
+            if entry.level in ['ERROR', 'WARNING', 'CRITICAL']:
+                candidates.setdefault(self._entry_signature(entry), entry)
+        existing = self._existing_signatures(list(candidates))
+        new_entries = [(signature, entry) for signature, entry in candidates.items() if signature not in existing]
         
-        # Parsear entradas de log
-        log_entries = self._parse_log_entries(content)
+        auto_resolved = 0
+        pending = 0
+        for _, entry in new_entries:
+            if self._resolve_entry(entry) == LogStatus.AUTO_RESOLVED:
+                auto_resolved += 1
+            else:
+                pending += 1
         
-        for entry in log_entries:
-            if self._should_process_entry(entry):
-                status = self._analyze_and_resolve(entry)
-                if status == LogStatus.AUTO_RESOLVED:
-                    auto_resolved += 1
-                elif status == LogStatus.PENDING:
-                    pending += 1
-                processed += 1
+        conn = get_pool(self.db_path).connect()
+        try:
+            self._insert_entries(conn, new_entries)
+            self._tailer.commit(log_file_path, tail, conn)
+            conn.commit()
+        finally:
+            conn.close()
         
         self._update_metrics()
         
         return {
-            'processed': processed,
+            'processed': len(new_entries),
             'auto_resolved': auto_resolved,
             'pending': pending,
             'total_in_db': self._get_total_logs_in_db()
@@ -160,33 +192,40 @@ class PARALogManager:
     
     def _parse_log_entries(self, content: str) -> List[LogEntry]:
         """Parsea el contenido del archivo de logs."""
+        data = content.encode('utf-8')
+        records, _ = parse_detailed_records(data, 0, len(data))
+        return self._records_to_entries(records)
+    
+    def _records_to_entries(self, records) -> List[LogEntry]:
         entries = []
-        
-        # Patrón para entradas de log
-        pattern = r'\[([^\]]+)\] ([A-Z]+) \[([^:]+):([^:]+):(\d+)\] \[PID:(\d+)\] \[TID:(\d+)\]\n(.*?)\n' + '-'*80
-        
-        matches = re.finditer(pattern, content, re.DOTALL)
-        
-        for match in matches:
-            timestamp_str, level, name, module, lineno, pid, tid, message = match.groups()
-            
-            try:
-                timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
-                
-                entry = LogEntry(
-                    id=len(entries) + 1,
-                    timestamp=timestamp,
-                    level=level,
-                    module=module,
-                    message=message.strip(),
-                    status=LogStatus.PENDING
-                )
-                entries.append(entry)
-            except ValueError:
+        for record in records:
+            timestamp = parse_log_timestamp(record.timestamp)
+            if timestamp is None:
                 continue
-        
+            entries.append(LogEntry(
+                id=len(entries) + 1,
+                timestamp=timestamp,
+                level=record.level,
+                module=record.component,
+                message=record.message,
+                status=LogStatus.PENDING
+            ))
         return entries
     
+    @staticmethod
+    def _entry_signature(entry: LogEntry) -> str:
+        return record_signature(entry.timestamp.isoformat(), entry.level, entry.module, entry.message)
+    
+    def _existing_signatures(self, signatures: List[str]) -> set:
+        existing = set()
+        for i in range(0, len(signatures), 500):
+            chunk = signatures[i:i + 500]
+            rows = get_pool(self.db_path).query(
+                f"SELECT signature FROM log_entries WHERE signature IN ({', '.join('?' for _ in chunk)})", chunk
+            )
+            existing.update(row[0] for row in rows)
+        return existing
+    
     def _should_process_entry(self, entry: LogEntry) -> bool:
         """Determina si una entrada debe ser procesada."""
         # Solo procesar errores y warnings
@@ -198,20 +237,10 @@ class PARALogManager:
     
     def _entry_exists(self, entry: LogEntry) -> bool:
         """Verifica si una entrada ya existe en la base de datos."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT id FROM log_entries 
-            WHERE timestamp = ? AND level = ? AND module = ? AND message = ?
-        ''', (entry.timestamp.isoformat(), entry.level, entry.module, entry.message))
-        
-        exists = cursor.fetchone() is not None
-        conn.close()
-        return exists
+        return bool(self._existing_signatures([self._entry_signature(entry)]))
     
-    def _analyze_and_resolve(self, entry: LogEntry) -> LogStatus:
-        """Analiza una entrada de log e intenta resolverla automáticamente."""
+    def _resolve_entry(self, entry: LogEntry) -> LogStatus:
+        """Intenta resolver una entrada con los patrones de auto-resolución (sin guardarla)."""
         entry.auto_resolution_attempted = True
         
         for pattern, resolver_func in self.auto_resolution_patterns.items():
@@ -222,26 +251,36 @@ class PARALogManager:
                         entry.status = LogStatus.AUTO_RESOLVED
                         entry.resolution = resolution
                         entry.resolved_at = datetime.now()
-                        self._save_entry(entry)
                         return LogStatus.AUTO_RESOLVED
                 except Exception as e:
                     logger.error(f"Error in auto-resolution: {e}")
         
         # Si no se pudo resolver automáticamente, marcar como pendiente
         entry.status = LogStatus.PENDING
-        self._save_entry(entry)
         return LogStatus.PENDING
     
+    def _analyze_and_resolve(self, entry: LogEntry) -> LogStatus:
+        """Analiza una entrada de log e intenta resolverla automáticamente."""
+        status = self._resolve_entry(entry)
+        self._save_entry(entry)
+        return status
+    
     def _save_entry(self, entry: LogEntry):
         """Guarda una entrada en la base de datos."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO log_entries 
-            (timestamp, level, module, message, status, resolution, resolved_at, auto_resolution_attempted)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        conn = get_pool(self.db_path).connect()
+        try:
+            self._insert_entries(conn, [(self._entry_signature(entry), entry)])
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def _insert_entries(self, conn, entries):
+        """Inserta ``(firma, entrada)`` en lote; las firmas ya guardadas se ignoran."""
+        conn.executemany('''
+            INSERT OR IGNORE INTO log_entries 
+            (timestamp, level, module, message, status, resolution, resolved_at, auto_resolution_attempted, signature)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [(
             entry.timestamp.isoformat(),
             entry.level,
             entry.module,
@@ -249,11 +288,9 @@ class PARALogManager:
             entry.status.value,
             entry.resolution,
             entry.resolved_at.isoformat() if entry.resolved_at else None,
-            entry.auto_resolution_attempted
-        ))
-        
-        conn.commit()
-        conn.close()
+            entry.auto_resolution_attempted,
+            signature
+        ) for signature, entry in entries])
     
     # Funciones de auto-resolución
     def _resolve_model_not_found(self, entry: LogEntry) -> Optional[str]:
@@ -354,7 +391,7 @@ class PARALogManager:
     
     def get_pending_logs(self, limit: int = 10) -> List[LogEntry]:
         """Obtiene logs pendientes (solo los que no están resueltos)."""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         cursor.execute('''
             SELECT id, timestamp, level, module, message, status, resolution, resolved_at, auto_resolution_attempted
@@ -382,7 +419,7 @@ class PARALogManager:
 
     def get_resolved_logs(self, limit: int = 20) -> List[LogEntry]:
         """Obtiene logs resueltos (auto o manualmente) para historial."""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         cursor.execute('''
             SELECT id, timestamp, level, module, message, status, resolution, resolved_at, auto_resolution_attempted
@@ -410,7 +447,7 @@ class PARALogManager:
     
     def mark_as_resolved(self, log_id: int, resolution: str):
         """Marca un log como resuelto manualmente solo si está pendiente."""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         # Solo actualizar si está pendiente
         cursor.execute('''
@@ -424,7 +461,7 @@ class PARALogManager:
     
     def _get_total_logs_in_db(self) -> int:
         """Obtiene el total de logs en la base de datos."""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
         cursor.execute('SELECT COUNT(*) FROM log_entries')
@@ -435,7 +472,7 @@ class PARALogManager:
     
     def _update_metrics(self):
         """Actualiza las métricas del log manager."""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
         # Obtener estadísticas
@@ -480,7 +517,7 @@ class PARALogManager:
     
     def get_recent_activity(self, hours: int = 24) -> Dict:
         """Obtiene actividad reciente."""
-        conn = sqlite3.connect(self.db_path)
+        conn = get_pool(self.db_path).connect()
         cursor = conn.cursor()
         
         since = datetime.now() - timedelta(hours=hours)
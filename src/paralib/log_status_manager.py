@@ -4,16 +4,27 @@ paralib/log_status_manager.py
 
 Gestor de estados de logs para PARA System.
 Permite marcar logs como resueltos, nuevos o ignorados.
+
+Los errores se agrupan por huella (``error_fingerprint``): la plantilla del mensaje sin
+números, rutas ni identificadores, junto con el componente. El estado vive en SQLite
+(``log_status.db``) con índices por huella, estado y nivel, así registrar una entrada,
+agrupar errores recurrentes o resolverlos es una sola consulta indexada y cada cambio se
+persiste con un UPSERT de una fila (sin reescribir todo el archivo).
 """
 
+import hashlib
 import json
+import re
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass
 from enum import Enum
 
+from .sqlite_pool import apply_migrations, get_pool
+from .lazy import LazyInstance
+
 class LogStatus(Enum):
     """Estados de los logs."""
     NEW = "new"           # Log nuevo, no procesado
@@ -36,167 +47,308 @@ class LogEntryWithStatus:
     resolved_by: Optional[str] = None
     auto_fix_applied: bool = False
     error_signature: Optional[str] = None
+    occurrences: int = 1
+    first_seen: Optional[str] = None
+    last_seen: Optional[str] = None
+
+# --- Huellas de error ---
+
+_UUID = re.compile(r'\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b')
+_HEX = re.compile(r'\b(?:0x[0-9a-fA-F]+|(?=[0-9a-fA-F]*\d)(?=[0-9a-fA-F]*[a-fA-F])[0-9a-fA-F]{6,})\b')
+_ABSOLUTE_PATH = re.compile(r'(?<![\w.])(?:[A-Za-z]:\\|~?/)[^\s\'"]*')
+_RELATIVE_PATH = re.compile(r'\b[\w.-]+(?:[\\/][\w.-]+)+')
+_NUMBER = re.compile(r'\b\d+(?:[.,:]\d+)*')
+_SPACES = re.compile(r'\s+')
+
+
+def message_template(message: str) -> str:
+    """Plantilla de un mensaje: rutas, ids, hashes y números sustituidos por marcadores."""
+    template = _UUID.sub('<id>', message or '')
+    template = _ABSOLUTE_PATH.sub('<path>', template)
+    template = _RELATIVE_PATH.sub('<path>', template)
+    template = _HEX.sub('<hex>', template)
+    template = _NUMBER.sub('<n>', template)
+    return _SPACES.sub(' ', template).strip()
+
+
+def error_fingerprint(message: str, component: str = None) -> str:
+    """Huella estable de un error: mismo componente y misma plantilla de mensaje."""
+    raw = f"{component or ''}\x1f{message_template(message)}"
+    return hashlib.md5(raw.encode('utf-8', errors='replace')).hexdigest()[:16]
+
+
+LOG_STATUS_MIGRATIONS = [
+    (1, "Estado de logs agrupado por huella", [
+        '''
+        CREATE TABLE IF NOT EXISTS log_status (
+            id TEXT PRIMARY KEY,
+            fingerprint TEXT NOT NULL,
+            template TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            level TEXT NOT NULL,
+            component TEXT NOT NULL,
+            message TEXT NOT NULL,
+            context TEXT,
+            session_id TEXT,
+            status TEXT NOT NULL DEFAULT 'new',
+            resolution_notes TEXT,
+            resolved_at TEXT,
+            resolved_by TEXT,
+            auto_fix_applied INTEGER NOT NULL DEFAULT 0,
+            occurrences INTEGER NOT NULL DEFAULT 1,
+            first_seen TEXT NOT NULL,
+            last_seen TEXT NOT NULL
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_log_status_fingerprint ON log_status(fingerprint)",
+        "CREATE INDEX IF NOT EXISTS idx_log_status_template ON log_status(template)",
+        "CREATE INDEX IF NOT EXISTS idx_log_status_status ON log_status(status, last_seen)",
+        "CREATE INDEX IF NOT EXISTS idx_log_status_level ON log_status(level)",
+        "CREATE INDEX IF NOT EXISTS idx_log_status_occurrences ON log_status(occurrences)",
+    ]),
+]
+
+_COLUMNS = ('id, timestamp, level, component, message, context, session_id, status, resolution_notes, '
+            'resolved_at, resolved_by, auto_fix_applied, fingerprint, occurrences, first_seen, last_seen')
+
+
+def _row_to_entry(row) -> LogEntryWithStatus:
+    (log_id, timestamp, level, component, message, context, session_id, status, notes,
+     resolved_at, resolved_by, auto_fix_applied, fingerprint, occurrences, first_seen, last_seen) = row
+    try:
+        context = json.loads(context) if context else {}
+    except ValueError:
+        context = {}
+    return LogEntryWithStatus(
+        id=log_id, timestamp=timestamp, level=level, component=component, message=message,
+        context=context, session_id=session_id, status=LogStatus(status), resolution_notes=notes,
+        resolved_at=resolved_at, resolved_by=resolved_by, auto_fix_applied=bool(auto_fix_applied),
+        error_signature=fingerprint, occurrences=occurrences, first_seen=first_seen, last_seen=last_seen
+    )
 
 class LogStatusManager:
     """Gestor de estados de logs."""
-    
+
     def __init__(self, status_file: str = "logs/log_status.json"):
+        # ``status_file`` es el JSON de versiones anteriores: se importa una vez a la base SQLite
         self.status_file = Path(status_file)
         self.status_file.parent.mkdir(exist_ok=True)
-        self.log_entries: Dict[str, LogEntryWithStatus] = {}
+        self.db_path = self.status_file.with_suffix('.db')
+        self._pool = get_pool(self.db_path)
+        conn = self._pool.connect()
+        try:
+            apply_migrations(conn, LOG_STATUS_MIGRATIONS)
+        finally:
+            conn.close()
         self._load_status()
-    
+
     def _load_status(self):
-        """Carga el estado de logs desde archivo."""
+        """Importa el ``log_status.json`` antiguo (si existe) y lo renombra a ``.json.migrated``."""
         try:
-            if self.status_file.exists():
-                with open(self.status_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    for entry_data in data.get('entries', []):
-                        entry = LogEntryWithStatus(
-                            id=entry_data['id'],
-                            timestamp=entry_data['timestamp'],
-                            level=entry_data['level'],
-                            component=entry_data['component'],
-                            message=entry_data['message'],
-                            context=entry_data.get('context', {}),
-                            session_id=entry_data['session_id'],
-                            status=LogStatus(entry_data.get('status', 'new')),
-                            resolution_notes=entry_data.get('resolution_notes'),
-                            resolved_at=entry_data.get('resolved_at'),
-                            resolved_by=entry_data.get('resolved_by'),
-                            auto_fix_applied=entry_data.get('auto_fix_applied', False),
-                            error_signature=entry_data.get('error_signature')
-                        )
-                        self.log_entries[entry.id] = entry
+            if not self.status_file.exists():
+                return
+            with open(self.status_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            entries = data.get('entries', [])
+            # El CLI guardaba un dict {id: estado}; LogStatusManager, una lista de entradas
+            if isinstance(entries, dict):
+                entries = [dict(value, id=key) for key, value in entries.items() if isinstance(value, dict)]
+            for entry_data in entries:
+                now = entry_data.get('timestamp') or datetime.now().isoformat()
+                entry = LogEntryWithStatus(
+                    id=entry_data['id'],
+                    timestamp=now,
+                    level=entry_data.get('level', 'ERROR'),
+                    component=entry_data.get('component', 'Unknown'),
+                    message=entry_data.get('message', ''),
+                    context=entry_data.get('context', {}),
+                    session_id=entry_data.get('session_id', 'unknown'),
+                    status=LogStatus(entry_data.get('status', 'new')),
+                    resolution_notes=entry_data.get('resolution_notes'),
+                    resolved_at=entry_data.get('resolved_at'),
+                    resolved_by=entry_data.get('resolved_by'),
+                    auto_fix_applied=entry_data.get('auto_fix_applied', False),
+                    error_signature=entry_data.get('error_signature')
+                )
+                self._upsert(entry)
+            self.status_file.rename(self.status_file.with_name(self.status_file.name + '.migrated'))
         except Exception as e:
             print(f"Error cargando estado de logs: {e}")
-    
+
     def _save_status(self):
-        """Guarda el estado de logs a archivo."""
-        try:
-            data = {
-                'last_updated': datetime.now().isoformat(),
-                'entries': [asdict(entry) for entry in self.log_entries.values()]
-            }
-            with open(self.status_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"Error guardando estado de logs: {e}")
-    
+        """Compatibilidad: cada cambio ya se persiste al momento en SQLite."""
+        return None
+
+    def _upsert(self, entry: LogEntryWithStatus):
+        fingerprint = entry.error_signature or error_fingerprint(entry.message, entry.component)
+        entry.error_signature = fingerprint
+        first_seen = entry.first_seen or entry.timestamp
+        last_seen = entry.last_seen or entry.timestamp
+        with self._pool.connection() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO log_status ({_COLUMNS}, template) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (entry.id, entry.timestamp, entry.level, entry.component, entry.message,
+                 json.dumps(entry.context or {}, ensure_ascii=False, default=str), entry.session_id,
+                 entry.status.value, entry.resolution_notes, entry.resolved_at, entry.resolved_by,
+                 int(entry.auto_fix_applied), fingerprint, entry.occurrences, first_seen, last_seen,
+                 message_template(entry.message))
+            )
+
+    def _select(self, where: str = "", params: tuple = (), suffix: str = "") -> List[LogEntryWithStatus]:
+        rows = self._pool.query(f"SELECT {_COLUMNS} FROM log_status {where} {suffix}", params)
+        return [_row_to_entry(row) for row in rows]
+
     def add_log_entry(self, log_entry: LogEntryWithStatus):
         """Agrega una nueva entrada de log."""
-        self.log_entries[log_entry.id] = log_entry
-        self._save_status()
-    
-    def mark_as_resolved(self, log_id: str, resolution_notes: str = None, 
+        self._upsert(log_entry)
+
+    def record_log(self, level: str, component: str, message: str, timestamp: str = None,
+                   session_id: str = None, context: Dict[str, Any] = None) -> Tuple[LogEntryWithStatus, bool]:
+        """
+        Registra una ocurrencia en el grupo de su huella con un UPSERT atómico (varios procesos
+        pueden registrar a la vez sin perder incrementos). Devuelve (grupo, si es nuevo).
+        Una entrada que no es más reciente que la última vista (releída) no suma ocurrencias.
+        Un grupo resuelto vuelve a NEW si reaparece después de ``resolved_at`` (regresión);
+        uno ignorado conserva su estado.
+        """
+        timestamp = str(timestamp or datetime.now().isoformat())
+        fingerprint = error_fingerprint(message, component)
+        newer = "excluded.last_seen > log_status.last_seen"
+        # Los logs usan "YYYY-MM-DD HH:MM:SS" y resolved_at ISO con "T": se comparan normalizados
+        reopen = (f"{newer} AND log_status.status = '{LogStatus.RESOLVED.value}' AND "
+                  "replace(excluded.last_seen, ' ', 'T') > replace(COALESCE(log_status.resolved_at, ''), ' ', 'T')")
+        conn = self._pool.connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            is_new = conn.execute("SELECT 1 FROM log_status WHERE id = ?", (fingerprint,)).fetchone() is None
+            conn.execute(
+                f"INSERT INTO log_status ({_COLUMNS}, template) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL, NULL, NULL, 0, ?, 1, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET "
+                f"status = CASE WHEN {reopen} THEN '{LogStatus.NEW.value}' ELSE log_status.status END, "
+                f"resolved_at = CASE WHEN {reopen} THEN NULL ELSE log_status.resolved_at END, "
+                f"resolved_by = CASE WHEN {reopen} THEN NULL ELSE log_status.resolved_by END, "
+                f"auto_fix_applied = CASE WHEN {reopen} THEN 0 ELSE log_status.auto_fix_applied END, "
+                f"occurrences = log_status.occurrences + CASE WHEN {newer} THEN 1 ELSE 0 END, "
+                f"timestamp = CASE WHEN {newer} THEN excluded.timestamp ELSE log_status.timestamp END, "
+                f"message = CASE WHEN {newer} THEN excluded.message ELSE log_status.message END, "
+                f"session_id = CASE WHEN {newer} AND ? IS NOT NULL THEN excluded.session_id "
+                "ELSE log_status.session_id END, "
+                f"last_seen = CASE WHEN {newer} THEN excluded.last_seen ELSE log_status.last_seen END",
+                (fingerprint, timestamp, level, component, message,
+                 json.dumps(context or {}, ensure_ascii=False, default=str), session_id or 'unknown',
+                 LogStatus.NEW.value, fingerprint, timestamp, timestamp, message_template(message), session_id)
+            )
+            row = conn.execute(f"SELECT {_COLUMNS} FROM log_status WHERE id = ?", (fingerprint,)).fetchone()
+            conn.commit()
+        finally:
+            conn.close()
+        return _row_to_entry(row), is_new
+
+    def get_log_by_id(self, log_id: str) -> Optional[LogEntryWithStatus]:
+        entries = self._select("WHERE id = ?", (log_id,))
+        return entries[0] if entries else None
+
+    def _set_status(self, log_id: str, status: LogStatus, notes: Optional[str], resolved_by: str,
+                    auto_fix_applied: bool) -> bool:
+        with self._pool.connection() as conn:
+            cursor = conn.execute(
+                "UPDATE log_status SET status = ?, resolution_notes = ?, resolved_at = ?, resolved_by = ?, "
+                "auto_fix_applied = ? WHERE id = ?",
+                (status.value, notes, datetime.now().isoformat(), resolved_by, int(auto_fix_applied), log_id)
+            )
+            return cursor.rowcount > 0
+
+    def mark_as_resolved(self, log_id: str, resolution_notes: str = None,
                         resolved_by: str = "auto-fix", auto_fix_applied: bool = True):
-        """Marca un log como resuelto."""
-        if log_id in self.log_entries:
-            entry = self.log_entries[log_id]
-            entry.status = LogStatus.RESOLVED
-            entry.resolution_notes = resolution_notes
-            entry.resolved_at = datetime.now().isoformat()
-            entry.resolved_by = resolved_by
-            entry.auto_fix_applied = auto_fix_applied
-            self._save_status()
-            return True
-        return False
-    
+        """Marca un log (o el grupo de su huella) como resuelto."""
+        return self._set_status(log_id, LogStatus.RESOLVED, resolution_notes, resolved_by, auto_fix_applied)
+
     def mark_as_ignored(self, log_id: str, reason: str = None):
-        """Marca un log como ignorado."""
-        if log_id in self.log_entries:
-            entry = self.log_entries[log_id]
-            entry.status = LogStatus.IGNORED
-            entry.resolution_notes = f"Ignorado: {reason}" if reason else "Ignorado manualmente"
-            entry.resolved_at = datetime.now().isoformat()
-            entry.resolved_by = "manual"
-            self._save_status()
-            return True
-        return False
-    
+        """Marca un log (o el grupo de su huella) como ignorado."""
+        notes = f"Ignorado: {reason}" if reason else "Ignorado manualmente"
+        return self._set_status(log_id, LogStatus.IGNORED, notes, "manual", False)
+
     def get_new_logs(self) -> List[LogEntryWithStatus]:
         """Obtiene logs con estado NEW."""
-        return [entry for entry in self.log_entries.values() 
-                if entry.status == LogStatus.NEW]
-    
+        return self.get_logs_by_status(LogStatus.NEW)
+
     def get_resolved_logs(self) -> List[LogEntryWithStatus]:
         """Obtiene logs resueltos."""
-        return [entry for entry in self.log_entries.values() 
-                if entry.status == LogStatus.RESOLVED]
-    
+        return self.get_logs_by_status(LogStatus.RESOLVED)
+
     def get_ignored_logs(self) -> List[LogEntryWithStatus]:
         """Obtiene logs ignorados."""
-        return [entry for entry in self.log_entries.values() 
-                if entry.status == LogStatus.IGNORED]
-    
+        return self.get_logs_by_status(LogStatus.IGNORED)
+
     def get_logs_by_status(self, status: LogStatus) -> List[LogEntryWithStatus]:
         """Obtiene logs por estado específico."""
-        return [entry for entry in self.log_entries.values() 
-                if entry.status == status]
-    
+        return self._select("WHERE status = ?", (status.value,), "ORDER BY last_seen")
+
     def get_error_logs(self) -> List[LogEntryWithStatus]:
         """Obtiene logs de error (nuevos o resueltos)."""
-        return [entry for entry in self.log_entries.values() 
-                if entry.level.upper() in ['ERROR', 'CRITICAL']]
-    
+        return self._select("WHERE level IN ('ERROR', 'CRITICAL')")
+
     def get_warning_logs(self) -> List[LogEntryWithStatus]:
         """Obtiene logs de warning."""
-        return [entry for entry in self.log_entries.values() 
-                if entry.level.upper() == 'WARNING']
-    
+        return self._select("WHERE level = 'WARNING'")
+
+    def get_recurring_errors(self, min_occurrences: int = 2, status: Optional[LogStatus] = None,
+                             limit: int = 50) -> List[LogEntryWithStatus]:
+        """Grupos de error que se repiten, de más a menos ocurrencias."""
+        where, params = "WHERE occurrences >= ?", [min_occurrences]
+        if status is not None:
+            where += " AND status = ?"
+            params.append(status.value)
+        params.append(limit)
+        return self._select(where, tuple(params), "ORDER BY occurrences DESC LIMIT ?")
+
     def get_stats(self) -> Dict[str, Any]:
         """Obtiene estadísticas de logs por estado."""
-        total = len(self.log_entries)
-        new_count = len(self.get_new_logs())
-        resolved_count = len(self.get_resolved_logs())
-        ignored_count = len(self.get_ignored_logs())
-        error_count = len(self.get_error_logs())
-        warning_count = len(self.get_warning_logs())
-        
+        by_status = dict(self._pool.query("SELECT status, COUNT(*) FROM log_status GROUP BY status"))
+        by_level = dict(self._pool.query("SELECT level, COUNT(*) FROM log_status GROUP BY level"))
+        occurrences = self._pool.query("SELECT COALESCE(SUM(occurrences), 0) FROM log_status")[0][0]
+        total = sum(by_status.values())
+        resolved_count = by_status.get(LogStatus.RESOLVED.value, 0)
+
         return {
             'total': total,
-            'new': new_count,
+            'new': by_status.get(LogStatus.NEW.value, 0),
             'resolved': resolved_count,
-            'ignored': ignored_count,
-            'errors': error_count,
-            'warnings': warning_count,
+            'ignored': by_status.get(LogStatus.IGNORED.value, 0),
+            'errors': by_level.get('ERROR', 0) + by_level.get('CRITICAL', 0),
+            'warnings': by_level.get('WARNING', 0),
+            'occurrences': occurrences,
             'resolution_rate': (resolved_count / total * 100) if total > 0 else 0
         }
-    
+
     def cleanup_old_resolved_logs(self, days: int = 7):
         """Limpia logs resueltos antiguos."""
-        cutoff_time = datetime.now().timestamp() - (days * 24 * 3600)
-        to_remove = []
-        
-        for log_id, entry in self.log_entries.items():
-            if entry.status == LogStatus.RESOLVED and entry.resolved_at:
-                try:
-                    resolved_time = datetime.fromisoformat(entry.resolved_at).timestamp()
-                    if resolved_time < cutoff_time:
-                        to_remove.append(log_id)
-                except:
-                    pass
-        
-        for log_id in to_remove:
-            del self.log_entries[log_id]
-        
-        if to_remove:
-            self._save_status()
-            return len(to_remove)
-        return 0
-    
+        cutoff = datetime.fromtimestamp(time.time() - days * 24 * 3600).isoformat()
+        with self._pool.connection() as conn:
+            cursor = conn.execute(
+                "DELETE FROM log_status WHERE status = ? AND resolved_at IS NOT NULL AND resolved_at < ?",
+                (LogStatus.RESOLVED.value, cutoff)
+            )
+            return cursor.rowcount
+
     def find_similar_logs(self, message: str, component: str = None) -> List[LogEntryWithStatus]:
-        """Encuentra logs similares basado en mensaje y componente."""
-        similar = []
-        message_lower = message.lower()
-        
-        for entry in self.log_entries.values():
-            if message_lower in entry.message.lower():
-                if component is None or entry.component == component:
-                    similar.append(entry)
-        
-        return similar
+        """
+        Encuentra logs similares: primero por huella (índice), y si no hay ninguno, por
+        subcadena del mensaje.
+        """
+        if component is not None:
+            similar = self._select("WHERE fingerprint = ?", (error_fingerprint(message, component),))
+        else:
+            similar = self._select("WHERE template = ?", (message_template(message),))
+        if similar:
+            return similar
+        where, params = "WHERE instr(lower(message), ?) > 0", [message.lower()]
+        if component is not None:
+            where += " AND component = ?"
+            params.append(component)
+        return self._select(where, tuple(params))
 
 # Instancia global
-log_status_manager = LogStatusManager() 
\ No newline at end of file
+log_status_manager = LazyInstance(LogStatusManager)
@@ -0,0 +1,582 @@
+"""
+paralib/log_store.py
+
+Lectura incremental e indexada de los logs de PARA.
+
+Los archivos de log (y sus rotaciones ``.1`` ... ``.N``) se leen con ``mmap`` a partir de un
+checkpoint persistido en SQLite (inode, offset y hash de la cabecera del archivo), de modo
+que cada consulta solo parsea los bytes escritos desde la anterior. Las entradas se guardan
+en lote con un índice único por firma, así releer un tramo (rotación, caída antes de guardar
+el checkpoint) nunca duplica registros.
+
+- ``LogTailer``: checkpoints y lectura de bytes nuevos con un parser dado.
+- ``LogIndex``: índice de entradas consultable (``recent``) para ``PARALogCenter``.
+- ``StructuredLogStore``: índice del log estructurado (JSON lines) de ``PARALogCenter`` con
+  consultas por nivel, componente, rango de tiempo y sesión sin parsear texto libre.
+"""
+import hashlib
+import json
+import mmap
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from .logger import logger
+from .sqlite_pool import apply_migrations, get_pool
+
+# Bytes de cabecera que identifican el contenido de un archivo (detecta truncados y reutilización de inode)
+HEAD_BYTES = 256
+# Máximo de entradas que conserva el índice por archivo de log
+MAX_INDEXED_RECORDS = 100_000
+# Primera lectura de un log (sin checkpoints): solo se parsean las entradas más recientes
+INITIAL_BACKFILL_RECORDS = 20_000
+# Ventana inicial (bytes desde el final) para localizar esas entradas; crece x4 si no alcanza
+BACKFILL_WINDOW = 1024 * 1024
+# Máximo de eventos que conserva el índice del log estructurado
+MAX_STRUCTURED_EVENTS = 5_000_000
+# A partir de este lote (p. ej. la primera sincronización) los índices se reconstruyen tras insertar
+BULK_REINDEX_THRESHOLD = 50_000
+
+CHECKPOINT_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS log_checkpoints (
+        source TEXT NOT NULL,
+        inode INTEGER NOT NULL,
+        offset INTEGER NOT NULL,
+        head_len INTEGER NOT NULL,
+        head_hash TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        PRIMARY KEY (source, inode)
+    )
+'''
+
+
+class LogRecord(NamedTuple):
+    timestamp: str
+    level: str
+    component: str
+    message: str
+    session_id: Optional[str] = None
+
+    @property
+    def signature(self) -> str:
+        return record_signature(self.timestamp, self.level, self.component, self.message)
+
+
+def record_signature(timestamp: str, level: str, component: str, message: str) -> str:
+    """Firma estable de una entrada: clave del índice único de deduplicación."""
+    raw = f"{timestamp}\x1f{level}\x1f{component}\x1f{message}"
+    return hashlib.md5(raw.encode('utf-8', errors='replace')).hexdigest()
+
+
+def parse_log_timestamp(value: str) -> Optional[datetime]:
+    """Timestamp de ``logging`` (``2024-01-31 12:00:00,123``) o sin milisegundos."""
+    for fmt in ('%Y-%m-%d %H:%M:%S,%f', '%Y-%m-%d %H:%M:%S'):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _decode(data: bytes) -> str:
+    return data.decode('utf-8', errors='replace')
+
+
+# --- Parsers: (buffer, inicio, fin) -> (entradas, offset consumido) ---
+
+# Formato detallado de PARALogger (para.log): cabecera, mensaje multilínea y separador de 80 guiones
+DETAILED_RECORD = re.compile(
+    rb'\[([^\]\n]+)\] ([A-Z]+) \[([^:\]\n]+):([^:\]\n]+):(\d+)\] \[PID:(\d+)\] \[TID:(\d+)\]\n(.*?)\n-{80}\n',
+    re.DOTALL
+)
+DETAILED_HEADER = re.compile(rb'^\[[^\]\n]+\] [A-Z]+ \[[^:\]\n]+:[^:\]\n]+:\d+\] \[PID:', re.MULTILINE)
+
+# Formato simple de PARALogCenter (para_system.log): una línea por entrada
+SIMPLE_RECORD = re.compile(rb'^\[([^\]\n]+)\] ([A-Z]+) \[([^\]\n]+)\] (.*)$', re.MULTILINE)
+LOG_CENTER_MESSAGE = re.compile(r'^(.*?) \| Component: (.*?) \| Session: (\S+)(?: \| Context: .*)?$', re.DOTALL)
+
+
+def parse_detailed_records(buffer, start: int, end: int) -> Tuple[List[LogRecord], int]:
+    records = []
+    consumed = start
+    for match in DETAILED_RECORD.finditer(buffer, start, end):
+        timestamp, level, _, module, _, _, _, message = match.groups()
+        records.append(LogRecord(_decode(timestamp), _decode(level), _decode(module), _decode(message).strip()))
+        consumed = match.end()
+    # Lo que queda tras la última entrada: si no empieza ninguna cabecera son líneas sueltas
+    # (no forman parte de una entrada) y se consumen; si hay una, puede estar a medio escribir
+    pending = DETAILED_HEADER.search(buffer, consumed, end)
+    if pending is None:
+        last_newline = buffer.rfind(b'\n', consumed, end)
+        if last_newline >= 0:
+            consumed = last_newline + 1
+    return records, consumed
+
+
+def parse_simple_records(buffer, start: int, end: int) -> Tuple[List[LogRecord], int]:
+    # Solo líneas completas: una línea a medio escribir se lee en la próxima pasada
+    last_newline = buffer.rfind(b'\n', start, end)
+    if last_newline < 0:
+        return [], start
+    complete = last_newline + 1
+    records = []
+    for match in SIMPLE_RECORD.finditer(buffer, start, complete):
+        timestamp, level, _, raw_message = (_decode(group) for group in match.groups())
+        component, session_id, message = 'System', None, raw_message
+        parsed = LOG_CENTER_MESSAGE.match(raw_message)
+        if parsed:
+            message, component, session_id = parsed.groups()
+        records.append(LogRecord(timestamp, level, component, message.strip(), session_id))
+    return records, complete
+
+
+class LogEvent(NamedTuple):
+    """Entrada del log estructurado: campos tipados, tal como se escribieron."""
+    ts: float
+    level: str
+    component: str
+    message: str
+    session_id: Optional[str] = None
+    context: Optional[Dict[str, Any]] = None
+
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.fromtimestamp(self.ts)
+
+    @property
+    def signature(self) -> str:
+        return event_signature(self.ts, self.level, self.component, self.message)
+
+
+def event_signature(ts: float, level: str, component: str, message: str) -> str:
+    """Firma de un evento estructurado (``ts`` con toda su precisión, como se guarda en REAL)."""
+    return record_signature(repr(float(ts)), level, component, message)
+
+
+def parse_json_records(buffer, start: int, end: int) -> Tuple[List[LogEvent], int]:
+    """Parser del log estructurado: un objeto JSON por línea (las líneas inválidas se saltan)."""
+    last_newline = buffer.rfind(b'\n', start, end)
+    if last_newline < 0:
+        return [], start
+    complete = last_newline + 1
+    lines = [line for line in buffer[start:complete].splitlines() if line.strip()]
+    try:
+        # Todo el bloque en una sola llamada a json.loads (el bucle queda en C)
+        items = json.loads(b'[' + b','.join(lines) + b']')
+    except ValueError:
+        # Alguna línea corrupta (p. ej. escritura cortada): se parsean una a una y se saltan
+        items = []
+        for line in lines:
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                continue
+    events = []
+    for data in items:
+        try:
+            events.append(LogEvent(
+                float(data['ts']), data['level'], data.get('component') or 'System',
+                data.get('message', ''), data.get('session'), data.get('context') or None
+            ))
+        except (KeyError, TypeError, ValueError, AttributeError):
+            continue
+    return events, complete
+
+
+Parser = Callable[..., Tuple[List[Any], int]]
+
+
+def rotated_files(log_path: Path) -> List[Path]:
+    """Archivo de log y sus rotaciones, del más antiguo al más reciente."""
+    log_path = Path(log_path)
+    rotations = []
+    for candidate in log_path.parent.glob(f"{log_path.name}.*"):
+        suffix = candidate.name[len(log_path.name) + 1:]
+        if suffix.isdigit():
+            rotations.append((int(suffix), candidate))
+    files = [path for _, path in sorted(rotations, reverse=True)]
+    if log_path.exists():
+        files.append(log_path)
+    return files
+
+
+def _head_hash(buffer, length: int) -> str:
+    return hashlib.md5(buffer[:length]).hexdigest()
+
+
+class TailResult(NamedTuple):
+    records: List[LogRecord]
+    checkpoints: List[Tuple[int, int, int, str]]
+
+
+class LogTailer:
+    """Checkpoints de lectura por archivo de log, persistidos en una base SQLite."""
+
+    def __init__(self, db_path):
+        self._pool = get_pool(db_path)
+        with self._pool.connection() as conn:
+            conn.execute(CHECKPOINT_TABLE_SQL)
+
+    def _load(self, source: str) -> Dict[int, Tuple[int, int, str]]:
+        rows = self._pool.query(
+            "SELECT inode, offset, head_len, head_hash FROM log_checkpoints WHERE source = ?", (source,)
+        )
+        return {row[0]: (row[1], row[2], row[3]) for row in rows}
+
+    def read_new(self, log_path, parser: Parser, backfill: Optional[int] = INITIAL_BACKFILL_RECORDS) -> TailResult:
+        """
+        Parsea solo lo escrito desde el último checkpoint en ``log_path`` y sus rotaciones
+        (un archivo rotado conserva su inode, así lo que quedó sin leer antes de rotar se lee
+        desde ``.1``). La primera vez solo se leen las ``backfill`` entradas más recientes
+        (todas si ``backfill`` es None). El checkpoint no se guarda hasta llamar a ``commit``.
+        """
+        source = str(Path(log_path).resolve())
+        known = self._load(source)
+        remaining = backfill if not known else None
+        per_file: List[List[LogRecord]] = []
+        checkpoints = []
+        # Del más reciente al más antiguo, para que el backfill inicial tome las últimas entradas
+        for path in reversed(rotated_files(Path(log_path))):
+            try:
+                with open(path, 'rb') as f:
+                    st = os.fstat(f.fileno())
+                    if st.st_size == 0:
+                        continue
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                        if remaining is None:
+                            offset = self._resume_offset(buffer, st.st_size, known.get(st.st_ino))
+                            new_records = []
+                            if offset < st.st_size:
+                                new_records, offset = parser(buffer, offset, st.st_size)
+                        else:
+                            new_records, offset = self._read_tail(buffer, st.st_size, parser, remaining)
+                            remaining -= len(new_records)
+                        per_file.append(new_records)
+                        head_len = min(offset, HEAD_BYTES)
+                        checkpoints.append((st.st_ino, offset, head_len, _head_hash(buffer, head_len)))
+            except (OSError, ValueError) as e:
+                logger.warning(f"No se pudo leer el log {path}: {e}")
+        records = [record for file_records in reversed(per_file) for record in file_records]
+        return TailResult(records, checkpoints)
+
+    @staticmethod
+    def _read_tail(buffer, size: int, parser: Parser, wanted: int) -> Tuple[List[LogRecord], int]:
+        """Últimas ``wanted`` entradas de un archivo, parseando ventanas crecientes desde el final."""
+        if wanted <= 0:
+            return [], parser(buffer, size, size)[1] if size else 0
+        window = BACKFILL_WINDOW
+        while True:
+            start = max(0, size - window)
+            if start > 0:
+                # Empezar en un inicio de línea; una entrada cortada por la ventana se descarta
+                newline = buffer.find(b'\n', start, size)
+                start = newline + 1 if newline >= 0 else size
+            records, consumed = parser(buffer, start, size)
+            if len(records) >= wanted or start == 0:
+                return records[-wanted:], consumed
+            window *= 4
+
+    @staticmethod
+    def _resume_offset(buffer, size: int, checkpoint: Optional[Tuple[int, int, str]]) -> int:
+        if checkpoint is None:
+            return 0
+        offset, head_len, head_hash = checkpoint
+        # Archivo truncado o inode reutilizado por otro contenido: se lee desde el principio
+        if offset > size or _head_hash(buffer, head_len) != head_hash:
+            return 0
+        return offset
+
+    def commit(self, log_path, result: TailResult, conn=None):
+        """Guarda los checkpoints (en ``conn`` si se pasa, para confirmarlos junto con las entradas)."""
+        source = str(Path(log_path).resolve())
+        now = datetime.now().isoformat()
+        rows = [(source, inode, offset, head_len, head_hash, now)
+                for inode, offset, head_len, head_hash in result.checkpoints]
+
+        def write(connection):
+            # Los inodes que ya no están (rotaciones eliminadas) se olvidan
+            connection.execute("DELETE FROM log_checkpoints WHERE source = ?", (source,))
+            connection.executemany(
+                "INSERT INTO log_checkpoints (source, inode, offset, head_len, head_hash, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+
+        if conn is not None:
+            write(conn)
+        else:
+            with self._pool.connection() as connection:
+                write(connection)
+
+
+LOG_INDEX_MIGRATIONS = [
+    (1, "Índice de entradas de log", [
+        CHECKPOINT_TABLE_SQL,
+        '''
+        CREATE TABLE IF NOT EXISTS log_records (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            level TEXT NOT NULL,
+            component TEXT NOT NULL,
+            message TEXT NOT NULL,
+            session_id TEXT,
+            signature TEXT NOT NULL
+        )
+        ''',
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_log_records_signature ON log_records(source, signature)",
+        "CREATE INDEX IF NOT EXISTS idx_log_records_level ON log_records(source, level)",
+    ]),
+]
+
+
+class LogIndex:
+    """Índice SQLite de las entradas de un log, alimentado de forma incremental."""
+
+    def __init__(self, db_path, parser: Parser = parse_simple_records):
+        self.parser = parser
+        self._pool = get_pool(db_path)
+        conn = self._pool.connect()
+        try:
+            apply_migrations(conn, LOG_INDEX_MIGRATIONS)
+        finally:
+            conn.close()
+        self._tailer = LogTailer(db_path)
+
+    def sync(self, log_path) -> int:
+        """Indexa lo escrito desde la última sincronización. Devuelve las entradas nuevas."""
+        source = str(Path(log_path).resolve())
+        result = self._tailer.read_new(log_path, self.parser)
+        if not result.records and not result.checkpoints:
+            return 0
+        with self._pool.connection() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO log_records "
+                "(source, timestamp, level, component, message, session_id, signature) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(source, r.timestamp, r.level, r.component, r.message, r.session_id, r.signature)
+                 for r in result.records]
+            )
+            inserted = conn.total_changes - before
+            if inserted:
+                # Retención por rango de id (clave primaria): sin recorrer el índice
+                max_id = conn.execute("SELECT MAX(id) FROM log_records").fetchone()[0] or 0
+                conn.execute(
+                    "DELETE FROM log_records WHERE source = ? AND id <= ?",
+                    (source, max_id - MAX_INDEXED_RECORDS)
+                )
+            self._tailer.commit(log_path, result, conn)
+        return inserted
+
+    def recent(self, log_path, limit: int = 100, levels: Optional[List[str]] = None) -> List[LogRecord]:
+        """Últimas ``limit`` entradas (las más antiguas primero), tras sincronizar los bytes nuevos."""
+        self.sync(log_path)
+        source = str(Path(log_path).resolve())
+        sql = "SELECT timestamp, level, component, message, session_id FROM log_records WHERE source = ?"
+        params: list = [source]
+        if levels:
+            sql += f" AND level IN ({', '.join('?' for _ in levels)})"
+            params.extend(levels)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        return [LogRecord(*row) for row in reversed(self._pool.query(sql, params))]
+
+
+STRUCTURED_LOG_INDEXES = [
+    ('idx_log_events_ts', "CREATE INDEX IF NOT EXISTS idx_log_events_ts ON log_events(ts)"),
+    ('idx_log_events_level', "CREATE INDEX IF NOT EXISTS idx_log_events_level ON log_events(level, ts)"),
+    ('idx_log_events_component', "CREATE INDEX IF NOT EXISTS idx_log_events_component ON log_events(component, ts)"),
+    ('idx_log_events_session', "CREATE INDEX IF NOT EXISTS idx_log_events_session ON log_events(session_id, ts)"),
+]
+
+STRUCTURED_LOG_MIGRATIONS = [
+    (1, "Índice del log estructurado", [
+        CHECKPOINT_TABLE_SQL,
+        '''
+        CREATE TABLE IF NOT EXISTS log_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ts REAL NOT NULL,
+            level TEXT NOT NULL,
+            component TEXT NOT NULL,
+            message TEXT NOT NULL,
+            session_id TEXT,
+            context TEXT
+        )
+        ''',
+    ] + [sql for _, sql in STRUCTURED_LOG_INDEXES]),
+    (2, "Firma única de eventos estructurados", [
+        "ALTER TABLE log_events ADD COLUMN signature TEXT",
+        # Eventos ya indexados: se firman y se eliminan los duplicados que dejaron sincronizaciones concurrentes
+        "UPDATE log_events SET signature = log_event_signature(ts, level, component, message)",
+        "DELETE FROM log_events WHERE id NOT IN (SELECT MIN(id) FROM log_events GROUP BY signature)",
+        # Fuera de STRUCTURED_LOG_INDEXES: la carga masiva no lo descarta, lo necesita INSERT OR IGNORE
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_log_events_signature ON log_events(signature)",
+    ]),
+]
+
+TimeBound = Union[datetime, float, int, None]
+
+
+def _epoch(value: TimeBound) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value)
+
+
+_RELATIVE_TIME = re.compile(r'^(\d+(?:\.\d+)?)\s*([smhdw])$')
+_RELATIVE_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+
+def parse_time_bound(value: str, now: Optional[float] = None) -> Optional[float]:
+    """
+    Límite de tiempo de una consulta: relativo al momento actual (``30m``, ``2h``, ``7d``)
+    o absoluto en ISO (``2024-01-31`` o ``2024-01-31T12:00``). Devuelve epoch o None.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    match = _RELATIVE_TIME.match(value)
+    if match:
+        return (now if now is not None else datetime.now().timestamp()) - float(match.group(1)) * _RELATIVE_UNITS[match.group(2)]
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return None
+
+
+def _as_list(value) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [item for item in value.split(',') if item]
+    return list(value)
+
+
+class StructuredLogStore:
+    """
+    Índice SQLite del log estructurado (``para_system.jsonl`` y sus rotaciones).
+
+    Cada consulta sincroniza antes los bytes nuevos (mismo mecanismo de checkpoints que
+    ``LogIndex``) y filtra con índices por nivel, componente, tiempo y sesión, de modo que
+    filtrar millones de entradas no implica leer ni parsear los archivos de log.
+    """
+
+    def __init__(self, db_path, log_path):
+        self.log_path = Path(log_path)
+        self._pool = get_pool(db_path)
+        conn = self._pool.connect()
+        try:
+            conn.create_function('log_event_signature', 4, event_signature, deterministic=True)
+            apply_migrations(conn, STRUCTURED_LOG_MIGRATIONS)
+        finally:
+            conn.close()
+        self._tailer = LogTailer(db_path)
+
+    def sync(self) -> int:
+        """
+        Indexa lo escrito desde la última sincronización. Devuelve los eventos nuevos.
+
+        Varios procesos (CLI, daemon, dashboard) pueden leer el mismo checkpoint, y un hash de
+        cabecera distinto obliga a releer el archivo: el índice único por firma y
+        ``INSERT OR IGNORE`` hacen que un tramo releído no duplique eventos.
+        """
+        # El log estructurado es propio y acotado por la rotación: la primera vez se indexa entero
+        result = self._tailer.read_new(self.log_path, parse_json_records, backfill=None)
+        if not result.records and not result.checkpoints:
+            return 0
+        inserted = 0
+        with self._pool.connection() as conn:
+            if result.records:
+                # Lotes grandes: insertar sin índices y reconstruirlos después es varias veces más rápido
+                bulk = len(result.records) >= BULK_REINDEX_THRESHOLD
+                if bulk:
+                    for name, _ in STRUCTURED_LOG_INDEXES:
+                        conn.execute(f"DROP INDEX IF EXISTS {name}")
+                before = conn.total_changes
+                conn.executemany(
+                    "INSERT OR IGNORE INTO log_events (ts, level, component, message, session_id, context, signature) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(e.ts, e.level, e.component, e.message, e.session_id,
+                      json.dumps(e.context, ensure_ascii=False, default=str) if e.context else None, e.signature)
+                     for e in result.records]
+                )
+                inserted = conn.total_changes - before
+                if bulk:
+                    for _, sql in STRUCTURED_LOG_INDEXES:
+                        conn.execute(sql)
+                max_id = conn.execute("SELECT MAX(id) FROM log_events").fetchone()[0] or 0
+                if max_id > MAX_STRUCTURED_EVENTS:
+                    conn.execute("DELETE FROM log_events WHERE id <= ?", (max_id - MAX_STRUCTURED_EVENTS,))
+            self._tailer.commit(self.log_path, result, conn)
+        return inserted
+
+    @staticmethod
+    def _where(levels=None, components=None, since: TimeBound = None, until: TimeBound = None,
+               session_id: Optional[str] = None, contains: Optional[str] = None) -> Tuple[str, list]:
+        """
+        Cláusula WHERE para los filtros. ``components`` admite prefijos con ``*``
+        (``CLI-*``), que se resuelven con el índice de componente.
+        """
+        clauses, params = [], []
+        levels = [level.upper() for level in _as_list(levels)]
+        if levels:
+            clauses.append(f"level IN ({', '.join('?' for _ in levels)})")
+            params.extend(levels)
+        components = _as_list(components)
+        if components:
+            alternatives = []
+            for component in components:
+                if component.endswith('*'):
+                    alternatives.append("component GLOB ?")
+                else:
+                    alternatives.append("component = ?")
+                params.append(component)
+            clauses.append(f"({' OR '.join(alternatives)})")
+        since, until = _epoch(since), _epoch(until)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(until)
+        if session_id:
+            clauses.append("session_id = ?")
+            params.append(session_id)
+        if contains:
+            clauses.append("instr(lower(message), ?) > 0")
+            params.append(contains.lower())
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, levels=None, components=None, since: TimeBound = None, until: TimeBound = None,
+              session_id: Optional[str] = None, contains: Optional[str] = None,
+              limit: Optional[int] = 100) -> List[LogEvent]:
+        """Últimos ``limit`` eventos que cumplen los filtros (los más antiguos primero)."""
+        self.sync()
+        where, params = self._where(levels, components, since, until, session_id, contains)
+        sql = f"SELECT ts, level, component, message, session_id, context FROM log_events{where} ORDER BY ts DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        events = []
+        for ts, level, component, message, session, context in reversed(self._pool.query(sql, params)):
+            events.append(LogEvent(ts, level, component, message, session, json.loads(context) if context else None))
+        return events
+
+    def count(self, levels=None, components=None, since: TimeBound = None, until: TimeBound = None,
+              session_id: Optional[str] = None, contains: Optional[str] = None) -> int:
+        self.sync()
+        where, params = self._where(levels, components, since, until, session_id, contains)
+        return self._pool.query(f"SELECT COUNT(*) FROM log_events{where}", params)[0][0]
+
+    def count_by(self, field: str = 'level', levels=None, components=None, since: TimeBound = None,
+                 until: TimeBound = None, session_id: Optional[str] = None) -> Dict[str, int]:
+        """Recuento agrupado por ``level``, ``component`` o ``session_id``."""
+        if field not in ('level', 'component', 'session_id'):
+            raise ValueError(f"Campo de agrupación no soportado: {field}")
+        self.sync()
+        where, params = self._where(levels, components, since, until, session_id)
+        rows = self._pool.query(f"SELECT {field}, COUNT(*) FROM log_events{where} GROUP BY {field}", params)
+        return {key: count for key, count in rows}
@@ -15,7 +15,8 @@ from pathlib import Path
 from typing import Optional, Dict, Any
 import json
 import threading
-from functools import wraps
+
+from .call_stats import instrument
 
 class PARALogger:
     """
@@ -243,46 +244,38 @@ class PARALogger:
 logger = PARALogger()
 
 # Decorador para logging automático de funciones
-def log_function_calls(func):
-    """Decorador para logging automático de llamadas a funciones."""
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        func_name = f"{func.__module__}.{func.__name__}"
-        
-        # Log de entrada
-        logger.log_function_call(func_name, args, kwargs)
-        
-        try:
-            # Ejecutar función
-            start_time = datetime.now()
-            result = func(*args, **kwargs)
-            duration = (datetime.now() - start_time).total_seconds()
-            
-            # Log de resultado
-            logger.log_function_result(func_name, result)
-            logger.log_performance(func_name, duration)
-            
-            return result
-        except Exception as e:
-            # Log de error
-            logger.log_function_error(func_name, e)
-            raise
+def log_function_calls(func=None, *, sample_rate: Optional[float] = None):
+    """
+    Decorador para logging automático de llamadas a funciones (``@log_function_calls`` o
+    ``@log_function_calls(sample_rate=0.1)``). Los tiempos van al histograma de
+    ``paralib.call_stats``; entrada, resultado y duración solo se loguean con
+    ``PARA_CALL_TRACING=log`` y en las llamadas muestreadas.
+    """
+    if func is None:
+        return lambda f: log_function_calls(f, sample_rate=sample_rate)
+    func_name = f"{func.__module__}.{func.__name__}"
+    
+    def on_start():
+        logger.log_function_call(func_name)
+    
+    def on_end(_, elapsed_ns):
+        logger.log_function_result(func_name)
+        logger.log_performance(func_name, elapsed_ns / 1e9)
+    
+    def on_error(_, error, elapsed_ns):
+        logger.log_function_error(func_name, error)
     
-    return wrapper
+    return instrument(func, on_error, sample_rate=sample_rate, on_start=on_start, on_end=on_end)
 
 # Decorador para logging de excepciones
 def log_exceptions(func):
-    """Decorador para logging automático de excepciones."""
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        try:
-            return func(*args, **kwargs)
-        except Exception as e:
-            func_name = f"{func.__module__}.{func.__name__}"
-            logger.log_function_error(func_name, e)
-            raise
+    """Decorador para logging automático de excepciones (sin coste extra si no hay excepción)."""
+    func_name = f"{func.__module__}.{func.__name__}"
+    
+    def on_error(_, error, elapsed_ns):
+        logger.log_function_error(func_name, error)
     
-    return wrapper
+    return instrument(func, on_error, measure=False)
 
 # Función para configurar logging específico de módulo
 def get_module_logger(module_name: str) -> PARALogger:
@@ -0,0 +1,470 @@
+"""
+paralib/move_journal.py
+
+Journal de operaciones (write-ahead) para movimientos y renombrados del vault.
+
+Reclasificar, consolidar o limpiar solo mueve, renombra o elimina carpetas vacías; en vez
+de un backup completo antes de cada comando, cada operación se registra en un journal
+JSON-lines (``.para_db/journal/<txn>.jsonl``) antes de ejecutarse:
+
+- Las operaciones de un comando forman una transacción: si el bloque falla, se deshacen
+  las ya ejecutadas (commit atómico del lote); si el proceso muere a mitad, la próxima
+  transacción detecta el journal sin ``commit`` y lo revierte.
+- ``undo_transaction`` deshace una transacción confirmada en orden inverso, en O(movimientos).
+- La intención se escribe (flush) antes de cada rename; el fsync se hace por lote
+  (``move_many``) y al confirmar, así el modo seguro cuesta milisegundos.
+
+Los destinos sobrescritos se apartan a ``<txn>.trash`` para poder restaurarlos; esa papelera
+se elimina al revertir o deshacer la transacción y, en las confirmadas, solo se conserva para
+las ``TRASH_RETENTION`` más recientes (las anteriores ya no restauran lo sobrescrito).
+
+Las funciones ``journal_rename``/``journal_mkdir``/``journal_rmdir``/``journal_write_text``
+registran en la transacción activa del hilo, si la hay, y si no operan directamente. Todo
+rename (también al revertir o deshacer) avisa a los ``add_rename_listener`` registrados.
+"""
+import errno
+import json
+import os
+import shutil
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .log_center import log_center
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    fcntl = None
+    FCNTL_AVAILABLE = False
+
+JOURNAL_DIR_NAME = "journal"
+# Transacciones confirmadas que conservan su papelera (destinos sobrescritos) para 'undo'
+TRASH_RETENTION = 20
+
+
+def get_journal_dir(vault_path) -> Path:
+    return Path(vault_path) / ".para_db" / JOURNAL_DIR_NAME
+
+
+def _try_lock(f) -> bool:
+    """Lock exclusivo no bloqueante: una transacción activa en otro proceso mantiene su journal bloqueado."""
+    if not FCNTL_AVAILABLE:
+        return True
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+# Callbacks (src, dst) tras cada rename: mantienen al día estado en memoria (p. ej. el grafo de enlaces)
+_rename_listeners: List[Callable[[Path, Path], None]] = []
+
+
+def add_rename_listener(callback: Callable[[Path, Path], None]):
+    """Registra ``callback(src, dst)``, llamado después de cada rename hecho por este módulo."""
+    if callback not in _rename_listeners:
+        _rename_listeners.append(callback)
+
+
+def _rename(src: Path, dst: Path):
+    """Rename atómico; entre dispositivos cae a ``shutil.move``."""
+    try:
+        os.rename(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(str(src), str(dst))
+    for callback in list(_rename_listeners):
+        try:
+            callback(Path(src), Path(dst))
+        except Exception as e:
+            log_center.log_warning(f"Error notificando el rename {src} → {dst}: {e}", "MoveJournal")
+
+
+class MoveTransaction:
+    """Transacción de movimientos con journal write-ahead."""
+
+    def __init__(self, vault_path, description: str = ''):
+        self.vault_path = Path(vault_path)
+        self.description = description
+        self.id = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{uuid.uuid4().hex[:4]}"
+        self.journal_path = get_journal_dir(self.vault_path) / f"{self.id}.jsonl"
+        self.operations: List[Dict[str, Any]] = []
+        self.state = 'new'
+        self._lock = threading.RLock()
+        self._file = None
+        self._trashed = 0
+
+    # --- Journal ---
+
+    def _append(self, records: Iterable[Dict[str, Any]], sync: bool = False):
+        self._file.write(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records))
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+
+    def begin(self) -> "MoveTransaction":
+        recover_incomplete(self.vault_path)
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.journal_path, 'a', encoding='utf-8')
+        _try_lock(self._file)
+        self._append([{'op': 'begin', 'id': self.id, 'description': self.description,
+                       'timestamp': datetime.now().isoformat()}], sync=True)
+        self.state = 'active'
+        return self
+
+    # --- Operaciones ---
+
+    def move(self, src, dst) -> Path:
+        """Mueve ``src`` a ``dst`` registrando la intención antes de ejecutar."""
+        return self.move_many([(src, dst)])[0]
+
+    def move_many(self, pairs: Iterable[Tuple[Any, Any]]) -> List[Path]:
+        """Registra todo el lote con un solo fsync y luego ejecuta los movimientos en orden."""
+        pairs = [(Path(src), Path(dst)) for src, dst in pairs if Path(src) != Path(dst)]
+        if not pairs:
+            return []
+        with self._lock:
+            # Un destino existente se aparta a la papelera de la transacción: sobrescribir también se puede deshacer
+            displaced = [(dst, self._trash_path(dst)) for _, dst in pairs if dst.is_file()]
+            pairs = displaced + pairs
+            # Los directorios destino se crean (y registran) antes que los movimientos: al deshacer,
+            # los archivos vuelven antes de quitar las carpetas
+            trash = _trash_dir(self.journal_path)
+            for parent in dict.fromkeys(dst.parent for _, dst in pairs):
+                if parent == trash:
+                    # La papelera es de la transacción, no del vault: no se registra
+                    parent.mkdir(parents=True, exist_ok=True)
+                elif not parent.exists():
+                    self.mkdir(parent)
+            records = [{'op': 'move', 'src': str(src), 'dst': str(dst)} for src, dst in pairs]
+            self._append(records, sync=len(records) > 1)
+            for record, (src, dst) in zip(records, pairs):
+                _rename(src, dst)
+                self.operations.append(record)
+        return [dst for _, dst in pairs[len(displaced):]]
+
+    def _trash_path(self, path: Path) -> Path:
+        self._trashed += 1
+        return _trash_dir(self.journal_path) / f"{self._trashed}_{path.name}"
+
+    def write_text(self, path, content: str) -> Path:
+        """
+        Crea/reescribe un archivo: se escribe en la papelera de la transacción y se mueve a su
+        sitio, así deshacer lo retira (y restaura el anterior, si lo había).
+        """
+        path = Path(path)
+        with self._lock:
+            staged = self._trash_path(path)
+            staged.parent.mkdir(parents=True, exist_ok=True)
+            staged.write_text(content, encoding='utf-8')
+            return self.move(staged, path)
+
+    def mkdir(self, path) -> Path:
+        """Crea el directorio (y padres); registra solo los que crea, para poder quitarlos al deshacer."""
+        path = Path(path)
+        with self._lock:
+            missing = []
+            current = path
+            while not current.exists():
+                missing.append(current)
+                current = current.parent
+            for directory in reversed(missing):
+                record = {'op': 'mkdir', 'path': str(directory)}
+                self._append([record])
+                directory.mkdir(exist_ok=True)
+                self.operations.append(record)
+        return path
+
+    def rmdir(self, path):
+        """Elimina un directorio vacío."""
+        path = Path(path)
+        with self._lock:
+            record = {'op': 'rmdir', 'path': str(path)}
+            self._append([record])
+            path.rmdir()
+            self.operations.append(record)
+
+    # --- Fin de la transacción ---
+
+    def commit(self):
+        with self._lock:
+            self._append([{'op': 'commit', 'operations': len(self.operations),
+                           'timestamp': datetime.now().isoformat()}], sync=True)
+            self._close('committed')
+        log_center.log_info(f"Transacción {self.id} confirmada ({len(self.operations)} operaciones)",
+                            "MoveJournal", {'description': self.description})
+        purge_old_trash(self.vault_path)
+
+    def rollback(self) -> Dict[str, Any]:
+        """Deshace las operaciones ejecutadas de esta transacción (activa)."""
+        with self._lock:
+            result = _revert_operations(self.operations)
+            self._append([{'op': 'rollback', 'timestamp': datetime.now().isoformat()}], sync=True)
+            self._close('rolled_back')
+            if not result['conflicts']:
+                _remove_trash(self.journal_path)
+        log_center.log_warning(f"Transacción {self.id} revertida", "MoveJournal", result)
+        return result
+
+    def _close(self, state: str):
+        self.state = state
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        if self.state == 'new':
+            self.begin()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.state != 'active':
+            return False
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+
+def _revert_operations(operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aplica la inversa de cada operación, de la última a la primera."""
+    result = {'reverted': 0, 'conflicts': []}
+    for record in reversed(operations):
+        try:
+            if record['op'] == 'move':
+                src, dst = Path(record['src']), Path(record['dst'])
+                if not dst.exists():
+                    # El movimiento nunca se ejecutó (o el archivo ya no está en destino)
+                    if not src.exists():
+                        result['conflicts'].append(f"{dst}: no existe")
+                    continue
+                if src.exists():
+                    result['conflicts'].append(f"{src}: el origen está ocupado")
+                    continue
+                src.parent.mkdir(parents=True, exist_ok=True)
+                _rename(dst, src)
+            elif record['op'] == 'mkdir':
+                path = Path(record['path'])
+                if path.exists():
+                    try:
+                        path.rmdir()
+                    except OSError:
+                        result['conflicts'].append(f"{path}: directorio no vacío")
+                        continue
+            elif record['op'] == 'rmdir':
+                Path(record['path']).mkdir(parents=True, exist_ok=True)
+            else:
+                continue
+            result['reverted'] += 1
+        except OSError as e:
+            result['conflicts'].append(f"{record}: {e}")
+    return result
+
+
+def _trash_dir(journal_path: Path) -> Path:
+    return journal_path.with_suffix('.trash')
+
+
+def _remove_trash(journal_path: Path) -> bool:
+    """Elimina la papelera de una transacción; devuelve True si existía."""
+    trash = _trash_dir(journal_path)
+    if not trash.exists():
+        return False
+    shutil.rmtree(trash, ignore_errors=True)
+    return True
+
+
+def purge_old_trash(vault_path, keep: int = TRASH_RETENTION) -> int:
+    """
+    Elimina las papeleras de transacciones revertidas/deshechas y de las confirmadas más allá
+    de las ``keep`` más recientes con papelera. Devuelve cuántas eliminó.
+    """
+    journal_dir = get_journal_dir(vault_path)
+    if not journal_dir.exists():
+        return 0
+    purged = 0
+    committed = 0
+    # Solo se leen los journals con papelera (los ids empiezan por la fecha: orden cronológico)
+    for trash in sorted(journal_dir.glob("*.trash"), reverse=True):
+        path = trash.with_suffix('.jsonl')
+        try:
+            state = _read_journal(path)['state'] if path.exists() else 'orphan'
+        except OSError:
+            continue
+        if state == 'incomplete':
+            continue
+        if state == 'committed':
+            committed += 1
+            if committed <= keep:
+                continue
+        if _remove_trash(path):
+            purged += 1
+    return purged
+
+
+def _read_journal(path: Path) -> Dict[str, Any]:
+    info = {'id': path.stem, 'path': path, 'operations': [], 'state': 'incomplete', 'description': '',
+            'timestamp': ''}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Línea truncada por un corte: todo lo anterior es válido
+                break
+            op = record.get('op')
+            if op == 'begin':
+                info['description'] = record.get('description', '')
+                info['timestamp'] = record.get('timestamp', '')
+            elif op in ('move', 'mkdir', 'rmdir'):
+                info['operations'].append(record)
+            elif op == 'commit':
+                info['state'] = 'committed'
+            elif op in ('rollback', 'undone'):
+                info['state'] = 'rolled_back' if op == 'rollback' else 'undone'
+    return info
+
+
+def list_transactions(vault_path) -> List[Dict[str, Any]]:
+    """Transacciones del journal, de la más reciente a la más antigua."""
+    journal_dir = get_journal_dir(vault_path)
+    if not journal_dir.exists():
+        return []
+    transactions = []
+    for path in sorted(journal_dir.glob("*.jsonl"), reverse=True):
+        try:
+            info = _read_journal(path)
+        except OSError:
+            continue
+        info['operation_count'] = len(info.pop('operations'))
+        info['path'] = str(path)
+        transactions.append(info)
+    return transactions
+
+
+def recover_incomplete(vault_path) -> int:
+    """Revierte las transacciones sin commit (proceso interrumpido). Devuelve cuántas revirtió."""
+    journal_dir = get_journal_dir(vault_path)
+    if not journal_dir.exists():
+        return 0
+    recovered = 0
+    with _active_lock:
+        active = set(_active_journals)
+    for path in journal_dir.glob("*.jsonl"):
+        if path in active:
+            continue
+        try:
+            info = _read_journal(path)
+            if info['state'] != 'incomplete':
+                continue
+            with open(path, 'a', encoding='utf-8') as f:
+                if not _try_lock(f):
+                    continue  # Sigue activa en otro proceso
+                result = _revert_operations(info['operations'])
+                f.write(json.dumps({'op': 'rollback', 'recovered': True, 'timestamp': datetime.now().isoformat()}) + '\n')
+            if not result['conflicts']:
+                _remove_trash(path)
+            recovered += 1
+            log_center.log_warning(f"Transacción incompleta revertida: {info['id']}", "MoveJournal", result)
+        except OSError as e:
+            log_center.log_error(f"No se pudo recuperar el journal {path.name}: {e}", "MoveJournal")
+    return recovered
+
+
+def undo_transaction(vault_path, transaction_id: str = None) -> Dict[str, Any]:
+    """Deshace una transacción confirmada (por defecto, la última no deshecha)."""
+    candidates = [t for t in list_transactions(vault_path) if t['state'] == 'committed']
+    if transaction_id:
+        candidates = [t for t in candidates if t['id'] == transaction_id]
+    if not candidates:
+        return {'success': False, 'error': 'No hay transacciones para deshacer'}
+
+    path = Path(candidates[0]['path'])
+    info = _read_journal(path)
+    result = _revert_operations(info['operations'])
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'op': 'undone', 'timestamp': datetime.now().isoformat(), **result}, ensure_ascii=False) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    if not result['conflicts']:
+        _remove_trash(path)
+    result.update({'success': not result['conflicts'], 'id': info['id'], 'description': info['description']})
+    log_center.log_info(f"Transacción {info['id']} deshecha ({result['reverted']} operaciones)", "MoveJournal", result)
+    return result
+
+
+# --- Transacción activa del hilo ---
+
+# Cada hilo (comando del CLI/daemon, watcher, batcher) tiene su propia transacción activa;
+# _active_journals reúne las de todos para que recover_incomplete no revierta una en curso
+_local = threading.local()
+_active_journals = set()
+_active_lock = threading.Lock()
+
+
+def current_transaction() -> Optional[MoveTransaction]:
+    return getattr(_local, 'transaction', None)
+
+
+@contextmanager
+def move_transaction(vault_path, description: str = ''):
+    """
+    Abre una transacción y la deja activa en este hilo para las funciones ``journal_*``. Si el
+    hilo ya tiene una activa, se une a ella (los comandos anidados forman un solo lote).
+    """
+    outer = current_transaction()
+    if outer is not None:
+        yield outer
+        return
+
+    transaction = MoveTransaction(vault_path, description)
+    with _active_lock:
+        _active_journals.add(transaction.journal_path)
+    _local.transaction = transaction
+    try:
+        with transaction.begin():
+            yield transaction
+    finally:
+        _local.transaction = None
+        with _active_lock:
+            _active_journals.discard(transaction.journal_path)
+
+
+def journal_rename(src, dst) -> Path:
+    transaction = current_transaction()
+    if transaction is not None:
+        return transaction.move(src, dst)
+    _rename(Path(src), Path(dst))
+    return Path(dst)
+
+
+def journal_mkdir(path) -> Path:
+    transaction = current_transaction()
+    if transaction is not None:
+        return transaction.mkdir(path)
+    Path(path).mkdir(parents=True, exist_ok=True)
+    return Path(path)
+
+
+def journal_rmdir(path):
+    transaction = current_transaction()
+    if transaction is not None:
+        transaction.rmdir(path)
+    else:
+        Path(path).rmdir()
+
+
+def journal_write_text(path, content: str) -> Path:
+    transaction = current_transaction()
+    if transaction is not None:
+        return transaction.write_text(path, content)
+    Path(path).write_text(content, encoding='utf-8')
+    return Path(path)
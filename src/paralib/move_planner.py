@@ -0,0 +1,325 @@
+"""
+paralib/move_planner.py
+
+Planificador de movimientos por lotes para consolidación y fusión de carpetas.
+
+Lee cada directorio implicado una sola vez (``os.scandir``) y construye un árbol en
+memoria. Sobre ese árbol calcula el plan completo: qué carpetas pueden moverse con un solo
+rename de directorio, qué archivos hay que mover uno a uno, qué nombres chocan (se resuelven
+con sufijo ``_N`` antes de tocar el disco) y qué carpetas quedan vacías. Después ejecuta el
+plan en la transacción activa del journal con ``MoveTransaction.move_many`` (un solo fsync
+por lote), sin volver a listar ni a hacer glob sobre el vault.
+"""
+import fnmatch
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from .logger import logger
+from .move_journal import _rename, current_transaction, move_transaction
+from .profiler import profiled_stage
+
+
+def _as_path(path) -> Path:
+    return path if isinstance(path, Path) else Path(path)
+
+
+class _DirListing:
+    """Contenido (nombres) de un directorio según el plan."""
+    __slots__ = ('files', 'dirs')
+
+    def __init__(self):
+        self.files: Set[str] = set()
+        self.dirs: Set[str] = set()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.files or name in self.dirs
+
+    def is_empty(self) -> bool:
+        return not self.files and not self.dirs
+
+
+class MovePlanner:
+    """
+    Plan de movimientos sobre un árbol en memoria.
+
+    Las rutas que se consultan después de planificar un movimiento reflejan el estado
+    *planificado* (p. ej. tras ``merge(a, b)`` los archivos de ``a`` ya figuran en ``b``),
+    así varias consolidaciones seguidas resuelven colisiones entre sí sin tocar el disco.
+    """
+
+    def __init__(self, vault_path: Optional[Path] = None):
+        self.vault_path = Path(vault_path) if vault_path else None
+        self.operations: List[Tuple] = []
+        self._tree: Dict[Path, _DirListing] = {}
+        # Directorios que en el plan ya no existen (movidos o quitados): no se vuelven a leer del disco
+        self._gone: Set[Path] = set()
+        # Último sufijo usado por (carpeta, nombre): evita reprobar _1, _2... en cada colisión
+        self._suffix_hint: Dict[Tuple[Path, str], int] = {}
+
+    def reset(self):
+        """Descarta el plan y el árbol en memoria: las siguientes consultas vuelven a leer el disco."""
+        self.operations = []
+        self._tree.clear()
+        self._gone.clear()
+        self._suffix_hint.clear()
+
+    # --- Árbol en memoria ---
+
+    def _listing(self, directory: Path) -> Optional[_DirListing]:
+        """Listado planificado de ``directory``; lo lee del disco (un ``scandir``) la primera vez."""
+        directory = _as_path(directory)
+        listing = self._tree.get(directory)
+        if listing is None and not self._is_gone(directory) and directory.is_dir():
+            listing = self._scan(directory)
+        return listing
+
+    def _is_gone(self, directory: Path) -> bool:
+        return bool(self._gone) and (directory in self._gone or any(p in self._gone for p in directory.parents))
+
+    def _scan(self, directory: Path) -> _DirListing:
+        listing = self._tree[directory] = _DirListing()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            listing.dirs.add(entry.name)
+                        else:
+                            listing.files.add(entry.name)
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.warning(f"No se pudo escanear {directory}: {e}")
+        return listing
+
+    def _load_subtree(self, root: Path):
+        """Carga todo el subárbol; necesario antes de planificar un rename de directorio."""
+        pending = [_as_path(root)]
+        while pending:
+            directory = pending.pop()
+            listing = self._listing(directory)
+            if listing is not None:
+                pending.extend(directory / name for name in listing.dirs)
+
+    def exists(self, path: Path) -> bool:
+        path = _as_path(path)
+        listing = self._listing(path.parent)
+        return listing is not None and path.name in listing
+
+    def is_dir(self, path: Path) -> bool:
+        path = _as_path(path)
+        listing = self._listing(path.parent)
+        return listing is not None and path.name in listing.dirs
+
+    def files(self, folder: Path, pattern: str = '*', recursive: bool = False) -> List[Path]:
+        """Archivos de ``folder`` (o de su subárbol) que coinciden con ``pattern``, según el plan."""
+        folder = _as_path(folder)
+        result = []
+        pending = [folder]
+        while pending:
+            directory = pending.pop()
+            listing = self._listing(directory)
+            if listing is None:
+                continue
+            result.extend(directory / name for name in sorted(listing.files)
+                          if fnmatch.fnmatchcase(name, pattern))
+            if recursive:
+                pending.extend(directory / name for name in sorted(listing.dirs, reverse=True)
+                               if not name.startswith('.'))
+        return result
+
+    def count(self, folder: Path, pattern: str = '*', recursive: bool = True) -> int:
+        return len(self.files(folder, pattern, recursive))
+
+    def unique_path(self, directory: Path, name: str, start: int = 1) -> Path:
+        """Ruta libre para ``name`` dentro de ``directory``, con sufijo ``_N`` si ya está ocupada."""
+        directory = _as_path(directory)
+        taken = self._listing(directory) or ()
+        if name not in taken:
+            return directory / name
+        stem, suffix = os.path.splitext(name)
+        counter = max(start, self._suffix_hint.get((directory, name), start))
+        while True:
+            new_name = f"{stem}_{counter}{suffix}"
+            if new_name not in taken:
+                self._suffix_hint[(directory, name)] = counter + 1
+                return directory / new_name
+            counter += 1
+
+    # --- Operaciones planificadas ---
+
+    def mkdir(self, directory: Path) -> Path:
+        directory = _as_path(directory)
+        if directory in self._tree or self.is_dir(directory):
+            return directory
+        if directory.parent != directory:
+            self.mkdir(directory.parent)
+        self.operations.append(('mkdir', directory))
+        self._gone.discard(directory)
+        self._tree[directory] = _DirListing()
+        parent = self._tree.get(directory.parent)
+        if parent is not None:
+            parent.dirs.add(directory.name)
+        return directory
+
+    def move_file(self, src: Path, target_dir: Path, start: int = 1) -> Path:
+        """Planifica mover el archivo ``src`` a ``target_dir``; devuelve la ruta final sin colisiones."""
+        src, target_dir = _as_path(src), _as_path(target_dir)
+        if src.parent == target_dir:
+            return src
+        self.mkdir(target_dir)
+        dst = self.unique_path(target_dir, src.name, start)
+        self.operations.append(('move', src, dst))
+        source_listing = self._tree.get(src.parent)
+        if source_listing is not None:
+            source_listing.files.discard(src.name)
+        self._listing(target_dir).files.add(dst.name)
+        return dst
+
+    def move_dir(self, src: Path, dst: Path) -> Path:
+        """Planifica un rename de directorio completo (una sola operación para todo el subárbol)."""
+        src, dst = _as_path(src), _as_path(dst)
+        self._load_subtree(src)
+        self.mkdir(dst.parent)
+        self.operations.append(('move_dir', src, dst))
+        # Todo el subárbol cambia de prefijo en el árbol planificado
+        for path in [p for p in self._tree if p == src or src in p.parents]:
+            self._tree[dst / path.relative_to(src)] = self._tree.pop(path)
+        self._gone.add(src)
+        self._gone.discard(dst)
+        source_parent = self._tree.get(src.parent)
+        if source_parent is not None:
+            source_parent.dirs.discard(src.name)
+        self._listing(dst.parent).dirs.add(dst.name)
+        return dst
+
+    def rmdir(self, directory: Path) -> bool:
+        """Planifica quitar ``directory`` si en el plan queda vacío."""
+        directory = _as_path(directory)
+        listing = self._listing(directory)
+        if listing is None or not listing.is_empty():
+            return False
+        self.operations.append(('rmdir', directory))
+        del self._tree[directory]
+        self._gone.add(directory)
+        parent = self._tree.get(directory.parent)
+        if parent is not None:
+            parent.dirs.discard(directory.name)
+        return True
+
+    def prune_empty(self, directory: Path) -> bool:
+        """Quita ``directory`` y sus subcarpetas que queden vacías tras el plan; True si se quita."""
+        directory = _as_path(directory)
+        listing = self._listing(directory)
+        if listing is None:
+            return False
+        for name in sorted(listing.dirs):
+            self.prune_empty(directory / name)
+        return self.rmdir(directory)
+
+    # --- Planes compuestos ---
+
+    def merge(self, source: Path, target: Path, start: int = 1) -> int:
+        """
+        Fusiona ``source`` en ``target`` y quita ``source``. Si ``target`` no existe, o una
+        subcarpeta no existe en el destino, se mueve con un solo rename de directorio.
+        Devuelve el número de archivos que cambian de carpeta.
+        """
+        source, target = _as_path(source), _as_path(target)
+        if not self.exists(target):
+            moved = self.count(source, recursive=True)
+            self.move_dir(source, target)
+            return moved
+
+        listing = self._listing(source)
+        if listing is None:
+            return 0
+        moved = 0
+        for name in sorted(listing.files):
+            self.move_file(source / name, target, start)
+            moved += 1
+        for name in sorted(listing.dirs):
+            child_target = target / name
+            if self.is_dir(child_target):
+                moved += self.merge(source / name, child_target, start)
+            else:
+                moved += self.count(source / name, recursive=True)
+                self.move_dir(source / name, self.unique_path(target, name, start))
+        self.rmdir(source)
+        return moved
+
+    def gather(self, source: Path, target: Path, pattern: str = '*.md', recursive: bool = False,
+               start: int = 1) -> Tuple[int, bool]:
+        """
+        Reúne en ``target`` (sin subcarpetas) los archivos de ``source`` que coinciden con
+        ``pattern``. Devuelve (archivos movidos, si ``source`` queda vacía y se quita).
+        """
+        files = self.files(source, pattern, recursive)
+        for file_path in files:
+            self.move_file(file_path, target, start)
+        return len(files), self.prune_empty(source)
+
+    # --- Ejecución ---
+
+    def pending_moves(self) -> int:
+        return sum(1 for op in self.operations if op[0] in ('move', 'move_dir'))
+
+    @profiled_stage('file_move_batch')
+    def execute(self, description: str = '') -> int:
+        """
+        Aplica el plan. Usa la transacción activa del journal; si no la hay y se conoce el
+        vault abre una nueva, y si no, aplica los cambios directamente. Devuelve el número
+        de operaciones aplicadas. Si falla, el árbol se descarta (``reset``): el disco quedó
+        sin el plan, o con parte de él, y los planes siguientes deben leerlo de nuevo.
+        """
+        operations, self.operations = self.operations, []
+        if not operations:
+            return 0
+        transaction = current_transaction()
+        try:
+            if transaction is None and self.vault_path is not None:
+                with move_transaction(self.vault_path, description) as transaction:
+                    self._apply(operations, transaction)
+            else:
+                self._apply(operations, transaction)
+        except Exception:
+            self.reset()
+            raise
+        return len(operations)
+
+    @staticmethod
+    def _apply(operations: List[Tuple], transaction):
+        batch: List[Tuple[Path, Path]] = []
+
+        def flush():
+            if not batch:
+                return
+            if transaction is not None:
+                transaction.move_many(batch)
+            else:
+                for src, dst in batch:
+                    _rename(src, dst)
+            batch.clear()
+
+        for op in operations:
+            if op[0] == 'move':
+                batch.append((op[1], op[2]))
+                continue
+            if op[0] == 'move_dir':
+                # Los movimientos siguientes pueden ir dentro del directorio renombrado: cierra el lote
+                batch.append((op[1], op[2]))
+                flush()
+                continue
+            flush()
+            if op[0] == 'mkdir':
+                if transaction is not None:
+                    transaction.mkdir(op[1])
+                else:
+                    op[1].mkdir(parents=True, exist_ok=True)
+            elif op[0] == 'rmdir':
+                if transaction is not None:
+                    transaction.rmdir(op[1])
+                else:
+                    op[1].rmdir()
+        flush()
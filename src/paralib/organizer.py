@@ -11,7 +11,7 @@ import json
 from datetime import datetime
 import sqlite3
 from collections import defaultdict, Counter
-import shutil
+from contextlib import nullcontext
 from rich.table import Table
 
 # Imports internos
@@ -42,10 +42,12 @@ from .vault import load_para_config
 from .vault_selector import vault_selector
 from .analyze_manager import AnalyzeManager
 from .logger import logger
-import ollama
-from paralib.ai_engine import AIEngine
+from paralib.ai_engine import get_ai_engine
+from paralib.profiler import profiler, profiled_stage
 from paralib.learning_system import PARA_Learning_System
 from paralib.intelligent_naming import create_intelligent_name
+from paralib.move_journal import journal_mkdir, journal_rename, journal_rmdir, journal_write_text, move_transaction
+from paralib.move_planner import MovePlanner
 from datetime import datetime, timedelta
 
 # Importar console y should_show desde rich
@@ -167,7 +169,7 @@ def classify_note_with_llm(note_content: str, user_directive: str, model_name: s
     Usa el motor AIEngine centralizado para clasificar una nota con LLM, evitando duplicación y asegurando logging correcto.
     FUERZA MAPEO A CATEGORÍAS PARA VÁLIDAS.
     """
-    engine = AIEngine(model_name=model_name)
+    engine = get_ai_engine(model_name)
     result = engine.classify_note_with_llm(note_content, user_directive, system_prompt)
     
     if result:
@@ -433,6 +435,7 @@ def check_ollama_model(model_name: str) -> bool:
     Verifica si un modelo específico existe en Ollama.
     """
     try:
+        import ollama
         ollama.show(model_name)
         return True
     except Exception as e:
@@ -452,7 +455,7 @@ def classify_note_with_hybrid_system(note_content: str, note_path: Path, user_di
     console.print(f"🔍 [dim]Analizando con ChromaDB + IA para máxima precisión...[/dim]")
     
     # Inicializar analyze manager para análisis semántico
-    analyze_manager = AnalyzeManager(vault_path, db_path=Path(db.db_path).parent)
+    analyze_manager = _get_analyze_manager(db, vault_path)
     
     # 1. ANÁLISIS SEMÁNTICO CON CHROMADB
     enhanced_suggestion = analyze_manager.get_enhanced_classification_suggestion(note_path, note_content)
@@ -929,9 +932,11 @@ def _process_notes_classification(vault_path: Path, db: ChromaPARADatabase, extr
             console.print(f"[dim]Progreso: {progress_percent:.1f}% ({i}/{len(notes_to_process)}) - {note_path.name}[/dim]")
             
             # Procesar nota
-            note_content = note_path.read_text(encoding="utf-8")
+            with profiler.stage('file_read'):
+                note_content = note_path.read_text(encoding="utf-8")
             analysis = analyze_note_completely(note_path, note_content, extra_prompt)
-            result = classify_note_with_complete_analysis(note_content, note_path, extra_prompt, model_name, system_prompt, db, vault_path)
+            with profiler.stage('classify_note'):
+                result = classify_note_with_complete_analysis(note_content, note_path, extra_prompt, model_name, system_prompt, db, vault_path)
             
             if result:
                 results.append({
@@ -1028,6 +1033,7 @@ def get_profile():
     config = load_para_config()
     return config.get('profile', 'General')
 
+@profiled_stage('analyze_note_completely')
 def analyze_note_completely(note_path: Path, note_content: str, user_directive: str) -> dict:
     """
     Análisis completo de una nota: contenido, tags, metadatos, fechas, etc.
@@ -1228,8 +1234,9 @@ def classify_note_with_complete_analysis(note_content: str, note_path: Path, use
             complete_analysis['suggested_category'] = preliminary_result.get('category', '')
     
     # 2. ANÁLISIS SEMÁNTICO CON CHROMADB
-    analyze_manager = AnalyzeManager(vault_path, db_path=Path(db.db_path).parent)
-    enhanced_suggestion = analyze_manager.get_enhanced_classification_suggestion(note_path, note_content)
+    with profiler.stage('semantic_suggestion'):
+        analyze_manager = _get_analyze_manager(db, vault_path)
+        enhanced_suggestion = analyze_manager.get_enhanced_classification_suggestion(note_path, note_content)
     
     semantic_category = enhanced_suggestion['suggested_category']
     semantic_confidence = enhanced_suggestion['confidence_score']
@@ -1246,19 +1253,20 @@ def classify_note_with_complete_analysis(note_content: str, note_path: Path, use
     llm_folder = llm_result.get('folder_name', '')
     llm_confidence = llm_result.get('confidence', 0.0)
     
-    # 4. CÁLCULO DE PESOS DINÁMICOS CON ANÁLISIS COMPLETO
-    weights = _calculate_dynamic_weights_with_analysis(semantic_confidence, complete_analysis, db, vault_path)
-    
-    semantic_weight = weights['semantic']
-    llm_weight = weights['llm']
-    
-    # 5. DECISIÓN HÍBRIDA CON ANÁLISIS COMPLETO
-    final_result = _make_hybrid_decision_with_analysis(
-        semantic_category, semantic_confidence, semantic_reasoning,
-        llm_category, llm_folder, llm_result,
-        semantic_weight, llm_weight,
-        complete_analysis, user_directive, vault_path
-    )
+    with profiler.stage('hybrid_decision'):
+        # 4. CÁLCULO DE PESOS DINÁMICOS CON ANÁLISIS COMPLETO
+        weights = _calculate_dynamic_weights_with_analysis(semantic_confidence, complete_analysis, db, vault_path)
+        
+        semantic_weight = weights['semantic']
+        llm_weight = weights['llm']
+        
+        # 5. DECISIÓN HÍBRIDA CON ANÁLISIS COMPLETO
+        final_result = _make_hybrid_decision_with_analysis(
+            semantic_category, semantic_confidence, semantic_reasoning,
+            llm_category, llm_folder, llm_result,
+            semantic_weight, llm_weight,
+            complete_analysis, user_directive, vault_path
+        )
     
     # 6. NUEVO: REGISTRO DE APRENDIZAJE AUTOMÁTICO (OPCIONAL)
     try:
@@ -1327,6 +1335,7 @@ def classify_note_with_complete_analysis(note_content: str, note_path: Path, use
     
     return final_result
 
+@profiled_stage('learning_write')
 def _register_classification_learning(note_content: str, note_path: Path, final_result: dict, 
                                     analysis: dict, semantic_category: str, llm_category: str,
                                     semantic_confidence: float, llm_confidence: float,
@@ -1334,12 +1343,10 @@ def _register_classification_learning(note_content: str, note_path: Path, final_
                                     vault_path: Path, db: ChromaPARADatabase):
     """
     Registra la clasificación para aprendizaje automático y detección de errores.
+    El aprendizaje se procesa en segundo plano vía el sumidero de telemetría.
     """
     try:
-        from paralib.learning_system import PARA_Learning_System
-        
-        # Inicializar sistema de aprendizaje
-        learning_system = PARA_Learning_System(db, vault_path)
+        from paralib.telemetry_sink import get_telemetry_sink
         
         # Extraer información relevante
         predicted_category = final_result.get('category', 'Unknown')
@@ -1372,15 +1379,16 @@ def _register_classification_learning(note_content: str, note_path: Path, final_
             'timestamp': datetime.now().isoformat()
         }
         
-        # Aprender de la clasificación
-        learning_result = learning_system.learn_from_classification(classification_data)
-        
-        # Si se detectó un error potencial, registrar feedback automático
-        if potential_error.get('is_error', False):
-            _register_automatic_feedback(
-                learning_system, note_path, predicted_category, 
-                potential_error, analysis, vault_path
-            )
+        # Encolar el aprendizaje (y el feedback automático si hay error potencial)
+        get_telemetry_sink().submit('learning', {
+            'classification_data': classification_data,
+            'note_path': note_path,
+            'predicted_category': predicted_category,
+            'potential_error': potential_error,
+            'analysis': analysis,
+            'vault_path': vault_path,
+            'db': db
+        })
             
     except Exception as e:
         # No fallar si el sistema de aprendizaje no está disponible
@@ -2120,29 +2128,10 @@ def find_duplicate_notes_by_content(notes: list[Path]) -> list[list[Path]]:
 def merge_folders(source: Path, target: Path):
     """Fusiona el contenido de source en target y elimina source."""
     try:
-        for item in source.iterdir():
-            target_path = target / item.name
-            
-            if item.is_file():
-                # Si el archivo ya existe, crear nombre único
-                if target_path.exists():
-                    counter = 1
-                    while target_path.exists():
-                        name_parts = item.stem, f"_{counter}", item.suffix
-                        target_path = target / "".join(name_parts)
-                        counter += 1
-                
-                shutil.move(str(item), str(target_path))
-            
-            elif item.is_dir():
-                if target_path.exists():
-                    # Fusionar recursivamente
-                    merge_folders(item, target_path)
-                else:
-                    shutil.move(str(item), str(target_path))
-        
-        # Eliminar carpeta source vacía
-        source.rmdir()
+        # Plan en memoria: subcarpetas nuevas en el destino se mueven con un solo rename
+        planner = MovePlanner()
+        planner.merge(source, target)
+        planner.execute(f"Fusión de {source.name} en {target.name}")
         
     except Exception as e:
         console.print(f"Error fusionando carpetas: {e}")
@@ -2383,10 +2372,12 @@ def _consolidate_group_automatically(folders, pattern):
     """
     Consolida un grupo específico de carpetas automáticamente.
     """
+    planner = MovePlanner()
+    
     # Ordenar por número de archivos (mayor primero)
     folder_data = []
     for folder in folders:
-        md_files = list(folder.rglob("*.md"))
+        md_files = planner.files(folder, '*.md', recursive=True)
         folder_data.append({
             'folder': folder,
             'file_count': len(md_files),
@@ -2401,48 +2392,30 @@ def _consolidate_group_automatically(folders, pattern):
     clean_name = pattern.title()
     new_target_path = target_folder['folder'].parent / clean_name
     
-    # Renombrar target si es necesario
+    # Renombrar target si es necesario (si ya existe, se usa la carpeta existente como target)
     if target_folder['folder'].name != clean_name:
-        if not new_target_path.exists():
-            target_folder['folder'].rename(new_target_path)
-            target_folder['folder'] = new_target_path
-        else:
-            # Si ya existe, usar la carpeta existente como target
-            target_folder['folder'] = new_target_path
+        if not planner.exists(new_target_path):
+            planner.move_dir(target_folder['folder'], new_target_path)
+        target_folder['folder'] = new_target_path
     
     result = {'folders_merged': 0, 'files_moved': 0}
     
-    # Mover archivos de otras carpetas al target
+    # Planificar el movimiento de los archivos de las otras carpetas al target
+    files_moved = 0
+    folders_merged = 0
     for folder_info in folder_data[1:]:  # Saltar el target
-        source_folder = folder_info['folder']
-        
-        # Mover todos los archivos MD
-        for file_path in folder_info['files']:
-            target_file_path = target_folder['folder'] / file_path.name
-            
-            # Si ya existe un archivo con ese nombre, crear nombre único
-            if target_file_path.exists():
-                base_name = file_path.stem
-                extension = file_path.suffix
-                counter = 1
-                while target_file_path.exists():
-                    target_file_path = target_folder['folder'] / f"{base_name}_{counter}{extension}"
-                    counter += 1
-            
-            try:
-                file_path.rename(target_file_path)
-                result['files_moved'] += 1
-            except Exception as e:
-                pass  # Silenciar errores en consolidación automática
-        
-        # Eliminar carpeta source si está vacía
-        try:
-            remaining_files = list(source_folder.rglob("*"))
-            if not remaining_files:
-                source_folder.rmdir()
-                result['folders_merged'] += 1
-        except Exception:
-            pass  # Silenciar errores en consolidación automática
+        if folder_info['folder'] == target_folder['folder']:
+            continue
+        moved, removed = planner.gather(folder_info['folder'], target_folder['folder'], '*.md', recursive=True)
+        files_moved += moved
+        folders_merged += int(removed)
+    
+    try:
+        planner.execute(f"Consolidación automática '{pattern}'")
+        result['files_moved'] = files_moved
+        result['folders_merged'] = folders_merged
+    except Exception:
+        pass  # Silenciar errores en consolidación automática
     
     return result
 
@@ -2464,9 +2437,12 @@ def _consolidate_group_automatically(folders, pattern):
         return result
     
     # Analizar contenido de las carpetas para detectar proyectos diferentes
+    # Un solo listado por carpeta (árbol en memoria) para el análisis, el orden y el plan
+    planner = MovePlanner()
+    folder_files = {folder: planner.files(folder, '*.md', recursive=True) for folder in folders}
     project_analysis = {}
     for folder in folders:
-        files = list(folder.rglob("*.md"))
+        files = folder_files[folder]
         project_keywords = set()
         
         for file_path in files:
@@ -2499,7 +2475,7 @@ def _consolidate_group_automatically(folders, pattern):
     # Ordenar carpetas por número de archivos (la que más archivos tenga será el target)
     folder_data = []
     for folder in folders:
-        files = list(folder.rglob("*.md"))
+        files = folder_files[folder]
         folder_data.append({
             'folder': folder,
             'files': files,
@@ -2515,36 +2491,32 @@ def _consolidate_group_automatically(folders, pattern):
     target_folder = folder_data[0]
     log_center.log_info(f"Consolidando grupo '{pattern}': {len(folders)} carpetas → {target_folder['folder'].name}", "AutoConsolidate")
     
-    # Mover archivos de otras carpetas al target
+    # Planificar todos los movimientos (colisiones de nombre resueltas de antemano)
+    planned_moves = []
+    removed_folders = []
     for folder_info in folder_data[1:]:  # Saltar el target
         source_folder = folder_info['folder']
-        
-        # Mover todos los archivos MD
         for file_path in folder_info['files']:
-            target_file_path = target_folder['folder'] / file_path.name
-            
-            try:
-                # Usar función de renombrado seguro (que NO renombra archivos de usuario)
-                final_path = _safe_rename_file(file_path, target_file_path, target_folder['folder'].parent, None)
-                if final_path != file_path:  # Solo contar si realmente se movió
-                    result['files_moved'] += 1
-                    log_center.log_info(f"Archivo consolidado: {file_path.name} → {final_path.name}", "AutoConsolidate")
-            except Exception as e:
-                error_msg = f"Error consolidando archivo: {file_path.name}: {e}"
-                log_center.log_error(error_msg, "AutoConsolidate")
-                result['errors'].append(error_msg)
-        
-        # Eliminar carpeta source si está vacía
-        try:
-            remaining_files = list(source_folder.rglob("*"))
-            if not remaining_files:
-                source_folder.rmdir()
-                result['folders_merged'] += 1
-                log_center.log_info(f"Carpeta eliminada (vacía): {source_folder.name}", "AutoConsolidate")
-        except Exception as e:
-            error_msg = f"Error eliminando carpeta vacía: {source_folder.name}: {e}"
-            log_center.log_warning(error_msg, "AutoConsolidate")
-            result['errors'].append(error_msg)
+            planned_moves.append((file_path, planner.move_file(file_path, target_folder['folder'])))
+        # La carpeta source se elimina si queda vacía
+        if planner.prune_empty(source_folder):
+            removed_folders.append(source_folder)
+    
+    # Ejecutar el plan como un solo lote
+    try:
+        planner.execute(f"Consolidación automática '{pattern}'")
+    except Exception as e:
+        error_msg = f"Error consolidando grupo '{pattern}': {e}"
+        log_center.log_error(error_msg, "AutoConsolidate")
+        result['errors'].append(error_msg)
+        return result
+    
+    for file_path, final_path in planned_moves:
+        result['files_moved'] += 1
+        log_center.log_info(f"Archivo consolidado: {file_path.name} → {final_path.name}", "AutoConsolidate")
+    for source_folder in removed_folders:
+        result['folders_merged'] += 1
+        log_center.log_info(f"Carpeta eliminada (vacía): {source_folder.name}", "AutoConsolidate")
     
     return result
 
@@ -2570,7 +2542,7 @@ def _ensure_correct_para_structure(vault_path: Path, excluded_paths: list[str] =
         # Si existe la carpeta sin número, renombrarla
         if simple_path.exists() and not numbered_path.exists():
             try:
-                simple_path.rename(numbered_path)
+                journal_rename(simple_path, numbered_path)
                 console.print(f"✅ Renombrado: {simple_name} → {numbered_name}")
             except Exception as e:
                 console.print(f"❌ Error renombrando {simple_name}: {e}")
@@ -2578,7 +2550,7 @@ def _ensure_correct_para_structure(vault_path: Path, excluded_paths: list[str] =
         # Si no existe ninguna, crear la numerada
         elif not numbered_path.exists() and not simple_path.exists():
             try:
-                numbered_path.mkdir(parents=True, exist_ok=True)
+                journal_mkdir(numbered_path)
                 console.print(f"✅ Creado: {numbered_name}")
             except Exception as e:
                 console.print(f"❌ Error creando {numbered_name}: {e}")
@@ -2717,7 +2689,7 @@ def _consolidate_scattered_folders(vault_path: Path, excluded_paths: list[str] =
                 # Eliminar carpeta source si está vacía
                 remaining_files = list(folder.rglob("*"))
                 if not remaining_files:
-                    folder.rmdir()
+                    journal_rmdir(folder)
                     console.print(f"   🗑️ Eliminada carpeta vacía: {folder.name}")
                 
                 consolidated_count += 1
@@ -2774,12 +2746,11 @@ def _determine_target_category_for_folder(folder: Path) -> str:
 def _calculate_network_centrality(note_path: str, vault_path: Path) -> float:
     """Calcula la centralidad de red de una nota basada en backlinks y enlaces."""
     try:
-        from paralib.vault import extract_links_and_backlinks
-        forward_links, backlinks, centrality = extract_links_and_backlinks(vault_path)
-        
-        if note_path and note_path in centrality:
-            return centrality[note_path]
-        return 0.0
+        from paralib.vault import get_link_graph
+        # Grafo compartido y actualizado incrementalmente (sin reescanear el vault por nota)
+        if not note_path:
+            return 0.0
+        return float(get_link_graph(vault_path).centrality(note_path))
     except Exception:
         return 0.0
 
@@ -3479,7 +3450,7 @@ def enforce_para_principles(vault_path: Path, db: ChromaPARADatabase) -> dict:
                         for group_name, group_notes in note_groups.items():
                             if len(group_notes) >= 2:  # Only create groups with 2+ notes
                                 target_folder = vault_path / category / group_name
-                                target_folder.mkdir(parents=True, exist_ok=True)
+                                journal_mkdir(target_folder)
                                 
                                 for note in group_notes:
                                     try:
@@ -3499,7 +3470,7 @@ def enforce_para_principles(vault_path: Path, db: ChromaPARADatabase) -> dict:
                         # Remove original general folder if empty
                         if not any(folder.iterdir()):
                             try:
-                                folder.rmdir()
+                                journal_rmdir(folder)
                                 console.print(f"      🗑️ Removed empty folder: {folder.name}")
                                 stats['empty_folders_removed'] += 1
                             except Exception as e:
@@ -3518,7 +3489,7 @@ def enforce_para_principles(vault_path: Path, db: ChromaPARADatabase) -> dict:
             if not project_folders:
                 console.print("⚠️ No projects found - creating default project")
                 default_project = projects_path / "Active Project"
-                default_project.mkdir(parents=True, exist_ok=True)
+                journal_mkdir(default_project)
                 
                 # Create a project template note
                 template_content = """# Active Project
@@ -3538,7 +3509,7 @@ Add project-specific notes here.
 *Created automatically by PARA CLI - organize this project according to your current priorities*
 """
                 template_path = default_project / "Project Overview.md"
-                template_path.write_text(template_content, encoding='utf-8')
+                journal_write_text(template_path, template_content)
                 console.print("   📝 Created 'Active Project' with template")
                 stats['projects_created'] += 1
             else:
@@ -3567,7 +3538,7 @@ Add project-specific notes here.
                 for theme, keywords in thematic_categories.items():
                     if any(keyword in folder_name for keyword in keywords):
                         target_theme_path = resources_path / theme
-                        target_theme_path.mkdir(parents=True, exist_ok=True)
+                        journal_mkdir(target_theme_path)
                         
                         target_path = target_theme_path / folder.name
                         if folder != target_path:
@@ -3742,7 +3713,7 @@ def _remove_empty_folders_recursive(path: Path) -> int:
                     # Verificar si la carpeta actual está vacía después de la limpieza recursiva
                     try:
                         if not any(item.iterdir()):
-                            item.rmdir()
+                            journal_rmdir(item)
                             current_removed += 1
                             removed_count += 1
                             console.print(f"🗑️ [dim]Carpeta vacía eliminada: {item.name}[/dim]")
@@ -3894,119 +3865,114 @@ def run_full_reclassification_safe(vault_path: str, excluded_paths: list[str] =
     try:
         vault_path = Path(vault_path)
         
-        # Crear backup si se solicita
-        if create_backup:
+        # Modo seguro: los movimientos se registran en el journal (deshacer con 'undo'),
+        # sin backup completo previo
+        journal = move_transaction(vault_path, "Reclasificación completa") if create_backup else nullcontext()
+        with journal as transaction:
+            if transaction is not None:
+                console.print(f"🛡️ Journal de movimientos activo: {transaction.id} (deshacer con 'undo')")
+            
+            # Inicializar ChromaDB
             try:
-                from paralib.backup_manager import backup_manager
-                backup_result = backup_manager.create_backup(str(vault_path))
-                # Mostrar solo resumen legible del backup
-                try:
-                    backup_summary = f"💾 Backup creado: ID={backup_result.id}, Fecha={backup_result.timestamp.strftime('%Y-%m-%d %H:%M:%S')}, Archivos={backup_result.file_count}, Tamaño={backup_result.size_mb:.2f}MB, Estado={backup_result.status}"
-                except Exception:
-                    backup_summary = f"💾 Backup creado: {getattr(backup_result, 'id', str(backup_result))}"
-                console.print(backup_summary)
+                db = ChromaPARADatabase(str(vault_path))
             except Exception as e:
-                console.print(f"⚠️ [yellow]Error creando backup: {e}[/yellow]")
-        
-        # Inicializar ChromaDB
-        try:
-            db = ChromaPARADatabase(str(vault_path))
-        except Exception as e:
-            console.print(f"❌ Error inicializando ChromaDB: {e}")
-            return {
-                'success': False,
-                'error': f"Error inicializando ChromaDB: {e}",
-                'message': 'Error en reclasificación completa'
-            }
-        
-        # Asegurar estructura PARA (sin renombrar archivos de usuario)
-        try:
-            _ensure_correct_para_structure(vault_path, excluded_paths)
-        except Exception as e:
-            console.print(f"⚠️ [yellow]Error asegurando estructura PARA: {e}[/yellow]")
-        
-        # Consolidar carpetas dispersas (conservador)
-        try:
-            _consolidate_scattered_folders(vault_path, excluded_paths)
-        except Exception as e:
-            console.print(f"⚠️ [yellow]Error consolidando carpetas dispersas: {e}[/yellow]")
-        
-        # Clasificar inbox
-        try:
-            console.print("\n📥 Clasificando Inbox...")
-            run_inbox_classification(vault_path, db, "Clasificar todas las notas del inbox", "llama3.2:3b", True)
-        except Exception as e:
-            console.print(f"⚠️ [yellow]Error clasificando inbox: {e}[/yellow]")
-            if should_show('show_debug'):
-                import traceback
-                console.print(traceback.format_exc())
-        
-        # Refactorizar archive
-        try:
-            console.print("\n📦 Refactorizando Archive...")
-            run_archive_refactor(vault_path, db, "Refactorizar notas del archive", "llama3.2:3b", True, excluded_paths or [])
-        except Exception as e:
-            console.print(f"⚠️ [yellow]Error refactorizando archive: {e}[/yellow]")
-            if should_show('show_debug'):
-                import traceback
-                console.print(traceback.format_exc())
-        
-        # NUEVO: Enforce PARA method principles
-        try:
-            console.print("\n🎯 Enforcing PARA Method Principles...")
-            para_stats = enforce_para_principles(vault_path, db)
-        except Exception as e:
-            console.print(f"⚠️ [yellow]Error enforcing PARA principles: {e}[/yellow]")
-            para_stats = {'errors': [str(e)]}
-        
-        # Consolidación automática post-organización (conservadora)
-        consolidation_stats = {}
-        try:
-            console.print("\n🏗️ Ejecutando consolidación automática (modo conservador)...")
-            consolidation_stats = auto_consolidate_post_organization(vault_path, excluded_paths)
-        except Exception as e:
-            console.print(f"⚠️ [yellow]Error en consolidación automática: {e}[/yellow]")
-            consolidation_stats = {'error': str(e)}
-        
-        # Construir resultado final con manejo robusto de errores
-        try:
-            result = {
-                'success': True,
-                'vault_path': str(vault_path),
-                'backup_created': create_backup,
-                'para_stats': para_stats,
-                'consolidation_stats': consolidation_stats,
-                'message': 'Reclasificación completada exitosamente (modo seguro)',
-                'safety_features': [
-                    'No renombrado de archivos de usuario',
-                    'Respeto a proyectos independientes',
-                    'Consolidación conservadora',
-                    'Preservación de nombres originales'
-                ]
-            }
+                console.print(f"❌ Error inicializando ChromaDB: {e}")
+                return {
+                    'success': False,
+                    'error': f"Error inicializando ChromaDB: {e}",
+                    'message': 'Error en reclasificación completa'
+                }
             
-            # Agregar estadísticas finales si están disponibles
+            # Asegurar estructura PARA (sin renombrar archivos de usuario)
             try:
-                final_distribution = db.get_category_distribution()
-                if final_distribution:
-                    result['final_distribution'] = final_distribution
+                _ensure_correct_para_structure(vault_path, excluded_paths)
             except Exception as e:
-                console.print(f"⚠️ [yellow]Error obteniendo distribución final: {e}[/yellow]")
+                console.print(f"⚠️ [yellow]Error asegurando estructura PARA: {e}[/yellow]")
             
-            return result
+            # Consolidar carpetas dispersas (conservador)
+            try:
+                _consolidate_scattered_folders(vault_path, excluded_paths)
+            except Exception as e:
+                console.print(f"⚠️ [yellow]Error consolidando carpetas dispersas: {e}[/yellow]")
+            
+            # Clasificar inbox
+            try:
+                console.print("\n📥 Clasificando Inbox...")
+                run_inbox_classification(vault_path, db, "Clasificar todas las notas del inbox", "llama3.2:3b", True)
+            except Exception as e:
+                console.print(f"⚠️ [yellow]Error clasificando inbox: {e}[/yellow]")
+                if should_show('show_debug'):
+                    import traceback
+                    console.print(traceback.format_exc())
+            
+            # Refactorizar archive
+            try:
+                console.print("\n📦 Refactorizando Archive...")
+                run_archive_refactor(vault_path, db, "Refactorizar notas del archive", "llama3.2:3b", True, excluded_paths or [])
+            except Exception as e:
+                console.print(f"⚠️ [yellow]Error refactorizando archive: {e}[/yellow]")
+                if should_show('show_debug'):
+                    import traceback
+                    console.print(traceback.format_exc())
+            
+            # NUEVO: Enforce PARA method principles
+            try:
+                console.print("\n🎯 Enforcing PARA Method Principles...")
+                para_stats = enforce_para_principles(vault_path, db)
+            except Exception as e:
+                console.print(f"⚠️ [yellow]Error enforcing PARA principles: {e}[/yellow]")
+                para_stats = {'errors': [str(e)]}
+            
+            # Consolidación automática post-organización (conservadora)
+            consolidation_stats = {}
+            try:
+                console.print("\n🏗️ Ejecutando consolidación automática (modo conservador)...")
+                consolidation_stats = auto_consolidate_post_organization(vault_path, excluded_paths)
+            except Exception as e:
+                console.print(f"⚠️ [yellow]Error en consolidación automática: {e}[/yellow]")
+                consolidation_stats = {'error': str(e)}
+            
+            # Construir resultado final con manejo robusto de errores
+            try:
+                result = {
+                    'success': True,
+                    'vault_path': str(vault_path),
+                    'backup_created': False,
+                    'journal_id': transaction.id if transaction is not None else None,
+                    'para_stats': para_stats,
+                    'consolidation_stats': consolidation_stats,
+                    'message': 'Reclasificación completada exitosamente (modo seguro)',
+                    'safety_features': [
+                        'No renombrado de archivos de usuario',
+                        'Respeto a proyectos independientes',
+                        'Consolidación conservadora',
+                        'Preservación de nombres originales'
+                    ]
+                }
+            
+                # Agregar estadísticas finales si están disponibles
+                try:
+                    final_distribution = db.get_category_distribution()
+                    if final_distribution:
+                        result['final_distribution'] = final_distribution
+                except Exception as e:
+                    console.print(f"⚠️ [yellow]Error obteniendo distribución final: {e}[/yellow]")
+            
+                return result
+            
+            except Exception as e:
+                console.print(f"⚠️ [yellow]Error construyendo resultado final: {e}[/yellow]")
+                return {
+                    'success': True,  # Consideramos éxito aunque haya errores menores
+                    'vault_path': str(vault_path),
+                    'backup_created': False,
+                    'journal_id': transaction.id if transaction is not None else None,
+                    'para_stats': para_stats,
+                    'consolidation_stats': consolidation_stats,
+                    'message': 'Reclasificación completada con advertencias (modo seguro)',
+                    'warnings': [str(e)]
+                }
             
-        except Exception as e:
-            console.print(f"⚠️ [yellow]Error construyendo resultado final: {e}[/yellow]")
-            return {
-                'success': True,  # Consideramos éxito aunque haya errores menores
-                'vault_path': str(vault_path),
-                'backup_created': create_backup,
-                'para_stats': para_stats,
-                'consolidation_stats': consolidation_stats,
-                'message': 'Reclasificación completada con advertencias (modo seguro)',
-                'warnings': [str(e)]
-            }
-        
     except Exception as e:
         console.print(f"❌ Error crítico en reclasificación completa: {e}")
         if should_show('show_debug'):
@@ -4018,6 +3984,7 @@ def run_full_reclassification_safe(vault_path: str, excluded_paths: list[str] =
             'message': 'Error crítico en reclasificación completa'
         }
 
+@profiled_stage('file_move')
 def _safe_rename_file(source_path: Path, target_path: Path, vault_path: Path, db: ChromaPARADatabase = None) -> Path:
     """
     Mueve un archivo de forma segura, manejando conflictos de nombres y directorios.
@@ -4040,7 +4007,7 @@ def _safe_rename_file(source_path: Path, target_path: Path, vault_path: Path, db
         
         # Si el target_path no existe, mover directamente
         if not target_path.exists():
-            source_path.rename(target_path)
+            journal_rename(source_path, target_path)
             return target_path
         
         # CASO CRÍTICO: Si target_path existe como directorio y source_path es un archivo
@@ -4054,7 +4021,7 @@ def _safe_rename_file(source_path: Path, target_path: Path, vault_path: Path, db
                 new_name = f"{base_name}_{counter}{extension}"
                 new_path = target_path / new_name
                 if not new_path.exists():
-                    source_path.rename(new_path)
+                    journal_rename(source_path, new_path)
                     log_center.log_warning(
                         f"Archivo renombrado debido a conflicto con directorio: {source_path.name} → {new_name}",
                         "Organizer-SafeRename",
@@ -4078,7 +4045,7 @@ def _safe_rename_file(source_path: Path, target_path: Path, vault_path: Path, db
                 new_name = f"{base_name}_{counter}{extension}"
                 new_path = target_path.parent / new_name
                 if not new_path.exists():
-                    source_path.rename(new_path)
+                    journal_rename(source_path, new_path)
                     log_center.log_warning(
                         f"Archivo renombrado debido a conflicto: {source_path.name} → {new_name}",
                         "Organizer-SafeRename",
@@ -4102,14 +4069,14 @@ def _safe_rename_file(source_path: Path, target_path: Path, vault_path: Path, db
                         new_name = f"{base_name}_{counter}{extension}"
                         new_path = target_path / new_name
                         if not new_path.exists():
-                            item.rename(new_path)
+                            journal_rename(item, new_path)
                             break
                         counter += 1
                 else:
-                    item.rename(item_target)
+                    journal_rename(item, item_target)
             
             # Eliminar el directorio origen vacío
-            source_path.rmdir()
+            journal_rmdir(source_path)
             return target_path
         
         return target_path
@@ -4154,7 +4121,7 @@ def clean_problematic_folders(vault_path: Path, db=None) -> dict:
                     try:
                         # Mover a recursos
                         resources_path = vault_path / '03-Resources'
-                        resources_path.mkdir(exist_ok=True)
+                        journal_mkdir(resources_path)
                         
                         # Limpiar nombre (remover "Related" y sufijos)
                         clean_name = folder.name.replace(' Related', '').replace(' Related_2', '')
@@ -4167,7 +4134,7 @@ def clean_problematic_folders(vault_path: Path, db=None) -> dict:
                             clean_name = f"{clean_name}_{datetime.now().strftime('%Y%m%d')}"
                             new_path = resources_path / clean_name
                         
-                        folder.rename(new_path)
+                        journal_rename(folder, new_path)
                         stats['projects_fixed'] += 1
                         print(f"✅ Movido de proyectos a recursos: {folder.name} → {clean_name}")
                         
@@ -4207,7 +4174,7 @@ def clean_problematic_folders(vault_path: Path, db=None) -> dict:
                             new_name = f"{base_name}_{datetime.now().strftime('%Y%m%d')}"
                             new_path = main_folder.parent / new_name
                         
-                        main_folder.rename(new_path)
+                        journal_rename(main_folder, new_path)
                         
                         # Mover contenido de otras carpetas
                         for other_folder in other_folders:
@@ -4215,9 +4182,9 @@ def clean_problematic_folders(vault_path: Path, db=None) -> dict:
                                 if item.is_file():
                                     target_path = new_path / item.name
                                     if not target_path.exists():
-                                        item.rename(target_path)
+                                        journal_rename(item, target_path)
                             # Eliminar carpeta vacía
-                            other_folder.rmdir()
+                            journal_rmdir(other_folder)
                         
                         stats['resources_reorganized'] += 1
                         print(f"✅ Consolidado: {len(folders)} carpetas '{base_name}' → 1")
@@ -4229,7 +4196,7 @@ def clean_problematic_folders(vault_path: Path, db=None) -> dict:
         areas_path = vault_path / '02-Areas'
         if areas_path.exists():
             personal_dev_path = areas_path / 'Personal Development'
-            personal_dev_path.mkdir(exist_ok=True)
+            journal_mkdir(personal_dev_path)
             
             # Mover carpetas de desarrollo personal a la nueva área
             personal_folders = ['Carrera', 'Encuesta', 'Coaching']
@@ -4240,7 +4207,7 @@ def clean_problematic_folders(vault_path: Path, db=None) -> dict:
                     try:
                         target_path = personal_dev_path / folder_name
                         if not target_path.exists():
-                            source_path.rename(target_path)
+                            journal_rename(source_path, target_path)
                             stats['areas_created'] += 1
                             print(f"✅ Movido a Personal Development: {folder_name}")
                     except Exception as e:
@@ -4259,16 +4226,16 @@ def clean_problematic_folders(vault_path: Path, db=None) -> dict:
                         try:
                             # Mover contenido a archivo
                             archive_path = vault_path / '04-Archive' / 'Temporary Notes'
-                            archive_path.mkdir(exist_ok=True)
+                            journal_mkdir(archive_path)
                             
                             for item in folder.iterdir():
                                 if item.is_file():
                                     target_path = archive_path / item.name
                                     if not target_path.exists():
-                                        item.rename(target_path)
+                                        journal_rename(item, target_path)
                             
                             # Eliminar carpeta vacía
-                            folder.rmdir()
+                            journal_rmdir(folder)
                             stats['folders_cleaned'] += 1
                             print(f"✅ Limpiada carpeta temporal: {folder.name}")
                             
@@ -4399,6 +4366,7 @@ class TagAnalyzer:
         """Retorna coherencia de tags (valor por defecto)."""
         return 0.5  # Valor neutral
 
+@profiled_stage('classification_log_write')
 def _log_detailed_classification_decision(
     note_content: str, 
     note_path: Path, 
@@ -4421,7 +4389,7 @@ def _log_detailed_classification_decision(
     """
     from datetime import datetime
     from paralib.log_center import log_center
-    from paralib.learning_system import PARA_Learning_System
+    from paralib.telemetry_sink import get_telemetry_sink
     import json
     
     try:
@@ -4527,30 +4495,17 @@ def _log_detailed_classification_decision(
         if fallback_used:
             log_message += f" [FALLBACK: {fallback_reason}]"
         
-        log_center.log(log_level, log_message, "Classification-Decision")
-        
-        # 2. Sistema de Aprendizaje (para mejora automática)
-        try:
-            learning_system = PARA_Learning_System(db, vault_path)
-            learning_result = learning_system.learn_from_classification(classification_log)
-            classification_log['learning_result'] = learning_result
-        except Exception as e:
-            classification_log['learning_error'] = str(e)
-            log_center.log_warning(f"Error en sistema de aprendizaje: {e}", "Classification-Decision")
-        
-        # 3. Base de Datos de Clasificaciones (para análisis histórico)
-        try:
-            _save_classification_to_database(classification_log, db)
-        except Exception as e:
-            classification_log['database_error'] = str(e)
-            log_center.log_warning(f"Error guardando clasificación en DB: {e}", "Classification-Decision")
+        getattr(log_center, f"log_{log_level}")(log_message, "Classification-Decision")
         
-        # 4. Archivo de Log Detallado (para análisis offline)
-        try:
-            _save_detailed_log_to_file(classification_log, vault_path)
-        except Exception as e:
-            classification_log['file_log_error'] = str(e)
-            log_center.log_warning(f"Error guardando log detallado: {e}", "Classification-Decision")
+        # 2-3. Historial en DB y archivo de log detallado: en segundo plano (el aprendizaje
+        # lo registra _register_classification_learning)
+        # (ver _process_classification_decision_events)
+        if not get_telemetry_sink().submit('classification_decision', {
+            'classification_log': classification_log,
+            'vault_path': vault_path,
+            'db': db
+        }):
+            classification_log['telemetry_dropped'] = True
         
         return classification_log
         
@@ -4562,39 +4517,126 @@ def _log_detailed_classification_decision(
             'note_path': str(note_path) if note_path else 'unknown'
         }
 
-def _save_classification_to_database(classification_log: dict, db: ChromaPARADatabase):
-    """Guarda la clasificación en la base de datos para análisis histórico."""
-    try:
-        # Crear documento para ChromaDB
-        document = {
-            'content': classification_log['note_content_preview'],
-            'metadata': {
-                'note_path': classification_log['note_path'],
-                'note_name': classification_log['note_name'],
-                'final_category': classification_log['final_decision']['category'],
-                'final_folder': classification_log['final_decision']['folder'],
-                'final_confidence': classification_log['final_decision']['confidence'],
-                'final_method': classification_log['final_decision']['method'],
-                'semantic_category': classification_log['semantic_analysis']['category'],
-                'llm_category': classification_log['llm_analysis']['category'],
-                'semantic_confidence': classification_log['semantic_analysis']['confidence'],
-                'llm_confidence': classification_log['llm_analysis']['confidence'],
-                'fallback_used': classification_log['final_decision']['fallback_used'],
-                'requires_review': classification_log['learning_data']['requires_review'],
-                'timestamp': classification_log['timestamp'],
-                'classification_id': f"cls_{classification_log['timestamp'].replace(':', '-')}"
-            }
-        }
-        
-        # Agregar a la colección de clasificaciones
-        db.collection.add(
-            documents=[document['content']],
-            metadatas=[document['metadata']],
-            ids=[document['metadata']['classification_id']]
-        )
+def _build_classification_event(classification_log: dict, db: ChromaPARADatabase) -> dict:
+    """Convierte un log detallado de clasificación en un evento del historial."""
+    from paralib.classification_log import EVENT_CLASSIFICATION
+    
+    note_path = Path(classification_log['note_path'])
+    final_decision = classification_log['final_decision']
+    return {
+        'event_type': EVENT_CLASSIFICATION,
+        'note_id': db._generate_id(note_path),
+        'path': classification_log['note_path'],
+        'filename': classification_log['note_name'],
+        'timestamp': classification_log['timestamp'],
+        'predicted_category': final_decision['category'],
+        'predicted_folder': final_decision['folder'],
+        'confidence': final_decision['confidence'],
+        'method': final_decision['method'],
+        'explanation': final_decision['reasoning'],
+        'semantic_category': classification_log['semantic_analysis']['category'],
+        'semantic_confidence': classification_log['semantic_analysis']['confidence'],
+        'llm_category': classification_log['llm_analysis']['category'],
+        'llm_confidence': classification_log['llm_analysis']['confidence'],
+        'fallback_used': final_decision['fallback_used'],
+        'requires_review': classification_log['learning_data']['requires_review'],
+        'model': classification_log.get('model_name'),
+        'prompt': classification_log.get('user_directive'),
+        'tags': classification_log['analysis'].get('tags_found', []),
+        'content_preview': classification_log['note_content_preview'],
+    }
+
+# === SUMIDERO DE TELEMETRÍA: procesamiento batch en segundo plano ===
+
+_learning_systems: Dict[tuple, Any] = {}
+
+def _get_learning_system(db: ChromaPARADatabase, vault_path: Path):
+    """Instancia de PARA_Learning_System reutilizada por vault/DB (no una por clasificación)."""
+    key = (str(vault_path), str(getattr(db, 'db_path', '')))
+    learning_system = _learning_systems.get(key)
+    if learning_system is None:
+        learning_system = PARA_Learning_System(db, vault_path)
+        _learning_systems[key] = learning_system
+    return learning_system
+
+_analyze_managers: Dict[tuple, tuple] = {}
+# Cambio relativo de notas indexadas a partir del cual se recalcula el clustering del vault
+ANALYZE_REFRESH_RATIO = 0.10
+
+def _get_analyze_manager(db: ChromaPARADatabase, vault_path: Path) -> AnalyzeManager:
+    """
+    AnalyzeManager reutilizado por vault/DB. Construirlo abre su ChromaDB, carga el modelo de
+    embeddings y agrupa todo el vault, así que no se repite en cada nota: se recalcula cuando
+    el número de notas indexadas cambia más de ``ANALYZE_REFRESH_RATIO``.
+    """
+    key = (str(vault_path), str(getattr(db, 'db_path', '')))
+    note_count = db.get_note_count()
+    cached = _analyze_managers.get(key)
+    if cached is None or abs(note_count - cached[1]) > max(1, cached[1] * ANALYZE_REFRESH_RATIO):
+        cached = (AnalyzeManager(vault_path, db_path=Path(db.db_path).parent), note_count)
+        _analyze_managers[key] = cached
+    return cached[0]
+
+def _process_learning_events(events: List[dict]):
+    """Handler batch de eventos 'learning' encolados por _register_classification_learning."""
+    for event in events:
+        try:
+            learning_system = _get_learning_system(event['db'], event['vault_path'])
+            learning_system.learn_from_classification(event['classification_data'])
+            
+            # Si se detectó un error potencial, registrar feedback automático
+            if event['potential_error'].get('is_error', False):
+                _register_automatic_feedback(
+                    learning_system, event['note_path'], event['predicted_category'],
+                    event['potential_error'], event['analysis'], event['vault_path']
+                )
+        except Exception as e:
+            logger.warning(f"Error registrando aprendizaje en segundo plano: {e}")
+
+def _process_classification_decision_events(events: List[dict]):
+    """
+    Handler batch de decisiones de clasificación: historial en DB (una transacción por lote)
+    y archivo de log detallado. El aprendizaje ya lo registra _process_learning_events; aquí
+    no se repite para no contar dos veces cada clasificación en los agregados.
+    """
+    from paralib.classification_log import get_history_store
+    from paralib.log_center import log_center
+    
+    history_batches = {}
+    for event in events:
+        classification_log = event['classification_log']
+        db = event['db']
         
-    except Exception as e:
-        raise Exception(f"Error guardando en base de datos: {e}")
+        # 2. Base de Datos de Clasificaciones (se acumula para escribir en lote)
+        try:
+            store = get_history_store(db)
+            if store is not None:
+                history_batches.setdefault(id(store), (store, []))[1].append(
+                    _build_classification_event(classification_log, db))
+        except Exception as e:
+            classification_log['database_error'] = str(e)
+            log_center.log_warning(f"Error guardando clasificación en DB: {e}", "Classification-Decision")
+    
+    for store, history_events in history_batches.values():
+        try:
+            store.append_many(history_events)
+        except Exception as e:
+            log_center.log_warning(f"Error guardando {len(history_events)} clasificaciones en DB: {e}", "Classification-Decision")
+    
+    # 3. Archivo de Log Detallado (para análisis offline)
+    for event in events:
+        try:
+            _save_detailed_log_to_file(event['classification_log'], event['vault_path'])
+        except Exception as e:
+            log_center.log_warning(f"Error guardando log detallado: {e}", "Classification-Decision")
+
+def _register_telemetry_handlers():
+    from paralib.telemetry_sink import get_telemetry_sink
+    sink = get_telemetry_sink()
+    sink.register_handler('learning', _process_learning_events)
+    sink.register_handler('classification_decision', _process_classification_decision_events)
+
+_register_telemetry_handlers()
 
 def _save_detailed_log_to_file(classification_log: dict, vault_path: Path):
     """Guarda el log detallado en un archivo JSON para análisis offline."""
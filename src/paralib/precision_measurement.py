@@ -5,7 +5,6 @@ Objetivo: Alcanzar 95% de precisión medible y real
 
 from pathlib import Path
 from typing import Dict, List, Tuple, Any
-import sqlite3
 import json
 from datetime import datetime
 from rich.console import Console
@@ -15,9 +14,10 @@ import statistics
 
 from paralib.db import ChromaPARADatabase
 from paralib.learning_system import PARA_Learning_System
-from paralib.classification_log import get_feedback_notes
+from paralib.classification_log import get_history_store
 from paralib.organizer import classify_note_with_enhanced_analysis
 from paralib.logger import logger
+from paralib.sqlite_pool import get_pool
 
 console = Console()
 
@@ -34,7 +34,7 @@ class PrecisionMeasurementSystem:
     def _init_measurement_database(self):
         """Inicializa la base de datos de mediciones de precisión."""
         self.measurement_db_path.parent.mkdir(exist_ok=True, parents=True)
-        conn = sqlite3.connect(str(self.measurement_db_path))
+        conn = get_pool(self.measurement_db_path).connect()
         cursor = conn.cursor()
         
         # Tabla principal de mediciones
@@ -93,15 +93,13 @@ class PrecisionMeasurementSystem:
         # Obtener métricas actuales del learning system
         current_metrics = self.learning_system.get_metrics()
         
-        # Obtener feedback notes para cálculo manual
-        feedback_notes = get_feedback_notes(self.db)
-        classifications = self.learning_system._get_all_classifications()
+        # Agregados del historial de clasificaciones para cálculo manual
+        store = get_history_store(self.db)
+        summary = store.summary() if store is not None else {'total_notes': 0, 'feedback_count': 0, 'correct': 0}
         
         # Calcular precisión manual
-        if feedback_notes:
-            correct_count = sum(1 for note in feedback_notes 
-                              if note.get('predicted_category') == note.get('feedback_category'))
-            manual_accuracy = (correct_count / len(feedback_notes)) * 100
+        if summary['feedback_count']:
+            manual_accuracy = (summary['correct'] / summary['feedback_count']) * 100
         else:
             manual_accuracy = 0.0
         
@@ -109,8 +107,8 @@ class PrecisionMeasurementSystem:
             'timestamp': datetime.utcnow().isoformat(),
             'learning_system_accuracy': current_metrics.get('accuracy_rate', 0.0),
             'manual_calculated_accuracy': manual_accuracy,
-            'total_classifications': len(classifications),
-            'total_feedback': len(feedback_notes),
+            'total_classifications': summary['total_notes'],
+            'total_feedback': summary['feedback_count'],
             'confidence_correlation': current_metrics.get('confidence_correlation', 0.0),
             'category_balance': current_metrics.get('category_balance', 0.0),
             'semantic_coherence': current_metrics.get('semantic_coherence', 0.0)
@@ -232,20 +230,21 @@ class PrecisionMeasurementSystem:
     
     def _save_factor_performance(self, factors: Dict[str, Any], note_path: Path, category: str):
         """Guarda el rendimiento de factores individuales."""
-        conn = sqlite3.connect(str(self.measurement_db_path))
+        conn = get_pool(self.measurement_db_path).connect()
         cursor = conn.cursor()
         
         timestamp = datetime.utcnow().isoformat()
         
-        for factor_name, factor_value in factors.items():
-            # Calcular impact score básico
-            impact_score = self._calculate_factor_impact(factor_name, factor_value)
-            
-            cursor.execute('''
-                INSERT INTO factor_performance 
-                (timestamp, factor_name, factor_value, impact_score, category_correlation, note_path)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (timestamp, factor_name, str(factor_value), impact_score, category, str(note_path)))
+        # Calcular impact score básico por factor y escribir en batch
+        cursor.executemany('''
+            INSERT INTO factor_performance 
+            (timestamp, factor_name, factor_value, impact_score, category_correlation, note_path)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', [
+            (timestamp, factor_name, str(factor_value),
+             self._calculate_factor_impact(factor_name, factor_value), category, str(note_path))
+            for factor_name, factor_value in factors.items()
+        ])
         
         conn.commit()
         conn.close()
@@ -320,7 +319,7 @@ class PrecisionMeasurementSystem:
     
     def _analyze_factor_impacts(self) -> Dict[str, float]:
         """Analiza el impacto de cada factor en la precisión."""
-        conn = sqlite3.connect(str(self.measurement_db_path))
+        conn = get_pool(self.measurement_db_path).connect()
         cursor = conn.cursor()
         
         # Obtener rendimiento promedio por factor
@@ -340,7 +339,7 @@ class PrecisionMeasurementSystem:
     
     def _save_measurement_result(self, comparison: Dict[str, Any], test_results: Dict[str, Any]):
         """Guarda el resultado de la medición en la base de datos."""
-        conn = sqlite3.connect(str(self.measurement_db_path))
+        conn = get_pool(self.measurement_db_path).connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -0,0 +1,268 @@
+"""
+paralib/profiler.py
+
+Perfilado por etapas de las ejecuciones de clasificación (``classify``, ``reclassify-all``...).
+
+Se activa con ``--profile`` en el CLI o con la variable ``PARA_PROFILE``:
+
+- ``PARA_PROFILE=1`` (o ``stages``): tiempo de pared y número de llamadas por etapa
+  (lectura de archivo, ``analyze_note_completely``, sugerencia semántica, cada llamada al LLM,
+  decisión híbrida, escrituras de aprendizaje, movimientos de archivos...) con percentiles.
+- ``PARA_PROFILE=cprofile``: además, ``cProfile`` de toda la ejecución (``.prof`` + top 40).
+- ``PARA_PROFILE=pyinstrument``: además, informe de ``pyinstrument`` si está instalado.
+
+Al terminar se imprime la tabla por etapa y se guarda un JSON en ``logs/profiles/`` para
+comparar ejecuciones entre versiones. Desactivado, ``stage()`` devuelve un contexto nulo
+compartido y las funciones con ``profiled_stage`` solo comprueban el modo.
+"""
+import cProfile
+import io
+import json
+import os
+import platform
+import pstats
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import pyinstrument
+    PYINSTRUMENT_AVAILABLE = True
+except ImportError:
+    pyinstrument = None
+    PYINSTRUMENT_AVAILABLE = False
+
+PROFILE_MODES = ('stages', 'cprofile', 'pyinstrument')
+# Muestras de duración que se guardan por etapa para los percentiles (muestreo de reservorio)
+MAX_STAGE_SAMPLES = 50_000
+PROFILE_DIR = Path("logs") / "profiles"
+
+_NULL_CONTEXT = nullcontext()
+
+
+def _mode_from_env(value: Optional[str]) -> Optional[str]:
+    value = (value or '').strip().lower()
+    if value in ('', '0', 'false', 'no', 'off'):
+        return None
+    if value in PROFILE_MODES:
+        return value
+    return 'stages'
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class StageStats:
+    """Tiempo acumulado, llamadas, errores y muestras de una etapa."""
+    __slots__ = ('name', 'count', 'errors', 'total', 'max', 'samples')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: List[float] = []
+
+    def add(self, seconds: float, failed: bool = False):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if failed:
+            self.errors += 1
+        if len(self.samples) < MAX_STAGE_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            slot = random.randrange(self.count)
+            if slot < MAX_STAGE_SAMPLES:
+                self.samples[slot] = seconds
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.samples)
+        return {
+            'stage': self.name,
+            'count': self.count,
+            'errors': self.errors,
+            'total_s': round(self.total, 6),
+            'mean_s': round(self.total / self.count, 6) if self.count else 0.0,
+            'p50_s': round(_percentile(ordered, 50), 6),
+            'p90_s': round(_percentile(ordered, 90), 6),
+            'p99_s': round(_percentile(ordered, 99), 6),
+            'max_s': round(self.max, 6),
+        }
+
+
+class Profiler:
+    """Registro de etapas de una ejecución; un único perfilador global (``profiler``)."""
+
+    def __init__(self, mode: Optional[str] = None):
+        self.mode = mode
+        self.stages: Dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+        self._started_at: Optional[float] = None
+        self._label = ''
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._pyinstrument = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode is not None
+
+    def enable(self, mode: str = 'stages'):
+        self.mode = mode if mode in PROFILE_MODES else 'stages'
+
+    # --- Registro ---
+
+    def record(self, name: str, seconds: float, failed: bool = False):
+        stats = self.stages.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self.stages.setdefault(name, StageStats(name))
+        stats.add(seconds, failed)
+
+    @contextmanager
+    def _timed(self, name: str):
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, failed)
+
+    def stage(self, name: str):
+        """Contexto que mide una etapa (``with profiler.stage('llm_call'):``)."""
+        if self.mode is None:
+            return _NULL_CONTEXT
+        return self._timed(name)
+
+    # --- Ejecución completa ---
+
+    def start(self, label: str = ''):
+        """Empieza una ejecución perfilada (y cProfile/pyinstrument según el modo)."""
+        if self.mode is None:
+            return
+        self.stages.clear()
+        self._label = label
+        self._started_at = time.perf_counter()
+        if self.mode == 'cprofile':
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        elif self.mode == 'pyinstrument':
+            if PYINSTRUMENT_AVAILABLE:
+                self._pyinstrument = pyinstrument.Profiler()
+                self._pyinstrument.start()
+            else:
+                print("⚠️ pyinstrument no está instalado (pip install pyinstrument); solo se miden etapas")
+
+    def report(self) -> Dict[str, Any]:
+        wall = time.perf_counter() - self._started_at if self._started_at is not None else None
+        stages = sorted((stats.summary() for stats in list(self.stages.values())),
+                        key=lambda item: item['total_s'], reverse=True)
+        return {
+            'label': self._label,
+            'created_at': datetime.now().isoformat(),
+            'wall_time_s': round(wall, 6) if wall is not None else None,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'argv': sys.argv[1:],
+            'stages': stages,
+        }
+
+    def finish(self, output_dir: Path = PROFILE_DIR, print_table: bool = True) -> Optional[Path]:
+        """Detiene la ejecución perfilada, imprime la tabla por etapa y guarda el JSON."""
+        if self.mode is None or self._started_at is None:
+            return None
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        report = self.report()
+
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            prof_path = output_dir / f"profile_{stamp}.prof"
+            self._cprofile.dump_stats(str(prof_path))
+            text = io.StringIO()
+            pstats.Stats(self._cprofile, stream=text).sort_stats('cumulative').print_stats(40)
+            (output_dir / f"profile_{stamp}_cprofile.txt").write_text(text.getvalue(), encoding='utf-8')
+            report['cprofile'] = str(prof_path)
+            self._cprofile = None
+        if self._pyinstrument is not None:
+            self._pyinstrument.stop()
+            html_path = output_dir / f"profile_{stamp}_pyinstrument.html"
+            html_path.write_text(self._pyinstrument.output_html(), encoding='utf-8')
+            report['pyinstrument'] = str(html_path)
+            self._pyinstrument = None
+
+        json_path = output_dir / f"profile_{stamp}.json"
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        self._started_at = None
+
+        if print_table:
+            self.print_report(report)
+            print(f"💾 Perfil guardado en {json_path}")
+        return json_path
+
+    @staticmethod
+    def print_report(report: Dict[str, Any]):
+        try:
+            from rich.console import Console
+            from rich.table import Table
+        except ImportError:
+            Console = None
+        title = f"Perfil por etapa ({report.get('wall_time_s') or 0:.2f}s de pared)"
+        if Console is None:
+            print(f"\n{title}")
+            for item in report['stages']:
+                print(f"  {item['stage']:<28} {item['count']:>7} {item['total_s']:>10.3f}s "
+                      f"p50 {item['p50_s'] * 1000:.1f}ms p90 {item['p90_s'] * 1000:.1f}ms p99 {item['p99_s'] * 1000:.1f}ms")
+            return
+        table = Table(title=title)
+        table.add_column("Etapa", style="cyan")
+        table.add_column("Llamadas", justify="right")
+        table.add_column("Errores", justify="right")
+        table.add_column("Total (s)", justify="right", style="magenta")
+        table.add_column("p50 (ms)", justify="right")
+        table.add_column("p90 (ms)", justify="right")
+        table.add_column("p99 (ms)", justify="right")
+        table.add_column("Máx (ms)", justify="right")
+        for item in report['stages']:
+            table.add_row(
+                item['stage'], str(item['count']), str(item['errors']), f"{item['total_s']:.3f}",
+                f"{item['p50_s'] * 1000:.1f}", f"{item['p90_s'] * 1000:.1f}",
+                f"{item['p99_s'] * 1000:.1f}", f"{item['max_s'] * 1000:.1f}"
+            )
+        Console().print(table)
+
+
+profiler = Profiler(_mode_from_env(os.environ.get('PARA_PROFILE')))
+
+
+def profiled_stage(name: str) -> Callable:
+    """
+    Decorador que mide cada llamada como la etapa ``name``. El modo se comprueba en cada
+    llamada (``--profile`` lo activa después de importar los módulos decorados).
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if profiler.mode is None:
+                return func(*args, **kwargs)
+            with profiler._timed(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
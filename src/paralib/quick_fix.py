@@ -10,6 +10,7 @@ en el sistema PARA.
 import os
 import sys
 import json
+from contextlib import nullcontext
 from pathlib import Path
 from typing import Dict, List, Optional
 
@@ -17,6 +18,7 @@ from typing import Dict, List, Optional
 sys.path.append(str(Path(__file__).parent.parent))
 
 from paralib.logger import logger
+from paralib.move_journal import journal_mkdir, journal_rename, move_transaction
 from rich.console import Console
 from rich.prompt import Prompt, Confirm
 from rich.table import Table
@@ -53,12 +55,7 @@ class QuickFixPARA:
             target_base = self.vault_path / self.categories[target_category]
             
             # Determinar carpeta de destino
-            if target_folder:
-                target_dir = target_base / target_folder
-                target_dir.mkdir(parents=True, exist_ok=True)
-            else:
-                target_dir = target_base
-            
+            target_dir = target_base / target_folder if target_folder else target_base
             target_path = target_dir / source_path.name
             
             # Verificar que el destino no exista
@@ -67,8 +64,10 @@ class QuickFixPARA:
                 if not Confirm.ask("¿Sobrescribir?", default=False):
                     return False
             
-            # Mover archivo
-            source_path.rename(target_path)
+            # Mover archivo (journal: se puede deshacer con 'undo', incluso si sobrescribe)
+            with move_transaction(self.vault_path, f"Quick fix: {source_path.name}"):
+                journal_mkdir(target_dir)
+                journal_rename(source_path, target_path)
             console.print(f"[green]✅ Movido: {source_path.name} → {target_category}/{target_folder or ''}[/green]")
             
             logger.info(f"Quick fix: {source_path} → {target_path}")
@@ -108,27 +107,29 @@ class QuickFixPARA:
                 console.print("[yellow]MODO SIMULACIÓN - Los archivos NO se moverán[/yellow]")
             
             target_base = self.vault_path / self.categories[target_category]
-            target_base.mkdir(exist_ok=True)
             
-            for file_path in files_found:
-                try:
-                    target_path = target_base / file_path.name
-                    
-                    if dry_run:
-                        console.print(f"  [dim]SIMULAR: {file_path.name} → {target_category}[/dim]")
-                    else:
-                        if target_path.exists():
-                            console.print(f"  [yellow]⚠️ Ya existe: {file_path.name}[/yellow]")
-                            continue
+            with (nullcontext() if dry_run else move_transaction(self.vault_path, f"Batch move '{pattern}' → {target_category}")):
+                if not dry_run:
+                    journal_mkdir(target_base)
+                for file_path in files_found:
+                    try:
+                        target_path = target_base / file_path.name
                         
-                        file_path.rename(target_path)
-                        console.print(f"  [green]✅ Movido: {file_path.name}[/green]")
-                        results['moved_successfully'] += 1
-                
-                except Exception as e:
-                    error_msg = f"Error moviendo {file_path.name}: {e}"
-                    results['errors'].append(error_msg)
-                    console.print(f"  [red]❌ {error_msg}[/red]")
+                        if dry_run:
+                            console.print(f"  [dim]SIMULAR: {file_path.name} → {target_category}[/dim]")
+                        else:
+                            if target_path.exists():
+                                console.print(f"  [yellow]⚠️ Ya existe: {file_path.name}[/yellow]")
+                                continue
+                            
+                            journal_rename(file_path, target_path)
+                            console.print(f"  [green]✅ Movido: {file_path.name}[/green]")
+                            results['moved_successfully'] += 1
+                    
+                    except Exception as e:
+                        error_msg = f"Error moviendo {file_path.name}: {e}"
+                        results['errors'].append(error_msg)
+                        console.print(f"  [red]❌ {error_msg}[/red]")
             
             return results
             
@@ -0,0 +1,235 @@
+"""
+paralib/restore_engine.py
+
+Motor de restauración por diferencias para los backups de PARA.
+
+En lugar de borrar el vault y extraer el backup completo, compara cada archivo del
+backup con el archivo vivo (tamaño, mtime y, si hace falta, contenido) y solo reescribe
+los que difieren. Las escrituras son atómicas y se hacen en paralelo. Admite restauración
+selectiva por ruta, carpeta o patrón glob (``01-Projects/*``, ``**/reunion*.md``).
+"""
+import fnmatch
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .log_center import log_center
+from .snapshot_store import walk_vault_files
+
+# Lectura al comparar contenido / copiar en streaming
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def matches_patterns(rel_path: str, patterns: Optional[Iterable[str]]) -> bool:
+    """
+    True si ``rel_path`` coincide con algún patrón: ruta exacta, carpeta (prefijo) o glob.
+    Sin patrones, todo coincide.
+    """
+    if not patterns:
+        return True
+    for pattern in patterns:
+        pattern = pattern.replace('\\', '/').strip('/')
+        if not pattern:
+            return True
+        if rel_path == pattern or rel_path.startswith(pattern + '/'):
+            return True
+        if fnmatch.fnmatchcase(rel_path, pattern):
+            return True
+    return False
+
+
+def atomic_write(target: Path, chunks: Iterable[bytes], mtime_ns: Optional[int] = None):
+    """Escribe ``chunks`` en ``target`` vía archivo temporal + ``os.replace``; conserva el mtime del backup."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f".{target.name}.{threading.get_ident()}.para_restore")
+    try:
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+        if mtime_ns is not None:
+            # Con el mtime del backup, la próxima comparación se resuelve sin leer el archivo
+            os.utime(tmp_path, ns=(mtime_ns, mtime_ns))
+        os.replace(tmp_path, target)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def same_bytes(path: Path, data: bytes) -> bool:
+    """Compara un archivo vivo con contenido en memoria."""
+    try:
+        if path.stat().st_size != len(data):
+            return False
+        with open(path, 'rb') as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+
+@dataclass
+class RestoreResult:
+    """Resultado de una restauración por diferencias."""
+    restored: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    removed: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def success(self) -> bool:
+        return not self.errors
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'restored': len(self.restored),
+            'unchanged': self.unchanged,
+            'removed': len(self.removed),
+            'errors': len(self.errors),
+        }
+
+
+class RestoreEngine:
+    """
+    Restaura un conjunto de entradas sobre ``target``.
+
+    - ``patterns``: limita la restauración a rutas/carpetas/globs (restauración selectiva).
+    - ``prune``: elimina los archivos vivos (dentro de la selección) que no están en el backup,
+      de modo que el resultado sea igual al backup sin borrar ``.para_db`` ni ``.git``.
+    - ``keep``: rutas/carpetas que la poda nunca elimina (las que el backup no pudo leer).
+    """
+
+    def __init__(self, target: Path, patterns: Optional[List[str]] = None, prune: bool = False,
+                 workers: int = None, keep: Optional[Iterable[str]] = None):
+        self.target = Path(target)
+        self.patterns = list(patterns) if patterns else None
+        self.prune = prune
+        self.keep = list(keep) if keep else None
+        self.workers = workers or min(16, (os.cpu_count() or 2) * 2)
+        self._lock = threading.Lock()
+
+    def selected(self, rel_path: str) -> bool:
+        return matches_patterns(rel_path, self.patterns)
+
+    def restore(self, entries: Dict[str, Any],
+                is_same: Callable[[Path, Any], bool],
+                write: Callable[[Path, Any], None]) -> RestoreResult:
+        """
+        Restauración con acceso aleatorio (snapshots, zip). Para cada entrada seleccionada,
+        ``is_same(ruta_viva, entrada)`` decide si se omite y ``write(ruta_viva, entrada)`` la reescribe.
+        """
+        result = RestoreResult()
+        selected = [(rel_path, entry) for rel_path, entry in entries.items() if self.selected(rel_path)]
+
+        def restore_one(rel_path: str, entry: Any):
+            live = self.target / rel_path
+            try:
+                if live.is_file() and is_same(live, entry):
+                    with self._lock:
+                        result.unchanged += 1
+                    return
+                write(live, entry)
+                with self._lock:
+                    result.restored.append(rel_path)
+            except Exception as e:
+                with self._lock:
+                    result.errors.append(rel_path)
+                log_center.log_error(f"No se pudo restaurar {rel_path}: {e}", component='RestoreEngine')
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="para-restore") as executor:
+            for future in [executor.submit(restore_one, rel_path, entry) for rel_path, entry in selected]:
+                future.result()
+
+        self._prune(set(entries), result)
+        return result
+
+    def restore_stream(self, members: Iterator[Tuple[str, int, Optional[int], Any]],
+                       max_buffered: int = COPY_CHUNK_SIZE) -> RestoreResult:
+        """
+        Restauración desde un stream secuencial (tar.zst). ``members`` produce
+        ``(ruta, tamaño, mtime_ns, fileobj)``; el fileobj solo es válido hasta el siguiente miembro.
+        Los archivos pequeños se leen y se comparan/escriben en el pool; los grandes se comparan
+        en streaming contra el archivo vivo y solo se reemplazan si difieren.
+        """
+        result = RestoreResult()
+        seen = set()
+
+        def write_small(rel_path: str, data: bytes, mtime_ns: Optional[int]):
+            live = self.target / rel_path
+            try:
+                if same_bytes(live, data):
+                    with self._lock:
+                        result.unchanged += 1
+                    return
+                atomic_write(live, [data], mtime_ns)
+                with self._lock:
+                    result.restored.append(rel_path)
+            except Exception as e:
+                with self._lock:
+                    result.errors.append(rel_path)
+                log_center.log_error(f"No se pudo restaurar {rel_path}: {e}", component='RestoreEngine')
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="para-restore") as executor:
+            futures = []
+            for rel_path, size, mtime_ns, fileobj in members:
+                seen.add(rel_path)
+                if not self.selected(rel_path):
+                    continue
+                if size <= max_buffered:
+                    futures.append(executor.submit(write_small, rel_path, fileobj.read(), mtime_ns))
+                    continue
+                try:
+                    if self._copy_if_different(fileobj, size, self.target / rel_path, mtime_ns):
+                        result.restored.append(rel_path)
+                    else:
+                        result.unchanged += 1
+                except Exception as e:
+                    result.errors.append(rel_path)
+                    log_center.log_error(f"No se pudo restaurar {rel_path}: {e}", component='RestoreEngine')
+            for future in futures:
+                future.result()
+
+        self._prune(seen, result)
+        return result
+
+    def _copy_if_different(self, fileobj, size: int, live: Path, mtime_ns: Optional[int]) -> bool:
+        """Copia un archivo grande a un temporal comparándolo con el vivo; lo reemplaza solo si difiere."""
+        live.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = live.with_name(f".{live.name}.{threading.get_ident()}.para_restore")
+        try:
+            current = open(live, 'rb') if live.is_file() and live.stat().st_size == size else None
+            identical = current is not None
+            try:
+                with open(tmp_path, 'wb') as out:
+                    for chunk in iter(lambda: fileobj.read(COPY_CHUNK_SIZE), b''):
+                        out.write(chunk)
+                        if identical and current.read(len(chunk)) != chunk:
+                            identical = False
+            finally:
+                if current is not None:
+                    current.close()
+            if identical:
+                return False
+            if mtime_ns is not None:
+                os.utime(tmp_path, ns=(mtime_ns, mtime_ns))
+            os.replace(tmp_path, live)
+            return True
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    def _prune(self, backup_paths: set, result: RestoreResult):
+        if not self.prune or not self.target.exists():
+            return
+        for rel_path, _ in walk_vault_files(self.target):
+            if rel_path in backup_paths or not self.selected(rel_path):
+                continue
+            if self.keep and matches_patterns(rel_path, self.keep):
+                continue
+            try:
+                (self.target / rel_path).unlink()
+                result.removed.append(rel_path)
+            except OSError as e:
+                result.errors.append(rel_path)
+                log_center.log_error(f"No se pudo eliminar {rel_path}: {e}", component='RestoreEngine')
@@ -9,6 +9,7 @@ from typing import List, Optional
 from difflib import SequenceMatcher
 from pathlib import Path
 from paralib.db import ChromaPARADatabase
+from paralib.embedding_service import embed_texts
 
 # 1. Normalización de nombres
 
@@ -25,28 +26,40 @@ def string_similarity(a: str, b: str) -> float:
     return SequenceMatcher(None, a, b).ratio()
 
 # 3. Similitud de embeddings
-def embedding_similarity(a: str, b: str, db: ChromaPARADatabase) -> float:
-    emb_a = db.embedding_model.encode(a, convert_to_tensor=False)
-    emb_b = db.embedding_model.encode(b, convert_to_tensor=False)
-    # Cosine similarity
+def _cosine(emb_a, emb_b) -> float:
     dot = sum(x*y for x, y in zip(emb_a, emb_b))
     norm_a = sum(x*x for x in emb_a) ** 0.5
     norm_b = sum(x*x for x in emb_b) ** 0.5
     return dot / (norm_a * norm_b + 1e-8)
 
+def embedding_similarity(a: str, b: str, db: ChromaPARADatabase) -> float:
+    # Ambos textos en un mismo lote del modelo
+    emb_a, emb_b = embed_texts([a, b], db)
+    # Cosine similarity
+    return _cosine(emb_a, emb_b)
+
 # 4. Buscar carpeta/proyecto similar
 def find_similar_folder(target_name: str, folders: List[str], db: ChromaPARADatabase, threshold: float = 0.85) -> Optional[str]:
     norm_target = normalize_name(target_name)
-    best_score = 0
-    best_folder = None
+    scores = {}
+    semantic_candidates = []
     for folder in folders:
-        norm_folder = normalize_name(folder)
-        score = string_similarity(norm_target, norm_folder)
+        score = string_similarity(norm_target, normalize_name(folder))
         if score < threshold:
             # Probar similitud semántica si la de string no es suficiente
-            score = embedding_similarity(target_name, folder, db)
-        if score > best_score:
-            best_score = score
+            semantic_candidates.append(folder)
+        else:
+            scores[folder] = score
+    if semantic_candidates:
+        # Un único encode en lote para el objetivo y todas las candidatas
+        target_embedding, *folder_embeddings = embed_texts([target_name] + semantic_candidates, db)
+        for folder, embedding in zip(semantic_candidates, folder_embeddings):
+            scores[folder] = _cosine(target_embedding, embedding)
+    best_score = 0
+    best_folder = None
+    for folder in folders:
+        if scores.get(folder, 0) > best_score:
+            best_score = scores[folder]
             best_folder = folder
     if best_score >= threshold:
         return best_folder
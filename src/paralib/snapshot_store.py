@@ -0,0 +1,407 @@
+"""
+paralib/snapshot_store.py
+
+Almacén de snapshots direccionado por contenido para los backups de PARA.
+
+- Cada archivo del vault se divide en chunks de tamaño fijo; cada chunk se guarda una
+  sola vez como blob (comprimido con zlib) bajo ``objects/<hh>/<hash>``.
+- Cada backup es un manifest JSON (``manifests/<id>.json``) con ruta → tamaño, mtime,
+  hash del archivo y lista de chunks. Los blobs sin cambios se reutilizan entre snapshots.
+- Un snapshot nuevo solo lee y hashea los archivos cuyo tamaño/mtime cambió respecto al
+  manifest anterior, así que el costo es proporcional a lo editado y el disco crece por deltas.
+- Los chunks se direccionan con blake2b; el hash por archivo usa el hash rápido de
+  ``fast_hash`` (BLAKE3/xxHash) y el manifest registra el algoritmo.
+- Los archivos o carpetas que no se pudieron leer quedan en ``skipped_paths`` y el snapshot
+  se marca ``incomplete``: restaurarlo con poda no borra esas rutas.
+- ``garbage_collect`` toma el lock exclusivo del almacén y ``create_snapshot`` uno
+  compartido, así la recolección nunca borra blobs de un snapshot en curso.
+"""
+import hashlib
+import json
+import os
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from .fast_hash import DEFAULT_ALGORITHM, hash_file, new_hasher
+from .log_center import log_center
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    fcntl = None
+    FCNTL_AVAILABLE = False
+
+CHUNK_SIZE = 4 * 1024 * 1024
+# Hash por archivo (verificación/comparación) y hash de direccionamiento de chunks
+HASH_ALGORITHM = DEFAULT_ALGORITHM
+CHUNK_HASH_ALGORITHM = "blake2b"
+MANIFEST_VERSION = 2
+VERIFIED_BLOBS_FILE = "verified_blobs"
+LOCK_FILE = ".lock"
+
+# Directorios del vault que nunca se respaldan (se podan durante el recorrido)
+EXCLUDED_DIRS = {'.para_db', '.git', '.trash'}
+
+
+def walk_vault_files(vault_path: Path, excluded_dirs: Set[str] = EXCLUDED_DIRS,
+                     errors: Optional[List[str]] = None) -> Iterator[Tuple[str, os.stat_result]]:
+    """
+    Recorre el vault con os.scandir podando los directorios excluidos. Devuelve (ruta relativa, stat).
+    Las rutas relativas que no se pudieron leer se agregan a ``errors`` (si se pasa).
+    """
+    root = str(vault_path)
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in excluded_dirs:
+                                stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            rel_path = os.path.relpath(entry.path, root).replace(os.sep, '/')
+                            yield rel_path, entry.stat(follow_symlinks=False)
+                    except OSError:
+                        if errors is not None:
+                            errors.append(os.path.relpath(entry.path, root).replace(os.sep, '/'))
+                        continue
+        except OSError as e:
+            log_center.log_warning(f"No se pudo leer {directory}: {e}", "SnapshotStore")
+            if errors is not None:
+                rel_dir = os.path.relpath(directory, root).replace(os.sep, '/')
+                errors.append('' if rel_dir == '.' else rel_dir)
+
+
+def _new_hasher():
+    return hashlib.blake2b(digest_size=32)
+
+
+def file_digest(file_path: Path, algorithm: str = HASH_ALGORITHM) -> str:
+    """Hash del contenido completo de un archivo (el mismo que guarda el manifest en ``hash``)."""
+    return hash_file(file_path, algorithm)
+
+
+def diff_vault(vault_path: Path, files: Dict[str, Dict[str, Any]], algorithm: str,
+               workers: int = 8) -> Dict[str, List[str]]:
+    """
+    Compara el vault vivo con las entradas de un manifest ({ruta: {size, mtime_ns, hash}}).
+    Casi siempre basta un stat por archivo: solo se hashean (en paralelo) los archivos con
+    el mismo tamaño y distinto mtime. Devuelve ``{'changed', 'added', 'removed'}``.
+    """
+    vault_path = Path(vault_path)
+    changed, added, to_hash = [], [], []
+    seen = set()
+    for rel_path, st in walk_vault_files(vault_path):
+        seen.add(rel_path)
+        entry = files.get(rel_path)
+        if entry is None:
+            added.append(rel_path)
+        elif entry['size'] != st.st_size:
+            changed.append(rel_path)
+        elif entry.get('mtime_ns') != st.st_mtime_ns:
+            to_hash.append(rel_path)
+
+    def differs(rel_path: str) -> bool:
+        try:
+            return hash_file(vault_path / rel_path, algorithm) != files[rel_path]['hash']
+        except OSError:
+            return True
+
+    if to_hash:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="para-diff") as executor:
+            changed.extend(rel_path for rel_path, different in zip(to_hash, executor.map(differs, to_hash)) if different)
+    return {'changed': changed, 'added': added, 'removed': [p for p in files if p not in seen]}
+
+
+class SnapshotStore:
+    """Almacén de blobs + manifests bajo ``<backup_dir>/snapshots``."""
+
+    def __init__(self, root: Path, workers: int = None):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.manifests_dir = self.root / "manifests"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.manifests_dir.mkdir(parents=True, exist_ok=True)
+        self.workers = workers or min(8, (os.cpu_count() or 2) + 2)
+        self._thread_lock = threading.RLock()
+
+    @contextmanager
+    def _store_lock(self, exclusive: bool):
+        """Lock del almacén entre procesos (flock): compartido para crear snapshots, exclusivo para GC."""
+        if not FCNTL_AVAILABLE:
+            with self._thread_lock:
+                yield
+            return
+        with open(self.root / LOCK_FILE, 'a') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    # --- Blobs ---
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest
+
+    def has_blob(self, digest: str) -> bool:
+        return self._blob_path(digest).exists()
+
+    def _write_blob(self, digest: str, data: bytes) -> int:
+        """Guarda un chunk si no existe. Devuelve los bytes agregados al almacén."""
+        path = self._blob_path(digest)
+        if path.exists():
+            return 0
+        path.parent.mkdir(exist_ok=True)
+        payload = zlib.compress(data, 1)
+        tmp_path = path.with_name(f"{digest}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        return len(payload)
+
+    def read_blob(self, digest: str) -> bytes:
+        with open(self._blob_path(digest), 'rb') as f:
+            return zlib.decompress(f.read())
+
+    def _store_file(self, file_path: Path) -> Tuple[Dict[str, Any], int]:
+        """Divide un archivo en chunks, guarda los nuevos y devuelve (entrada del manifest, bytes nuevos)."""
+        file_hasher = new_hasher(HASH_ALGORITHM)
+        chunks, added = [], 0
+        with open(file_path, 'rb') as f:
+            for data in iter(lambda: f.read(CHUNK_SIZE), b''):
+                file_hasher.update(data)
+                chunk_hasher = _new_hasher()
+                chunk_hasher.update(data)
+                digest = chunk_hasher.hexdigest()
+                added += self._write_blob(digest, data)
+                chunks.append(digest)
+        return {'hash': file_hasher.hexdigest(), 'chunks': chunks}, added
+
+    # --- Manifests ---
+
+    def manifest_path(self, snapshot_id: str) -> Path:
+        return self.manifests_dir / f"{snapshot_id}.json"
+
+    # Formato del manifest: línea 1 = resumen JSON, línea 2 = {ruta: entrada}. Listar
+    # backups solo lee la primera línea, sin cargar la lista de archivos.
+
+    def load_manifest(self, snapshot_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.manifest_path(snapshot_id), 'r', encoding='utf-8') as f:
+                manifest = json.loads(f.readline())
+                manifest['files'] = json.loads(f.readline() or '{}')
+                return manifest
+        except (OSError, ValueError):
+            return None
+
+    def list_manifests(self) -> List[Dict[str, Any]]:
+        """Manifests ordenados del más reciente al más antiguo (sin la lista de archivos)."""
+        manifests = []
+        for path in self.manifests_dir.glob("*.json"):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    manifests.append(json.loads(f.readline()))
+            except (OSError, ValueError) as e:
+                log_center.log_warning(f"Manifest ilegible {path.name}: {e}", "SnapshotStore")
+        manifests.sort(key=lambda m: m.get('timestamp', ''), reverse=True)
+        return manifests
+
+    def latest_manifest(self, vault_path: str) -> Optional[Dict[str, Any]]:
+        """Último manifest completo del mismo vault (base para el snapshot incremental)."""
+        for summary in self.list_manifests():
+            if summary.get('vault_path') == str(vault_path):
+                return self.load_manifest(summary['id'])
+        return None
+
+    def create_snapshot(self, vault_path: Path, snapshot_id: str, description: str = '',
+                        backup_type: str = 'incremental') -> Dict[str, Any]:
+        """
+        Crea un snapshot del vault. Los archivos con mismo tamaño y mtime que en el snapshot
+        anterior reutilizan su entrada sin leerse; el resto se lee, se divide y se hashea en paralelo.
+        """
+        with self._store_lock(exclusive=False):
+            return self._create_snapshot(Path(vault_path), snapshot_id, description, backup_type)
+
+    def _create_snapshot(self, vault_path: Path, snapshot_id: str, description: str,
+                         backup_type: str) -> Dict[str, Any]:
+        parent = self.latest_manifest(str(vault_path))
+        parent_files = parent.get('files', {}) if parent else {}
+        if parent and parent.get('hash_algorithm') != HASH_ALGORITHM:
+            # Otro algoritmo de hash por archivo: se rehashea todo (los chunks se siguen deduplicando)
+            parent_files = {}
+
+        files: Dict[str, Dict[str, Any]] = {}
+        changed: List[Tuple[str, os.stat_result]] = []
+        skipped: List[str] = []
+        for rel_path, st in walk_vault_files(vault_path, errors=skipped):
+            previous = parent_files.get(rel_path)
+            if previous and previous['size'] == st.st_size and previous['mtime_ns'] == st.st_mtime_ns:
+                files[rel_path] = previous
+            else:
+                changed.append((rel_path, st))
+
+        added_bytes = 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="para-snapshot") as executor:
+            futures = {rel_path: (st, executor.submit(self._store_file, vault_path / rel_path))
+                       for rel_path, st in changed}
+            for rel_path, (st, future) in futures.items():
+                try:
+                    entry, added = future.result()
+                except OSError as e:
+                    log_center.log_warning(f"No se pudo respaldar {rel_path}: {e}", "SnapshotStore")
+                    skipped.append(rel_path)
+                    continue
+                entry.update({'size': st.st_size, 'mtime_ns': st.st_mtime_ns})
+                files[rel_path] = entry
+                added_bytes += added
+
+        summary = {
+            'id': snapshot_id,
+            'version': MANIFEST_VERSION,
+            'format': 'snapshot',
+            'hash_algorithm': HASH_ALGORITHM,
+            'chunk_algorithm': CHUNK_HASH_ALGORITHM,
+            'timestamp': datetime.now().isoformat(),
+            'vault_path': str(vault_path),
+            'backup_type': backup_type,
+            'description': description,
+            'parent': parent.get('id') if parent else None,
+            'file_count': len(files),
+            'total_bytes': sum(entry['size'] for entry in files.values()),
+            'changed_files': len(changed),
+            'added_bytes': added_bytes,
+            # Rutas (archivos o carpetas) que no se pudieron leer: la restauración no las poda
+            'skipped_paths': sorted(skipped),
+            'status': 'incomplete' if skipped else 'completed',
+        }
+        if skipped:
+            log_center.log_warning(f"Snapshot {snapshot_id} incompleto: {len(skipped)} rutas sin respaldar",
+                                   "SnapshotStore", {'skipped_paths': skipped[:20]})
+        # El manifest se escribe al final y de forma atómica: un snapshot a medias nunca es visible
+        path = self.manifest_path(snapshot_id)
+        tmp_path = path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(summary, ensure_ascii=False) + '\n')
+            f.write(json.dumps(files, ensure_ascii=False) + '\n')
+        os.replace(tmp_path, path)
+        return dict(summary, files=files)
+
+    def restore_file(self, entry: Dict[str, Any], target: Path):
+        """Reconstruye un archivo desde sus chunks (escritura atómica, con el mtime original)."""
+        from .restore_engine import atomic_write
+        atomic_write(target, (self.read_blob(digest) for digest in entry['chunks']), entry.get('mtime_ns'))
+
+    @staticmethod
+    def is_unchanged(live: Path, entry: Dict[str, Any], algorithm: str = HASH_ALGORITHM) -> bool:
+        """True si el archivo vivo coincide con la entrada: tamaño+mtime iguales, o mismo hash."""
+        st = live.stat()
+        if st.st_size != entry['size']:
+            return False
+        if st.st_mtime_ns == entry.get('mtime_ns'):
+            return True
+        return file_digest(live, algorithm) == entry['hash']
+
+    # --- Verificación ---
+
+    def _load_verified_blobs(self) -> Set[str]:
+        path = self.root / VERIFIED_BLOBS_FILE
+        if not path.exists():
+            return set()
+        with open(path, 'r', encoding='utf-8') as f:
+            return {line.strip() for line in f if line.strip()}
+
+    def _verify_blob(self, digest: str) -> bool:
+        try:
+            hasher = _new_hasher()
+            hasher.update(self.read_blob(digest))
+            return hasher.hexdigest() == digest
+        except (OSError, zlib.error):
+            return False
+
+    def verify_snapshot(self, snapshot_id: str, incremental: bool = True) -> Dict[str, Any]:
+        """
+        Verifica que todos los chunks de un snapshot existan y que su contenido coincida con
+        su hash (en paralelo). Con ``incremental`` se omiten los blobs ya verificados antes:
+        son inmutables, así que verificar un snapshot nuevo solo cuesta sus deltas.
+        """
+        manifest = self.load_manifest(snapshot_id)
+        if manifest is None:
+            return {'valid': False, 'error': 'manifest ilegible o inexistente'}
+
+        digests = {digest for entry in manifest['files'].values() for digest in entry['chunks']}
+        verified = self._load_verified_blobs() if incremental else set()
+        missing = [digest for digest in digests if not self.has_blob(digest)]
+        pending = [digest for digest in digests - verified if digest not in missing]
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="para-verify") as executor:
+            results = list(zip(pending, executor.map(self._verify_blob, pending)))
+        corrupted = [digest for digest, ok in results if not ok]
+        newly_verified = [digest for digest, ok in results if ok]
+        if newly_verified:
+            with open(self.root / VERIFIED_BLOBS_FILE, 'a', encoding='utf-8') as f:
+                f.write(''.join(f"{digest}\n" for digest in newly_verified))
+
+        bad = set(missing) | set(corrupted)
+        return {
+            'valid': not bad,
+            'files': len(manifest['files']),
+            'blobs': len(digests),
+            'checked_blobs': len(pending),
+            'missing_blobs': len(missing),
+            'corrupted_blobs': len(corrupted),
+            'damaged_files': sorted(rel_path for rel_path, entry in manifest['files'].items()
+                                    if bad.intersection(entry['chunks'])),
+        }
+
+    def delete_snapshot(self, snapshot_id: str) -> bool:
+        path = self.manifest_path(snapshot_id)
+        if not path.exists():
+            return False
+        path.unlink()
+        return True
+
+    def garbage_collect(self) -> int:
+        """Elimina los blobs que ningún manifest referencia. Devuelve bytes liberados."""
+        with self._store_lock(exclusive=True):
+            return self._garbage_collect()
+
+    def _garbage_collect(self) -> int:
+        referenced: Set[str] = set()
+        for path in self.manifests_dir.glob("*.json"):
+            manifest = self.load_manifest(path.stem)
+            if manifest is None:
+                # Ante un manifest ilegible no se borra nada: podría referenciar blobs vivos
+                return 0
+            for entry in manifest['files'].values():
+                referenced.update(entry['chunks'])
+
+        freed = 0
+        for shard in self.objects_dir.iterdir():
+            if not shard.is_dir():
+                continue
+            for blob in shard.iterdir():
+                if blob.name not in referenced:
+                    try:
+                        freed += blob.stat().st_size
+                        blob.unlink()
+                    except OSError:
+                        continue
+
+        # El registro de blobs verificados solo conserva los que siguen vivos
+        verified = self._load_verified_blobs()
+        if verified - referenced:
+            with open(self.root / VERIFIED_BLOBS_FILE, 'w', encoding='utf-8') as f:
+                f.write(''.join(f"{digest}\n" for digest in verified & referenced))
+        return freed
+
+    def store_size_bytes(self) -> int:
+        return sum(blob.stat().st_size for blob in self.objects_dir.glob("*/*"))
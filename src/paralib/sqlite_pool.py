@@ -0,0 +1,316 @@
+"""
+paralib/sqlite_pool.py
+
+Capa compartida de acceso a SQLite para las bases internas de PARA
+(learning_system.db, precision_measurements.db, log_management.db, ...).
+
+- Conexiones reutilizadas por base de datos (pool), en modo WAL con ``synchronous=NORMAL``.
+- Cache de sentencias preparadas por conexión (``cached_statements``), efectiva porque las
+  conexiones ya no se abren y cierran en cada método.
+- Escritor en segundo plano que agrupa los INSERT/UPDATE encolados y los ejecuta con
+  ``executemany`` en una sola transacción, con vaciado garantizado al salir del proceso.
+  Si el lote falla, se reintenta sentencia a sentencia (un savepoint por escritura) para
+  perder solo las que fallan; ``flush`` informa de ellas.
+"""
+import atexit
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from itertools import groupby
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .logger import logger
+
+# Máximo de operaciones encoladas que el escritor agrupa en una transacción
+WRITER_BATCH_SIZE = 500
+# Escrituras fallidas que se conservan para informar en flush()
+MAX_RECORDED_FAILURES = 100
+
+
+class SQLiteWriteError(Exception):
+    """Escrituras encoladas que fallaron; ``failures`` es una lista de (sql, params, error)."""
+
+    def __init__(self, db_name: str, failures: List[Tuple[str, Sequence[Any], str]], dropped: int = 0):
+        self.failures = failures
+        self.count = len(failures) + dropped
+        super().__init__(f"{self.count} escrituras fallidas en {db_name}: {failures[0][2] if failures else ''}")
+
+
+class PooledConnection:
+    """Proxy de ``sqlite3.Connection``: ``close()`` devuelve la conexión al pool."""
+
+    def __init__(self, pool: "SQLiteConnectionPool", conn: sqlite3.Connection):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def close(self):
+        if self._conn is not None:
+            self._pool._release(self._conn)
+            self._conn = None
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._conn.__exit__(exc_type, exc, tb)
+
+
+class SQLiteConnectionPool:
+    """Pool de conexiones WAL para un archivo SQLite, con escritor batch en background."""
+
+    def __init__(self, db_path, max_idle: int = 4, cached_statements: int = 256):
+        self.db_path = Path(db_path)
+        self.max_idle = max_idle
+        self.cached_statements = cached_statements
+        self._idle: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[Tuple[str, Sequence[Any]]]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        # Escrituras fallidas desde el último flush (y cuántas no cupieron en la lista)
+        self._failures: List[Tuple[str, Sequence[Any], str]] = []
+        self._dropped_failures = 0
+
+    # --- Conexiones ---
+
+    def _open(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=30,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    def connect(self) -> PooledConnection:
+        """Toma una conexión del pool (o abre una nueva). Llamar ``close()`` para devolverla."""
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        return PooledConnection(self, conn or self._open())
+
+    def _release(self, conn: sqlite3.Connection):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    @contextmanager
+    def connection(self):
+        """Context manager: conexión con commit al salir (rollback si hay excepción)."""
+        pooled = self.connect()
+        try:
+            yield pooled
+            pooled.commit()
+        finally:
+            pooled.close()
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> None:
+        """Ejecuta una escritura de forma síncrona."""
+        with self.connection() as conn:
+            conn.execute(sql, params)
+
+    def executemany(self, sql: str, rows: Iterable[Sequence[Any]]) -> None:
+        """Ejecuta una escritura batch de forma síncrona, en una sola transacción."""
+        with self.connection() as conn:
+            conn.executemany(sql, rows)
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        """Ejecuta una lectura y devuelve todas las filas."""
+        conn = self.connect()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    # --- Escritor en background ---
+
+    def submit(self, sql: str, params: Sequence[Any] = ()) -> None:
+        """Encola una escritura para el escritor en background (no bloquea al llamador)."""
+        self._ensure_writer()
+        self._queue.put((sql, tuple(params)))
+
+    def submit_many(self, sql: str, rows: Iterable[Sequence[Any]]) -> None:
+        self._ensure_writer()
+        for params in rows:
+            self._queue.put((sql, tuple(params)))
+
+    def flush(self, timeout: Optional[float] = None, raise_errors: bool = False) -> bool:
+        """
+        Espera a que se escriban todas las operaciones encoladas. Devuelve False si vence el
+        ``timeout`` o si alguna escritura encolada falló desde el último flush; con
+        ``raise_errors`` esas fallas se lanzan como ``SQLiteWriteError``.
+        """
+        if self._writer is None:
+            return True
+        # Mismo contador y condición que ``Queue.join``, pero con límite: no queda ningún hilo esperando
+        pending = self._queue.all_tasks_done
+        with pending:
+            done = pending.wait_for(lambda: not self._queue.unfinished_tasks, timeout)
+        error = self.take_errors()
+        if error is not None:
+            if raise_errors:
+                raise error
+            return False
+        return done
+
+    def take_errors(self) -> Optional[SQLiteWriteError]:
+        """Escrituras fallidas desde la última consulta (None si no hubo)."""
+        with self._lock:
+            failures, self._failures = self._failures, []
+            dropped, self._dropped_failures = self._dropped_failures, 0
+        if not failures and not dropped:
+            return None
+        return SQLiteWriteError(self.db_path.name, failures, dropped)
+
+    def _ensure_writer(self):
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(
+                    target=self._writer_loop, name=f"sqlite-writer:{self.db_path.name}", daemon=True
+                )
+                self._writer.start()
+
+    def _writer_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < WRITER_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                logger.error(f"Error en escritor SQLite ({self.db_path.name}): {e}")
+                self._record_failures([(sql, params, str(e)) for sql, params in batch])
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch: List[Tuple[str, Sequence[Any]]]):
+        # Agrupar operaciones consecutivas con la misma sentencia para executemany
+        try:
+            with self.connection() as conn:
+                for sql, group in groupby(batch, key=lambda item: item[0]):
+                    conn.executemany(sql, [params for _, params in group])
+            return
+        except sqlite3.Error as e:
+            logger.warning(f"Lote de {len(batch)} escrituras falló en {self.db_path.name} ({e}); "
+                           f"reintentando una a una")
+        self._write_one_by_one(batch)
+
+    def _write_one_by_one(self, batch: List[Tuple[str, Sequence[Any]]]):
+        """Una transacción con un savepoint por escritura: solo se pierden las que fallan."""
+        failures = []
+        with self.connection() as conn:
+            conn.execute("BEGIN")
+            for sql, params in batch:
+                conn.execute("SAVEPOINT pooled_write")
+                try:
+                    conn.execute(sql, params)
+                except sqlite3.Error as e:
+                    conn.execute("ROLLBACK TO pooled_write")
+                    failures.append((sql, params, str(e)))
+                conn.execute("RELEASE pooled_write")
+        if failures:
+            self._record_failures(failures)
+
+    def _record_failures(self, failures: List[Tuple[str, Sequence[Any], str]]):
+        logger.error(f"{len(failures)} escrituras descartadas en {self.db_path.name}: {failures[0][2]}")
+        with self._lock:
+            room = max(0, MAX_RECORDED_FAILURES - len(self._failures))
+            self._failures.extend(failures[:room])
+            self._dropped_failures += len(failures) - min(room, len(failures))
+
+    def close(self):
+        """Vacía la cola y cierra las conexiones ociosas."""
+        self.flush()
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+def apply_migrations(conn, migrations: Sequence[Tuple[int, str, Sequence[str]]]) -> int:
+    """
+    Aplica migraciones versionadas usando ``PRAGMA user_version``.
+
+    ``migrations`` es una lista de ``(versión, descripción, [sentencias SQL])`` en orden
+    creciente. Solo se ejecutan las posteriores a la versión actual, cada una en su propia
+    transacción. Si se aplicó alguna, se corre ``ANALYZE`` para refrescar las estadísticas
+    del planificador. Devuelve la versión final del esquema.
+    """
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    applied = False
+    for version, description, statements in migrations:
+        if version <= current:
+            continue
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Otro proceso pudo haber migrado mientras esperábamos el lock
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= version:
+                conn.execute("ROLLBACK")
+                current = max(current, version)
+                continue
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            logger.error(f"Migración {version} ({description}) falló en SQLite")
+            raise
+        logger.info(f"Migración SQLite aplicada: v{version} - {description}")
+        current = version
+        applied = True
+    if applied:
+        conn.execute("ANALYZE")
+        conn.commit()
+    return current
+
+
+_pools: Dict[str, SQLiteConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path) -> SQLiteConnectionPool:
+    """Devuelve el pool compartido para un archivo SQLite (uno por ruta)."""
+    key = str(Path(db_path).resolve())
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = SQLiteConnectionPool(db_path)
+            _pools[key] = pool
+        return pool
+
+
+def flush_all_pools(timeout: Optional[float] = None) -> bool:
+    """Vacía las colas de escritura de todos los pools; False si alguno no terminó o tuvo fallas."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    ok = True
+    for pool in pools:
+        ok = pool.flush(timeout) and ok
+    return ok
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        flush_all_pools(timeout=10)
+    except Exception:
+        pass
@@ -0,0 +1,302 @@
+"""
+paralib/stub_llm.py
+
+Backend LLM ``stub`` determinista para pruebas de carga y benchmarks sin un modelo real.
+
+- En proceso: ``AIEngine(backend="stub")`` o ``PARA_AI_BACKEND=stub`` (las instancias que
+  crea ``organizer`` en cada clasificación también lo respetan).
+- Por HTTP: ``para stub-llm --port=11435`` levanta un servidor local con la API de chat de
+  Ollama (``/api/chat``, ``/api/generate``, ``/api/tags``, ``/api/show``, ``/api/version``);
+  cualquier proceso con ``OLLAMA_HOST=http://127.0.0.1:11435`` lo usa como si fuera Ollama.
+
+La respuesta depende solo del prompt (y de ``PARA_STUB_SEED``): clasificación PARA por
+palabras clave en JSON, interpretación de comandos o un texto corto. La latencia es
+``PARA_STUB_LATENCY_MS`` más un jitter determinista de hasta ``PARA_STUB_JITTER_MS``.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from paralib.logger import logger
+
+STUB_MODEL_NAME = "para-stub:latest"
+DEFAULT_STUB_PORT = 11435
+
+CATEGORY_KEYWORDS = {
+    "Projects": ["deadline", "sprint", "entrega", "milestone", "kickoff", "roadmap", "release", "lanzamiento",
+                 "urgente", "cliente", "objetivo", "implementar", "project", "proyecto"],
+    "Areas": ["hábito", "habito", "rutina", "presupuesto", "salud", "gastos", "finanzas", "reunión", "reunion",
+              "equipo", "seguimiento", "mensual", "responsabilidad", "meeting", "personal"],
+    "Resources": ["tutorial", "referencia", "documentación", "documentacion", "guía", "guia", "snippet", "manual",
+                  "ejemplo", "librería", "concepto", "reference", "api"],
+    "Archive": ["completado", "cerrado", "finalizado", "obsoleto", "terminado", "deprecated", "histórico",
+                "retrospectiva", "cancelado"],
+}
+CATEGORIES = list(CATEGORY_KEYWORDS)
+
+_WORD = re.compile(r"[a-záéíóúñü]{5,}")
+_NOTE_CONTENT = re.compile(r"Note content:\n---\n(.*?)\n\nResponde SOLO", re.DOTALL)
+_USER_INPUT = re.compile(r'El usuario escribió: "(.*?)"')
+_AVAILABLE_COMMANDS = re.compile(r"Comandos disponibles: ([^\n]*)")
+_STOP_WORDS = {
+    "sobre", "desde", "hasta", "entre", "porque", "cuando", "donde", "tiene", "tienen", "puede", "pueden",
+    "nota", "notas", "texto", "sistema", "proceso", "datos", "usuario", "title", "created", "updated",
+    "status", "tags", "project", "aliases", "tareas", "relacionado",
+}
+
+
+def _env_float(name: str, default: float = 0.0) -> float:
+    try:
+        return max(0.0, float(os.environ.get(name, default)))
+    except ValueError:
+        return default
+
+
+def _digest(*parts: str) -> int:
+    return int.from_bytes(hashlib.md5("\x00".join(parts).encode("utf-8")).digest()[:8], "big")
+
+
+class StubLLM:
+    """Modelo de mentira: respuestas deterministas con latencia configurable."""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: str = "0"):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.seed = str(seed)
+        self.calls = 0
+
+    @classmethod
+    def from_env(cls) -> "StubLLM":
+        return cls(latency_ms=_env_float("PARA_STUB_LATENCY_MS"), jitter_ms=_env_float("PARA_STUB_JITTER_MS"),
+                   seed=os.environ.get("PARA_STUB_SEED", "0"))
+
+    def delay_for(self, prompt: str) -> float:
+        """Segundos de latencia para ``prompt`` (el jitter depende del prompt, no del azar)."""
+        jitter = self.jitter_ms * (_digest(self.seed, prompt) % 1000) / 1000 if self.jitter_ms else 0.0
+        return (self.latency_ms + jitter) / 1000
+
+    # --- Respuestas ---
+
+    def classify(self, text: str) -> Dict[str, Any]:
+        """Clasificación PARA por palabras clave; sin coincidencias decide el hash del contenido."""
+        lowered = text.lower()
+        scores = {category: sum(lowered.count(keyword) for keyword in keywords)
+                  for category, keywords in CATEGORY_KEYWORDS.items()}
+        total = sum(scores.values())
+        if total:
+            category = max(CATEGORIES, key=lambda c: scores[c])
+            confidence = round(0.5 + 0.5 * scores[category] / total, 3)
+        else:
+            category = CATEGORIES[_digest(self.seed, text) % len(CATEGORIES)]
+            confidence = 0.5
+        words = Counter(w for w in _WORD.findall(lowered) if w not in _STOP_WORDS)
+        top = [word for word, _ in sorted(words.items(), key=lambda item: (-item[1], item[0]))[:2]]
+        folder_name = " ".join(word.capitalize() for word in top) or category
+        return {
+            "category": category,
+            "folder_name": folder_name,
+            "confidence": confidence,
+            "reasoning": f"stub: {scores[category]} coincidencias de palabras clave de {category}",
+        }
+
+    def interpret(self, prompt: str) -> Dict[str, Any]:
+        """Interpretación de comando: el primer comando disponible mencionado por el usuario o ``help``."""
+        input_match = _USER_INPUT.search(prompt)
+        commands_match = _AVAILABLE_COMMANDS.search(prompt)
+        commands = [c.strip() for c in commands_match.group(1).split(",")] if commands_match else []
+        lowered = input_match.group(1).lower() if input_match else ""
+        command = next((c for c in commands if c and c in lowered), "help")
+        return {"command": command, "args": [], "confidence": 0.9 if command != "help" else 0.3,
+                "reasoning": "stub: coincidencia literal del comando"}
+
+    def respond(self, system_prompt: str, user_prompt: str) -> str:
+        """Contenido de la respuesta para un par de prompts (sin latencia)."""
+        self.calls += 1
+        note = _NOTE_CONTENT.search(user_prompt)
+        if note:
+            return json.dumps(self.classify(note.group(1)), ensure_ascii=False)
+        if '"command"' in user_prompt and _USER_INPUT.search(user_prompt):
+            return json.dumps(self.interpret(user_prompt), ensure_ascii=False)
+        if '"category"' in user_prompt or '"category"' in system_prompt:
+            return json.dumps(self.classify(user_prompt), ensure_ascii=False)
+        words = Counter(w for w in _WORD.findall(user_prompt.lower()) if w not in _STOP_WORDS)
+        topics = ", ".join(word for word, _ in words.most_common(3)) or "sin tema"
+        return f"Respuesta stub determinista sobre: {topics}."
+
+    def chat(self, messages: List[Dict[str, str]], model: str = STUB_MODEL_NAME,
+             timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Respuesta con la forma de ``ollama.chat`` (``{'message': {'role', 'content'}, ...}``).
+        Si la latencia supera ``timeout`` espera ``timeout`` y devuelve ``{'error': ...}`` como el
+        resto de backends de ``AIEngine``.
+        """
+        system_prompt = "\n".join(m.get("content", "") for m in messages if m.get("role") == "system")
+        user_prompt = "\n".join(m.get("content", "") for m in messages if m.get("role") != "system")
+        delay = self.delay_for(system_prompt + user_prompt)
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            return {"error": f"Timeout: la IA no respondió en {timeout} segundos"}
+        start = time.perf_counter_ns()
+        if delay:
+            time.sleep(delay)
+        content = self.respond(system_prompt, user_prompt)
+        return {
+            "model": model,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "message": {"role": "assistant", "content": content},
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": time.perf_counter_ns() - start,
+            "prompt_eval_count": len(system_prompt.split()) + len(user_prompt.split()),
+            "eval_count": len(content.split()),
+        }
+
+
+_stub: Optional[StubLLM] = None
+_stub_lock = threading.Lock()
+
+
+def get_stub_llm() -> StubLLM:
+    """Instancia compartida del proceso, configurada desde el entorno la primera vez."""
+    global _stub
+    if _stub is None:
+        with _stub_lock:
+            if _stub is None:
+                _stub = StubLLM.from_env()
+    return _stub
+
+
+def configure_stub_llm(latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: str = "0") -> StubLLM:
+    """Sustituye la instancia compartida (benchmarks y pruebas)."""
+    global _stub
+    with _stub_lock:
+        _stub = StubLLM(latency_ms=latency_ms, jitter_ms=jitter_ms, seed=seed)
+    return _stub
+
+
+# --- Servidor HTTP compatible con Ollama ---
+
+class _OllamaHandler(BaseHTTPRequestHandler):
+    server_version = "para-stub-llm"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug(f"[stub-llm] {self.address_string()} {format % args}")
+
+    def _send_json(self, payload: Dict[str, Any], status: int = 200):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, chunks: List[Dict[str, Any]]):
+        body = b"".join(json.dumps(chunk, ensure_ascii=False).encode("utf-8") + b"\n" for chunk in chunks)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length).decode("utf-8"))
+
+    def do_GET(self):
+        if self.path in ("/", "/api/version"):
+            if self.path == "/":
+                body = b"Ollama is running"
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            self._send_json({"version": "0.0.0-para-stub"})
+        elif self.path == "/api/tags":
+            self._send_json({"models": [self.server.model_entry()]})
+        else:
+            self._send_json({"error": f"ruta no soportada: {self.path}"}, 404)
+
+    def do_POST(self):
+        try:
+            request = self._read_json()
+        except (ValueError, UnicodeDecodeError) as e:
+            self._send_json({"error": f"JSON inválido: {e}"}, 400)
+            return
+        stub: StubLLM = self.server.stub
+        model = request.get("model") or STUB_MODEL_NAME
+
+        if self.path == "/api/chat":
+            response = stub.chat(request.get("messages") or [], model=model)
+        elif self.path == "/api/generate":
+            messages = [{"role": "system", "content": request.get("system", "")},
+                        {"role": "user", "content": request.get("prompt", "")}]
+            chat = stub.chat(messages, model=model)
+            response = {k: v for k, v in chat.items() if k != "message"}
+            response["response"] = chat["message"]["content"]
+        elif self.path == "/api/show":
+            self._send_json({"modelfile": "", "parameters": "", "template": "{{ .Prompt }}",
+                             "details": self.server.model_entry()["details"], "model_info": {}})
+            return
+        else:
+            self._send_json({"error": f"ruta no soportada: {self.path}"}, 404)
+            return
+
+        if request.get("stream", True) is False:
+            self._send_json(response)
+        else:
+            # Streaming NDJSON: un fragmento con todo el contenido y el cierre con done=True
+            content_key = "message" if "message" in response else "response"
+            first = {**response, "done": False}
+            last = {**response, "done": True}
+            last[content_key] = {"role": "assistant", "content": ""} if content_key == "message" else ""
+            self._send_stream([first, last])
+
+
+class StubOllamaServer(ThreadingHTTPServer):
+    """Servidor HTTP local que habla la API de chat de Ollama con un ``StubLLM``."""
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_STUB_PORT, stub: Optional[StubLLM] = None):
+        super().__init__((host, port), _OllamaHandler)
+        self.stub = stub or get_stub_llm()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def model_entry(self) -> Dict[str, Any]:
+        return {
+            "name": STUB_MODEL_NAME,
+            "model": STUB_MODEL_NAME,
+            "modified_at": "2024-01-01T00:00:00Z",
+            "size": 0,
+            "digest": hashlib.sha256(STUB_MODEL_NAME.encode()).hexdigest(),
+            "details": {"format": "stub", "family": "stub", "parameter_size": "0B", "quantization_level": "none"},
+        }
+
+    def start(self) -> "StubOllamaServer":
+        """Sirve en un hilo de fondo (pruebas y benchmarks en el mismo proceso)."""
+        self._thread = threading.Thread(target=self.serve_forever, name="para-stub-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
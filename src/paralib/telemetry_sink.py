@@ -0,0 +1,182 @@
+"""
+paralib/telemetry_sink.py
+
+Sumidero asíncrono de telemetría/aprendizaje para el camino caliente de clasificación.
+
+La clasificación encola eventos (aprendizaje, historial, logs detallados) en una cola
+acotada y vuelve de inmediato; un consumidor en segundo plano los agrupa por tipo y
+los entrega en lote a los handlers registrados. Garantiza el vaciado al salir del
+proceso y aplica una política configurable cuando la cola está llena:
+
+- ``block``: contrapresión, espera hasta ``block_timeout`` segundos y luego descarta.
+- ``drop_oldest``: descarta el evento más antiguo de la cola para hacer lugar.
+- ``drop_newest``: descarta el evento nuevo.
+"""
+import atexit
+import queue
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from .logger import logger
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "drop_newest")
+
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_BLOCK_TIMEOUT = 1.0
+
+
+class TelemetrySink:
+    """Cola acotada de eventos con consumidor batch en background."""
+
+    def __init__(self, max_queue_size: int = DEFAULT_QUEUE_SIZE, batch_size: int = DEFAULT_BATCH_SIZE,
+                 overflow_policy: str = "block", block_timeout: float = DEFAULT_BLOCK_TIMEOUT):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            logger.warning(f"Política de desborde desconocida '{overflow_policy}', usando 'block'")
+            overflow_policy = "block"
+        self.batch_size = batch_size
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue_size)
+        self._handlers: Dict[str, Callable[[List[Any]], None]] = {}
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {'submitted': 0, 'processed': 0, 'dropped': 0, 'errors': 0, 'batches': 0}
+
+    def register_handler(self, kind: str, handler: Callable[[List[Any]], None]):
+        """Registra el handler que procesa en lote los eventos de un tipo."""
+        self._handlers[kind] = handler
+
+    def submit(self, kind: str, payload: Any) -> bool:
+        """Encola un evento sin bloquear la clasificación (salvo contrapresión). Devuelve si se aceptó."""
+        self._ensure_worker()
+        item = (kind, payload)
+        try:
+            if self.overflow_policy == "block":
+                self._queue.put(item, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(item)
+        except queue.Full:
+            if self.overflow_policy != "drop_oldest" or not self._evict_oldest():
+                self._count('dropped')
+                return False
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                self._count('dropped')
+                return False
+        self._count('submitted')
+        return True
+
+    def _evict_oldest(self) -> bool:
+        try:
+            self._queue.get_nowait()
+        except queue.Empty:
+            return False
+        self._queue.task_done()
+        self._count('dropped')
+        return True
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que se procesen todos los eventos encolados."""
+        if self._worker is None:
+            return True
+        if timeout is None:
+            self._queue.join()
+            return True
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._worker_loop, name="para-telemetry-sink", daemon=True)
+                self._worker.start()
+
+    def _worker_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._process_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _process_batch(self, batch: List[tuple]):
+        grouped = defaultdict(list)
+        for kind, payload in batch:
+            grouped[kind].append(payload)
+        for kind, payloads in grouped.items():
+            handler = self._handlers.get(kind)
+            if handler is None:
+                logger.warning(f"Sin handler de telemetría para eventos '{kind}' ({len(payloads)} descartados)")
+                self._count('dropped', len(payloads))
+                continue
+            try:
+                handler(payloads)
+                self._count('processed', len(payloads))
+            except Exception as e:
+                self._count('errors', len(payloads))
+                logger.error(f"Error procesando eventos de telemetría '{kind}': {e}")
+        self._count('batches')
+
+
+_sink: Optional[TelemetrySink] = None
+_sink_lock = threading.Lock()
+
+
+def get_telemetry_sink() -> TelemetrySink:
+    """Devuelve el sumidero compartido, configurado desde ``telemetry_sink`` en para_config.json."""
+    global _sink
+    with _sink_lock:
+        if _sink is None:
+            try:
+                from .config import load_para_config
+                settings = load_para_config().get('telemetry_sink', {}) or {}
+            except Exception:
+                settings = {}
+            _sink = TelemetrySink(
+                max_queue_size=settings.get('max_queue_size', DEFAULT_QUEUE_SIZE),
+                batch_size=settings.get('batch_size', DEFAULT_BATCH_SIZE),
+                overflow_policy=settings.get('overflow_policy', 'block'),
+                block_timeout=settings.get('block_timeout', DEFAULT_BLOCK_TIMEOUT),
+            )
+        return _sink
+
+
+def flush_telemetry(timeout: Optional[float] = None) -> bool:
+    """Vacía el sumidero compartido (si existe) y las escrituras SQLite que haya generado."""
+    if _sink is None:
+        return True
+    done = _sink.flush(timeout)
+    from .sqlite_pool import flush_all_pools
+    return flush_all_pools(timeout) and done
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        flush_telemetry(timeout=30)
+    except Exception:
+        pass
@@ -32,6 +32,7 @@ try:
     from .log_center import log_center
     from .db import RobustChromaPARADatabase
     from .config import load_config
+    from .lazy import LazyInstance
 except ImportError:
     # Imports absolutos cuando se ejecuta directamente
     sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -40,6 +41,7 @@ except ImportError:
     from paralib.log_center import log_center
     from paralib.db import RobustChromaPARADatabase
     from paralib.config import load_config
+    from paralib.lazy import LazyInstance
 
 @dataclass
 class UpdateInfo:
@@ -155,7 +157,7 @@ class PARAUpdateCenter:
         self.logger.log_info("Update Center inicializado", "UpdateCenter-Init")
 
 # Instancia global del Update Center
-update_center = PARAUpdateCenter()
+update_center = LazyInstance(PARAUpdateCenter)
 
 @log_function_calls
 def check_updates(force: bool = False) -> Dict[str, Any]:
@@ -3,12 +3,11 @@ from pathlib import Path
 from rich.panel import Panel
 from rich import box
 import functools
+from contextlib import nullcontext
 import typer
 import json
 import importlib.util
 from rich.console import Console
-import shutil
-from datetime import datetime
 from paralib.log_manager import PARALogManager
 
 def shorten_path(path, max_len: int = 70):
@@ -60,8 +59,6 @@ def auto_backup_if_needed(vault_path=None, reason="pre-action"):
     """
     Realiza un backup automático robusto. Si falla, loguea el error en logs/para.log y con PARALogManager.
     """
-    import shutil
-    from datetime import datetime
     from paralib.log_manager import PARALogManager
     log_path = Path("logs/para.log")
     log_path.parent.mkdir(exist_ok=True)
@@ -76,12 +73,18 @@ def auto_backup_if_needed(vault_path=None, reason="pre-action"):
                 f.write(msg + "\n")
             logger.analyze_log_file(str(log_path))
             return False
-        backup_dir = Path("backups")
-        backup_dir.mkdir(exist_ok=True)
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_path = backup_dir / f"vault_backup_{ts}.zip"
-        shutil.make_archive(str(backup_path).replace('.zip',''), 'zip', str(vault_path))
-        msg = f"[BACKUP] Backup automático creado en {backup_path} ({reason})"
+        # Snapshot incremental: solo se leen y guardan los archivos cambiados desde el anterior
+        from paralib.backup_manager import backup_manager
+        check = backup_manager.vault_matches_backup(str(vault_path))
+        if check['matches']:
+            msg = f"[BACKUP] Vault sin cambios desde el backup {check['backup_id']}, no se crea uno nuevo ({reason})"
+            with open(log_path, "a") as f:
+                f.write(msg + "\n")
+            return True
+        backup_info = backup_manager.create_backup(str(vault_path), 'incremental', f"Backup automático ({reason})")
+        if not backup_info:
+            raise RuntimeError("el snapshot incremental no se pudo crear")
+        msg = f"[BACKUP] Backup automático creado: {backup_info.id} (+{backup_info.size_mb:.2f} MB) ({reason})"
         with open(log_path, "a") as f:
             f.write(msg + "\n")
         logger.analyze_log_file(str(log_path))
@@ -111,7 +114,10 @@ def pre_command_checks(func):
                 f.write(msg + "\n")
             logger.analyze_log_file(str(log_path))
         backups_dir = Path("backups")
-        if not backups_dir.exists() or not any(backups_dir.glob("*.zip")):
+        has_backups = backups_dir.exists() and (
+            any(backups_dir.glob("para_backup_*")) or any(backups_dir.glob("snapshots/manifests/*.json"))
+        )
+        if not has_backups:
             msg = "[ADVERTENCIA] No se encontró backup reciente. Se recomienda ejecutar un backup antes de organizar."
             print(msg)
             with open(log_path, "a") as f:
@@ -119,23 +125,42 @@ def pre_command_checks(func):
             logger.analyze_log_file(str(log_path))
         import inspect
         destructive_commands = {"classify", "refactor", "clean", "reset"}
+        # Comandos que solo mueven/renombran (todo pasa por el journal); el resto toma además snapshot
+        journaled_commands = {"classify", "refactor", "clean"}
         command_name = func.__name__
+        journal = nullcontext()
         if command_name in destructive_commands:
             vault_path = None
             if "vault_path" in kwargs:
                 vault_path = kwargs["vault_path"]
             elif len(args) > 0:
                 vault_path = args[0] if isinstance(args[0], (str, Path)) else None
-            from paralib.utils import auto_backup_if_needed
-            if not auto_backup_if_needed(vault_path):
-                msg = "[CRITICAL] Acción abortada por fallo en el backup automático."
-                print(msg)
-                with open(log_path, "a") as f:
-                    f.write(msg + "\n")
-                logger.analyze_log_file(str(log_path))
-                raise typer.Exit(1)
+            if not vault_path:
+                from paralib.vault import find_vault
+                vault_path = find_vault()
+            # Los movimientos se registran en el journal (deshacer con 'undo'); para los comandos que
+            # solo mueven/renombran reemplaza al backup previo, el resto (o sin vault) toma snapshot
+            vault_exists = bool(vault_path) and Path(vault_path).exists()
+            if vault_exists:
+                from paralib.move_journal import move_transaction
+                journal = move_transaction(vault_path, f"Comando {command_name}")
+            if not vault_exists or command_name not in journaled_commands:
+                from paralib.utils import auto_backup_if_needed
+                if not auto_backup_if_needed(vault_path):
+                    msg = "[CRITICAL] Acción abortada por fallo en el backup automático."
+                    print(msg)
+                    with open(log_path, "a") as f:
+                        f.write(msg + "\n")
+                    logger.analyze_log_file(str(log_path))
+                    raise typer.Exit(1)
         try:
-            return func(*args, **kwargs)
+            with journal:
+                try:
+                    return func(*args, **kwargs)
+                except typer.Exit as e:
+                    # Salida normal del comando: el journal se confirma igual
+                    exit_signal = e
+            raise exit_signal
         except typer.Exit:
             raise
         except Exception as e:
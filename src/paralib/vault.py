@@ -394,6 +394,196 @@ def extract_links_and_backlinks(vault_path: Path) -> tuple[dict, dict, dict]:
     centrality = {n: len(backlinks_dict[n]) for n in backlinks_dict}
     return links_dict, backlinks_dict, centrality
 
+_WIKILINK_RE = re.compile(r'\[\[([^\]]+)\]\]')
+
+class VaultLinkGraph:
+    """
+    Grafo de enlaces [[wikilink]] del vault, actualizable de forma incremental.
+    Mismo modelo que extract_links_and_backlinks (rutas como str, enlaces por stem),
+    pero una edición solo reprocesa la nota afectada.
+
+    Se mantiene al día con los eventos del watcher, con los renames del journal
+    (``apply_rename``) y con ``refresh``, que compara mtimes para captar ediciones externas.
+    """
+    
+    def __init__(self, vault_path: Path):
+        self.vault_path = Path(vault_path)
+        self._lock = threading.RLock()
+        self.name_to_paths: dict = {}    # stem -> set(rutas)
+        self.raw_links: dict = {}        # ruta -> [stems enlazados]
+        self.backlinks: dict = {}        # ruta -> set(rutas que la enlazan)
+        self.mtimes: dict = {}           # ruta -> mtime al leerla
+        self.built = False
+    
+    def build(self):
+        """Escaneo completo inicial."""
+        with self._lock:
+            self.name_to_paths.clear()
+            self.raw_links.clear()
+            self.backlinks.clear()
+            self.mtimes.clear()
+            notes = list(self.vault_path.rglob("*.md"))
+            for note in notes:
+                self.name_to_paths.setdefault(note.stem, set()).add(str(note))
+            for note in notes:
+                self.mtimes[str(note)] = self._mtime(note)
+                try:
+                    self._set_links(str(note), note.read_text(encoding='utf-8'))
+                except Exception:
+                    self._set_links(str(note), "")
+            self.built = True
+        return self
+    
+    def refresh(self) -> int:
+        """
+        Aplica los cambios hechos fuera del proceso (ediciones, altas, bajas, movimientos) según
+        los mtimes, sin releer las notas sin cambios. Devuelve las notas actualizadas.
+        """
+        with self._lock:
+            if not self.built:
+                self.build()
+                return len(self.raw_links)
+            current = {str(note): self._mtime(note) for note in self.vault_path.rglob("*.md")}
+            removed = [path for path in self.raw_links if path not in current]
+            for path in removed:
+                self.remove_note(Path(path))
+            changed = [path for path, mtime in current.items() if self.mtimes.get(path) != mtime]
+            for path in changed:
+                self.update_note(Path(path))
+            return len(removed) + len(changed)
+    
+    def apply_rename(self, src: Path, dst: Path):
+        """Refleja un rename del vault (nota o carpeta completa) ya hecho en disco."""
+        src, dst = Path(src), Path(dst)
+        src_in, dst_in = self._in_vault(src), self._in_vault(dst)
+        if not src_in and not dst_in:
+            return
+        with self._lock:
+            prefix = str(src) + os.sep
+            moved = [path for path in self.raw_links if path == str(src) or path.startswith(prefix)]
+            for path in moved:
+                new_path = dst / Path(path).relative_to(src) if path != str(src) else dst
+                if dst_in:
+                    self.move_note(Path(path), new_path)
+                else:
+                    self.remove_note(Path(path))
+            # Nota que entra al vault (p. ej. restaurada de la papelera del journal)
+            if not moved and dst_in and dst.suffix == '.md':
+                self.update_note(dst)
+    
+    def _in_vault(self, path: Path) -> bool:
+        return path == self.vault_path or self.vault_path in path.parents
+    
+    @staticmethod
+    def _mtime(note: Path):
+        try:
+            return note.stat().st_mtime
+        except OSError:
+            return None
+    
+    @staticmethod
+    def _parse_links(content: str) -> list:
+        # Soporta alias Obsidian [[Nota|Alias]]
+        return [l.split('|')[0].strip() for l in _WIKILINK_RE.findall(content)]
+    
+    def _resolve(self, stem: str) -> set:
+        return self.name_to_paths.get(stem, set())
+    
+    def _set_links(self, path: str, content: str):
+        for stem in self.raw_links.get(path, []):
+            for target in self._resolve(stem):
+                self.backlinks.get(target, set()).discard(path)
+        stems = self._parse_links(content)
+        self.raw_links[path] = stems
+        for stem in stems:
+            for target in self._resolve(stem):
+                self.backlinks.setdefault(target, set()).add(path)
+    
+    def _relink_stem(self, stem: str):
+        """Recalcula los backlinks hacia las notas con ese nombre (alta/baja de una nota)."""
+        targets = self._resolve(stem)
+        for source, stems in self.raw_links.items():
+            if stem in stems:
+                for target in targets:
+                    self.backlinks.setdefault(target, set()).add(source)
+    
+    def update_note(self, note_path: Path, content: str = None):
+        """Agrega o actualiza una nota (creada o modificada)."""
+        path = str(note_path)
+        with self._lock:
+            if content is None:
+                try:
+                    content = Path(note_path).read_text(encoding='utf-8')
+                except Exception:
+                    content = ""
+            self.mtimes[path] = self._mtime(Path(note_path))
+            stem = Path(note_path).stem
+            is_new = path not in self.name_to_paths.get(stem, set())
+            self.name_to_paths.setdefault(stem, set()).add(path)
+            self.backlinks.setdefault(path, set())
+            self._set_links(path, content)
+            if is_new:
+                self._relink_stem(stem)
+    
+    def remove_note(self, note_path: Path):
+        """Elimina una nota del grafo."""
+        path = str(note_path)
+        with self._lock:
+            self._set_links(path, "")
+            self.raw_links.pop(path, None)
+            self.backlinks.pop(path, None)
+            self.mtimes.pop(path, None)
+            paths = self.name_to_paths.get(Path(note_path).stem)
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del self.name_to_paths[Path(note_path).stem]
+    
+    def move_note(self, old_path: Path, new_path: Path, content: str = None):
+        """Renombra/mueve una nota conservando sus enlaces entrantes resueltos por nombre."""
+        with self._lock:
+            self.remove_note(old_path)
+            self.update_note(new_path, content)
+    
+    def links_of(self, note_path: Path) -> list:
+        with self._lock:
+            return sorted({t for stem in self.raw_links.get(str(note_path), []) for t in self._resolve(stem)})
+    
+    def backlinks_of(self, note_path: Path) -> list:
+        with self._lock:
+            return sorted(self.backlinks.get(str(note_path), set()))
+    
+    def centrality(self, note_path) -> int:
+        """Número de backlinks de la nota."""
+        with self._lock:
+            return len(self.backlinks.get(str(note_path), ()))
+
+_link_graphs: dict = {}
+_link_graphs_lock = threading.Lock()
+
+def get_link_graph(vault_path: Path) -> VaultLinkGraph:
+    """
+    Grafo de enlaces compartido por vault (se construye una vez y luego se actualiza). Los
+    renames del journal (organizer, consolidaciones, undo) se aplican al grafo al hacerse.
+    """
+    key = str(Path(vault_path).resolve())
+    with _link_graphs_lock:
+        graph = _link_graphs.get(key)
+        if graph is None:
+            from paralib.move_journal import add_rename_listener
+            graph = VaultLinkGraph(Path(vault_path))
+            _link_graphs[key] = graph
+            add_rename_listener(graph.apply_rename)
+    if not graph.built:
+        graph.build()
+    return graph
+
+def refresh_link_graphs() -> int:
+    """Pone al día (por mtimes) los grafos ya construidos; lo usa el daemon antes de cada comando."""
+    with _link_graphs_lock:
+        graphs = [graph for graph in _link_graphs.values() if graph.built]
+    return sum(graph.refresh() for graph in graphs)
+
 def get_notes_modification_times(vault_path: Path, top_n: int = 20) -> tuple[dict, list]:
     """
     Devuelve un dict nota->timestamp y una lista de las top_n notas más recientes.
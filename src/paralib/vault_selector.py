@@ -16,6 +16,7 @@ from rich.prompt import Confirm
 from .logger import logger
 from .vault import find_vault
 from .vault_cli import select_vault_interactive
+from .lazy import LazyInstance
 
 console = Console()
 CACHE_FILE = Path(".para_vault_cache.json")
@@ -139,4 +140,4 @@ class VaultSelector:
         return vaults
 
 # Instancia global del selector
-vault_selector = VaultSelector() 
\ No newline at end of file
+vault_selector = LazyInstance(VaultSelector)
\ No newline at end of file
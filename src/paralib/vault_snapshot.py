@@ -0,0 +1,199 @@
+"""
+paralib/vault_snapshot.py
+
+Snapshot persistente del vault (ruta, inode, mtime, tamaño, hash de contenido) para
+reconciliar al arrancar el watcher los cambios hechos mientras estaba detenido.
+
+El escaneo usa ``os.scandir`` con varios workers por directorio y solo calcula el hash
+de los archivos nuevos o cuyo mtime/tamaño cambió, por lo que reiniciar sobre un vault
+grande cuesta poco más que listar sus directorios.
+"""
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from .logger import logger
+from .sqlite_pool import apply_migrations, get_pool
+
+SNAPSHOT_DB_NAME = "vault_snapshot.db"
+
+SNAPSHOT_MIGRATIONS = [
+    (1, "Tabla de snapshot del vault", [
+        '''
+        CREATE TABLE IF NOT EXISTS vault_files (
+            path TEXT PRIMARY KEY,
+            inode INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            content_hash TEXT NOT NULL
+        )
+        ''',
+    ]),
+]
+
+
+class FileState(NamedTuple):
+    inode: int
+    mtime_ns: int
+    size: int
+    content_hash: Optional[str] = None
+
+
+def hash_file(path: str) -> str:
+    """Hash MD5 del contenido (mismo algoritmo que los IDs de la DB)."""
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _scan_directory(directory: str, accept: Callable[[str], bool]):
+    """Lista un directorio: (archivos aceptados con su stat, subdirectorios)."""
+    files, subdirs = {}, []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith('.'):
+                            subdirs.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False) and accept(entry.path):
+                        st = entry.stat(follow_symlinks=False)
+                        files[entry.path] = FileState(st.st_ino, st.st_mtime_ns, st.st_size)
+                except OSError:
+                    continue
+    except OSError as e:
+        logger.warning(f"No se pudo escanear {directory}: {e}")
+    return files, subdirs
+
+
+def scan_vault(vault_path: Path, accept: Callable[[str], bool], workers: int = 8) -> Dict[str, FileState]:
+    """Escanea el vault en paralelo (un directorio por tarea) y devuelve ruta -> FileState."""
+    result: Dict[str, FileState] = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="para-scan") as executor:
+        pending = {executor.submit(_scan_directory, str(vault_path), accept)}
+        while pending:
+            future = pending.pop()
+            files, subdirs = future.result()
+            result.update(files)
+            pending.update(executor.submit(_scan_directory, d, accept) for d in subdirs)
+    return result
+
+
+class VaultSnapshot:
+    """Snapshot del vault en ``.para_db/vault_snapshot.db``."""
+
+    def __init__(self, vault_path: Path, accept: Callable[[str], bool], workers: int = 8):
+        self.vault_path = Path(vault_path)
+        self.accept = accept
+        self.workers = workers
+        self.db_path = self.vault_path / ".para_db" / SNAPSHOT_DB_NAME
+        self._pool = get_pool(self.db_path)
+        conn = self._pool.connect()
+        try:
+            apply_migrations(conn, SNAPSHOT_MIGRATIONS)
+        finally:
+            conn.close()
+
+    def load(self) -> Dict[str, FileState]:
+        rows = self._pool.query("SELECT path, inode, mtime_ns, size, content_hash FROM vault_files")
+        return {row[0]: FileState(*row[1:]) for row in rows}
+
+    def is_empty(self) -> bool:
+        return not self._pool.query("SELECT 1 FROM vault_files LIMIT 1")
+
+    def reconcile(self) -> List[Dict]:
+        """
+        Compara el vault actual con el snapshot guardado, actualiza el snapshot y devuelve
+        los eventos sintéticos (created/modified/moved/deleted) en el formato del watcher.
+        Si no había snapshot previo solo lo crea (no emite eventos).
+        """
+        first_run = self.is_empty()
+        previous = self.load()
+        current = scan_vault(self.vault_path, self.accept, self.workers)
+
+        events: List[Dict] = []
+        removed: List[str] = list(previous.keys() - current.keys())
+        upserts: Dict[str, FileState] = {}
+        created: Dict[str, FileState] = {}
+
+        for path, state in current.items():
+            old = previous.pop(path, None)
+            if old is None:
+                created[path] = state
+            elif old.mtime_ns != state.mtime_ns or old.size != state.size or old.inode != state.inode:
+                content_hash = self._safe_hash(path)
+                if content_hash is None:
+                    continue
+                upserts[path] = state._replace(content_hash=content_hash)
+                if content_hash != old.content_hash:
+                    events.append({'kind': 'modified', 'path': path, 'old_path': None})
+
+        # Lo que queda en ``previous`` desapareció: candidatos a moved por inode o por hash
+        deleted_by_inode = {state.inode: path for path, state in previous.items()}
+        deleted_by_hash = {state.content_hash: path for path, state in previous.items()}
+        for path, state in created.items():
+            content_hash = self._safe_hash(path)
+            if content_hash is None:
+                continue
+            upserts[path] = state._replace(content_hash=content_hash)
+            if first_run:
+                continue
+            origin = deleted_by_inode.get(state.inode)
+            if origin is None or origin not in previous:
+                origin = deleted_by_hash.get(content_hash)
+            if origin is not None and origin in previous:
+                del previous[origin]
+                events.append({'kind': 'moved', 'path': path, 'old_path': origin})
+            else:
+                events.append({'kind': 'created', 'path': path, 'old_path': None})
+
+        for path in previous:
+            events.append({'kind': 'deleted', 'path': path, 'old_path': None})
+
+        with self._pool.connection() as conn:
+            conn.executemany("DELETE FROM vault_files WHERE path = ?", [(p,) for p in removed])
+            conn.executemany(
+                "INSERT OR REPLACE INTO vault_files (path, inode, mtime_ns, size, content_hash) VALUES (?, ?, ?, ?, ?)",
+                [(p, s.inode, s.mtime_ns, s.size, s.content_hash) for p, s in upserts.items()]
+            )
+        return events
+
+    @staticmethod
+    def _safe_hash(path: str) -> Optional[str]:
+        try:
+            return hash_file(path)
+        except OSError:
+            return None
+
+    # --- Mantenimiento incremental desde los eventos del watcher ---
+
+    def record(self, path: str):
+        """Actualiza la entrada de un archivo creado/modificado."""
+        try:
+            st = os.stat(path)
+            content_hash = hash_file(path)
+        except OSError:
+            return
+        self._pool.submit(
+            "INSERT OR REPLACE INTO vault_files (path, inode, mtime_ns, size, content_hash) VALUES (?, ?, ?, ?, ?)",
+            (str(path), st.st_ino, st.st_mtime_ns, st.st_size, content_hash)
+        )
+
+    def forget(self, path: str):
+        """Elimina la entrada de un archivo borrado."""
+        self._pool.submit("DELETE FROM vault_files WHERE path = ?", (str(path),))
+
+    def apply_event(self, kind: str, path: str, old_path: str = None):
+        if kind == 'deleted':
+            self.forget(path)
+            return
+        if kind == 'moved' and old_path:
+            self.forget(old_path)
+        self.record(path)
+
+    def flush(self):
+        self._pool.flush()